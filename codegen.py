@@ -18,6 +18,8 @@
 from __future__ import nested_scopes
 from __future__ import print_function
 
+import hashlib
+import os
 import re
 import sys
 
@@ -124,6 +126,100 @@ def nullCheckedFields(spec, m):
             fieldsToNullCheck.add(jfName)
     return fieldsToNullCheck
 
+def bitGroupReads(spec, arguments):
+    """Resolves, at generation time, which octet and mask each bit argument
+    is read from: returns (argument, bit group number or None, mask) for each
+    argument, a new bit group starting whenever a bit follows a non-bit
+    argument or the current group is full."""
+    result = []
+    group = -1
+    mask = 0x100
+    for a in arguments:
+        if spec.resolveDomain(a.domain) == 'bit':
+            if mask > 0x80:
+                group = group + 1
+                mask = 0x01
+            result.append((a, group, mask))
+            mask = mask << 1
+        else:
+            mask = 0x100
+            result.append((a, None, None))
+    return result
+
+def propertyFlagMasks(fields):
+    """Resolves, at generation time, the flag word and mask of each content
+    header property: 15 presence flags per word, most significant bit first,
+    the least significant bit being the continuation flag."""
+    return [(f, i // 15, 1 << (15 - i % 15)) for (i, f) in enumerate(fields)]
+
+def flagWordCount(fields):
+    return max(1, (len(fields) + 14) // 15)
+
+# wire sizes of the fixed-width domains; bits are sized per group
+fixedWireSizeMap = {
+    'octet': 1,
+    'short': 2,
+    'long': 4,
+    'longlong': 8,
+    'timestamp': 8
+    }
+
+def wireSizeTerms(spec, arguments, accessor):
+    """Splits the wire size of a list of arguments into a constant, computed
+    at generation time, and the terms to add at runtime for variable-width
+    arguments."""
+    fixed = 0
+    terms = []
+    for (a, group, mask) in bitGroupReads(spec, arguments):
+        domain = spec.resolveDomain(a.domain)
+        if group is not None:
+            if mask == 0x01:
+                fixed += 1
+        elif domain in fixedWireSizeMap:
+            fixed += fixedWireSizeMap[domain]
+        else:
+            terms.append("ByteBufferValueWriter.%sSize(%s)" % (domain, accessor(a)))
+    return (fixed, terms)
+
+# shortstr method arguments ("class.method") and content header properties
+# ("class") decoded through the per-connection ShortStringCache: values
+# drawn from a small set that repeat on every delivery. Keys of tables are
+# always decoded through the cache.
+internedShortstrs = {
+    'basic.deliver': ['consumer-tag', 'exchange', 'routing-key'],
+    'basic.get-ok': ['exchange', 'routing-key'],
+    'basic.return': ['exchange', 'routing-key'],
+    'basic.consume-ok': ['consumer-tag'],
+    'basic.cancel': ['consumer-tag'],
+    'basic.cancel-ok': ['consumer-tag'],
+    'basic': ['content-type', 'content-encoding', 'type', 'user-id', 'app-id', 'cluster-id']
+    }
+
+def bufferReadCall(spec, domain, interned):
+    """Returns the ByteBufferValueReader call decoding a value of the given
+    domain from the 'in' buffer, going through the 'cache' string cache for
+    tables and interned short strings."""
+    domain = spec.resolveDomain(domain)
+    if domain == 'table' or (domain == 'shortstr' and interned):
+        return "ByteBufferValueReader.read%s(in, cache)" % (java_class_name(domain))
+    return "ByteBufferValueReader.read%s(in)" % (java_class_name(domain))
+
+# primitive slots of the compact properties layout: properties of these
+# domains are stored unboxed, their presence being kept in a bitmask, and
+# the boxed getters are views over the slots
+propertySlotTypeMap = {
+    'octet': 'byte',
+    'timestamp': 'long'
+    }
+
+def propertySlotType(spec, f):
+    return propertySlotTypeMap.get(spec.resolveDomain(f.domain))
+
+def propertyPresenceType(fields):
+    if len(fields) <= 16:
+        return 'short'
+    return 'int'
+
 #---------------------------------------------------------------------------
 
 def printFileHeader():
@@ -154,14 +250,18 @@ def genJavaApi(spec):
         print()
         print("import java.io.DataInputStream;")
         print("import java.io.IOException;")
+        print("import java.nio.ByteBuffer;")
         print("import java.util.Collections;")
         print("import java.util.HashMap;")
         print("import java.util.Map;")
         print("import java.util.Date;")
         print()
+        print("import com.rabbitmq.client.impl.ByteBufferValueReader;")
+        print("import com.rabbitmq.client.impl.ByteBufferValueWriter;")
         print("import com.rabbitmq.client.impl.ContentHeaderPropertyWriter;")
         print("import com.rabbitmq.client.impl.ContentHeaderPropertyReader;")
         print("import com.rabbitmq.client.impl.LongStringHelper;")
+        print("import com.rabbitmq.client.impl.ShortStringCache;")
 
     def printProtocolClass():
         print()
@@ -233,6 +333,47 @@ def genJavaApi(spec):
                 print("        }")
             print("    }")
 
+    def propertyPresent(f, i):
+        """Expression telling whether the i-th property is present, once decoded."""
+        if propertySlotType(spec, f):
+            return "(this.presentProperties & 0x%04x) != 0" % (1 << i)
+        return "this.%s != null" % (java_field_name(f.name))
+
+    def propertyView(f, i):
+        """Expression of the i-th property as its boxed type, once decoded."""
+        (jfName, slot) = (java_field_name(f.name), propertySlotType(spec, f))
+        if slot == 'byte':
+            return "(this.presentProperties & 0x%04x) != 0 ? Integer.valueOf(this.%s & 0xff) : null" % (1 << i, jfName)
+        if slot == 'long':
+            return "(this.presentProperties & 0x%04x) != 0 ? new Date(this.%s) : null" % (1 << i, jfName)
+        return "this.%s" % (jfName)
+
+    def hasTableProperty(c):
+        return any([spec.resolveDomain(f.domain) == 'table' for f in c.fields])
+
+    def printTablesDecoded(c, indent):
+        """Prints the marking of the decoded tables, which the application
+        may change: the encoded form can no longer be trusted."""
+        for f in c.fields:
+            if spec.resolveDomain(f.domain) == 'table':
+                print("%sif (this.%s != null) this.mutableTables = true;" % (indent, java_field_name(f.name)))
+
+    def printPropertyAssignment(f, i, present, value, indent):
+        """Prints the assignment of a property from an unboxed value, if
+        present: an int for octets, milliseconds for timestamps."""
+        (jfName, slot) = (java_field_name(f.name), propertySlotType(spec, f))
+        if slot is None:
+            print("%sthis.%s = %s ? %s : null;" % (indent, jfName, present, value))
+        else:
+            cast = "(byte) " if slot == 'byte' else ""
+            print("%sif (%s) { this.%s = %s%s; this.presentProperties |= 0x%04x; }" % (indent, present, jfName, cast, value, 1 << i))
+
+    def propertyBufferReadCall(c, f):
+        if propertySlotType(spec, f) == 'long':
+            # AMQP timestamps are in seconds
+            return "ByteBufferValueReader.readLonglong(in) * 1000"
+        return bufferReadCall(spec, f.domain, f.name in internedShortstrs.get(c.name, []))
+
     def printReadProperties(c):
         if c.fields:
             for f in c.fields:
@@ -243,33 +384,174 @@ def genJavaApi(spec):
 
         if c.fields:
             print()
-            for f in c.fields:
+            for (i, f) in enumerate(c.fields):
                 (jfName, jfClass) = (java_field_name(f.name), java_class_name(f.domain))
-                print("            this.%s = %s_present ? reader.read%s() : null;" % (jfName, jfName, jfClass))
+                value = "reader.read%s()" % (jfClass)
+                if propertySlotType(spec, f) == 'long':
+                    value = value + ".getTime()"
+                printPropertyAssignment(f, i, "%s_present" % (jfName), value, "            ")
+            printTablesDecoded(c, "            ")
+
+    def printReadPropertiesFromBuffer(c):
+        words = flagWordCount(c.fields)
+        print("            int start = in.position();")
+        for w in range(words):
+            if w > 0:
+                print("            if ((flags%i & 0x0001) == 0)" % (w - 1))
+                print("                throw new IOException(\"Attempted to read flag word when none advertised\");")
+            print("            int flags%i = ByteBufferValueReader.readShort(in);" % (w))
+        print("            if ((flags%i & 0x0001) != 0)" % (words - 1))
+        print("                throw new IOException(\"Unexpected continuation flag word\");")
+        print()
+        print("            if (lazy) {")
+        print("                int undecoded = 0;")
+        for (i, (f, word, mask)) in enumerate(propertyFlagMasks(c.fields)):
+            print("                if ((flags%i & 0x%04x) != 0) { ByteBufferValueReader.skip%s(in); undecoded |= 0x%04x; }" % (word, mask, java_class_name(f.domain), 1 << i))
+        print("                this.encodedProperties = ByteBufferValueReader.sliceFrom(in, start);")
+        print("                this.undecodedProperties = undecoded;")
+        print("                this.cache = cache;")
+        print("            } else {")
+        for (i, (f, word, mask)) in enumerate(propertyFlagMasks(c.fields)):
+            printPropertyAssignment(f, i, "(flags%i & 0x%04x) != 0" % (word, mask), propertyBufferReadCall(c, f), "                ")
+        printTablesDecoded(c, "                ")
+        print("            }")
+
+    def printDecodeProperties(c):
+        hasTable = any([spec.resolveDomain(f.domain) == 'table' for f in c.fields])
+        print()
+        print("        private void decodeAllProperties() {")
+        print("            int undecoded = this.undecodedProperties;")
+        print("            if (undecoded != 0) decodeProperties(undecoded);")
+        print("        }")
+        print()
+        print("        private synchronized void decodeProperties(int properties) {")
+        print("            properties &= this.undecodedProperties;")
+        print("            if (properties == 0) return;")
+        print("            ByteBuffer in = this.encodedProperties.duplicate();")
+        print("            ShortStringCache cache = this.cache;")
+        indent = "            "
+        if hasTable:
+            print("            try {")
+            indent = "                "
+        # flag words were validated when the header was read
+        for w in range(flagWordCount(c.fields)):
+            print("%sint flags%i = ByteBufferValueReader.readShort(in);" % (indent, w))
+        for (i, (f, word, mask)) in enumerate(propertyFlagMasks(c.fields)):
+            (jfName, jfClass) = (java_field_name(f.name), java_class_name(f.domain))
+            print("%sif ((flags%i & 0x%04x) != 0) {" % (indent, word, mask))
+            if spec.resolveDomain(f.domain) == 'table':
+                print("%s    if ((properties & 0x%04x) != 0) { this.%s = %s; this.mutableTables = true; }" % (indent, 1 << i, jfName, propertyBufferReadCall(c, f)))
+            elif propertySlotType(spec, f) is None:
+                print("%s    if ((properties & 0x%04x) != 0) this.%s = %s;" % (indent, 1 << i, jfName, propertyBufferReadCall(c, f)))
+            else:
+                cast = "(byte) " if propertySlotType(spec, f) == 'byte' else ""
+                print("%s    if ((properties & 0x%04x) != 0) { this.%s = %s%s; this.presentProperties |= 0x%04x; }"
+                      % (indent, 1 << i, jfName, cast, propertyBufferReadCall(c, f), 1 << i))
+            print("%s    else ByteBufferValueReader.skip%s(in);" % (indent, jfClass))
+            print("%s}" % (indent))
+        if hasTable:
+            print("            } catch (IOException e) {")
+            print("                throw new IllegalStateException(\"Malformed content header properties\", e);")
+            print("            }")
+        print("            this.undecodedProperties &= ~properties;")
+        print("            if (this.undecodedProperties == 0) this.cache = null;")
+        print("        }")
 
     def printWritePropertiesTo(c):
         print()
         print("        public void writePropertiesTo(ContentHeaderPropertyWriter writer)")
         print("            throws IOException")
         print("        {")
+        print("            decodeAllProperties();")
         if c.fields:
-            for f in c.fields:
-                print("            writer.writePresence(this.%s != null);" % (java_field_name(f.name)))
+            for (i, f) in enumerate(c.fields):
+                print("            writer.writePresence(%s);" % (propertyPresent(f, i)))
             print()
         print("            writer.finishPresence();")
         if c.fields:
             print()
-            for f in c.fields:
+            for (i, f) in enumerate(c.fields):
                 (jfName, jfClass) = (java_field_name(f.name), java_class_name(f.domain))
-                print("            if (this.%s != null) writer.write%s(this.%s);" % (jfName, jfClass, jfName))
+                value = "this.%s" % (jfName)
+                if propertySlotType(spec, f) == 'long':
+                    value = "new Date(this.%s)" % (jfName)
+                print("            if (%s) writer.write%s(%s);" % (propertyPresent(f, i), jfClass, value))
+        print("        }")
+
+    def printPropertiesWireSize(c):
+        print()
+        print("        public int wireSize() {")
+        print("            ByteBuffer encoded = this.encodedProperties;")
+        if hasTableProperty(c):
+            print("            if (encoded != null && !this.mutableTables) return 12 + encoded.remaining();")
+            print("            decodeAllProperties();")
+        else:
+            print("            if (encoded != null) return 12 + encoded.remaining();")
+        # class id, weight, body size and the flag words
+        print("            int size = %i;" % (2 + 2 + 8 + 2 * flagWordCount(c.fields)))
+        for (i, f) in enumerate(c.fields):
+            (jfName, domain) = (java_field_name(f.name), spec.resolveDomain(f.domain))
+            if domain in fixedWireSizeMap:
+                print("            if (%s) size += %i;" % (propertyPresent(f, i), fixedWireSizeMap[domain]))
+            else:
+                print("            if (%s) size += ByteBufferValueWriter.%sSize(this.%s);" % (propertyPresent(f, i), domain, jfName))
+        print("            return size;")
+        print("        }")
+
+    def printEncodePropertiesTo(c):
+        print()
+        print("        public void encodePropertiesTo(ByteBuffer out) {")
+        print("            ByteBuffer encoded = this.encodedProperties;")
+        if hasTableProperty(c):
+            print("            if (this.mutableTables) {")
+            print("                // the decoded tables may have changed since they were received")
+            print("                decodeAllProperties();")
+            print("                encodePropertyValuesTo(out);")
+            print("                return;")
+            print("            }")
+        print("            if (encoded == null) {")
+        tables = [java_field_name(f.name) for f in c.fields if spec.resolveDomain(f.domain) == 'table']
+        # nested values of tables are not copied and may change between encodings
+        memoizable = "".join([" || !ByteBufferValueWriter.hasImmutableValues(this.%s)" % (t) for t in tables])
+        print("                if (!this.encodedBefore%s) {" % (memoizable))
+        print("                    this.encodedBefore = true;")
+        print("                    encodePropertyValuesTo(out);")
+        print("                    return;")
+        print("                }")
+        print("                // encoded again, the instance is likely reused: keep the encoded form")
+        print("                encoded = ByteBuffer.allocate(wireSize() - 12);")
+        print("                encodePropertyValuesTo(encoded);")
+        print("                encoded.flip();")
+        print("                this.encodedProperties = encoded;")
+        print("            }")
+        print("            out.put(encoded.duplicate());")
+        print("        }")
+        print()
+        print("        private void encodePropertyValuesTo(ByteBuffer out) {")
+        words = flagWordCount(c.fields)
+        for w in range(words):
+            flags = [ "(%s ? 0x%04x : 0)" % (propertyPresent(f, i), mask)
+                      for (i, (f, word, mask)) in enumerate(propertyFlagMasks(c.fields)) if word == w ]
+            if w < words - 1:
+                flags.append("0x0001")
+            if not flags:
+                flags = ["0"]
+            print("            ByteBufferValueWriter.writeShort(out, %s);" % ("\n                | ".join(flags)))
+        for (i, f) in enumerate(c.fields):
+            (jfName, jfClass) = (java_field_name(f.name), java_class_name(f.domain))
+            if propertySlotType(spec, f) == 'long':
+                print("            if (%s) ByteBufferValueWriter.writeLonglong(out, this.%s / 1000);" % (propertyPresent(f, i), jfName))
+            else:
+                print("            if (%s) ByteBufferValueWriter.write%s(out, this.%s);" % (propertyPresent(f, i), jfClass, jfName))
         print("        }")
 
     def printAppendPropertyDebugStringTo(c):
-        appendList = [ "%s=\")\n               .append(this.%s)\n               .append(\""
-                       % (f.name, java_field_name(f.name))
-                       for f in c.fields ]
+        appendList = [ "%s=\")\n               .append(%s)\n               .append(\""
+                       % (f.name, propertyView(f, i) if propertySlotType(spec, f) is None else "(%s)" % (propertyView(f, i)))
+                       for (i, f) in enumerate(c.fields) ]
         print()
         print("        public void appendPropertyDebugStringTo(StringBuilder acc) {")
+        print("            decodeAllProperties();")
         print("            acc.append(\"(%s)\");" % (", ".join(appendList)))
         print("        }")
 
@@ -313,18 +595,23 @@ def genJavaApi(spec):
     def printPropertiesBuilder(c):
         print()
         print("        public Builder builder() {")
+        print("            decodeAllProperties();")
         print("            Builder builder = new Builder()")
-        setFieldList = [ "%s(%s)" % (fn, fn)
-                         for fn in [ java_field_name(f.name) for f in c.fields ]
-                         ]
+        setFieldList = [ "%s(%s)" % (java_field_name(f.name), propertyView(f, i))
+                         for (i, f) in enumerate(c.fields) ]
         print("                .%s;" % ("\n                .".join(setFieldList)))
         print("            return builder;")
         print("        }")
 
     def printPropertiesClass(c):
-        def printGetter(fieldType, fieldName):
+        def printGetter(f, index):
+            (fieldType, fieldName) = (java_field_type(spec, f.domain), java_field_name(f.name))
             capFieldName = fieldName[0].upper() + fieldName[1:]
-            print("        public %s get%s() { return this.%s; }" % (java_boxed_type(fieldType), capFieldName, fieldName))
+            print("        public %s get%s() { if ((this.undecodedProperties & 0x%04x) != 0) decodeProperties(0x%04x); return %s; }"
+                  % (java_boxed_type(fieldType), capFieldName, 1 << index, 1 << index, propertyView(f, index)))
+
+        if len(c.fields) > 31:
+            raise Exception("Lazily decoded properties support at most 31 fields, %s has %i" % (c.name, len(c.fields)))
 
         jClassName = java_class_name(c.name)
 
@@ -333,7 +620,22 @@ def genJavaApi(spec):
         #property fields
         for f in c.fields:
             (fType, fName) = (java_boxed_type(java_field_type(spec, f.domain)), java_field_name(f.name))
-            print("        private %s %s;" % (fType, fName))
+            print("        private %s %s;" % (propertySlotType(spec, f) or fType, fName))
+        if [f for f in c.fields if propertySlotType(spec, f)]:
+            print("        /** Presence of the properties stored unboxed, one bit per property */")
+            print("        private %s presentProperties;" % (propertyPresenceType(c.fields)))
+        print()
+        print("        /** Encoded property flags and values, as received when lazily decoded, or memoized */")
+        print("        private volatile ByteBuffer encodedProperties;")
+        print("        /** Whether the properties have been encoded once, they are memoized the second time */")
+        print("        private volatile boolean encodedBefore;")
+        if hasTableProperty(c):
+            print("        /** Whether tables were decoded: the application may change them, so they are always encoded again */")
+            print("        private volatile boolean mutableTables;")
+        print("        /** Properties not decoded yet from encodedProperties, one bit per property */")
+        print("        private volatile int undecodedProperties;")
+        print("        /** Cache for the strings still to be decoded from encodedProperties */")
+        print("        private ShortStringCache cache;")
 
         #explicit constructor
         if c.fields:
@@ -343,10 +645,13 @@ def genJavaApi(spec):
             print("        public %sProperties(" % (jClassName))
             print("            %s)" % (",\n            ".join(consParmList)))
             print("        {")
-            for f in c.fields:
-                (fType, fName) = (java_field_type(spec, f.domain), java_field_name(f.name))
+            for (i, f) in enumerate(c.fields):
+                (fType, fName, slot) = (java_field_type(spec, f.domain), java_field_name(f.name), propertySlotType(spec, f))
                 if fType == "Map<String,Object>":
                     print("            this.%s = %s==null ? null : Collections.unmodifiableMap(new HashMap<String,Object>(%s));" % (fName, fName, fName))
+                elif slot is not None:
+                    value = "checkOctet(\"%s\", %s.intValue())" % (f.name, fName) if slot == 'byte' else "%s.getTime()" % (fName)
+                    printPropertyAssignment(f, i, "%s != null" % (fName), value, "            ")
                 else:
                     print("            this.%s = %s;" % (fName, fName))
             print("        }")
@@ -361,6 +666,23 @@ def genJavaApi(spec):
 
         print("        }")
 
+        #bytebuffer constructor
+        print()
+        print("        public %sProperties(ByteBuffer in) throws IOException {" % (jClassName))
+        print("            this(in, false, null);")
+        print("        }")
+        print()
+        print("        public %sProperties(ByteBuffer in, boolean lazy) throws IOException {" % (jClassName))
+        print("            this(in, lazy, null);")
+        print("        }")
+        print()
+        print("        public %sProperties(ByteBuffer in, boolean lazy, ShortStringCache cache) throws IOException {" % (jClassName))
+        print("            super(in);")
+
+        printReadPropertiesFromBuffer(c)
+
+        print("        }")
+
         # default constructor
         print("        public %sProperties() {}" % (jClassName))
 
@@ -369,17 +691,26 @@ def genJavaApi(spec):
         print("        public String getClassName() { return \"%s\"; }" % (c.name))
 
         if c.fields:
-            equalsHashCode(spec, c.fields, java_class_name(c.name), 'Properties', False)
+            slotTypes = dict([(java_field_name(f.name), propertySlotType(spec, f))
+                              for f in c.fields if propertySlotType(spec, f)])
+            thatPrelude = ["that.decodeAllProperties();"]
+            if slotTypes:
+                thatPrelude += ["if (presentProperties != that.presentProperties)", "    return false;"]
+            equalsHashCode(spec, c.fields, java_class_name(c.name), 'Properties', False,
+                           ["decodeAllProperties();"], thatPrelude, slotTypes)
 
         printPropertiesBuilder(c)
 
         #accessor methods
         print()
-        for f in c.fields:
-            (jType, jName) = (java_field_type(spec, f.domain), java_field_name(f.name))
-            printGetter(jType, jName)
+        for (i, f) in enumerate(c.fields):
+            printGetter(f, i)
+
+        printDecodeProperties(c)
 
         printWritePropertiesTo(c)
+        printPropertiesWireSize(c)
+        printEncodePropertiesTo(c)
         printAppendPropertyDebugStringTo(c)
         printPropertiesBuilderClass(c)
 
@@ -403,7 +734,7 @@ def genJavaApi(spec):
 
 #--------------------------------------------------------------------------------
 
-def equalsHashCode(spec, fields, jClassName, classSuffix, usePrimitiveType):
+def equalsHashCode(spec, fields, jClassName, classSuffix, usePrimitiveType, thisPrelude = [], thatPrelude = [], slotTypes = {}):
         print()
         print()
         print("        @Override")
@@ -413,10 +744,13 @@ def equalsHashCode(spec, fields, jClassName, classSuffix, usePrimitiveType):
         print("            if (o == null || getClass() != o.getClass())")
         print("               return false;")
         print("            %s%s that = (%s%s) o;" % (jClassName, classSuffix, jClassName, classSuffix))
+        for line in thisPrelude + thatPrelude:
+            print("            %s" % (line))
 
         for f in fields:
             (fType, fName) = (java_field_type(spec, f.domain), java_field_name(f.name))
-            if usePrimitiveType and fType in javaScalarTypes:
+            fType = slotTypes.get(fName, fType)
+            if (usePrimitiveType and fType in javaScalarTypes) or fName in slotTypes:
                 print("            if (%s != that.%s)" % (fName, fName))
             else:
                 print("            if (%s != null ? !%s.equals(that.%s) : that.%s != null)" % (fName, fName, fName, fName))
@@ -429,11 +763,14 @@ def equalsHashCode(spec, fields, jClassName, classSuffix, usePrimitiveType):
         print()
         print("        @Override")
         print("        public int hashCode() {")
+        for line in thisPrelude:
+            print("            %s" % (line))
         print("            int result = 0;")
 
         for f in fields:
             (fType, fName) = (java_field_type(spec, f.domain), java_field_name(f.name))
-            if usePrimitiveType and fType in javaScalarTypes:
+            fType = slotTypes.get(fName, fType)
+            if (usePrimitiveType and fType in javaScalarTypes) or fName in slotTypes:
                 if fType == 'boolean':
                     print("            result = 31 * result + (%s ? 1 : 0);" % fName)
                 elif fType == 'long':
@@ -446,22 +783,36 @@ def equalsHashCode(spec, fields, jClassName, classSuffix, usePrimitiveType):
         print("            return result;")
         print("        }")
 
-def genJavaImpl(spec):
+def genJavaImpl(spec, profile = None):
+    decoded = profileMethods(spec, profile)
+
+    def isDecoded(c, m):
+        return decoded is None or (c.name, m.name) in decoded
+
+    def decodedMethods(c):
+        return [m for m in c.allMethods() if isDecoded(c, m)]
+
     def printHeader():
         printFileHeader()
         print("package com.rabbitmq.client.impl;")
         print()
         print("import java.io.IOException;")
         print("import java.io.DataInputStream;")
+        print("import java.nio.BufferUnderflowException;")
+        print("import java.nio.ByteBuffer;")
         print("import java.util.Collections;")
         print("import java.util.HashMap;")
         print("import java.util.Map;")
         print()
         print("import com.rabbitmq.client.AMQP;")
         print("import com.rabbitmq.client.LongString;")
+        print("import com.rabbitmq.client.MalformedFrameException;")
         print("import com.rabbitmq.client.UnknownClassOrMethodId;")
         print("import com.rabbitmq.client.UnexpectedMethodError;")
 
+    def hasTables(m):
+        return any([spec.resolveDomain(a.domain) == 'table' for a in m.arguments])
+
     def printClassMethods(spec, c):
         print()
         print("    public static class %s {" % (java_class_name(c.name)))
@@ -477,7 +828,15 @@ def genJavaImpl(spec):
             def constructors():
                 print()
                 argList = [ "%s %s" % (java_field_type(spec,a.domain),java_field_name(a.name)) for a in m.arguments ]
-                print("            public %s(%s) {" % (java_class_name(m.name), ", ".join(argList)))
+                if hasTables(m):
+                    print("            public %s(%s) {" % (java_class_name(m.name), ", ".join(argList)))
+                    print("                this(%s, false);" % (", ".join([java_field_name(a.name) for a in m.arguments])))
+                    print("            }")
+                    print()
+                    print("            /** Trusted constructor for the decoders: tables are owned by the method, they are wrapped without copying */")
+                    print("            private %s(%s, boolean adoptTables) {" % (java_class_name(m.name), ", ".join(argList)))
+                else:
+                    print("            public %s(%s) {" % (java_class_name(m.name), ", ".join(argList)))
 
                 fieldsToNullCheckInCons = [f for f in nullCheckedFields(spec, m)]
                 fieldsToNullCheckInCons.sort()
@@ -489,7 +848,7 @@ def genJavaImpl(spec):
                 for a in m.arguments:
                     (jfType, jfName) = (java_field_type(spec, a.domain), java_field_name(a.name))
                     if jfType == "Map<String,Object>":
-                        print("                this.%s = %s==null ? null : Collections.unmodifiableMap(new HashMap<String,Object>(%s));" % (jfName, jfName, jfName))
+                        print("                this.%s = %s==null ? null : Collections.unmodifiableMap(adoptTables ? %s : new HashMap<String,Object>(%s));" % (jfName, jfName, jfName, jfName))
                     else:
                         print("                this.%s = %s;" % (jfName, jfName))
 
@@ -500,6 +859,29 @@ def genJavaImpl(spec):
                 print("                this(%s);" % (", ".join(consArgs)))
                 print("            }")
 
+            def buffer_reader():
+                print()
+                print("            public static %s readFrom(ByteBuffer in) throws IOException {" % (java_class_name(m.name)))
+                print("                return readFrom(in, null);")
+                print("            }")
+                print()
+                print("            public static %s readFrom(ByteBuffer in, ShortStringCache cache) throws IOException {" % (java_class_name(m.name)))
+                interned = internedShortstrs.get("%s.%s" % (c.name, m.name), [])
+                for (a, group, mask) in bitGroupReads(spec, m.arguments):
+                    (jfType, jfName) = (java_field_type(spec, a.domain), java_field_name(a.name))
+                    if group is None:
+                        print("                %s %s = %s;" % (jfType, jfName, bufferReadCall(spec, a.domain, a.name in interned)))
+                    else:
+                        if mask == 0x01:
+                            print("                int bits%i = ByteBufferValueReader.readOctet(in);" % (group))
+                        print("                boolean %s = (bits%i & 0x%02x) != 0;" % (jfName, group, mask))
+                consArgs = [java_field_name(a.name) for a in m.arguments]
+                if hasTables(m):
+                    # the decoded tables are owned by the method
+                    consArgs.append("true")
+                print("                return new %s(%s);" % (java_class_name(m.name), ", ".join(consArgs)))
+                print("            }")
+
             def others():
                 print()
                 print("            public int protocolClassId() { return %s; }" % (c.index))
@@ -535,6 +917,64 @@ def genJavaImpl(spec):
                     print("                writer.write%s(this.%s);" % (java_class_name(spec.resolveDomain(a.domain)), java_field_name(a.name)))
                 print("            }")
 
+            def wire_size():
+                (fixed, terms) = wireSizeTerms(spec, m.arguments, lambda a: "this." + java_field_name(a.name))
+                print()
+                print("            public int wireSize() {")
+                # class id and method id
+                print("                return %s;" % ("\n                    + ".join(["%i" % (4 + fixed)] + terms)))
+                print("            }")
+
+            def print_argument_writes(accessor):
+                bits = []
+                def flushBits():
+                    if bits:
+                        print("                ByteBufferValueWriter.writeOctet(out, %s);" % ("\n                    | ".join(bits)))
+                        del bits[:]
+                for (a, group, mask) in bitGroupReads(spec, m.arguments):
+                    if group is None:
+                        flushBits()
+                        print("                ByteBufferValueWriter.write%s(out, %s);" % (java_class_name(spec.resolveDomain(a.domain)), accessor(a)))
+                    else:
+                        if mask == 0x01:
+                            flushBits()
+                        bits.append("(%s ? 0x%02x : 0)" % (accessor(a), mask))
+                flushBits()
+
+            def encode_arguments():
+                print()
+                print("            public void encodeArgumentsTo(ByteBuffer out) {")
+                print_argument_writes(lambda a: "this." + java_field_name(a.name))
+                print("            }")
+
+            def flyweight_encoder():
+                # methods with fixed-width and short string arguments only can
+                # be encoded from their arguments, without instantiating them
+                domains = [spec.resolveDomain(a.domain) for a in m.arguments]
+                if not m.arguments or [d for d in domains if d not in fixedWireSizeMap and d not in ['bit', 'shortstr']]:
+                    return
+                (fixed, terms) = wireSizeTerms(spec, m.arguments, lambda a: java_field_name(a.name))
+                print()
+                if terms:
+                    print("            /** Maximum wire size of the payload of this method, short strings being at most 255 bytes long */")
+                    print("            public static final int MAX_WIRE_SIZE = %i;" % (4 + fixed + 256 * len(terms)))
+                else:
+                    print("            /** Wire size of the payload of this method */")
+                    print("            public static final int WIRE_SIZE = %i;" % (4 + fixed))
+                print()
+                print("            /** Encodes the payload of this method from its arguments, without instantiating it */")
+                argList = [ "%s %s" % (java_field_type(spec,a.domain),java_field_name(a.name)) for a in m.arguments ]
+                print("            public static void encode(ByteBuffer out, %s) {" % (", ".join(argList)))
+                fieldsToNullCheck = [f for f in nullCheckedFields(spec, m)]
+                fieldsToNullCheck.sort()
+                for f in fieldsToNullCheck:
+                    print("                if (%s == null)" % (f))
+                    print("                    throw new IllegalStateException(\"Invalid configuration: '%s' must be non-null.\");" % (f))
+                print("                ByteBufferValueWriter.writeShort(out, %s);" % (c.index))
+                print("                ByteBufferValueWriter.writeShort(out, %s);" % (m.index))
+                print_argument_writes(lambda a: java_field_name(a.name))
+                print("            }")
+
             #start
             print()
             print("        public static class %s" % (java_class_name(m.name),))
@@ -548,12 +988,16 @@ def genJavaImpl(spec):
 
             getters()
             constructors()
+            buffer_reader()
             others()
             if m.arguments:
                 equalsHashCode(spec, m.arguments, java_class_name(m.name), '', True)
 
             argument_debug_string()
             write_arguments()
+            wire_size()
+            encode_arguments()
+            flyweight_encoder()
 
             print("        }")
         print("    }")
@@ -581,9 +1025,11 @@ def genJavaImpl(spec):
         print("        int methodId = in.readShort();")
         print("        switch (classId) {")
         for c in spec.allClasses():
+            if not decodedMethods(c):
+                continue
             print("            case %s:" % (c.index))
             print("                switch (methodId) {")
-            for m in c.allMethods():
+            for m in decodedMethods(c):
                 fq_name = java_class_name(c.name) + '.' + java_class_name(m.name)
                 print("                    case %s: {" % (m.index))
                 print("                        return new %s(new MethodArgumentReader(new ValueReader(in)));" % (fq_name))
@@ -595,6 +1041,129 @@ def genJavaImpl(spec):
         print("        throw new UnknownClassOrMethodId(classId, methodId);")
         print("    }")
 
+    def printMethodBufferReader():
+        print()
+        print("    public static Method readMethodFrom(ByteBuffer in) throws IOException {")
+        print("        return readMethodFrom(in, null);")
+        print("    }")
+        print()
+        print("    public static Method readMethodFrom(ByteBuffer in, ShortStringCache cache) throws IOException {")
+        print("        try {")
+        print("            int classId = ByteBufferValueReader.readShort(in);")
+        print("            int methodId = ByteBufferValueReader.readShort(in);")
+        print("            switch (classId) {")
+        for c in spec.allClasses():
+            if not decodedMethods(c):
+                continue
+            print("                case %s:" % (c.index))
+            print("                    switch (methodId) {")
+            for m in decodedMethods(c):
+                fq_name = java_class_name(c.name) + '.' + java_class_name(m.name)
+                print("                        case %s: return %s.readFrom(in, cache);" % (m.index, fq_name))
+            print("                        default: break;")
+            print("                    } break;")
+        print("            }")
+        print()
+        print("            throw new UnknownClassOrMethodId(classId, methodId);")
+        print("        } catch (BufferUnderflowException e) {")
+        print("            throw new MalformedFrameException(\"Truncated method frame\");")
+        print("        }")
+        print("    }")
+
+    def printMethodIndex():
+        methods = [(c, m) for c in spec.allClasses() for m in c.allMethods()]
+        print()
+        print("    /** Number of methods of the protocol, see {@link #methodIndex(int, int)} */")
+        print("    public static final int METHOD_COUNT = %i;" % (len(methods)))
+        print()
+        print("    private static final String[] METHOD_NAMES = {")
+        for (c, m) in methods:
+            print("        \"%s.%s\"," % (c.name, m.name))
+        print("    };")
+        print()
+        print("    /**")
+        print("     * Dense index of a method of the protocol, for per-method arrays.")
+        print("     * @return the index of the method, from 0 to {@link #METHOD_COUNT} excluded, -1 for an unknown method")
+        print("     */")
+        print("    public static int methodIndex(int classId, int methodId) {")
+        print("        switch (classId) {")
+        index = 0
+        for c in spec.allClasses():
+            print("            case %s:" % (c.index))
+            print("                switch (methodId) {")
+            for m in c.allMethods():
+                print("                    case %s: return %i;" % (m.index, index))
+                index += 1
+            print("                    default: return -1;")
+            print("                }")
+        print("            default: return -1;")
+        print("        }")
+        print("    }")
+        print()
+        print("    /** @return the name of the method at the given index, e.g. {@code basic.publish} */")
+        print("    public static String methodName(int methodIndex) {")
+        print("        return METHOD_NAMES[methodIndex];")
+        print("    }")
+
+    def printReplyMapping():
+        indexes = {}
+        for c in spec.allClasses():
+            for m in c.allMethods():
+                indexes[(c.name, m.name)] = len(indexes)
+        print()
+        print("    /** @return whether the method at the given index is synchronous, i.e. expects a reply */")
+        print("    public static boolean isSynchronous(int methodIndex) {")
+        print("        switch (methodIndex) {")
+        for c in spec.allClasses():
+            for m in c.allMethods():
+                if m.isSynchronous:
+                    print("            case %i: // %s.%s" % (indexes[(c.name, m.name)], c.name, m.name))
+        print("                return true;")
+        print("            default:")
+        print("                return false;")
+        print("        }")
+        print("    }")
+        print()
+        print("    /**")
+        print("     * Whether a method replies to a synchronous method, according to the specification.")
+        print("     * @param requestIndex the index of the synchronous method, see {@link #methodIndex(int, int)}")
+        print("     * @param replyIndex the index of the candidate reply")
+        print("     * @return true if the reply answers the request, false otherwise or if the request is asynchronous")
+        print("     */")
+        print("    public static boolean isReply(int requestIndex, int replyIndex) {")
+        print("        switch (requestIndex) {")
+        for c in spec.allClasses():
+            for m in c.allMethods():
+                if not m.isSynchronous:
+                    continue
+                replies = synchronousReplies(c, m)
+                if not replies:
+                    raise Exception("No reply for synchronous method %s.%s" % (c.name, m.name))
+                condition = " || ".join(["replyIndex == %i" % (indexes[(c.name, r.name)]) for r in replies])
+                print("            case %i: return %s; // %s.%s" % (indexes[(c.name, m.name)], condition, c.name, m.name))
+        print("            default: return false;")
+        print("        }")
+        print("    }")
+        print()
+        print("    /** @return whether the reply answers the synchronous request, according to the specification */")
+        print("    public static boolean isReply(com.rabbitmq.client.Method request, com.rabbitmq.client.Method reply) {")
+        print("        return isReply(methodIndex(request.protocolClassId(), request.protocolMethodId()),")
+        print("                       methodIndex(reply.protocolClassId(), reply.protocolMethodId()));")
+        print("    }")
+        print()
+        print("    /** @return whether the method has its nowait flag set, i.e. the broker sends no reply to it */")
+        print("    public static boolean isNoWait(com.rabbitmq.client.Method m) {")
+        print("        switch (methodIndex(m.protocolClassId(), m.protocolMethodId())) {")
+        for c in spec.allClasses():
+            for m in c.allMethods():
+                if any(a.name == 'nowait' for a in m.arguments):
+                    print("            case %i: return ((com.rabbitmq.client.AMQP.%s.%s) m).%s(); // %s.%s" %
+                          (indexes[(c.name, m.name)], java_class_name(c.name), java_class_name(m.name),
+                           java_getter_name('nowait'), c.name, m.name))
+        print("            default: return false;")
+        print("        }")
+        print("    }")
+
     def printContentHeaderReader():
         print()
         print("    public static AMQContentHeader readContentHeaderFrom(DataInputStream in) throws IOException {")
@@ -609,6 +1178,32 @@ def genJavaImpl(spec):
         print("        throw new UnknownClassOrMethodId(classId);")
         print("    }")
 
+    def printContentHeaderBufferReader():
+        print()
+        print("    public static AMQContentHeader readContentHeaderFrom(ByteBuffer in) throws IOException {")
+        print("        return readContentHeaderFrom(in, false);")
+        print("    }")
+        print()
+        print("    public static AMQContentHeader readContentHeaderFrom(ByteBuffer in, boolean lazy) throws IOException {")
+        print("        return readContentHeaderFrom(in, lazy, null);")
+        print("    }")
+        print()
+        print("    public static AMQContentHeader readContentHeaderFrom(ByteBuffer in, boolean lazy, ShortStringCache cache) throws IOException {")
+        print("        try {")
+        print("            int classId = ByteBufferValueReader.readShort(in);")
+        print("            switch (classId) {")
+        for c in spec.allClasses():
+            if c.fields:
+                print("                case %s: return new %sProperties(in, lazy, cache);" %(c.index, (java_class_name(c.name))))
+        print("                default: break;")
+        print("            }")
+        print()
+        print("            throw new UnknownClassOrMethodId(classId);")
+        print("        } catch (BufferUnderflowException e) {")
+        print("            throw new MalformedFrameException(\"Truncated content header frame\");")
+        print("        }")
+        print("    }")
+
     printHeader()
     print()
     print("public class AMQImpl implements AMQP {")
@@ -617,17 +1212,930 @@ def genJavaImpl(spec):
 
     printMethodVisitor()
     printMethodArgumentReader()
+    printMethodBufferReader()
+    printMethodIndex()
+    printReplyMapping()
     printContentHeaderReader()
+    printContentHeaderBufferReader()
+
+    print("}")
+
+# the spec flags synchronous methods without naming their replies: a reply
+# is the method of the same class with the '-ok' suffix, plus these ones
+extraSynchronousReplies = {
+    ('basic', 'get'): ['get-empty']
+}
+
+def synchronousReplies(c, m):
+    names = [m.name + '-ok'] + extraSynchronousReplies.get((c.name, m.name), [])
+    return [r for r in c.allMethods() if r.name in names]
+
+#--------------------------------------------------------------------------------
+
+# profiles trim the generated decoders to the methods a kind of client uses,
+# a class name stands for all its methods. AMQImpl rejects the other methods
+# with UnknownClassOrMethodId and does not load their classes when it is
+# linked. All the classes are still generated, the client refers to them.
+profileEntries = {
+    'publish': ['connection', 'channel', 'exchange', 'queue', 'tx', 'confirm',
+                'basic.qos', 'basic.qos-ok', 'basic.publish', 'basic.return',
+                'basic.ack', 'basic.nack'],
+    'consume': ['connection', 'channel', 'exchange', 'queue',
+                'basic.qos', 'basic.qos-ok', 'basic.consume', 'basic.consume-ok',
+                'basic.cancel', 'basic.cancel-ok', 'basic.deliver',
+                'basic.get', 'basic.get-ok', 'basic.get-empty',
+                'basic.ack', 'basic.reject', 'basic.nack',
+                'basic.recover', 'basic.recover-ok']
+}
+
+def profileMethods(spec, profile):
+    """The (class, method) names of a profile, None for the full protocol."""
+    if profile is None or profile == 'full':
+        return None
+    if profile not in profileEntries:
+        raise Exception("Unknown profile %s, expected full or one of %s" % (profile, ", ".join(sorted(profileEntries))))
+    methods = set()
+    for entry in profileEntries[profile]:
+        (className, _, methodName) = entry.partition('.')
+        matches = [(c.name, m.name) for c in spec.allClasses() for m in c.allMethods()
+                   if c.name == className and methodName in ('', m.name)]
+        if not matches:
+            raise Exception("No method %s in the specification for profile %s" % (entry, profile))
+        methods.update(matches)
+    return methods
+
+def genClassList(spec, profile = None):
+    """Generated classes of a profile, in the format of the class lists
+    used to create AppCDS archives (-XX:SharedClassListFile)."""
+    methods = profileMethods(spec, profile)
+    names = ['com/rabbitmq/client/AMQP',
+             'com/rabbitmq/client/impl/AMQImpl',
+             'com/rabbitmq/client/impl/AMQImpl$MethodVisitor']
+    for c in spec.allClasses():
+        selected = [m for m in c.allMethods() if methods is None or (c.name, m.name) in methods]
+        if not selected:
+            continue
+        jClass = java_class_name(c.name)
+        names.append('com/rabbitmq/client/AMQP$%s' % (jClass))
+        names.append('com/rabbitmq/client/impl/AMQImpl$%s' % (jClass))
+        for m in selected:
+            names.append('com/rabbitmq/client/AMQP$%s$%s' % (jClass, java_class_name(m.name)))
+            names.append('com/rabbitmq/client/impl/AMQImpl$%s$%s' % (jClass, java_class_name(m.name)))
+        if c.fields:
+            names.append('com/rabbitmq/client/AMQP$%sProperties' % (jClass))
+    for name in names:
+        print(name)
+
+#--------------------------------------------------------------------------------
+
+# representative values for the benchmarks, by field name first, by domain otherwise
+benchmarkShortstrs = {
+    'exchange': 'amq.topic',
+    'destination': 'amq.topic',
+    'source': 'orders',
+    'routing-key': 'orders.eu.created',
+    'queue': 'amq.gen-JzTY20BRgKO-HjmUJj0wLg',
+    'consumer-tag': 'amq.ctag-Dl9ZRHzc0lWtn0cPiD5L0w',
+    'type': 'topic',
+    'reply-text': "NOT_FOUND - no queue 'orders' in vhost '/'",
+    'virtual-host': '/',
+    'mechanism': 'PLAIN',
+    'locale': 'en_US',
+    'content-type': 'application/json',
+    'content-encoding': 'gzip',
+    'correlation-id': 'c0ffee2b-86d5-4ab3-9a5e-3b6a1f0e4d21',
+    'reply-to': 'amq.rabbitmq.reply-to.g1h2AA5yZXBseUAxNjQ5NzI2NQAAAAEAAAAA',
+    'message-id': '7d4b1e8a-2f6c-4d3e-b1a9-0c5e8f7a6b34',
+    'expiration': '60000',
+    'user-id': 'guest',
+    'app-id': 'order-service',
+    'basic.type': 'order.created'
+}
+benchmarkTables = {
+    'client-properties': 'peerProperties()',
+    'server-properties': 'peerProperties()',
+    'headers': 'messageHeaders()'
+}
+benchmarkDomainValues = {
+    'octet': '2',
+    'short': '10',
+    'long': '131072',
+    'longlong': '42L',
+    'bit': 'true',
+    'longstr': 'LongStringHelper.asLongString("AMQPLAIN PLAIN")',
+    'timestamp': 'new Date(1600000000000L)',
+    'table': 'arguments()'
+}
+
+def benchmarkValue(spec, c, f):
+    domain = spec.resolveDomain(f.domain)
+    if domain == 'shortstr':
+        value = benchmarkShortstrs.get(c.name + '.' + f.name, benchmarkShortstrs.get(f.name, 'benchmark'))
+        return '"%s"' % (value.replace('"', '\\"'))
+    if domain == 'table' and f.name in benchmarkTables:
+        return benchmarkTables[f.name]
+    return benchmarkDomainValues[domain]
+
+def genJavaBenchmarks(spec, profile = None):
+    methods = profileMethods(spec, profile)
+
+    def printHeader():
+        printFileHeader()
+        print("package com.rabbitmq.client.impl;")
+        print()
+        print("import java.io.IOException;")
+        print("import java.nio.ByteBuffer;")
+        print("import java.util.Arrays;")
+        print("import java.util.Collections;")
+        print("import java.util.Date;")
+        print("import java.util.LinkedHashMap;")
+        print("import java.util.Map;")
+        print("import java.util.concurrent.TimeUnit;")
+        print()
+        print("import org.openjdk.jmh.annotations.Benchmark;")
+        print("import org.openjdk.jmh.annotations.BenchmarkMode;")
+        print("import org.openjdk.jmh.annotations.Fork;")
+        print("import org.openjdk.jmh.annotations.Measurement;")
+        print("import org.openjdk.jmh.annotations.Mode;")
+        print("import org.openjdk.jmh.annotations.OutputTimeUnit;")
+        print("import org.openjdk.jmh.annotations.Scope;")
+        print("import org.openjdk.jmh.annotations.State;")
+        print("import org.openjdk.jmh.annotations.Warmup;")
+        print()
+        print("import com.rabbitmq.client.AMQP;")
+
+    def printHelpers():
+        print()
+        print("    /** Body size advertised by the content headers */")
+        print("    private static final long BODY_SIZE = 1024L;")
+        print()
+        print("    /** Scratch buffer to encode into */")
+        print("    private final ByteBuffer buffer = ByteBuffer.allocate(65536);")
+        print()
+        print("    private static Map<String, Object> arguments() {")
+        print("        Map<String, Object> arguments = new LinkedHashMap<>();")
+        print("        arguments.put(\"x-queue-type\", \"quorum\");")
+        print("        arguments.put(\"x-max-length\", 100000);")
+        print("        arguments.put(\"x-message-ttl\", 60000L);")
+        print("        arguments.put(\"x-dead-letter-exchange\", \"orders.dlx\");")
+        print("        return arguments;")
+        print("    }")
+        print()
+        print("    private static Map<String, Object> peerProperties() {")
+        print("        Map<String, Object> capabilities = new LinkedHashMap<>();")
+        print("        capabilities.put(\"publisher_confirms\", true);")
+        print("        capabilities.put(\"exchange_exchange_bindings\", true);")
+        print("        capabilities.put(\"basic.nack\", true);")
+        print("        capabilities.put(\"consumer_cancel_notify\", true);")
+        print("        capabilities.put(\"connection.blocked\", true);")
+        print("        capabilities.put(\"authentication_failure_close\", true);")
+        print("        Map<String, Object> properties = new LinkedHashMap<>();")
+        print("        properties.put(\"product\", \"RabbitMQ\");")
+        print("        properties.put(\"version\", \"3.12.6\");")
+        print("        properties.put(\"platform\", \"Java\");")
+        print("        properties.put(\"copyright\", \"Copyright (c) 2007-2023 VMware, Inc. or its affiliates.\");")
+        print("        properties.put(\"information\", \"Licensed under the MPL. See https://www.rabbitmq.com/\");")
+        print("        properties.put(\"capabilities\", capabilities);")
+        print("        properties.put(\"connection_name\", \"order-service-1\");")
+        print("        return properties;")
+        print("    }")
+        print()
+        print("    private static Map<String, Object> messageHeaders() {")
+        print("        Map<String, Object> death = new LinkedHashMap<>();")
+        print("        death.put(\"count\", 1L);")
+        print("        death.put(\"reason\", \"rejected\");")
+        print("        death.put(\"queue\", \"orders\");")
+        print("        death.put(\"time\", new Date(1600000000000L));")
+        print("        death.put(\"exchange\", \"amq.topic\");")
+        print("        death.put(\"routing-keys\", Arrays.asList(\"orders.eu.created\"));")
+        print("        Map<String, Object> headers = new LinkedHashMap<>();")
+        print("        headers.put(\"traceparent\", \"00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01\");")
+        print("        headers.put(\"x-death\", Collections.singletonList(death));")
+        print("        headers.put(\"x-retries\", 3);")
+        print("        return headers;")
+        print("    }")
+        print()
+        print("    private static ByteBuffer encoded(Method method) {")
+        print("        ByteBuffer encoded = ByteBuffer.allocate(method.wireSize());")
+        print("        method.encodeTo(encoded);")
+        print("        return encoded;")
+        print("    }")
+        print()
+        print("    private static ByteBuffer encoded(AMQContentHeader header) {")
+        print("        ByteBuffer encoded = ByteBuffer.allocate(header.wireSize());")
+        print("        header.encodeTo(encoded, BODY_SIZE);")
+        print("        return encoded;")
+        print("    }")
+        print()
+        print("    private static Method roundTrip(Method method) throws IOException {")
+        print("        CommandAssembler assembler = new CommandAssembler(null, null, null, Integer.MAX_VALUE);")
+        print("        assembler.handleFrame(method.toFrame(1));")
+        print("        return assembler.getMethod();")
+        print("    }")
+
+    def benchmarkName(c, m = None):
+        name = java_field_name(c.name)
+        if m:
+            name += java_class_name(m.name)
+        else:
+            name += 'Properties'
+        return name
+
+    def printMethodBenchmarks(c, m):
+        name = benchmarkName(c, m)
+        args = ", ".join([benchmarkValue(spec, c, a) for a in m.arguments])
+        print()
+        print("    // %s.%s" % (c.name, m.name))
+        print()
+        print("    private final Method %s = new AMQImpl.%s.%s(%s);" % (name, java_class_name(c.name), java_class_name(m.name), args))
+        print("    private final ByteBuffer %sEncoded = encoded(%s);" % (name, name))
+        print()
+        print("    @Benchmark")
+        print("    public int %sEncode() {" % (name))
+        print("        buffer.clear();")
+        print("        %s.encodeTo(buffer);" % (name))
+        print("        return buffer.position();")
+        print("    }")
+        print()
+        print("    @Benchmark")
+        print("    public Method %sDecode() throws IOException {" % (name))
+        print("        %sEncoded.clear();" % (name))
+        print("        return AMQImpl.readMethodFrom(%sEncoded);" % (name))
+        print("    }")
+        print()
+        print("    @Benchmark")
+        print("    public Method %sRoundTrip() throws IOException {" % (name))
+        print("        return roundTrip(%s);" % (name))
+        print("    }")
+
+    def printContentHeaderBenchmarks(c):
+        name = benchmarkName(c)
+        print()
+        print("    // %s properties" % (c.name))
+        print()
+        print("    private final AMQContentHeader %s = new AMQP.%sProperties.Builder()" % (name, java_class_name(c.name)))
+        for f in c.fields:
+            print("        .%s(%s)" % (java_field_name(f.name), benchmarkValue(spec, c, f)))
+        print("        .build();")
+        print("    private final ByteBuffer %sEncoded = encoded(%s);" % (name, name))
+        print()
+        print("    @Benchmark")
+        print("    public int %sEncode() {" % (name))
+        print("        buffer.clear();")
+        print("        %s.encodeTo(buffer, BODY_SIZE);" % (name))
+        print("        return buffer.position();")
+        print("    }")
+        print()
+        print("    @Benchmark")
+        print("    public AMQContentHeader %sDecode() throws IOException {" % (name))
+        print("        %sEncoded.clear();" % (name))
+        print("        return AMQImpl.readContentHeaderFrom(%sEncoded);" % (name))
+        print("    }")
+        print()
+        print("    @Benchmark")
+        print("    public AMQContentHeader %sRoundTrip() throws IOException {" % (name))
+        print("        return AMQImpl.readContentHeaderFrom(%s.toFrame(1, BODY_SIZE).getPayloadBuffer());" % (name))
+        print("    }")
 
+    printHeader()
+    print()
+    print("/**")
+    print(" * Encoding, decoding and round-trip (through {@link Frame} and {@link CommandAssembler})")
+    print(" * benchmarks of every method and content header class of the protocol.")
+    print(" */")
+    print("@BenchmarkMode(Mode.AverageTime)")
+    print("@OutputTimeUnit(TimeUnit.NANOSECONDS)")
+    print("@Warmup(iterations = 3, time = 1)")
+    print("@Measurement(iterations = 5, time = 1)")
+    print("@Fork(1)")
+    print("@State(Scope.Thread)")
+    print("public class AMQImplBenchmark {")
+    printHelpers()
+    for c in spec.allClasses():
+        for m in c.allMethods():
+            if methods is None or (c.name, m.name) in methods:
+                printMethodBenchmarks(c, m)
+        if c.fields:
+            printContentHeaderBenchmarks(c)
     print("}")
 
 #--------------------------------------------------------------------------------
 
+def python_name(name):
+    return name.replace('-', '_')
+
+# reading code of the domains, the value ends up in v and o is moved past it
+pythonDomainReaders = {
+    'octet': ["v = b[o]", "o += 1"],
+    'short': ["v, = _H(b, o)", "o += 2"],
+    'long': ["v, = _I(b, o)", "o += 4"],
+    'longlong': ["v, = _Q(b, o)", "o += 8"],
+    'timestamp': ["v, = _Q(b, o)", "o += 8"],
+    'shortstr': ["n = b[o]", "v = str(b[o + 1:o + 1 + n], 'utf-8', 'replace')", "o += 1 + n"],
+    'longstr': ["n, = _I(b, o)", "v = b[o + 4:o + 4 + n]", "o += 4 + n"],
+    'table': ["n, = _I(b, o)", "v = Table(b[o + 4:o + 4 + n])", "o += 4 + n"]
+}
+
+# skipping code of the domains, for the routing key extractors
+pythonDomainSkips = {
+    'octet': "o += 1",
+    'short': "o += 2",
+    'long': "o += 4",
+    'longlong': "o += 8",
+    'timestamp': "o += 8",
+    'shortstr': "o += 1 + b[o]",
+    'longstr': "o += 4 + _I(b, o)[0]",
+    'table': "o += 4 + _I(b, o)[0]"
+}
+
+pythonCodecRuntime = r'''
+"""AMQP 0-9-1 frame codec, to analyse captures of raw AMQP traffic.
+
+Frames are split in batches straight from the buffers the capture is read
+into, method arguments, content properties and tables are only decoded
+when accessed and bodies are memoryviews of the capture buffers.
+
+    for record in records('capture.bin'):
+        if isinstance(record, MethodRecord) and record.name == 'basic.publish':
+            print(record.channel, record.arguments['routing_key'])
+
+    python amqp_codec.py --summary capture.bin
+"""
+
+import collections
+import collections.abc
+import io
+import json
+import struct
+import sys
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+_FRAME_HEADER = struct.Struct('>BHI').unpack_from
+_H = struct.Struct('>H').unpack_from
+_I = struct.Struct('>I').unpack_from
+_Q = struct.Struct('>Q').unpack_from
+_CONTENT_HEADER = struct.Struct('>HHQ').unpack_from
+_VALUES = {
+    'b': (struct.Struct('>b').unpack_from, 1),
+    'B': (struct.Struct('>B').unpack_from, 1),
+    's': (struct.Struct('>h').unpack_from, 2),
+    'u': (struct.Struct('>H').unpack_from, 2),
+    'I': (struct.Struct('>i').unpack_from, 4),
+    'i': (struct.Struct('>I').unpack_from, 4),
+    'l': (struct.Struct('>q').unpack_from, 8),
+    'T': (struct.Struct('>Q').unpack_from, 8),
+    'f': (struct.Struct('>f').unpack_from, 4),
+    'd': (struct.Struct('>d').unpack_from, 8),
+}
+
+
+class FrameError(ValueError):
+    """A capture that is not a sequence of AMQP frames."""
+
+
+class Table(collections.abc.Mapping):
+    """A field table, decoded on first access."""
+
+    __slots__ = ('_view', '_fields')
+
+    def __init__(self, view):
+        self._view = view
+        self._fields = None
+
+    def _decoded(self):
+        if self._fields is None:
+            self._fields = _read_table(self._view)
+        return self._fields
+
+    def __getitem__(self, key):
+        return self._decoded()[key]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __len__(self):
+        return len(self._decoded())
+
+    def __repr__(self):
+        return repr(_printable(self))
+
+
+def _read_table(b):
+    fields = {}
+    o = 0
+    end = len(b)
+    while o < end:
+        n = b[o]
+        key = str(b[o + 1:o + 1 + n], 'utf-8', 'replace')
+        fields[key], o = _read_value(b, o + 1 + n)
+    return fields
+
+
+def _read_value(b, o):
+    t = chr(b[o])
+    o += 1
+    if t in _VALUES:
+        (unpack, size) = _VALUES[t]
+        return unpack(b, o)[0], o + size
+    if t == 'S' or t == 'x':
+        n, = _I(b, o)
+        return b[o + 4:o + 4 + n], o + 4 + n
+    if t == 'F':
+        n, = _I(b, o)
+        return Table(b[o + 4:o + 4 + n]), o + 4 + n
+    if t == 'A':
+        n, = _I(b, o)
+        (values, o, end) = ([], o + 4, o + 4 + n)
+        while o < end:
+            value, o = _read_value(b, o)
+            values.append(value)
+        return values, o
+    if t == 't':
+        return b[o] != 0, o + 1
+    if t == 'D':
+        return (b[o], struct.unpack_from('>i', b, o + 1)[0]), o + 5
+    if t == 'V':
+        return None, o
+    raise FrameError('Unrecognised type %r in table' % t)
+
+
+class MethodRecord(object):
+    """A method frame, its arguments are decoded on first access."""
+
+    __slots__ = ('channel', 'class_id', 'method_id', 'size', '_view', '_offset', '_arguments')
+
+    def __init__(self, channel, class_id, method_id, size, view, offset):
+        self.channel = channel
+        self.class_id = class_id
+        self.method_id = method_id
+        self.size = size
+        self._view = view
+        self._offset = offset
+        self._arguments = None
+
+    @property
+    def name(self):
+        return method_name(self.class_id, self.method_id)
+
+    @property
+    def arguments(self):
+        if self._arguments is None:
+            self._arguments = _decoder(self.class_id, self.method_id)(self._view, self._offset)
+        return self._arguments
+
+    def __repr__(self):
+        return 'MethodRecord(channel=%i, %s, %r)' % (self.channel, self.name, _printable(self.arguments))
+
+
+class HeaderRecord(object):
+    """A content header frame, its properties are decoded on first access."""
+
+    __slots__ = ('channel', 'class_id', 'body_size', 'size', '_view', '_offset', '_properties')
+
+    def __init__(self, channel, class_id, body_size, size, view, offset):
+        self.channel = channel
+        self.class_id = class_id
+        self.body_size = body_size
+        self.size = size
+        self._view = view
+        self._offset = offset
+        self._properties = None
+
+    @property
+    def properties(self):
+        if self._properties is None:
+            if self.class_id not in PROPERTIES:
+                raise FrameError('Unknown content class %i' % self.class_id)
+            self._properties = _read_properties(self._view, self._offset, PROPERTIES[self.class_id])
+        return self._properties
+
+    def __repr__(self):
+        return 'HeaderRecord(channel=%i, class_id=%i, body_size=%i, %r)' % (
+            self.channel, self.class_id, self.body_size, _printable(self.properties))
+
+
+class BodyRecord(object):
+    """A content body frame, the payload is a view of the capture."""
+
+    __slots__ = ('channel', 'payload', 'size')
+
+    def __init__(self, channel, payload, size):
+        self.channel = channel
+        self.payload = payload
+        self.size = size
+
+    def __repr__(self):
+        return 'BodyRecord(channel=%i, %i bytes)' % (self.channel, len(self.payload))
+
+
+class HeartbeatRecord(object):
+    """A heartbeat frame."""
+
+    __slots__ = ('channel', 'size')
+
+    def __init__(self, channel, size):
+        self.channel = channel
+        self.size = size
+
+    def __repr__(self):
+        return 'HeartbeatRecord()'
+
+
+def _printable(value):
+    if isinstance(value, memoryview):
+        return bytes(value)
+    if isinstance(value, collections.abc.Mapping):
+        return dict((k, _printable(v)) for (k, v) in value.items())
+    if isinstance(value, list):
+        return [_printable(v) for v in value]
+    return value
+
+
+def _read_properties(b, o, fields):
+    flags = []
+    while True:
+        word, = _H(b, o)
+        o += 2
+        flags.extend([(word >> bit) & 1 for bit in range(15, 0, -1)])
+        if not word & 1:
+            break
+    properties = {}
+    for ((name, reader), present) in zip(fields, flags):
+        if present:
+            properties[name], o = reader(b, o)
+    return properties
+
+
+def method_name(class_id, method_id):
+    """The name of a method, e.g. basic.publish."""
+    method = METHODS.get((class_id << 16) | method_id)
+    return method[0] if method else 'unknown.%i.%i' % (class_id, method_id)
+
+
+def _decoder(class_id, method_id):
+    method = METHODS.get((class_id << 16) | method_id)
+    if method is None:
+        raise FrameError('Unknown method %i.%i' % (class_id, method_id))
+    return method[1]
+
+
+def split(b, o=0):
+    """Splits the complete frames of a buffer, from an offset.
+
+    Returns a list of (frame type, channel, payload start, payload end)
+    tuples and the offset following the last complete frame."""
+    frames = []
+    append = frames.append
+    end = len(b)
+    while o + 8 <= end:
+        t, channel, size = _FRAME_HEADER(b, o)
+        e = o + 7 + size
+        if e >= end:
+            break
+        if b[e] != FRAME_END:
+            raise FrameError('Missing frame end after the frame at %i' % o)
+        append((t, channel, o + 7, e))
+        o = e + 1
+    return frames, o
+
+
+def buffers(source, chunk_size=CHUNK_SIZE):
+    """Reads a capture, a path or a binary file, by chunks.
+
+    Yields each buffer with its complete frames, as returned by split.
+    A protocol header at the beginning of the capture is skipped."""
+    f = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        rest = b''
+        o = None
+        while True:
+            # a new buffer per chunk, the records keep views of the previous ones
+            buf = bytearray(len(rest) + chunk_size)
+            buf[:len(rest)] = rest
+            n = f.readinto(memoryview(buf)[len(rest):])
+            if not n:
+                if len(rest):
+                    raise FrameError('Truncated frame at the end of the capture')
+                return
+            view = memoryview(buf)[:len(rest) + n]
+            if o is None:
+                o = 8 if bytes(view[:4]) == b'AMQP' else 0
+            frames, o = split(view, o)
+            yield view, frames
+            rest = view[o:]
+            o = 0
+    finally:
+        if f is not source:
+            f.close()
+
+
+def decode(view, frames):
+    """The records of frames split from a buffer."""
+    for (t, channel, s, e) in frames:
+        if t == FRAME_METHOD:
+            class_id, method_id = _H(view, s)[0], _H(view, s + 2)[0]
+            yield MethodRecord(channel, class_id, method_id, e - s + 8, view, s + 4)
+        elif t == FRAME_HEADER:
+            class_id, _, body_size = _CONTENT_HEADER(view, s)
+            yield HeaderRecord(channel, class_id, body_size, e - s + 8, view, s + 12)
+        elif t == FRAME_BODY:
+            yield BodyRecord(channel, view[s:e], e - s + 8)
+        elif t == FRAME_HEARTBEAT:
+            yield HeartbeatRecord(channel, e - s + 8)
+        else:
+            raise FrameError('Unknown frame type %i' % t)
+
+
+def records(source, chunk_size=CHUNK_SIZE):
+    """Streams the records of a capture, a path, a binary file or bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    for (view, frames) in buffers(source, chunk_size):
+        for record in decode(view, frames):
+            yield record
+
+
+def summary(source, top=10, chunk_size=CHUNK_SIZE):
+    """Frame counts and byte totals, by method and by frame type, and the
+    most frequent routing keys of a capture."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    method_counts = collections.Counter()
+    method_bytes = collections.Counter()
+    frame_counts = collections.Counter()
+    frame_bytes = collections.Counter()
+    routing_keys = collections.Counter()
+    for (view, frames) in buffers(source, chunk_size):
+        for (t, channel, s, e) in frames:
+            frame_counts[t] += 1
+            frame_bytes[t] += e - s + 8
+            if t == FRAME_METHOD:
+                key, = _I(view, s)
+                method_counts[key] += 1
+                method_bytes[key] += e - s + 8
+                if key in ROUTING_KEYS:
+                    routing_keys[ROUTING_KEYS[key](view, s + 4)] += 1
+    frame_names = {FRAME_METHOD: 'method', FRAME_HEADER: 'header',
+                   FRAME_BODY: 'body', FRAME_HEARTBEAT: 'heartbeat'}
+    return {
+        'frames': dict((frame_names.get(t, str(t)), {'count': frame_counts[t], 'bytes': frame_bytes[t]})
+                       for t in frame_counts),
+        'methods': dict((method_name(key >> 16, key & 0xFFFF), {'count': method_counts[key], 'bytes': method_bytes[key]})
+                        for key in method_counts),
+        'bytes': sum(frame_bytes.values()),
+        'routing_keys': routing_keys.most_common(top)
+    }
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Decodes captures of AMQP 0-9-1 traffic.')
+    parser.add_argument('captures', nargs='+')
+    parser.add_argument('--summary', action='store_true', help='print a summary instead of the records')
+    parser.add_argument('--top', type=int, default=10, help='number of routing keys of the summary')
+    options = parser.parse_args(args)
+    status = 0
+    for capture in options.captures:
+        decoded = 0
+        try:
+            if options.summary:
+                json.dump(summary(capture, options.top), sys.stdout, indent=2, sort_keys=True)
+                print()
+            else:
+                for record in records(capture):
+                    print(record)
+                    decoded += 1
+        except FrameError as e:
+            sys.stdout.flush()
+            if options.summary:
+                print('%s: %s' % (capture, e), file=sys.stderr)
+            else:
+                # the records decoded so far are printed already, e.g. before a truncated last frame
+                print('%s: %s, after %i records' % (capture, e, decoded), file=sys.stderr)
+            status = 1
+    return status
+'''
+
+def genPythonCodec(spec):
+    def printReader(domain):
+        print("def _property_%s(b, o):" % (domain))
+        for line in pythonDomainReaders[domain]:
+            print("    %s" % (line))
+        print("    return v, o")
+        print()
+        print()
+
+    def printMethodDecoder(c, m):
+        print("def _%s_%s(b, o):" % (python_name(c.name), python_name(m.name)))
+        print("    a = {}")
+        bit = 0
+        for a in m.arguments:
+            domain = spec.resolveDomain(a.domain)
+            if domain == 'bit':
+                if bit == 0:
+                    print("    bits = b[o]")
+                    print("    o += 1")
+                print("    a['%s'] = bool(bits & %i)" % (python_name(a.name), 1 << bit))
+                bit = (bit + 1) % 8
+                continue
+            bit = 0
+            for line in pythonDomainReaders[domain]:
+                print("    %s" % (line))
+            print("    a['%s'] = v" % (python_name(a.name)))
+        print("    return a")
+        print()
+        print()
+
+    def printRoutingKeyExtractor(c, m):
+        # skips the arguments before the routing key, the summary only needs it
+        print("def _%s_%s_routing_key(b, o):" % (python_name(c.name), python_name(m.name)))
+        bit = 0
+        for a in m.arguments:
+            if a.name == 'routing-key':
+                break
+            domain = spec.resolveDomain(a.domain)
+            if domain == 'bit':
+                if bit == 0:
+                    print("    o += 1")
+                bit = (bit + 1) % 8
+                continue
+            bit = 0
+            print("    %s" % (pythonDomainSkips[domain]))
+        print("    return str(b[o + 1:o + 1 + b[o]], 'utf-8', 'replace')")
+        print()
+        print()
+
+    print("# NOTE: This Python source code is autogenerated from the AMQP specification!")
+    print(pythonCodecRuntime)
+    print()
+    print("PROTOCOL = (%i, %i, %i)" % (spec.major, spec.minor, spec.revision))
+    for (c,v,cls) in spec.constants: print("%s = %i" % (java_constant_name(c), v))
+    print()
+    print()
+    domains = sorted(set([spec.resolveDomain(f.domain) for c in spec.allClasses() for f in c.fields]))
+    for domain in [d for d in domains if d != 'bit']:
+        printReader(domain)
+    for c in spec.allClasses():
+        for m in c.allMethods():
+            printMethodDecoder(c, m)
+    routedMethods = [(c, m) for c in spec.allClasses() for m in c.allMethods()
+                     if 'routing-key' in [a.name for a in m.arguments]]
+    for (c, m) in routedMethods:
+        printRoutingKeyExtractor(c, m)
+    print("# (class id << 16 | method id) -> (name, arguments decoder)")
+    print("METHODS = {")
+    for c in spec.allClasses():
+        for m in c.allMethods():
+            print("    0x%08x: ('%s.%s', _%s_%s)," % ((c.index << 16) | m.index, c.name, m.name, python_name(c.name), python_name(m.name)))
+    print("}")
+    print()
+    print("# (class id << 16 | method id) -> routing key extractor")
+    print("ROUTING_KEYS = {")
+    for (c, m) in routedMethods:
+        print("    0x%08x: _%s_%s_routing_key," % ((c.index << 16) | m.index, python_name(c.name), python_name(m.name)))
+    print("}")
+    print()
+    print("# class id -> ((property name, reader), ...) in flag order")
+    print("PROPERTIES = {")
+    for c in spec.allClasses():
+        if c.fields:
+            print("    %i: (" % (c.index))
+            for f in c.fields:
+                domain = spec.resolveDomain(f.domain)
+                reader = "lambda b, o: (True, o)" if domain == 'bit' else "_property_%s" % (domain)
+                print("        ('%s', %s)," % (python_name(f.name), reader))
+            print("    ),")
+    print("}")
+    print()
+    print()
+    print("if __name__ == '__main__':")
+    print("    sys.exit(main())")
+
+#--------------------------------------------------------------------------------
+
 def generateJavaApi(specPath):
     genJavaApi(AmqpSpec(specPath))
 
 def generateJavaImpl(specPath):
     genJavaImpl(AmqpSpec(specPath))
 
+def generateJavaBenchmarks(specPath):
+    genJavaBenchmarks(AmqpSpec(specPath))
+
+#--------------------------------------------------------------------------------
+
+class OutputBuffer:
+    """Collects everything printed by a generator so the output can be
+    compared with the file on disk before it is written."""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, s):
+        self.chunks.append(s)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+def generateToString(generator, spec):
+    buffer = OutputBuffer()
+    stdout = sys.stdout
+    sys.stdout = buffer
+    try:
+        generator(spec)
+    finally:
+        sys.stdout = stdout
+    return buffer.getvalue()
+
+def writeIfChanged(path, content):
+    data = content.encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmp = path + '.new'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tmp, path)
+    return True
+
+def inputsDigest(specPaths, args):
+    """Hashes everything the generated sources depend on: the spec files,
+    this script, the shared codegen module and the arguments."""
+    import amqp_codegen
+    scripts = [os.path.abspath(__file__),
+               re.sub(r'\.pyc$', '.py', os.path.abspath(amqp_codegen.__file__))]
+    digest = hashlib.sha256()
+    for path in specPaths + scripts:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    for arg in args:
+        digest.update(arg.encode('utf-8'))
+    return digest.hexdigest()
+
+# destination option, generator, whether the generator follows the profile
+allGenerators = [('header', genJavaApi, False),
+                 ('body', genJavaImpl, True),
+                 ('benchmarks', genJavaBenchmarks, True),
+                 ('classlist', genClassList, True),
+                 ('python', genPythonCodec, False)]
+
+def generateAll(args):
+    """codegen.py all <spec> [--header=<file>] [--body=<file>]
+                            [--benchmarks=<file>] [--classlist=<file>]
+                            [--python=<file>]
+                            [--profile=full|publish|consume] [--stamp=<file>]
+
+    Parses the spec once and generates all the given destinations from the
+    same process. A file is only written when its content changes. When the
+    stamp file holds the digest of the current inputs and all destinations
+    exist, nothing is done."""
+    options = {}
+    positional = []
+    for arg in args:
+        if arg.startswith('--') and '=' in arg:
+            (name, value) = arg[2:].split('=', 1)
+            options[name] = value
+        else:
+            positional.append(arg)
+    names = [name for (name, _, _) in allGenerators]
+    unknown = [name for name in options if name not in names + ['profile', 'stamp']]
+    if len(positional) != 1 or unknown:
+        print(generateAll.__doc__, file=sys.stderr)
+        sys.exit(1)
+    specPath = positional[0]
+    profile = options.get('profile', 'full')
+    stamp = options.get('stamp')
+    outputs = [(generator, profiled, options[name]) for (name, generator, profiled) in allGenerators if name in options]
+
+    digest = inputsDigest([specPath], args)
+    if stamp and os.path.exists(stamp) and all([os.path.exists(path) for (_, _, path) in outputs]):
+        with open(stamp) as f:
+            if f.read().strip() == digest:
+                return
+
+    spec = AmqpSpec(specPath)
+    for (generator, profiled, path) in outputs:
+        if profiled:
+            content = generateToString(lambda spec: generator(spec, profile), spec)
+        else:
+            content = generateToString(generator, spec)
+        writeIfChanged(path, content)
+    if stamp:
+        writeIfChanged(stamp, digest + '\n')
+
 if __name__ == "__main__":
-    do_main(generateJavaApi, generateJavaImpl)
+    if len(sys.argv) > 1 and sys.argv[1] == 'all':
+        generateAll(sys.argv[2:])
+    else:
+        do_main_dict({"header": generateJavaApi,
+                      "body": generateJavaImpl,
+                      "benchmarks": generateJavaBenchmarks})
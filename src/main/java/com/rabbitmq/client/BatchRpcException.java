@@ -0,0 +1,50 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client;
+
+import java.io.IOException;
+import java.util.Collections;
+import java.util.List;
+
+/**
+ * Thrown by {@link Channel#batchRpc(List)} when a method of the batch fails,
+ * e.g. because the broker closed the channel. The replies to the methods
+ * before the failing one have been received and are available with
+ * {@link #getReplies()}: these methods have been executed.
+ *
+ * @since 6.0.0
+ */
+public class BatchRpcException extends IOException {
+
+    /** Default for non-checking. */
+    private static final long serialVersionUID = 1L;
+
+    private final List<Command> replies;
+
+    public BatchRpcException(List<Command> replies, Throwable cause) {
+        super("Batch failed after " + replies.size() + " replies", cause);
+        this.replies = Collections.unmodifiableList(replies);
+    }
+
+    /**
+     * @return the replies received before the failure, in the order of the
+     * methods: the reply at index {@code i} is the one of the method at index
+     * {@code i}, the method at index {@code getReplies().size()} is the failing one
+     */
+    public List<Command> getReplies() {
+        return replies;
+    }
+}
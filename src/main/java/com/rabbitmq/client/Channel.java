@@ -19,6 +19,7 @@ import com.rabbitmq.client.AMQP.BasicProperties;
 import com.rabbitmq.client.AMQP.*;
 
 import java.io.IOException;
+import java.util.List;
 import java.util.Map;
 import java.util.concurrent.CompletableFuture;
 import java.util.concurrent.TimeoutException;
@@ -299,6 +300,44 @@ public interface Channel extends ShutdownNotifier, AutoCloseable {
     void basicPublish(String exchange, String routingKey, boolean mandatory, boolean immediate, BasicProperties props, byte[] body)
             throws IOException;
 
+    /**
+     * Publish several messages, with a single flush of the connection.
+     * <p>
+     * The messages are encoded together and written to the connection in
+     * as few writes as possible, which saves system calls at high message rates
+     * with small payloads. The messages are published in the list order and,
+     * if publisher confirms are enabled, get consecutive publish sequence numbers,
+     * the first one being {@link #getNextPublishSeqNo()} before the call.
+     * <p>
+     * Invocations of <code>Channel#basicPublishBatch</code> will eventually block if a
+     * <a href="https://www.rabbitmq.com/alarms.html">resource-driven alarm</a> is in effect.
+     *
+     * @see #basicPublish(String, String, boolean, BasicProperties, byte[])
+     * @param messages the messages to publish
+     * @return the publish sequence number of the first message if publisher confirms
+     * are enabled, 0 otherwise
+     * @throws java.io.IOException if an error is encountered
+     * @since 6.0.0
+     */
+    long basicPublishBatch(List<OutboundMessage> messages) throws IOException;
+
+    /**
+     * Publish several messages like {@link #basicPublishBatch(List)} and
+     * return a future that completes when the broker has confirmed all of them.
+     * <p>
+     * The future completes with true if all the messages have been acked,
+     * false if at least one has been nacked, and exceptionally if the channel
+     * closes before. If publisher confirms are not enabled, it completes with
+     * true once the messages are written.
+     *
+     * @param messages the messages to publish
+     * @return a future for the confirms of the messages
+     * @throws java.io.IOException if an error is encountered
+     * @see #confirmSelect()
+     * @since 6.0.0
+     */
+    CompletableFuture<Boolean> basicPublishBatchAsync(List<OutboundMessage> messages) throws IOException;
+
     /**
      * Actively declare a non-autodelete, non-durable exchange with no extra arguments
      * @see com.rabbitmq.client.AMQP.Exchange.Declare
@@ -1378,4 +1417,30 @@ public interface Channel extends ShutdownNotifier, AutoCloseable {
      */
     CompletableFuture<Command> asyncCompletableRpc(Method method) throws IOException;
 
+    /**
+     * Synchronously send several methods over this channel, typically
+     * to declare many queues, exchanges and bindings.
+     * <p>
+     * The methods are pipelined: each one is sent without waiting for the
+     * reply to the previous one, so the batch costs about one network round trip
+     * instead of one per method. The methods must be synchronous and must not
+     * use the {@code nowait} flag.
+     * <p>
+     * If a method fails, the channel is closed and the methods after
+     * it are not executed, as if the methods were sent with {@link #rpc(Method)}.
+     * The {@link BatchRpcException} thrown then holds the replies to the methods
+     * before the failing one.
+     *
+     * @param methods methods to transmit over this channel, e.g. built
+     *                with {@link AMQP.Queue.Declare.Builder}
+     * @return the command responses to the methods, in the same order.
+     * Caller should cast as appropriate.
+     * @throws BatchRpcException A method failed, or a reply did not arrive in time.
+     * @throws IOException Problem transmitting a method.
+     * @throws IllegalArgumentException A method is asynchronous or uses the
+     * {@code nowait} flag, nothing is sent then.
+     * @since 6.0.0
+     */
+    List<Command> batchRpc(List<? extends Method> methods) throws IOException;
+
 }
@@ -16,6 +16,7 @@
 package com.rabbitmq.client;
 
 import com.rabbitmq.client.impl.*;
+import com.rabbitmq.client.impl.nio.NioLoopStatistics;
 import com.rabbitmq.client.impl.nio.NioParams;
 import com.rabbitmq.client.impl.nio.SocketChannelFrameHandlerFactory;
 import com.rabbitmq.client.impl.recovery.AutorecoveringConnection;
@@ -41,6 +42,7 @@ import java.util.Map.Entry;
 import java.util.concurrent.*;
 import java.util.function.BiConsumer;
 import java.util.function.Predicate;
+import java.util.function.Supplier;
 
 import static java.util.concurrent.TimeUnit.MINUTES;
 
@@ -211,6 +213,62 @@ public class ConnectionFactory implements Cloneable {
      */
     private int maxInboundMessageBodySize = 1_048_576 * 64;
 
+    /**
+     * Whether message properties are decoded on first access.
+     *
+     * <p>Default is false.
+     */
+    private boolean lazyPropertiesDecoding = false;
+
+    /**
+     * Maximum number of entries of the per-connection cache of decoded short strings.
+     *
+     * <p>Default value is 0, which disables the cache.
+     */
+    private int shortStringCacheSize = 0;
+
+    /**
+     * Number of pending single acks that triggers sending them coalesced.
+     *
+     * <p>Default value is 0, which disables ack coalescing.
+     */
+    private int ackCoalescingMaxCount = 0;
+
+    /**
+     * Maximum time in milliseconds a single ack stays pending when ack coalescing is enabled.
+     *
+     * <p>Default value is 10 ms.
+     */
+    private int ackCoalescingMaxDelay = 10;
+
+    /**
+     * Whether consumer work is dispatched with per-channel ring buffers instead of a work pool.
+     *
+     * <p>Default is false.
+     */
+    private boolean ringBufferConsumerDispatch = false;
+
+    /**
+     * Pool of the bodies of inbound messages.
+     *
+     * <p>Default is null, which disables pooling.
+     */
+    private InboundBufferPool inboundBufferPool;
+
+    /**
+     * Factory of the recorders of the frames of connections.
+     *
+     * <p>Default is null, which disables recording.
+     */
+    private Supplier<TrafficRecorder> trafficRecorderFactory;
+
+    /**
+     * Timer wheel shared by connections.
+     *
+     * <p>Default is null, which means connections use the heartbeat executor.
+     */
+    private HashedTimerWheel timerWheel;
+
     /** @return the default host to use for connections */
     public String getHost() {
         return host;
@@ -1011,6 +1069,22 @@ public class ConnectionFactory implements Cloneable {
         return this;
     }
 
+    /**
+     * Statistics of the NIO loops of the connections created by this factory:
+     * connections, write queue depth, bytes per write wake-up, selector time.
+     *
+     * @return the statistics of the loops, empty if NIO is not used or no connection has been created
+     * @see #useNio()
+     * @see NioParams#setNbIoThreads(int)
+     * @since 6.0.0
+     */
+    public synchronized List<NioLoopStatistics> getNioLoopStatistics() {
+        if (this.frameHandlerFactory instanceof SocketChannelFrameHandlerFactory) {
+            return ((SocketChannelFrameHandlerFactory) this.frameHandlerFactory).getLoopStatistics();
+        }
+        return Collections.emptyList();
+    }
+
     protected synchronized FrameHandlerFactory createFrameHandlerFactory() throws IOException {
         if(nio) {
             if(this.frameHandlerFactory == null) {
@@ -1025,7 +1099,7 @@ public class ConnectionFactory implements Cloneable {
         } else {
             return new SocketFrameHandlerFactory(connectionTimeout, socketFactory,
                 socketConf, isSSL(), this.shutdownExecutor, sslContextFactory,
-                this.maxInboundMessageBodySize);
+                this.maxInboundMessageBodySize, this.inboundBufferPool);
         }
 
     }
@@ -1326,6 +1400,14 @@ public class ConnectionFactory implements Cloneable {
         result.setTrafficListener(trafficListener);
         result.setCredentialsRefreshService(credentialsRefreshService);
         result.setMaxInboundMessageBodySize(maxInboundMessageBodySize);
+        result.setLazyPropertiesDecoding(lazyPropertiesDecoding);
+        result.setShortStringCacheSize(shortStringCacheSize);
+        result.setAckCoalescingMaxCount(ackCoalescingMaxCount);
+        result.setAckCoalescingMaxDelay(ackCoalescingMaxDelay);
+        result.setRingBufferConsumerDispatch(ringBufferConsumerDispatch);
+        result.setInboundBufferPool(inboundBufferPool);
+        result.setTrafficRecorderFactory(trafficRecorderFactory);
+        result.setTimerWheel(timerWheel);
         return result;
     }
 
@@ -1633,6 +1715,244 @@ public class ConnectionFactory implements Cloneable {
         this.maxInboundMessageBodySize = maxInboundMessageBodySize;
     }
 
+    /**
+     * When set to true, the properties of inbound messages are kept
+     * encoded and each property is decoded the first time it is accessed.
+     * Consumers that look at few properties (or none) save the decoding
+     * of the others, e.g. of large headers tables. Properties of a message
+     * that is re-published untouched are sent back as received.
+     * <p>
+     * Default is false.
+     *
+     * @param lazyPropertiesDecoding whether to decode message properties on first access
+     * @return this connection factory instance
+     * @since 6.0.0
+     */
+    public ConnectionFactory setLazyPropertiesDecoding(boolean lazyPropertiesDecoding) {
+        this.lazyPropertiesDecoding = lazyPropertiesDecoding;
+        return this;
+    }
+
+    public boolean isLazyPropertiesDecoding() {
+        return lazyPropertiesDecoding;
+    }
+
+    /**
+     * Maximum number of entries of the per-connection cache of decoded short strings.
+     * <p>
+     * Inbound consumer tags, exchange names, routing keys, a few message properties
+     * (e.g. content type or application ID) and the keys of tables (e.g. message headers)
+     * are decoded through this cache. These values usually repeat from one message to
+     * the other, a cache hit returns the same {@link String} instance without any
+     * allocation. The least recently used entries are evicted first.
+     * <p>
+     * The cache is guarded by a lock taken on every lookup, by all the channels of
+     * the connection. Enable it when allocation matters more than contention, e.g.
+     * for a connection consuming at a high rate on a few channels, with a small set
+     * of consumer tags, exchanges, routing keys and header names. A size of a few
+     * hundred to a few thousand entries is usually enough. Leave it disabled for
+     * connections with many concurrently busy channels or with mostly unique values
+     * (e.g. one routing key per message), the lock and the misses cost more than
+     * the allocations they save then.
+     * <p>
+     * Default value is 0, which disables the cache.
+     *
+     * @param shortStringCacheSize the maximum number of entries of the cache
+     * @return this connection factory instance
+     * @see com.rabbitmq.client.impl.ShortStringCache
+     * @since 6.0.0
+     */
+    public ConnectionFactory setShortStringCacheSize(int shortStringCacheSize) {
+        if (shortStringCacheSize < 0) {
+            throw new IllegalArgumentException("Short string cache size cannot be negative: "
+                + shortStringCacheSize);
+        }
+        this.shortStringCacheSize = shortStringCacheSize;
+        return this;
+    }
+
+    public int getShortStringCacheSize() {
+        return shortStringCacheSize;
+    }
+
+    /**
+     * Enable ack coalescing and set the number of pending acks that triggers sending them.
+     * <p>
+     * With ack coalescing, channels do not send single acks
+     * ({@link Channel#basicAck(long, boolean)} with {@code multiple=false})
+     * right away: they keep them pending and send them once there are
+     * this many or once the oldest one is older than the
+     * {@link #setAckCoalescingMaxDelay(int) maximum delay}. The acks of
+     * contiguous delivery tags are then sent as one {@code basic.ack} with
+     * {@code multiple=true}, the acks after a not yet settled delivery are
+     * sent one by one. Pending acks are sent before a multiple nack, before
+     * {@code tx.commit}, {@code tx.rollback} and {@code basic.recover}, and when
+     * the channel is closed by the application, they are lost if the channel
+     * or the connection fails.
+     * <p>
+     * This reduces the number of frames and syscalls for consumers that ack
+     * messages one by one, at the cost of a delay before the broker sees the
+     * acks. The prefetch count of consumers should be greater than the count.
+     * <p>
+     * Default value is 0, which disables ack coalescing.
+     *
+     * @param ackCoalescingMaxCount number of pending acks that triggers sending them, 0 to disable
+     * @return this connection factory instance
+     * @see #setAckCoalescingMaxDelay(int)
+     * @since 6.0.0
+     */
+    public ConnectionFactory setAckCoalescingMaxCount(int ackCoalescingMaxCount) {
+        if (ackCoalescingMaxCount < 0) {
+            throw new IllegalArgumentException("Ack coalescing max count cannot be negative: "
+                + ackCoalescingMaxCount);
+        }
+        this.ackCoalescingMaxCount = ackCoalescingMaxCount;
+        return this;
+    }
+
+    public int getAckCoalescingMaxCount() {
+        return ackCoalescingMaxCount;
+    }
+
+    /**
+     * Set the maximum time a single ack stays pending when ack coalescing is enabled.
+     * <p>
+     * Acks that become due are sent by a task on the executor of the consumer work
+     * service (see {@link #setSharedExecutor(ExecutorService)}), the heartbeat executor
+     * or timer wheel only triggers it.
+     * <p>
+     * Default value is 10 ms.
+     *
+     * @param ackCoalescingMaxDelay the maximum delay in milliseconds, must be greater than 0
+     * @return this connection factory instance
+     * @see #setAckCoalescingMaxCount(int)
+     * @since 6.0.0
+     */
+    public ConnectionFactory setAckCoalescingMaxDelay(int ackCoalescingMaxDelay) {
+        if (ackCoalescingMaxDelay <= 0) {
+            throw new IllegalArgumentException("Ack coalescing max delay must be greater than 0: "
+                + ackCoalescingMaxDelay);
+        }
+        this.ackCoalescingMaxDelay = ackCoalescingMaxDelay;
+        return this;
+    }
+
+    public int getAckCoalescingMaxDelay() {
+        return ackCoalescingMaxDelay;
+    }
+
+    /**
+     * Set whether consumer work (deliveries and other consumer callbacks) is
+     * dispatched with per-channel ring buffers instead of the default work pool.
+     * <p>
+     * The work pool uses a lock shared by all the channels of the connection,
+     * which can be contended with many busy channels. With ring buffers, each
+     * channel has its own bounded queue, filled by the connection thread and
+     * drained by one consumer thread at a time, without locking. The callbacks
+     * of a channel still run in order, and the {@link #setWorkPoolTimeout(int) work pool timeout}
+     * applies when a ring is full.
+     * <p>
+     * Default is false.
+     *
+     * @param ringBufferConsumerDispatch whether to dispatch consumer work with ring buffers
+     * @return this connection factory instance
+     * @since 6.0.0
+     */
+    public ConnectionFactory setRingBufferConsumerDispatch(boolean ringBufferConsumerDispatch) {
+        this.ringBufferConsumerDispatch = ringBufferConsumerDispatch;
+        return this;
+    }
+
+    public boolean isRingBufferConsumerDispatch() {
+        return ringBufferConsumerDispatch;
+    }
+
+    /**
+     * Set the pool to take the arrays of inbound message bodies from.
+     * <p>
+     * The bodies of deliveries then go back to the pool when
+     * {@link Consumer#handleDelivery(String, Envelope, AMQP.BasicProperties, byte[])}
+     * (or {@link DeliverCallback#handle(String, Delivery)}) returns: consumers
+     * must not use a body afterwards, unless they {@link Delivery#retain() retain} it
+     * and release it once done. This saves allocating and copying large bodies,
+     * messages spanning several frames especially. The payloads of body frames are
+     * pooled with the blocking IO frame handler only, not with NIO.
+     * <p>
+     * Default is null, no pooling.
+     *
+     * @param inboundBufferPool the pool, can be shared by connection factories
+     * @return this connection factory instance
+     * @see InboundBufferPool
+     * @since 6.0.0
+     */
+    public ConnectionFactory setInboundBufferPool(InboundBufferPool inboundBufferPool) {
+        this.inboundBufferPool = inboundBufferPool;
+        return this;
+    }
+
+    public InboundBufferPool getInboundBufferPool() {
+        return inboundBufferPool;
+    }
+
+    /**
+     * Set the factory of the recorders of the frames of connections.
+     * <p>
+     * The factory is called for each connection, a recovered connection
+     * included, and must return a new {@link TrafficRecorder}: a "flight
+     * recorder" of the most recent frames of the connection, in binary form.
+     * Unlike a {@link TrafficListener}, a recorder does not decode frames
+     * nor turn them into strings, so it can stay enabled in production.
+     * <p>
+     * Default is null, no recording.
+     *
+     * @param trafficRecorderFactory the factory of recorders
+     * @return this connection factory instance
+     * @see TrafficRecorder
+     * @see AMQConnection#getTrafficRecorder()
+     * @since 6.0.0
+     */
+    public ConnectionFactory setTrafficRecorderFactory(Supplier<TrafficRecorder> trafficRecorderFactory) {
+        this.trafficRecorderFactory = trafficRecorderFactory;
+        return this;
+    }
+
+    public Supplier<TrafficRecorder> getTrafficRecorderFactory() {
+        return trafficRecorderFactory;
+    }
+
+    /**
+     * Set the timer wheel to share between connections.
+     * <p>
+     * With a timer wheel, connections use it instead of the
+     * {@link #setHeartbeatExecutor(ScheduledExecutorService) heartbeat executor}
+     * to send heartbeats and to trigger the flush of coalesced acks, and asynchronous
+     * RPCs (e.g. {@link Channel#asyncCompletableRpc(Method)}) time out after the
+     * {@link #setChannelRpcTimeout(int) channel RPC timeout}, as blocking RPCs do.
+     * Scheduling and cancelling on the wheel are O(1), which keeps
+     * the cost of timers flat with thousands of connections, at the price
+     * of a precision of one tick. The thread of the wheel only triggers the
+     * timers, the heartbeat writes run on the task executor of the wheel and
+     * the ack flushes on the consumer work service.
+     * <p>
+     * It's developer's responsibility to close the wheel
+     * when it is no longer needed.
+     * <p>
+     * Default is null, no timer wheel.
+     *
+     * @param timerWheel the timer wheel
+     * @return this connection factory instance
+     * @see HashedTimerWheel
+     * @since 6.0.0
+     */
+    public ConnectionFactory setTimerWheel(HashedTimerWheel timerWheel) {
+        this.timerWheel = timerWheel;
+        return this;
+    }
+
+    public HashedTimerWheel getTimerWheel() {
+        return timerWheel;
+    }
+
     /**
      * The factory to create SSL contexts.
      * This provides more flexibility to create {@link SSLContext}s
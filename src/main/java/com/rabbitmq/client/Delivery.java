@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client;
 
+import com.rabbitmq.client.impl.InboundBufferPool;
+
 /**
  * Encapsulates an arbitrary message - simple "bean" holder structure.
  */
@@ -22,11 +24,14 @@ public class Delivery {
     private final Envelope _envelope;
     private final AMQP.BasicProperties _properties;
     private final byte[] _body;
+    private final InboundBufferPool.Lease _lease;
 
     public Delivery(Envelope envelope, AMQP.BasicProperties properties, byte[] body) {
         _envelope = envelope;
         _properties = properties;
         _body = body;
+        // set when created in the delivery callback and the body is pooled
+        _lease = InboundBufferPool.lease(body);
     }
 
     /**
@@ -52,4 +57,32 @@ public class Delivery {
     public byte[] getBody() {
         return _body;
     }
+
+    /**
+     * Keep the body valid after the delivery callback returns, when
+     * inbound bodies are pooled. Each call must be matched by a call
+     * to {@link #release()} once the body is not used anymore.
+     * Does nothing if the body is not pooled, or if this delivery has
+     * not been created in the delivery callback.
+     * @return this delivery
+     * @see ConnectionFactory#setInboundBufferPool(InboundBufferPool)
+     * @since 6.0.0
+     */
+    public Delivery retain() {
+        if (_lease != null) {
+            _lease.retain();
+        }
+        return this;
+    }
+
+    /**
+     * Release the body retained with {@link #retain()}, the body must
+     * not be used afterwards. Does nothing if the body is not pooled.
+     * @since 6.0.0
+     */
+    public void release() {
+        if (_lease != null) {
+            _lease.release();
+        }
+    }
 }
@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client;
 
+import com.rabbitmq.client.impl.MethodWireStats;
+
 /**
  * Interface to gather execution data of the client.
  * Note transactions are not supported: they deal with
@@ -66,4 +68,18 @@ public interface MetricsCollector {
 
     void basicCancel(Channel channel, String consumerTag);
 
+    /**
+     * Per-method wire statistics the connections record into,
+     * queried once when a connection is created.
+     * <p>
+     * The default implementation returns null, which disables
+     * the recording altogether.
+     *
+     * @return the statistics to record into, null to disable recording
+     * @since 6.0.0
+     */
+    default MethodWireStats methodWireStats() {
+        return null;
+    }
+
 }
\ No newline at end of file
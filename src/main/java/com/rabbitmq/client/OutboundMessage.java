@@ -0,0 +1,95 @@
+// Copyright (c) 2017-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client;
+
+/**
+ * A message to publish with {@link Channel#basicPublishBatch(java.util.List)} - simple "bean" holder structure.
+ *
+ * @since 6.0.0
+ */
+public class OutboundMessage {
+    private final String _exchange;
+    private final String _routingKey;
+    private final boolean _mandatory;
+    private final AMQP.BasicProperties _properties;
+    private final byte[] _body;
+
+    /**
+     * @param exchange the exchange to publish the message to
+     * @param routingKey the routing key
+     * @param properties other properties for the message - routing headers etc
+     * @param body the message body
+     */
+    public OutboundMessage(String exchange, String routingKey, AMQP.BasicProperties properties, byte[] body) {
+        this(exchange, routingKey, false, properties, body);
+    }
+
+    /**
+     * @param exchange the exchange to publish the message to
+     * @param routingKey the routing key
+     * @param mandatory true if the 'mandatory' flag is to be set
+     * @param properties other properties for the message - routing headers etc
+     * @param body the message body
+     */
+    public OutboundMessage(String exchange, String routingKey, boolean mandatory,
+                           AMQP.BasicProperties properties, byte[] body) {
+        _exchange = exchange;
+        _routingKey = routingKey;
+        _mandatory = mandatory;
+        _properties = properties;
+        _body = body;
+    }
+
+    /**
+     * Retrieve the exchange to publish the message to.
+     * @return the exchange
+     */
+    public String getExchange() {
+        return _exchange;
+    }
+
+    /**
+     * Retrieve the routing key.
+     * @return the routing key
+     */
+    public String getRoutingKey() {
+        return _routingKey;
+    }
+
+    /**
+     * Retrieve the 'mandatory' flag.
+     * @return true if the message must be routed to a queue
+     */
+    public boolean isMandatory() {
+        return _mandatory;
+    }
+
+    /**
+     * Retrieve the message properties.
+     * @return the message properties, can be null
+     */
+    public AMQP.BasicProperties getProperties() {
+        return _properties;
+    }
+
+    /**
+     * Retrieve the message body.
+     * @return the message body
+     */
+    public byte[] getBody() {
+        return _body;
+    }
+}
@@ -30,6 +30,7 @@ import java.util.concurrent.atomic.AtomicBoolean;
 import java.util.function.Function;
 import java.util.function.Supplier;
 
+import com.rabbitmq.client.impl.InboundBufferPool;
 import com.rabbitmq.client.impl.MethodArgumentReader;
 import com.rabbitmq.client.impl.MethodArgumentWriter;
 import com.rabbitmq.client.impl.ValueReader;
@@ -191,6 +192,11 @@ public class RpcClient implements AutoCloseable {
                         // log a warning nevertheless.
                         LOGGER.warn("No outstanding request for correlation ID {}", replyId);
                     } else {
+                        // the reply is handed to the caller for good
+                        InboundBufferPool.Lease lease = InboundBufferPool.lease(body);
+                        if (lease != null) {
+                            lease.detach();
+                        }
                         blocker.set(new Response(consumerTag, envelope, properties, body));
                     }
                 }
@@ -119,7 +119,11 @@ public class RpcServer {
                     _mainloopRunning = false;
                     continue;
                 }
-                processRequest(request);
+                try {
+                    processRequest(request);
+                } finally {
+                    request.release();
+                }
                 _channel.basicAck(request.getEnvelope().getDeliveryTag(), false);
             }
             return null;
@@ -316,7 +320,8 @@ public class RpcServer {
             byte[] body)
             throws IOException {
             checkShutdown();
-            this._queue.add(new Delivery(envelope, properties, body));
+            // the request is processed after this method returns
+            this._queue.add(new Delivery(envelope, properties, body).retain());
         }
 
         /**
@@ -0,0 +1,63 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client;
+
+import com.rabbitmq.client.impl.ContentBodyStream;
+
+import java.io.IOException;
+
+/**
+ * {@link Consumer} that receives message bodies as streams rather than arrays.
+ * <p>
+ * The delivery is dispatched as soon as its content header arrives and the
+ * body frames are appended to the stream as they arrive: the consumer can
+ * start processing a large message before the whole body is received, and
+ * the frames are not copied into a single array.
+ * {@link Consumer#handleDelivery(String, Envelope, AMQP.BasicProperties, byte[])}
+ * is not called for a streaming consumer.
+ * <p>
+ * Like the other consumer callbacks, {@link #handleStreamingDelivery} runs
+ * in a dispatch thread, which waits for the body frames when reading ahead
+ * of them. The stream must not be used after the method returns. While a
+ * body is streamed, the dispatch queue of the channel is not bounded, so that
+ * the connection keeps reading frames even if the dispatch threads are busy.
+ * <p>
+ * Streaming applies to consumers passed directly to
+ * {@link Channel#basicConsume(String, boolean, String, boolean, boolean, java.util.Map, Consumer)},
+ * it does not to consumers wrapped by an observation collector.
+ *
+ * @see DefaultConsumer
+ * @since 6.0.0
+ */
+public interface StreamingConsumer extends Consumer {
+
+    /**
+     * Called when a <code><b>basic.deliver</b></code> is received for this consumer,
+     * once the content header is received.
+     * @param consumerTag the <i>consumer tag</i> associated with the consumer
+     * @param envelope packaging data for the message
+     * @param properties content header data for the message
+     * @param body the message body, read while it arrives
+     * @throws IOException if the consumer encounters an I/O error while processing the message,
+     * e.g. if the channel closes before the whole body arrives
+     */
+    void handleStreamingDelivery(String consumerTag,
+                                 Envelope envelope,
+                                 AMQP.BasicProperties properties,
+                                 ContentBodyStream body)
+        throws IOException;
+}
@@ -17,6 +17,7 @@ package com.rabbitmq.client.impl;
 
 import java.io.DataInputStream;
 import java.io.IOException;
+import java.nio.ByteBuffer;
 
 import com.rabbitmq.client.BasicProperties;
 
@@ -31,6 +32,10 @@ public abstract class AMQBasicProperties
         super(in);
     }
 
+    protected AMQBasicProperties(ByteBuffer in) {
+        super(in);
+    }
+
     @Override
     public Object clone() throws CloneNotSupportedException {
         return super.clone();
@@ -29,7 +29,15 @@ import org.slf4j.Logger;
 import org.slf4j.LoggerFactory;
 
 import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Deque;
+import java.util.List;
 import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.Future;
+import java.util.concurrent.TimeUnit;
 import java.util.concurrent.TimeoutException;
 import java.util.concurrent.locks.Condition;
 import java.util.concurrent.locks.Lock;
@@ -52,6 +60,12 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
 
     static final int NO_RPC_TIMEOUT = 0;
 
+    /** Maximum number of pipelined RPC requests waiting for their reply on a channel */
+    static final int PIPELINED_RPC_WINDOW = 1024;
+
+    /** Size of the scratch buffer batches of published messages are encoded in */
+    static final int PUBLISH_BATCH_BUFFER_SIZE = 128 * 1024;
+
     /**
      * Protected; used instead of synchronizing on the channel itself,
      * so that clients can themselves use the channel to synchronize
@@ -72,6 +86,9 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
     /** The current outstanding RPC request, if any. (Could become a queue in future.) */
     private RpcWrapper _activeRpc = null;
 
+    /** The pipelined RPC requests waiting for their reply, in the order they were sent. */
+    private final Deque<RpcWrapper> _pipelinedRpcs = new ArrayDeque<>();
+
     /** Whether transmission of content-bearing methods should be blocked */
     volatile boolean _blockContent = false;
 
@@ -82,6 +99,14 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
 
     private final TrafficListener _trafficListener;
     private final int maxInboundMessageBodySize;
+    private final boolean lazyPropertiesDecoding;
+    private final ShortStringCache shortStringCache;
+    private final InboundBufferPool inboundBufferPool;
+
+    /** Scratch buffer to encode outbound methods and content headers in, guarded by _channelLock */
+    private ByteBuffer encodingBuffer;
+    /** When the encoding in the scratch buffer started, for the wire statistics, guarded by _channelLock */
+    private long encodingStart;
 
     private final ObservationCollector.ConnectionInfo connectionInfo;
 
@@ -100,7 +125,10 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         this._checkRpcResponseType = connection.willCheckRpcResponseType();
         this._trafficListener = connection.getTrafficListener();
         this.maxInboundMessageBodySize = connection.getMaxInboundMessageBodySize();
-        this._command = new AMQCommand(this.maxInboundMessageBodySize);
+        this.lazyPropertiesDecoding = connection.isLazyPropertiesDecoding();
+        this.shortStringCache = connection.getShortStringCache();
+        this.inboundBufferPool = connection.getInboundBufferPool();
+        this._command = newInboundCommand();
         this.connectionInfo = connection.connectionInfo();
     }
 
@@ -121,11 +149,28 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
     void handleFrame(Frame frame) throws IOException {
         AMQCommand command = _command;
         if (command.handleFrame(frame)) { // a complete command has rolled off the assembly line
-            _command = new AMQCommand(this.maxInboundMessageBodySize); // prepare for the next one
+            _command = newInboundCommand(); // prepare for the next one
             handleCompleteInboundCommand(command);
+        } else if (frame.getType() == AMQP.FRAME_HEADER) {
+            // the body frames follow
+            handleContentHeader(command);
         }
     }
 
+    /**
+     * Protected API - Called when the content header of an inbound command
+     * is received, before its body frames. Does nothing by default.
+     * @param command the command being assembled
+     * @throws IOException if an error is encountered
+     */
+    protected void handleContentHeader(AMQCommand command) throws IOException {
+    }
+
+    private AMQCommand newInboundCommand() {
+        return new AMQCommand(this.maxInboundMessageBodySize, this.lazyPropertiesDecoding, this.shortStringCache,
+            _connection.getMethodWireStats(), this.inboundBufferPool);
+    }
+
     /**
      * Placeholder until we address bug 15786 (implementing a proper exception hierarchy).
      * In the meantime, this at least won't throw away any information from the wrapped exception.
@@ -171,6 +216,29 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         }
     }
 
+    /**
+     * Like {@link #pipelinedRpc(List)}, but a failure after the first method has been
+     * sent is reported with a {@link BatchRpcException} holding the replies received
+     * before it.
+     */
+    List<AMQCommand> exnWrappingPipelinedRpc(List<? extends Method> methods)
+        throws IOException
+    {
+        List<PipelinedRpcWrapper> rpcs = new ArrayList<>(methods.size());
+        try {
+            return pipelinedRpc(methods, rpcs);
+        } catch (AlreadyClosedException ace) {
+            if (rpcs.isEmpty()) {
+                // Do not wrap it since it means that connection/channel
+                // was closed in some action in the past
+                throw ace;
+            }
+            throw new BatchRpcException(completedReplies(rpcs), ace);
+        } catch (ShutdownSignalException | IOException ex) {
+            throw new BatchRpcException(completedReplies(rpcs), ex);
+        }
+    }
+
     /**
      * Private API - handle a command which has been assembled
      * @throws IOException if there's any problem
@@ -192,6 +260,9 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
             // The filter decided not to handle/consume the command,
             // so it must be a response to an earlier RPC.
 
+            if (completePipelinedRpc(command)) {
+                return;
+            }
             if (_checkRpcResponseType) {
                 _channelLock.lock();
                 try {
@@ -228,7 +299,7 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         _channelLock.lock();
         try {
             boolean waitClearedInterruptStatus = false;
-            while (_activeRpc != null) {
+            while (_activeRpc != null || !_pipelinedRpcs.isEmpty()) {
                 try {
                     _channelLockCondition.await();
                 } catch (InterruptedException e) { //NOSONAR
@@ -249,7 +320,7 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
     {
         _channelLock.lock();
         try {
-            return (_activeRpc != null);
+            return (_activeRpc != null || !_pipelinedRpcs.isEmpty());
         } finally {
             _channelLock.unlock();
         }
@@ -268,6 +339,82 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         }
     }
 
+    /**
+     * Adds a pipelined RPC request at the end of the pipeline, waiting for the
+     * current non-pipelined RPC to complete and for room in the pipeline.
+     * Called with the channel lock held.
+     * @param rpc the pipelined RPC request
+     */
+    protected void enqueuePipelinedRpc(RpcWrapper rpc) {
+        _channelLock.lock();
+        try {
+            boolean waitClearedInterruptStatus = false;
+            while (_activeRpc != null || _pipelinedRpcs.size() >= PIPELINED_RPC_WINDOW) {
+                try {
+                    _channelLockCondition.await();
+                } catch (InterruptedException e) { //NOSONAR
+                    waitClearedInterruptStatus = true;
+                    // No Sonar: we re-interrupt the thread later
+                }
+                ensureIsOpen();
+            }
+            if (waitClearedInterruptStatus) {
+                Thread.currentThread().interrupt();
+            }
+            _pipelinedRpcs.addLast(rpc);
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /**
+     * Hands the reply to the request at the head of the pipeline, if any.
+     * Replies arrive in the order the requests were sent, so a reply the head
+     * request cannot handle belongs to a request that timed out and is thrown away.
+     * @param command the reply
+     * @return true if the pipeline took the reply, false if the pipeline is empty
+     */
+    private boolean completePipelinedRpc(AMQCommand command) {
+        RpcWrapper rpc;
+        boolean drained;
+        _channelLock.lock();
+        try {
+            rpc = _pipelinedRpcs.peekFirst();
+            if (rpc == null) {
+                return false;
+            }
+            if (!rpc.canHandleReply(command)) {
+                return true;
+            }
+            _pipelinedRpcs.removeFirst();
+            drained = _pipelinedRpcs.isEmpty();
+            _channelLockCondition.signalAll();
+        } finally {
+            _channelLock.unlock();
+        }
+        rpc.complete(command);
+        if (drained) {
+            markRpcFinished();
+        }
+        return true;
+    }
+
+    /** Removes the given requests from the pipeline, e.g. after a timeout. */
+    private void abandonPipelinedRpcs(List<? extends RpcWrapper> rpcs) {
+        boolean drained;
+        _channelLock.lock();
+        try {
+            _pipelinedRpcs.removeAll(rpcs);
+            drained = _pipelinedRpcs.isEmpty();
+            _channelLockCondition.signalAll();
+        } finally {
+            _channelLock.unlock();
+        }
+        if (drained) {
+            markRpcFinished();
+        }
+    }
+
     protected void markRpcFinished() {
         // no-op
     }
@@ -334,14 +481,115 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         return new ChannelContinuationTimeoutException(e, this, this._channelNumber, m);
     }
 
+    /**
+     * Protected API - sends synchronous {@link Method}s to the broker one after the
+     * other, without waiting for the reply to a method before sending the next one,
+     * and waits for all the replies: only for use from non-connection-MainLoop threads!
+     * <p>
+     * Replies are matched to requests in order, with the request/reply mapping
+     * of the specification (see {@link AMQImpl#isReply(Method, Method)}).
+     * A reply must arrive within the RPC timeout (if enabled) of the previous one.
+     * A failing method usually closes the channel, the replies to the methods
+     * after it never arrive and the shutdown signal is thrown.
+     * @param methods the synchronous methods to send, without the nowait flag
+     * @return the replies, in the order of the methods
+     * @throws IllegalArgumentException if a method is asynchronous or uses the nowait
+     * flag, nothing is sent then
+     */
+    public List<AMQCommand> pipelinedRpc(List<? extends Method> methods)
+        throws IOException, ShutdownSignalException
+    {
+        return pipelinedRpc(methods, new ArrayList<>(methods.size()));
+    }
+
+    /** Sends the methods, adding them to {@code rpcs} as they are sent */
+    private List<AMQCommand> pipelinedRpc(List<? extends Method> methods, List<PipelinedRpcWrapper> rpcs)
+        throws IOException, ShutdownSignalException
+    {
+        for (Method m : methods) {
+            if (!AMQImpl.isSynchronous(AMQImpl.methodIndex(m.protocolClassId(), m.protocolMethodId()))) {
+                throw new IllegalArgumentException("Cannot pipeline asynchronous method " + m.protocolMethodName());
+            }
+            if (AMQImpl.isNoWait(m)) {
+                throw new IllegalArgumentException("Cannot pipeline nowait method " + m.protocolMethodName());
+            }
+        }
+        try {
+            for (Method m : methods) {
+                PipelinedRpcWrapper rpc = new PipelinedRpcWrapper(m);
+                _channelLock.lock();
+                try {
+                    ensureIsOpen();
+                    enqueuePipelinedRpc(rpc);
+                    rpcs.add(rpc);
+                    quiescingTransmit(m);
+                } finally {
+                    _channelLock.unlock();
+                }
+            }
+            List<AMQCommand> replies = new ArrayList<>(rpcs.size());
+            for (PipelinedRpcWrapper rpc : rpcs) {
+                replies.add(rpc.getReply(_rpcTimeout));
+            }
+            return replies;
+        } catch (TimeoutException e) {
+            abandonPipelinedRpcs(rpcs);
+            Method pending = rpcs.stream().filter(rpc -> !rpc.reply.isDone()).findFirst()
+                .map(rpc -> rpc.request).orElse(null);
+            throw new ChannelContinuationTimeoutException(e, this, this._channelNumber, pending);
+        } catch (IOException | RuntimeException e) {
+            abandonPipelinedRpcs(rpcs);
+            throw e;
+        }
+    }
+
+    /** @return the replies received by the pipelined RPCs, up to the first one without a reply */
+    private static List<Command> completedReplies(List<PipelinedRpcWrapper> rpcs) {
+        List<Command> replies = new ArrayList<>(rpcs.size());
+        for (PipelinedRpcWrapper rpc : rpcs) {
+            if (!rpc.reply.isDone() || rpc.reply.isCompletedExceptionally()) {
+                break;
+            }
+            replies.add(rpc.reply.join());
+        }
+        return replies;
+    }
+
     private CompletableFuture<Command> privateAsyncRpc(Method m)
         throws IOException, ShutdownSignalException
     {
         CompletableFuture<Command> future = new CompletableFuture<>();
         asyncRpc(m, future);
+        scheduleAsyncRpcTimeout(m, future);
         return future;
     }
 
+    /** Applies the RPC timeout to an asynchronous RPC, if the connection has a timer wheel */
+    private void scheduleAsyncRpcTimeout(Method m, CompletableFuture<Command> future) {
+        HashedTimerWheel timerWheel = _connection.getTimerWheel();
+        if (timerWheel == null || _rpcTimeout == NO_RPC_TIMEOUT) {
+            return;
+        }
+        Future<?> timeout = timerWheel.schedule(() -> timeOutAsyncRpc(m, future), _rpcTimeout, TimeUnit.MILLISECONDS);
+        future.whenComplete((command, throwable) -> timeout.cancel(false));
+    }
+
+    private void timeOutAsyncRpc(Method m, CompletableFuture<Command> future) {
+        ChannelContinuationTimeoutException exception;
+        _channelLock.lock();
+        try {
+            if (!(_activeRpc instanceof CompletableFutureRpcWrapper &&
+                ((CompletableFutureRpcWrapper) _activeRpc).isFor(future))) {
+                // the reply arrived in the meantime
+                return;
+            }
+            exception = wrapTimeoutException(m, new TimeoutException());
+        } finally {
+            _channelLock.unlock();
+        }
+        future.completeExceptionally(exception);
+    }
+
     private AMQCommand privateRpc(Method m, int timeout)
             throws IOException, ShutdownSignalException, TimeoutException {
         SimpleBlockingRpcContinuation k = new SimpleBlockingRpcContinuation(m);
@@ -450,6 +698,18 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         if (k != null) {
             k.shutdown(signal);
         }
+        List<RpcWrapper> pipelined;
+        _channelLock.lock();
+        try {
+            pipelined = new ArrayList<>(_pipelinedRpcs);
+            _pipelinedRpcs.clear();
+            _channelLockCondition.signalAll();
+        } finally {
+            _channelLock.unlock();
+        }
+        for (RpcWrapper rpc : pipelined) {
+            rpc.shutdown(signal);
+        }
     }
 
     public void transmit(Method m) throws IOException {
@@ -484,26 +744,226 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         _channelLock.lock();
         try {
             if (c.getMethod().hasContent()) {
-                while (_blockContent) {
-                    try {
-                        _channelLockCondition.await();
-                    } catch (InterruptedException ignored) {
-                        Thread.currentThread().interrupt();
+                awaitContentUnblocked();
+            }
+            this._trafficListener.write(c);
+            c.transmit(this);
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /** Waits for content-bearing methods to be unblocked, must be called with the channel lock held */
+    private void awaitContentUnblocked() {
+        while (_blockContent) {
+            try {
+                _channelLockCondition.await();
+            } catch (InterruptedException ignored) {
+                Thread.currentThread().interrupt();
+            }
+
+            // This is to catch a situation when the thread wakes up during
+            // shutdown. Currently, no command that has content is allowed
+            // to send anything in a closing state.
+            ensureIsOpen();
+        }
+    }
+
+    /**
+     * Whether methods can be sent from their encoded form, without instantiating
+     * them: not when a traffic listener expects the commands.
+     * @see #transmitEncodedMethod()
+     * @see #transmitPublish(String, String, boolean, boolean, AMQContentHeader, byte[])
+     */
+    boolean canTransmitEncoded() {
+        return this._trafficListener == TrafficListener.NO_OP;
+    }
+
+    /**
+     * Returns the scratch buffer of this channel, cleared and with room for
+     * at least {@code size} bytes. Must be called with the channel lock held.
+     */
+    ByteBuffer encodingBuffer(int size) {
+        MethodWireStats wireStats = _connection.getMethodWireStats();
+        if (wireStats != null) {
+            this.encodingStart = wireStats.startTime();
+        }
+        ByteBuffer buffer = this.encodingBuffer;
+        if (buffer == null || buffer.capacity() < size) {
+            buffer = ByteBuffer.allocate(Math.max(size, AMQImpl.Basic.Publish.MAX_WIRE_SIZE));
+            this.encodingBuffer = buffer;
+        }
+        buffer.clear();
+        return buffer;
+    }
+
+    /**
+     * Sends the content-less method encoded in the scratch buffer, see
+     * {@link #encodingBuffer(int)}. Must be called with the channel lock held.
+     */
+    void transmitEncodedMethod() throws IOException {
+        ensureIsOpen();
+        ByteBuffer buffer = this.encodingBuffer;
+        MethodWireStats wireStats = _connection.getMethodWireStats();
+        if (wireStats != null) {
+            wireStats.recordOutbound(AMQImpl.methodIndex(buffer.getShort(0), buffer.getShort(2)),
+                buffer.position() + AMQCommand.EMPTY_FRAME_SIZE, this.encodingStart);
+        }
+        _connection.writeFrame(AMQP.FRAME_METHOD, _channelNumber, buffer.array(), 0, buffer.position());
+        _connection.flush();
+    }
+
+    /**
+     * Sends a basic.publish and its content without instantiating the method,
+     * the command or the frames: the method and the content header are encoded
+     * in the scratch buffer of the channel, the body is written as is.
+     */
+    void transmitPublish(String exchange, String routingKey, boolean mandatory, boolean immediate,
+                         AMQContentHeader contentHeader, byte[] body) throws IOException {
+        _channelLock.lock();
+        try {
+            ensureIsOpen();
+            awaitContentUnblocked();
+            int bodyLength = body == null ? 0 : body.length;
+            int headerSize = contentHeader.wireSize();
+            int frameMax = _connection.getFrameMax();
+            boolean cappedFrameMax = frameMax > 0;
+            if (cappedFrameMax && headerSize + AMQCommand.EMPTY_FRAME_SIZE > frameMax) {
+                String msg = String.format("Content headers exceeded max frame size: %d > %d",
+                    headerSize + AMQCommand.EMPTY_FRAME_SIZE, frameMax);
+                throw new IllegalArgumentException(msg);
+            }
+
+            // the method and the content header are encoded one after the other
+            ByteBuffer buffer = encodingBuffer(AMQImpl.Basic.Publish.MAX_WIRE_SIZE + headerSize);
+            AMQImpl.Basic.Publish.encode(buffer, 0, exchange, routingKey, mandatory, immediate);
+            int methodSize = buffer.position();
+            contentHeader.encodeTo(buffer, bodyLength);
+
+            int bodyPayloadMax = cappedFrameMax ? frameMax - AMQCommand.EMPTY_FRAME_SIZE : bodyLength;
+            MethodWireStats wireStats = _connection.getMethodWireStats();
+            if (wireStats != null) {
+                int bodyFrames = bodyPayloadMax == 0 ? 0 : (bodyLength + bodyPayloadMax - 1) / bodyPayloadMax;
+                wireStats.recordOutbound(AMQImpl.methodIndex(AMQImpl.Basic.INDEX, AMQImpl.Basic.Publish.INDEX),
+                    buffer.position() + bodyLength + (long) (2 + bodyFrames) * AMQCommand.EMPTY_FRAME_SIZE,
+                    this.encodingStart);
+            }
+            _connection.writeFrame(AMQP.FRAME_METHOD, _channelNumber, buffer.array(), 0, methodSize);
+            _connection.writeFrame(AMQP.FRAME_HEADER, _channelNumber, buffer.array(), methodSize,
+                buffer.position() - methodSize);
+
+            for (int offset = 0; offset < bodyLength; offset += bodyPayloadMax) {
+                int fragmentLength = Math.min(bodyLength - offset, bodyPayloadMax);
+                _connection.writeFrame(AMQP.FRAME_BODY, _channelNumber, body, offset, fragmentLength);
+            }
+            _connection.flush();
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /**
+     * Sends basic.publish commands like {@link #transmitPublish}, but encodes
+     * the frames of the messages one after the other in the scratch buffer of the
+     * channel, writes them with as few writes as possible, and flushes once.
+     * Bodies that would not fit in the scratch buffer are written as is.
+     */
+    void transmitPublishBatch(List<OutboundMessage> messages) throws IOException {
+        _channelLock.lock();
+        try {
+            ensureIsOpen();
+            awaitContentUnblocked();
+            int frameMax = _connection.getFrameMax();
+            boolean cappedFrameMax = frameMax > 0;
+            // check all the messages before writing any
+            int[] headerSizes = new int[messages.size()];
+            for (int i = 0; i < headerSizes.length; i++) {
+                AMQContentHeader contentHeader = publishedProperties(messages.get(i));
+                headerSizes[i] = contentHeader.wireSize();
+                if (cappedFrameMax && headerSizes[i] + AMQCommand.EMPTY_FRAME_SIZE > frameMax) {
+                    String msg = String.format("Content headers exceeded max frame size: %d > %d",
+                        headerSizes[i] + AMQCommand.EMPTY_FRAME_SIZE, frameMax);
+                    throw new IllegalArgumentException(msg);
+                }
+            }
+
+            MethodWireStats wireStats = _connection.getMethodWireStats();
+            int publishIndex = AMQImpl.methodIndex(AMQImpl.Basic.INDEX, AMQImpl.Basic.Publish.INDEX);
+            ByteBuffer buffer = encodingBuffer(PUBLISH_BATCH_BUFFER_SIZE);
+            for (int i = 0; i < headerSizes.length; i++) {
+                OutboundMessage message = messages.get(i);
+                byte[] body = message.getBody();
+                int bodyLength = body == null ? 0 : body.length;
+                int bodyPayloadMax = cappedFrameMax ? frameMax - AMQCommand.EMPTY_FRAME_SIZE : bodyLength;
+                int bodyFrames = bodyPayloadMax == 0 ? 0 : (bodyLength + bodyPayloadMax - 1) / bodyPayloadMax;
+                int envelopeSize = AMQImpl.Basic.Publish.MAX_WIRE_SIZE + headerSizes[i] + 2 * AMQCommand.EMPTY_FRAME_SIZE;
+                long commandSize = envelopeSize + bodyLength + (long) bodyFrames * AMQCommand.EMPTY_FRAME_SIZE;
+                boolean inlineBody = commandSize <= PUBLISH_BATCH_BUFFER_SIZE;
+                if (buffer.remaining() < (inlineBody ? commandSize : envelopeSize)) {
+                    if (buffer.position() > 0) {
+                        _connection.writeFrames(buffer.array(), 0, buffer.position());
                     }
+                    buffer = encodingBuffer(Math.max(envelopeSize, PUBLISH_BATCH_BUFFER_SIZE));
+                }
 
-                    // This is to catch a situation when the thread wakes up during
-                    // shutdown. Currently, no command that has content is allowed
-                    // to send anything in a closing state.
-                    ensureIsOpen();
+                long startTime = wireStats == null ? 0L : wireStats.startTime();
+                int commandStart = buffer.position();
+                int sizePosition = startFrame(buffer, AMQP.FRAME_METHOD);
+                AMQImpl.Basic.Publish.encode(buffer, 0, message.getExchange(), message.getRoutingKey(),
+                    message.isMandatory(), false);
+                endFrame(buffer, sizePosition);
+                sizePosition = startFrame(buffer, AMQP.FRAME_HEADER);
+                publishedProperties(message).encodeTo(buffer, bodyLength);
+                endFrame(buffer, sizePosition);
+                if (wireStats != null) {
+                    wireStats.recordOutbound(publishIndex,
+                        buffer.position() - commandStart + bodyLength + (long) bodyFrames * AMQCommand.EMPTY_FRAME_SIZE,
+                        startTime);
+                }
+
+                if (inlineBody) {
+                    for (int offset = 0; offset < bodyLength; offset += bodyPayloadMax) {
+                        sizePosition = startFrame(buffer, AMQP.FRAME_BODY);
+                        buffer.put(body, offset, Math.min(bodyLength - offset, bodyPayloadMax));
+                        endFrame(buffer, sizePosition);
+                    }
+                } else {
+                    _connection.writeFrames(buffer.array(), 0, buffer.position());
+                    buffer.clear();
+                    for (int offset = 0; offset < bodyLength; offset += bodyPayloadMax) {
+                        int fragmentLength = Math.min(bodyLength - offset, bodyPayloadMax);
+                        _connection.writeFrame(AMQP.FRAME_BODY, _channelNumber, body, offset, fragmentLength);
+                    }
                 }
             }
-            this._trafficListener.write(c);
-            c.transmit(this);
+            if (buffer.position() > 0) {
+                _connection.writeFrames(buffer.array(), 0, buffer.position());
+            }
+            _connection.flush();
         } finally {
             _channelLock.unlock();
         }
     }
 
+    private static AMQContentHeader publishedProperties(OutboundMessage message) {
+        return message.getProperties() == null ? MessageProperties.MINIMAL_BASIC : message.getProperties();
+    }
+
+    /** Writes the start of a frame, the payload size to come, and returns the position of the size. */
+    private int startFrame(ByteBuffer buffer, int type) {
+        buffer.put((byte) type);
+        buffer.putShort((short) _channelNumber);
+        int sizePosition = buffer.position();
+        buffer.putInt(0);
+        return sizePosition;
+    }
+
+    /** Writes the size of the payload that has just been written and the end of the frame. */
+    private static void endFrame(ByteBuffer buffer, int sizePosition) {
+        buffer.putInt(sizePosition, buffer.position() - sizePosition - 4);
+        buffer.put((byte) AMQP.FRAME_END);
+    }
+
     public AMQConnection getConnection() {
         return _connection;
     }
@@ -632,6 +1092,57 @@ public abstract class AMQChannel extends ShutdownNotifierComponent {
         }
     }
 
+    /** A pipelined RPC request, matched to its reply with the mapping of the specification. */
+    private static final class PipelinedRpcWrapper implements RpcWrapper {
+
+        private final Method request;
+
+        private final CompletableFuture<AMQCommand> reply = new CompletableFuture<>();
+
+        private PipelinedRpcWrapper(Method request) {
+            this.request = request;
+        }
+
+        @Override
+        public boolean canHandleReply(AMQCommand command) {
+            return AMQImpl.isReply(request, command.getMethod());
+        }
+
+        @Override
+        public void complete(AMQCommand command) {
+            reply.complete(command);
+        }
+
+        @Override
+        public void shutdown(ShutdownSignalException signal) {
+            reply.completeExceptionally(signal);
+        }
+
+        /** Waits uninterruptibly for the reply, at most the given timeout unless it is {@link #NO_RPC_TIMEOUT}. */
+        AMQCommand getReply(int timeout) throws TimeoutException {
+            boolean interrupted = false;
+            try {
+                while (true) {
+                    try {
+                        return timeout == NO_RPC_TIMEOUT ? reply.get() : reply.get(timeout, TimeUnit.MILLISECONDS);
+                    } catch (InterruptedException e) { //NOSONAR
+                        interrupted = true;
+                        // No Sonar: we re-interrupt the thread later
+                    } catch (ExecutionException e) {
+                        if (e.getCause() instanceof ShutdownSignalException) {
+                            throw (ShutdownSignalException) e.getCause();
+                        }
+                        throw new IllegalStateException(e.getCause());
+                    }
+                }
+            } finally {
+                if (interrupted) {
+                    Thread.currentThread().interrupt();
+                }
+            }
+        }
+    }
+
     protected ObservationCollector.ConnectionInfo connectionInfo() {
         return this.connectionInfo;
     }
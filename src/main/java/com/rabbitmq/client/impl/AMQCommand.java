@@ -51,6 +51,12 @@ public class AMQCommand implements Command {
         this(null, null, null, maxBodyLength);
     }
 
+    AMQCommand(int maxBodyLength, boolean lazyProperties, ShortStringCache cache, MethodWireStats wireStats,
+               InboundBufferPool bufferPool) {
+        this.assembler = new CommandAssembler(null, null, null, maxBodyLength, lazyProperties, cache, wireStats,
+            bufferPool);
+    }
+
     /** Construct a command ready to fill in by reading frames */
     public AMQCommand() {
         this(null, null, null, Integer.MAX_VALUE);
@@ -108,6 +114,23 @@ public class AMQCommand implements Command {
         return this.assembler.handleFrame(f);
     }
 
+    /**
+     * Streams the content body instead of assembling it, {@link #getContentBody()}
+     * then returns an empty array.
+     * @return the stream, null if the body is already streamed
+     */
+    ContentBodyStream streamContentBody() {
+        return this.assembler.streamContentBody();
+    }
+
+    boolean isContentBodyStreamed() {
+        return this.assembler.isContentBodyStreamed();
+    }
+
+    boolean isComplete() {
+        return this.assembler.isComplete();
+    }
+
     /**
      * Sends this command down the named channel on the channel's
      * connection, possibly in multiple frames.
@@ -117,10 +140,12 @@ public class AMQCommand implements Command {
     public void transmit(AMQChannel channel) throws IOException {
         int channelNumber = channel.getChannelNumber();
         AMQConnection connection = channel.getConnection();
+        MethodWireStats wireStats = connection.getMethodWireStats();
 
         assemblerLock.lock();
         try {
             Method m = this.assembler.getMethod();
+            long encodingStart = wireStats == null ? 0L : wireStats.startTime();
             if (m.hasContent()) {
                 byte[] body = this.assembler.getContentBody();
 
@@ -134,7 +159,14 @@ public class AMQCommand implements Command {
                     String msg = String.format("Content headers exceeded max frame size: %d > %d", headerFrame.size(), frameMax);
                     throw new IllegalArgumentException(msg);
                 }
-                connection.writeFrame(m.toFrame(channelNumber));
+                Frame methodFrame = m.toFrame(channelNumber);
+                if (wireStats != null) {
+                    int bodyFrames = bodyPayloadMax == 0 ? 0 : (body.length + bodyPayloadMax - 1) / bodyPayloadMax;
+                    wireStats.recordOutbound(AMQImpl.methodIndex(m.protocolClassId(), m.protocolMethodId()),
+                        methodFrame.size() + headerFrame.size() + body.length + (long) bodyFrames * EMPTY_FRAME_SIZE,
+                        encodingStart);
+                }
+                connection.writeFrame(methodFrame);
                 connection.writeFrame(headerFrame);
 
                 for (int offset = 0; offset < body.length; offset += bodyPayloadMax) {
@@ -147,7 +179,12 @@ public class AMQCommand implements Command {
                     connection.writeFrame(frame);
                 }
             } else {
-                connection.writeFrame(m.toFrame(channelNumber));
+                Frame methodFrame = m.toFrame(channelNumber);
+                if (wireStats != null) {
+                    wireStats.recordOutbound(AMQImpl.methodIndex(m.protocolClassId(), m.protocolMethodId()),
+                        methodFrame.size(), encodingStart);
+                }
+                connection.writeFrame(methodFrame);
             }
         } finally {
             assemblerLock.unlock();
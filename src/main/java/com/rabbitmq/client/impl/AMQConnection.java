@@ -56,6 +56,7 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
 
     private final ExecutorService consumerWorkServiceExecutor;
     private final ScheduledExecutorService heartbeatExecutor;
+    private final HashedTimerWheel timerWheel;
     private final ExecutorService shutdownExecutor;
     private Thread mainLoopThread;
     private final AtomicBoolean ioLoopThreadSet = new AtomicBoolean(false);
@@ -69,6 +70,7 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
     private final ErrorOnWriteListener errorOnWriteListener;
 
     private final int workPoolTimeout;
+    private final boolean ringBufferConsumerDispatch;
 
     private final AtomicBoolean finalShutdownStarted = new AtomicBoolean(false);
     private volatile ObservationCollector.ConnectionInfo connectionInfo;
@@ -148,6 +150,8 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
     private final int channelRpcTimeout;
     private final boolean channelShouldCheckRpcResponseType;
     private final TrafficListener trafficListener;
+    /** Per-method wire statistics, null if disabled */
+    private final MethodWireStats methodWireStats;
     private final CredentialsRefreshService credentialsRefreshService;
 
     /* State modified after start - all volatile */
@@ -163,6 +167,15 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
     /** Saved server properties field from connection.start */
     private volatile Map<String, Object> _serverProperties;
     private final int maxInboundMessageBodySize;
+    private final boolean lazyPropertiesDecoding;
+    /** Cache of the short strings decoded from inbound frames, null if disabled */
+    private final ShortStringCache shortStringCache;
+    private final int ackCoalescingMaxCount;
+    private final int ackCoalescingMaxDelay;
+    /** Pool of the bodies of inbound messages, null if disabled */
+    private final InboundBufferPool inboundBufferPool;
+    /** Recorder of the frames of the connection, null if disabled */
+    private final TrafficRecorder trafficRecorder;
 
     /**
      * Protected API - respond, in the main I/O loop thread, to a ShutdownSignal.
@@ -239,6 +252,7 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
         this.saslConfig = params.getSaslConfig();
         this.consumerWorkServiceExecutor = params.getConsumerWorkServiceExecutor();
         this.heartbeatExecutor = params.getHeartbeatExecutor();
+        this.timerWheel = params.getTimerWheel();
         this.shutdownExecutor = params.getShutdownExecutor();
         this.threadFactory = params.getThreadFactory();
         if(params.getChannelRpcTimeout() < 0) {
@@ -251,6 +265,7 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
 
         this.credentialsRefreshService = params.getCredentialsRefreshService();
 
+        this.methodWireStats = metricsCollector.methodWireStats();
 
         this._channel0 = createChannel0();
 
@@ -266,7 +281,16 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
         this.errorOnWriteListener = params.getErrorOnWriteListener() != null ? params.getErrorOnWriteListener() :
             (connection, exception) -> { throw exception; }; // we just propagate the exception for non-recoverable connections
         this.workPoolTimeout = params.getWorkPoolTimeout();
+        this.ringBufferConsumerDispatch = params.isRingBufferConsumerDispatch();
         this.maxInboundMessageBodySize = params.getMaxInboundMessageBodySize();
+        this.lazyPropertiesDecoding = params.isLazyPropertiesDecoding();
+        this.shortStringCache = params.getShortStringCacheSize() > 0 ?
+            new ShortStringCache(params.getShortStringCacheSize()) : null;
+        this.ackCoalescingMaxCount = params.getAckCoalescingMaxCount();
+        this.ackCoalescingMaxDelay = params.getAckCoalescingMaxDelay();
+        this.inboundBufferPool = params.getInboundBufferPool();
+        this.trafficRecorder = params.getTrafficRecorderFactory() == null ?
+            null : params.getTrafficRecorderFactory().get();
     }
 
     AMQChannel createChannel0() {
@@ -278,11 +302,12 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
     }
 
     private void initializeConsumerWorkService() {
-        this._workService  = new ConsumerWorkService(consumerWorkServiceExecutor, threadFactory, workPoolTimeout, shutdownTimeout);
+        this._workService  = new ConsumerWorkService(consumerWorkServiceExecutor, threadFactory, workPoolTimeout, shutdownTimeout,
+            ringBufferConsumerDispatch);
     }
 
     private void initializeHeartbeatSender() {
-        this._heartbeatSender = new HeartbeatSender(_frameHandler, heartbeatExecutor, threadFactory);
+        this._heartbeatSender = new HeartbeatSender(_frameHandler, heartbeatExecutor, timerWheel, threadFactory);
     }
 
     /**
@@ -637,10 +662,39 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
      * Public API - sends a frame directly to the broker.
      */
     void writeFrame(Frame f) throws IOException {
+        if (trafficRecorder != null) {
+            trafficRecorder.outbound(f);
+        }
         _frameHandler.writeFrame(f);
         _heartbeatSender.signalActivity();
     }
 
+    /**
+     * Private API - sends a frame whose payload is a range of a byte array,
+     * the array can be reused once the method returns.
+     * @see FrameHandler#writeFrame(int, int, byte[], int, int)
+     */
+    void writeFrame(int type, int channel, byte[] payload, int offset, int length) throws IOException {
+        if (trafficRecorder != null) {
+            trafficRecorder.outbound(type, channel, payload, offset, length);
+        }
+        _frameHandler.writeFrame(type, channel, payload, offset, length);
+        _heartbeatSender.signalActivity();
+    }
+
+    /**
+     * Private API - sends frames already encoded in a range of a byte array,
+     * the array can be reused once the method returns.
+     * @see FrameHandler#writeFrames(byte[], int, int)
+     */
+    void writeFrames(byte[] frames, int offset, int length) throws IOException {
+        if (trafficRecorder != null) {
+            trafficRecorder.outbound(frames, offset, length);
+        }
+        _frameHandler.writeFrames(frames, offset, length);
+        _heartbeatSender.signalActivity();
+    }
+
     /**
      * Public API - flush the output buffers
      */
@@ -725,6 +779,9 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
     private void readFrame(Frame frame) throws IOException {
         if (frame != null) {
             _missedHeartbeats = 0;
+            if (trafficRecorder != null) {
+                trafficRecorder.inbound(frame);
+            }
             if (frame.getType() == AMQP.FRAME_HEARTBEAT) {
                 // Ignore it: we've already just reset the heartbeat counter.
             } else {
@@ -1220,6 +1277,69 @@ public class AMQConnection extends ShutdownNotifierComponent implements Connecti
         return maxInboundMessageBodySize;
     }
 
+    boolean isLazyPropertiesDecoding() {
+        return lazyPropertiesDecoding;
+    }
+
+    /**
+     * Pool of the bodies of inbound messages.
+     * @return the pool, null if disabled
+     */
+    InboundBufferPool getInboundBufferPool() {
+        return inboundBufferPool;
+    }
+
+    /**
+     * Timer wheel shared for heartbeats, ack flushes and continuation timeouts.
+     * @return the wheel, null if disabled
+     */
+    HashedTimerWheel getTimerWheel() {
+        return timerWheel;
+    }
+
+    /**
+     * Recorder of the frames of the connection.
+     * @return the recorder, null if disabled
+     * @see com.rabbitmq.client.ConnectionFactory#setTrafficRecorderFactory(java.util.function.Supplier)
+     */
+    public TrafficRecorder getTrafficRecorder() {
+        return trafficRecorder;
+    }
+
+    /**
+     * Cache of the short strings decoded from inbound frames.
+     * @return the cache, null if disabled
+     */
+    public ShortStringCache getShortStringCache() {
+        return shortStringCache;
+    }
+
+    int getAckCoalescingMaxCount() {
+        return ackCoalescingMaxCount;
+    }
+
+    int getAckCoalescingMaxDelay() {
+        return ackCoalescingMaxDelay;
+    }
+
+    /**
+     * Private API - schedules a one-shot task on the heartbeat executor or timer wheel.
+     * The task must be short and must not block, e.g. hand work over to another executor.
+     * @return the future of the task, null if the connection is shut down
+     */
+    Future<?> schedule(Runnable task, long delayNanos) {
+        return _heartbeatSender.schedule(task, delayNanos);
+    }
+
+    /**
+     * Per-method wire statistics of this connection.
+     * @return the statistics, null if disabled
+     * @see MetricsCollector#methodWireStats()
+     */
+    public MethodWireStats getMethodWireStats() {
+        return methodWireStats;
+    }
+
     private static class DefaultConnectionInfo implements ObservationCollector.ConnectionInfo {
 
         private final String peerAddress;
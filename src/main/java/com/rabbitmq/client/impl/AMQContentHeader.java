@@ -16,8 +16,8 @@
 package com.rabbitmq.client.impl;
 
 import java.io.DataInputStream;
-import java.io.DataOutputStream;
 import java.io.IOException;
+import java.nio.ByteBuffer;
 
 import com.rabbitmq.client.AMQP;
 import com.rabbitmq.client.ContentHeader;
@@ -40,21 +40,55 @@ public abstract class AMQContentHeader implements ContentHeader {
         in.readShort(); // weight not currently used
         this.bodySize = in.readLong();
     }
+
+    protected AMQContentHeader(ByteBuffer in) {
+        in.getShort(); // weight not currently used
+        this.bodySize = in.getLong();
+    }
     
     public long getBodySize() { return bodySize; }
-    
 
-    private void writeTo(DataOutputStream out, long bodySize) throws IOException {
-        out.writeShort(0); // weight - not currently used
-        out.writeLong(bodySize);
-        writePropertiesTo(new ContentHeaderPropertyWriter(out));
+    /**
+     * Private API - Checks the value of an octet property, stored unboxed by the autogenerated code
+     * @return the value
+     * @throws IllegalArgumentException if the value is not between 0 and 255
+     */
+    protected static int checkOctet(String name, int value) {
+        if (value < 0 || value > 255) {
+            throw new IllegalArgumentException("Property " + name + " must be an octet, between 0 and 255: " + value);
+        }
+        return value;
     }
+    
 
     /**
      * Private API - Autogenerated writer for this header
      */
     public abstract void writePropertiesTo(ContentHeaderPropertyWriter writer) throws IOException;
 
+    /**
+     * Private API - Autogenerated exact wire size of this header
+     * @return the size in bytes of the header frame payload
+     */
+    public abstract int wireSize();
+
+    /**
+     * Private API - Autogenerated encoder for the property flags and values of this header
+     */
+    public abstract void encodePropertiesTo(ByteBuffer out);
+
+    /**
+     * Private API - Encodes the whole header frame payload
+     * @param out the buffer to encode into, with at least {@link #wireSize()} bytes remaining
+     * @param bodySize the size of the content body
+     */
+    public void encodeTo(ByteBuffer out, long bodySize) {
+        out.putShort((short) getClassId());
+        out.putShort((short) 0); // weight - not currently used
+        out.putLong(bodySize);
+        encodePropertiesTo(out);
+    }
+
     /** Public API - {@inheritDoc} */
     @Override
     public void appendPropertyDebugStringTo(StringBuilder acc) {
@@ -72,11 +106,9 @@ public abstract class AMQContentHeader implements ContentHeader {
      * Private API - Called by {@link AMQCommand#transmit}
      */
     public Frame toFrame(int channelNumber, long bodySize) throws IOException {
-        Frame frame = new Frame(AMQP.FRAME_HEADER, channelNumber);
-        DataOutputStream bodyOut = frame.getOutputStream();
-        bodyOut.writeShort(getClassId());
-        writeTo(bodyOut, bodySize);
-        return frame;
+        byte[] payload = new byte[wireSize()];
+        encodeTo(ByteBuffer.wrap(payload), bodySize);
+        return new Frame(AMQP.FRAME_HEADER, channelNumber, payload);
     }
     
     @Override
@@ -53,6 +53,32 @@ public abstract class AbstractMetricsCollector implements MetricsCollector {
 
     private static final Function<ChannelState, Set<Long>> GET_UNCONFIRMED_DTAGS = channelState -> channelState.unconfirmedMessageDeliveryTags;
 
+    private volatile MethodWireStats methodWireStats;
+
+    /**
+     * Enables per-method wire statistics (commands, bytes, and optionally
+     * decoding and encoding time) for the connections created afterwards.
+     * Disabled by default.
+     *
+     * @param timing whether to time the decoding and the encoding of methods
+     * @return the statistics
+     * @see MetricsCollector#methodWireStats()
+     * @since 6.0.0
+     */
+    public synchronized MethodWireStats enableMethodWireStats(boolean timing) {
+        if (this.methodWireStats == null) {
+            MethodWireStats stats = new MethodWireStats(timing);
+            registerMethodWireStats(stats);
+            this.methodWireStats = stats;
+        }
+        return this.methodWireStats;
+    }
+
+    @Override
+    public MethodWireStats methodWireStats() {
+        return this.methodWireStats;
+    }
+
     @Override
     public void newConnection(final Connection connection) {
         try {
@@ -424,4 +450,15 @@ public abstract class AbstractMetricsCollector implements MetricsCollector {
      * Marks the event of a published message not being routed.
      */
     protected abstract void markPublishedMessageUnrouted();
+
+    /**
+     * Exposes per-method wire statistics once they are enabled.
+     * The default implementation does nothing, the statistics
+     * are still available with {@link #methodWireStats()}.
+     * @param stats the statistics
+     * @see #enableMethodWireStats(boolean)
+     */
+    protected void registerMethodWireStats(MethodWireStats stats) {
+
+    }
 }
@@ -0,0 +1,179 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import java.io.IOException;
+import java.util.BitSet;
+
+/**
+ * Coalesces the single acks of a channel: the acks of contiguous delivery
+ * tags are sent as one {@code basic.ack} with {@code multiple=true} once
+ * a number of acks is pending or the oldest pending ack is old enough.
+ * <p>
+ * A multiple ack settles every unsettled delivery up to its tag, so it
+ * is only sent for a range of tags the application has all settled,
+ * acked or not. The pending acks after a gap (a delivery still in
+ * process, or not to be acked, e.g. of an auto-ack consumer) are sent
+ * one by one. Coalescing is given up if a gap stays open for too long.
+ * <p>
+ * Not thread-safe, guarded by the channel lock.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#setAckCoalescingMaxCount(int)
+ */
+final class AckCoalescer {
+
+    /** Number of delivery tags after an open gap beyond which coalescing is given up */
+    static final int MAX_SPAN = 1 << 16;
+
+    @FunctionalInterface
+    interface AckSender {
+
+        void sendAck(long deliveryTag, boolean multiple) throws IOException;
+
+    }
+
+    private final int maxCount;
+    private final long maxDelayNanos;
+
+    /** Every delivery tag up to the base is settled */
+    private long base = 0;
+    /** Settled delivery tags after the base, bit i being tag base + 1 + i */
+    private BitSet settled = new BitSet();
+    /** Delivery tags after the base acked by the application, but not sent yet */
+    private BitSet pending = new BitSet();
+    private int pendingCount = 0;
+    private long firstPendingTime;
+    private boolean givenUp = false;
+
+    /**
+     * @param maxCount      number of pending acks that triggers sending them
+     * @param maxDelayNanos age of the oldest pending ack that triggers sending them
+     */
+    AckCoalescer(int maxCount, long maxDelayNanos) {
+        this.maxCount = maxCount;
+        this.maxDelayNanos = maxDelayNanos;
+    }
+
+    /**
+     * Acks deliveries: a multiple ack is sent right away, a single ack
+     * is kept pending, unless there are enough pending acks to send.
+     */
+    void ack(long deliveryTag, boolean multiple, AckSender sender) throws IOException {
+        if (multiple) {
+            // it covers the pending acks up to its tag
+            sender.sendAck(deliveryTag, true);
+            settle(deliveryTag, true);
+        } else if (givenUp || deliveryTag <= base) {
+            sender.sendAck(deliveryTag, false);
+        } else if (deliveryTag - base > MAX_SPAN) {
+            // an older delivery has been unsettled for too long
+            flush(sender);
+            givenUp = true;
+            settled.clear();
+            sender.sendAck(deliveryTag, false);
+        } else {
+            int index = (int) (deliveryTag - base - 1);
+            settled.set(index);
+            if (!pending.get(index)) {
+                pending.set(index);
+                if (pendingCount++ == 0) {
+                    firstPendingTime = System.nanoTime();
+                }
+            }
+            if (pendingCount >= maxCount || System.nanoTime() - firstPendingTime >= maxDelayNanos) {
+                flush(sender);
+            }
+        }
+    }
+
+    /**
+     * Records deliveries settled without going through this coalescer,
+     * e.g. nacked or rejected. Pending acks must be flushed before deliveries
+     * are nacked with {@code multiple=true}, the nack would cover them.
+     */
+    void settle(long deliveryTag, boolean multiple) {
+        if (givenUp) {
+            return;
+        }
+        if (multiple && deliveryTag == 0) {
+            // every delivery so far is settled, but the last delivery tag is unknown
+            clear();
+            settled.clear();
+            givenUp = true;
+        } else if (multiple) {
+            long distance = deliveryTag - base;
+            if (distance > 0) {
+                if (distance >= settled.length()) {
+                    settled.clear();
+                    pending.clear();
+                    pendingCount = 0;
+                } else {
+                    pendingCount -= pending.get(0, (int) distance).cardinality();
+                    shift((int) distance);
+                }
+                base += distance;
+            }
+        } else if (deliveryTag > base && deliveryTag - base <= MAX_SPAN) {
+            settled.set((int) (deliveryTag - base - 1));
+        }
+    }
+
+    /** Sends the pending acks, with a multiple ack for the contiguous settled tags. */
+    void flush(AckSender sender) throws IOException {
+        if (pendingCount == 0) {
+            return;
+        }
+        int prefix = settled.nextClearBit(0);
+        int lastPendingInPrefix = prefix == 0 ? -1 : pending.previousSetBit(prefix - 1);
+        if (lastPendingInPrefix >= 0) {
+            int coalesced = pending.get(0, prefix).cardinality();
+            sender.sendAck(base + 1 + lastPendingInPrefix, coalesced > 1);
+        }
+        if (prefix > 0) {
+            shift(prefix);
+            base += prefix;
+        }
+        for (int index = pending.nextSetBit(0); index >= 0; index = pending.nextSetBit(index + 1)) {
+            // after a gap, the tags stay settled
+            sender.sendAck(base + 1 + index, false);
+        }
+        pending.clear();
+        pendingCount = 0;
+    }
+
+    /** @return the nanoseconds until the pending acks are due, 0 if they are, -1 if there are none */
+    long nanosUntilDue(long now) {
+        if (pendingCount == 0) {
+            return -1;
+        }
+        return Math.max(0, firstPendingTime + maxDelayNanos - now);
+    }
+
+    long maxDelayNanos() {
+        return maxDelayNanos;
+    }
+
+    /** Discards the pending acks, e.g. when the channel closes. */
+    void clear() {
+        pending.clear();
+        pendingCount = 0;
+    }
+
+    private void shift(int count) {
+        settled = settled.get(count, Math.max(count, settled.length()));
+        pending = pending.get(count, Math.max(count, pending.length()));
+    }
+}
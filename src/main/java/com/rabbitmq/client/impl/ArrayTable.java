@@ -0,0 +1,215 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import java.util.AbstractMap;
+import java.util.AbstractSet;
+import java.util.Arrays;
+import java.util.ConcurrentModificationException;
+import java.util.Iterator;
+import java.util.Map;
+import java.util.NoSuchElementException;
+import java.util.Objects;
+import java.util.Set;
+
+/**
+ * {@link Map} backed by arrays of keys and values, for the small tables
+ * decoded from the wire (message headers, arguments). Lookups are linear,
+ * which is cheaper than hashing for a few entries. Entries are iterated
+ * in wire order. The table is mutable, like the {@link java.util.HashMap}
+ * it stands for, but it is meant for a few entries.
+ *
+ * @see ByteBufferValueReader#readTable(java.nio.ByteBuffer)
+ */
+final class ArrayTable extends AbstractMap<String, Object> {
+
+    /** Tables with more entries than this are decoded to a {@link java.util.HashMap} */
+    static final int MAX_SIZE = 8;
+
+    private static final String[] NO_KEYS = new String[0];
+    private static final Object[] NO_VALUES = new Object[0];
+
+    private String[] keys;
+    private Object[] values;
+    private int size;
+    private int modCount;
+
+    /** Creates an empty table */
+    ArrayTable() {
+        this(NO_KEYS, NO_VALUES, 0);
+    }
+
+    /**
+     * The arrays are adopted, not copied, so they should have the
+     * length of the table.
+     * @param keys   the distinct keys, the first {@code size} elements are used
+     * @param values the values, the first {@code size} elements are used
+     * @param size   the number of entries
+     */
+    ArrayTable(String[] keys, Object[] values, int size) {
+        this.keys = keys;
+        this.values = values;
+        this.size = size;
+    }
+
+    /** @return the index of the key in the first {@code size} keys, -1 if absent */
+    static int indexOf(String[] keys, int size, Object key) {
+        for (int i = 0; i < size; i++) {
+            if (Objects.equals(keys[i], key)) {
+                return i;
+            }
+        }
+        return -1;
+    }
+
+    @Override
+    public int size() {
+        return size;
+    }
+
+    @Override
+    public boolean containsKey(Object key) {
+        return indexOf(keys, size, key) >= 0;
+    }
+
+    @Override
+    public Object get(Object key) {
+        int index = indexOf(keys, size, key);
+        return index < 0 ? null : values[index];
+    }
+
+    @Override
+    public Object put(String key, Object value) {
+        int index = indexOf(keys, size, key);
+        if (index >= 0) {
+            Object previous = values[index];
+            values[index] = value;
+            return previous;
+        }
+        if (size == keys.length) {
+            int capacity = Math.max(4, size * 2);
+            keys = Arrays.copyOf(keys, capacity);
+            values = Arrays.copyOf(values, capacity);
+        }
+        keys[size] = key;
+        values[size] = value;
+        size++;
+        modCount++;
+        return null;
+    }
+
+    @Override
+    public Object remove(Object key) {
+        int index = indexOf(keys, size, key);
+        if (index < 0) {
+            return null;
+        }
+        Object previous = values[index];
+        removeAt(index);
+        return previous;
+    }
+
+    @Override
+    public void clear() {
+        Arrays.fill(keys, 0, size, null);
+        Arrays.fill(values, 0, size, null);
+        size = 0;
+        modCount++;
+    }
+
+    private void removeAt(int index) {
+        int moved = size - index - 1;
+        System.arraycopy(keys, index + 1, keys, index, moved);
+        System.arraycopy(values, index + 1, values, index, moved);
+        size--;
+        keys[size] = null;
+        values[size] = null;
+        modCount++;
+    }
+
+    @Override
+    public Set<Entry<String, Object>> entrySet() {
+        return new AbstractSet<Entry<String, Object>>() {
+
+            @Override
+            public Iterator<Entry<String, Object>> iterator() {
+                return new Iterator<Entry<String, Object>>() {
+                    private int index = 0;
+                    private int last = -1;
+                    private int expectedModCount = modCount;
+
+                    @Override
+                    public boolean hasNext() {
+                        return index < size;
+                    }
+
+                    @Override
+                    public Entry<String, Object> next() {
+                        if (modCount != expectedModCount) {
+                            throw new ConcurrentModificationException();
+                        }
+                        if (index >= size) {
+                            throw new NoSuchElementException();
+                        }
+                        last = index++;
+                        return new TableEntry(last);
+                    }
+
+                    @Override
+                    public void remove() {
+                        if (last < 0) {
+                            throw new IllegalStateException();
+                        }
+                        if (modCount != expectedModCount) {
+                            throw new ConcurrentModificationException();
+                        }
+                        removeAt(last);
+                        index = last;
+                        last = -1;
+                        expectedModCount = modCount;
+                    }
+                };
+            }
+
+            @Override
+            public int size() {
+                return size;
+            }
+
+            @Override
+            public void clear() {
+                ArrayTable.this.clear();
+            }
+        };
+    }
+
+    /** Entry writing its value through to the table */
+    private final class TableEntry extends SimpleEntry<String, Object> {
+
+        private final int index;
+
+        private TableEntry(int index) {
+            super(keys[index], values[index]);
+            this.index = index;
+        }
+
+        @Override
+        public Object setValue(Object value) {
+            values[index] = value;
+            return super.setValue(value);
+        }
+    }
+}
@@ -0,0 +1,347 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import java.io.IOException;
+import java.math.BigDecimal;
+import java.math.BigInteger;
+import java.nio.BufferUnderflowException;
+import java.nio.ByteBuffer;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+import com.rabbitmq.client.LongString;
+import com.rabbitmq.client.MalformedFrameException;
+
+/**
+ * Helper class to read AMQP wire-protocol encoded values straight
+ * from a {@link ByteBuffer}. Methods on this class are usually called
+ * from generated code, see {@link AMQImpl#readMethodFrom(ByteBuffer)}.
+ * <p>
+ * Unlike {@link ValueReader}, this class is stateless: values are read
+ * at the buffer's current position, which is advanced accordingly.
+ *
+ * @see ValueReader
+ */
+public final class ByteBufferValueReader {
+
+    private static final long INT_MASK = 0xffffffffL;
+
+    private ByteBufferValueReader() { }
+
+    /** Public API - reads a short string. */
+    public static String readShortstr(ByteBuffer in) {
+        int length = in.get() & 0xff;
+        return readUtf8(in, length);
+    }
+
+    /**
+     * Public API - reads a short string, through the given cache
+     * when there is one.
+     */
+    public static String readShortstr(ByteBuffer in, ShortStringCache cache) {
+        if (cache == null || !in.hasArray()) {
+            return readShortstr(in);
+        }
+        int length = in.get() & 0xff;
+        int position = in.position();
+        if (length > in.remaining()) {
+            throw new BufferUnderflowException();
+        }
+        String result = cache.intern(in.array(), in.arrayOffset() + position, length);
+        in.position(position + length);
+        return result;
+    }
+
+    /** Public API - reads a long string. */
+    public static LongString readLongstr(ByteBuffer in) {
+        return LongStringHelper.asLongString(readBytes(in));
+    }
+
+    /** Public API - reads a short integer. */
+    public static int readShort(ByteBuffer in) {
+        return in.getShort() & 0xffff;
+    }
+
+    /** Public API - reads an integer. */
+    public static int readLong(ByteBuffer in) {
+        return in.getInt();
+    }
+
+    /** Public API - reads a long integer. */
+    public static long readLonglong(ByteBuffer in) {
+        return in.getLong();
+    }
+
+    /** Public API - reads an octet. */
+    public static int readOctet(ByteBuffer in) {
+        return in.get() & 0xff;
+    }
+
+    /** Public API - reads a timestamp. */
+    public static Date readTimestamp(ByteBuffer in) {
+        return new Date(in.getLong() * 1000);
+    }
+
+    /** Public API - reads a table. */
+    public static Map<String, Object> readTable(ByteBuffer in) throws IOException {
+        return readTable(in, null);
+    }
+
+    /**
+     * Public API - reads a table, decoding its keys and the keys of
+     * nested tables through the given cache when there is one.
+     */
+    public static Map<String, Object> readTable(ByteBuffer in, ShortStringCache cache) throws IOException {
+        long tableLength = readLength(in);
+        if (tableLength == 0) return new ArrayTable();
+
+        int end = checkedEnd(in, tableLength);
+        // small tables, the most common, end up in arrays and are not hashed
+        String[] keys = new String[4];
+        Object[] values = new Object[4];
+        int size = 0;
+        Map<String, Object> table = null;
+        while (in.position() < end) {
+            String name = readShortstr(in, cache);
+            Object value = readFieldValue(in, cache);
+            if (table != null) {
+                if (!table.containsKey(name))
+                    table.put(name, value);
+            } else if (ArrayTable.indexOf(keys, size, name) < 0) {
+                if (size == ArrayTable.MAX_SIZE) {
+                    table = new HashMap<String, Object>();
+                    for (int i = 0; i < size; i++) {
+                        table.put(keys[i], values[i]);
+                    }
+                    table.put(name, value);
+                } else {
+                    if (size == keys.length) {
+                        keys = Arrays.copyOf(keys, ArrayTable.MAX_SIZE);
+                        values = Arrays.copyOf(values, ArrayTable.MAX_SIZE);
+                    }
+                    keys[size] = name;
+                    values[size] = value;
+                    size++;
+                }
+            }
+        }
+        checkConsumed(in, end);
+        if (table != null) {
+            return table;
+        }
+        if (size < keys.length) {
+            keys = Arrays.copyOf(keys, size);
+            values = Arrays.copyOf(values, size);
+        }
+        return new ArrayTable(keys, values, size);
+    }
+
+    /** Public API - skips a short string. */
+    public static void skipShortstr(ByteBuffer in) {
+        skip(in, in.get() & 0xff);
+    }
+
+    /** Public API - skips a long string. */
+    public static void skipLongstr(ByteBuffer in) {
+        skip(in, readLength(in));
+    }
+
+    /** Public API - skips a short integer. */
+    public static void skipShort(ByteBuffer in) {
+        skip(in, 2);
+    }
+
+    /** Public API - skips an integer. */
+    public static void skipLong(ByteBuffer in) {
+        skip(in, 4);
+    }
+
+    /** Public API - skips a long integer. */
+    public static void skipLonglong(ByteBuffer in) {
+        skip(in, 8);
+    }
+
+    /** Public API - skips an octet. */
+    public static void skipOctet(ByteBuffer in) {
+        skip(in, 1);
+    }
+
+    /** Public API - skips a timestamp. */
+    public static void skipTimestamp(ByteBuffer in) {
+        skip(in, 8);
+    }
+
+    /** Public API - skips a table, without decoding its entries. */
+    public static void skipTable(ByteBuffer in) {
+        skip(in, readLength(in));
+    }
+
+    /**
+     * Returns a view of the bytes between {@code start} and the current
+     * position of the buffer. The view shares the buffer's content.
+     */
+    public static ByteBuffer sliceFrom(ByteBuffer in, int start) {
+        ByteBuffer view = in.duplicate();
+        view.limit(in.position());
+        view.position(start);
+        return view.slice();
+    }
+
+    // package protected for testing
+    static Object readFieldValue(ByteBuffer in) throws IOException {
+        return readFieldValue(in, null);
+    }
+
+    private static Object readFieldValue(ByteBuffer in, ShortStringCache cache) throws IOException {
+        Object value;
+        switch (in.get() & 0xff) {
+          case 'S':
+              value = readLongstr(in);
+              break;
+          case 'I':
+              value = in.getInt();
+              break;
+          case 'i':
+              value = in.getInt() & INT_MASK;
+              break;
+          case 'D':
+              int scale = in.get() & 0xff;
+              byte [] unscaled = new byte[4];
+              in.get(unscaled);
+              value = new BigDecimal(new BigInteger(unscaled), scale);
+              break;
+          case 'T':
+              value = readTimestamp(in);
+              break;
+          case 'F':
+              value = readTable(in, cache);
+              break;
+          case 'A':
+              value = readArray(in, cache);
+              break;
+          case 'b':
+              value = in.get();
+              break;
+          case 'B':
+              value = in.get() & 0xff;
+              break;
+          case 'd':
+              value = in.getDouble();
+              break;
+          case 'f':
+              value = in.getFloat();
+              break;
+          case 'l':
+              value = in.getLong();
+              break;
+          case 's':
+              value = in.getShort();
+              break;
+          case 'u':
+              value = in.getShort() & 0xffff;
+              break;
+          case 't':
+              value = in.get() != 0;
+              break;
+          case 'x':
+              value = readBytes(in);
+              break;
+          case 'V':
+              value = null;
+              break;
+          default:
+              throw new MalformedFrameException
+                  ("Unrecognised type in table");
+        }
+        return value;
+    }
+
+    /** Reads a field-array */
+    private static List<Object> readArray(ByteBuffer in, ShortStringCache cache) throws IOException {
+        long length = readLength(in);
+        int end = checkedEnd(in, length);
+        List<Object> array = new ArrayList<Object>();
+        while (in.position() < end) {
+            array.add(readFieldValue(in, cache));
+        }
+        checkConsumed(in, end);
+        return array;
+    }
+
+    /** Reads a 32-bit-length-prefix byte vector. */
+    private static byte[] readBytes(ByteBuffer in) {
+        long contentLength = readLength(in);
+        if (contentLength < Integer.MAX_VALUE) {
+            byte[] buffer = new byte[(int) contentLength];
+            in.get(buffer);
+            return buffer;
+        } else {
+            throw new UnsupportedOperationException
+                ("Very long byte vectors and strings not currently supported");
+        }
+    }
+
+    private static long readLength(ByteBuffer in) {
+        return in.getInt() & INT_MASK;
+    }
+
+    private static void skip(ByteBuffer in, long length) {
+        if (length > in.remaining()) {
+            throw new BufferUnderflowException();
+        }
+        in.position(in.position() + (int) length);
+    }
+
+    /**
+     * Decodes UTF-8 bytes at the current position, straight from the
+     * backing array when there is one.
+     */
+    private static String readUtf8(ByteBuffer in, int length) {
+        if (in.hasArray()) {
+            int position = in.position();
+            if (length > in.remaining()) {
+                throw new BufferUnderflowException();
+            }
+            String result = new String(in.array(), in.arrayOffset() + position, length, StandardCharsets.UTF_8);
+            in.position(position + length);
+            return result;
+        } else {
+            byte[] b = new byte[length];
+            in.get(b);
+            return new String(b, StandardCharsets.UTF_8);
+        }
+    }
+
+    private static int checkedEnd(ByteBuffer in, long length) throws MalformedFrameException {
+        if (length > in.remaining()) {
+            throw new MalformedFrameException("Encoded length " + length
+                + " exceeds the " + in.remaining() + " remaining byte(s) of the frame");
+        }
+        return in.position() + (int) length;
+    }
+
+    private static void checkConsumed(ByteBuffer in, int end) throws MalformedFrameException {
+        if (in.position() != end) {
+            throw new MalformedFrameException("Table or array overran its encoded length");
+        }
+    }
+}
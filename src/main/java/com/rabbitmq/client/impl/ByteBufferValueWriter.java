@@ -0,0 +1,339 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import java.math.BigDecimal;
+import java.math.BigInteger;
+import java.nio.ByteBuffer;
+import java.util.Date;
+import java.util.List;
+import java.util.Map;
+
+import com.rabbitmq.client.LongString;
+
+/**
+ * Helper class to compute the exact wire size of AMQP values and to
+ * encode them straight into a pre-sized {@link ByteBuffer}. Methods on
+ * this class are usually called from generated code, see
+ * {@link Method#wireSize()} and {@link AMQContentHeader#wireSize()}.
+ * <p>
+ * Strings are measured and encoded to UTF-8 in place, without
+ * intermediate byte arrays.
+ *
+ * @see ValueWriter
+ */
+public final class ByteBufferValueWriter {
+
+    private ByteBufferValueWriter() { }
+
+    /** Computes the UTF-8 encoded length of a string, the same way {@link String#getBytes} would encode it. */
+    public static int utf8Length(String str) {
+        int length = str.length();
+        int acc = length;
+        for (int i = 0; i < length; i++) {
+            char c = str.charAt(i);
+            if (c < 0x80) {
+                // 1 byte, already counted
+            } else if (c < 0x800) {
+                acc += 1;
+            } else if (Character.isSurrogate(c)) {
+                if (Character.isHighSurrogate(c) && i + 1 < length && Character.isLowSurrogate(str.charAt(i + 1))) {
+                    // 4 bytes for 2 chars
+                    acc += 2;
+                    i++;
+                }
+                // an unpaired surrogate is encoded as '?'
+            } else {
+                acc += 2;
+            }
+        }
+        return acc;
+    }
+
+    /**
+     * Checks that the values of a table cannot change once the table is
+     * unmodifiable: scalars and strings only, no nested table, array,
+     * byte array or date.
+     * @return true if the encoded form of the table can be reused
+     */
+    public static boolean hasImmutableValues(Map<String, Object> table) {
+        if (table == null) return true;
+        for (Object value : table.values()) {
+            if (!(value == null || value instanceof String || value instanceof LongString
+                || value instanceof Integer || value instanceof Long || value instanceof Short
+                || value instanceof Byte || value instanceof Double || value instanceof Float
+                || value instanceof Boolean || value instanceof BigDecimal)) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    /** Computes the wire size of a short string. */
+    public static int shortstrSize(String str) {
+        return 1 + utf8Length(str);
+    }
+
+    /** Computes the wire size of a long string. */
+    public static int longstrSize(String str) {
+        return 4 + utf8Length(str);
+    }
+
+    /** Computes the wire size of a long string. */
+    public static int longstrSize(LongString str) {
+        return 4 + (int) str.length();
+    }
+
+    /** Computes the wire size of a table, including its length prefix. */
+    public static int tableSize(Map<String, Object> table) {
+        if (table == null) return 4;
+        int acc = 4;
+        for (Map.Entry<String, Object> entry : table.entrySet()) {
+            acc += shortstrSize(entry.getKey());
+            acc += fieldValueSize(entry.getValue());
+        }
+        return acc;
+    }
+
+    /** Computes the wire size of a field-value, including its type tag. */
+    public static int fieldValueSize(Object value) {
+        int acc = 1; // for the type tag
+        if (value instanceof String) {
+            acc += longstrSize((String) value);
+        } else if (value instanceof LongString) {
+            acc += longstrSize((LongString) value);
+        } else if (value instanceof Integer) {
+            acc += 4;
+        } else if (value instanceof BigDecimal) {
+            acc += 5;
+        } else if (value instanceof Date) {
+            acc += 8;
+        } else if (value instanceof Map) {
+            @SuppressWarnings("unchecked")
+            Map<String, Object> map = (Map<String, Object>) value;
+            acc += tableSize(map);
+        } else if (value instanceof Byte) {
+            acc += 1;
+        } else if (value instanceof Double) {
+            acc += 8;
+        } else if (value instanceof Float) {
+            acc += 4;
+        } else if (value instanceof Long) {
+            acc += 8;
+        } else if (value instanceof Short) {
+            acc += 2;
+        } else if (value instanceof Boolean) {
+            acc += 1;
+        } else if (value instanceof byte[]) {
+            acc += 4 + ((byte[]) value).length;
+        } else if (value instanceof List) {
+            acc += 4;
+            for (Object item : (List<?>) value) {
+                acc += fieldValueSize(item);
+            }
+        } else if (value instanceof Object[]) {
+            acc += 4;
+            for (Object item : (Object[]) value) {
+                acc += fieldValueSize(item);
+            }
+        } else if (value == null) {
+            // type tag only
+        } else {
+            throw new IllegalArgumentException("invalid value in table");
+        }
+        return acc;
+    }
+
+    /** Public API - encodes a short string. */
+    public static void writeShortstr(ByteBuffer out, String str) {
+        int length = utf8Length(str);
+        if (length > 255) {
+            throw new IllegalArgumentException(
+                    "Short string too long; utf-8 encoded length = " + length +
+                    ", max = 255.");
+        }
+        out.put((byte) length);
+        writeUtf8(out, str);
+    }
+
+    /** Public API - encodes a long string from a String. */
+    public static void writeLongstr(ByteBuffer out, String str) {
+        out.putInt(utf8Length(str));
+        writeUtf8(out, str);
+    }
+
+    /** Public API - encodes a long string from a LongString. */
+    public static void writeLongstr(ByteBuffer out, LongString str) {
+        byte[] bytes = str.getBytes();
+        out.putInt(bytes.length);
+        out.put(bytes);
+    }
+
+    /** Public API - encodes a short integer. */
+    public static void writeShort(ByteBuffer out, int s) {
+        out.putShort((short) s);
+    }
+
+    /** Public API - encodes an integer. */
+    public static void writeLong(ByteBuffer out, int l) {
+        out.putInt(l);
+    }
+
+    /** Public API - encodes a long integer. */
+    public static void writeLonglong(ByteBuffer out, long ll) {
+        out.putLong(ll);
+    }
+
+    /** Public API - encodes an octet. */
+    public static void writeOctet(ByteBuffer out, int octet) {
+        out.put((byte) octet);
+    }
+
+    /** Public API - encodes a timestamp. */
+    public static void writeTimestamp(ByteBuffer out, Date timestamp) {
+        // AMQP uses POSIX time_t which is in seconds since the epoch began
+        out.putLong(timestamp.getTime() / 1000);
+    }
+
+    /**
+     * Public API - encodes a table. The length prefix is reserved and
+     * back-patched once the entries are written, so the table is walked once.
+     */
+    public static void writeTable(ByteBuffer out, Map<String, Object> table) {
+        if (table == null) {
+            // Convenience.
+            out.putInt(0);
+        } else {
+            int lengthPosition = out.position();
+            out.putInt(0);
+            for (Map.Entry<String, Object> entry : table.entrySet()) {
+                writeShortstr(out, entry.getKey());
+                writeFieldValue(out, entry.getValue());
+            }
+            out.putInt(lengthPosition, out.position() - lengthPosition - 4);
+        }
+    }
+
+    /** Public API - encodes a field-value, including its type tag. */
+    public static void writeFieldValue(ByteBuffer out, Object value) {
+        if (value instanceof String) {
+            out.put((byte) 'S');
+            writeLongstr(out, (String) value);
+        } else if (value instanceof LongString) {
+            out.put((byte) 'S');
+            writeLongstr(out, (LongString) value);
+        } else if (value instanceof Integer) {
+            out.put((byte) 'I');
+            out.putInt((Integer) value);
+        } else if (value instanceof BigDecimal) {
+            out.put((byte) 'D');
+            BigDecimal decimal = (BigDecimal) value;
+            // The scale must be an unsigned octet, therefore its values must
+            // be between 0 and 255
+            if (decimal.scale() > 255 || decimal.scale() < 0)
+                throw new IllegalArgumentException
+                    ("BigDecimal has too large of a scale to be encoded. " +
+                            "The scale was: " + decimal.scale());
+            out.put((byte) decimal.scale());
+            BigInteger unscaled = decimal.unscaledValue();
+            // We use 31 instead of 32 (Integer.SIZE) because bitLength ignores the sign bit,
+            // so e.g. new BigDecimal(Integer.MAX_VALUE) comes out to 31 bits.
+            if (unscaled.bitLength() > 31)
+                throw new IllegalArgumentException
+                    ("BigDecimal too large to be encoded");
+            out.putInt(unscaled.intValue());
+        } else if (value instanceof Date) {
+            out.put((byte) 'T');
+            writeTimestamp(out, (Date) value);
+        } else if (value instanceof Map) {
+            out.put((byte) 'F');
+            @SuppressWarnings("unchecked")
+            Map<String, Object> map = (Map<String, Object>) value;
+            writeTable(out, map);
+        } else if (value instanceof Byte) {
+            out.put((byte) 'b');
+            out.put((Byte) value);
+        } else if (value instanceof Double) {
+            out.put((byte) 'd');
+            out.putDouble((Double) value);
+        } else if (value instanceof Float) {
+            out.put((byte) 'f');
+            out.putFloat((Float) value);
+        } else if (value instanceof Long) {
+            out.put((byte) 'l');
+            out.putLong((Long) value);
+        } else if (value instanceof Short) {
+            out.put((byte) 's');
+            out.putShort((Short) value);
+        } else if (value instanceof Boolean) {
+            out.put((byte) 't');
+            out.put((byte) ((Boolean) value ? 1 : 0));
+        } else if (value instanceof byte[]) {
+            out.put((byte) 'x');
+            out.putInt(((byte[]) value).length);
+            out.put((byte[]) value);
+        } else if (value == null) {
+            out.put((byte) 'V');
+        } else if (value instanceof List) {
+            out.put((byte) 'A');
+            int lengthPosition = out.position();
+            out.putInt(0);
+            for (Object item : (List<?>) value) {
+                writeFieldValue(out, item);
+            }
+            out.putInt(lengthPosition, out.position() - lengthPosition - 4);
+        } else if (value instanceof Object[]) {
+            out.put((byte) 'A');
+            int lengthPosition = out.position();
+            out.putInt(0);
+            for (Object item : (Object[]) value) {
+                writeFieldValue(out, item);
+            }
+            out.putInt(lengthPosition, out.position() - lengthPosition - 4);
+        } else {
+            throw new IllegalArgumentException
+                ("Invalid value type: " + value.getClass().getName());
+        }
+    }
+
+    /** Encodes a string to UTF-8 at the current position of the buffer. */
+    private static void writeUtf8(ByteBuffer out, String str) {
+        int length = str.length();
+        for (int i = 0; i < length; i++) {
+            char c = str.charAt(i);
+            if (c < 0x80) {
+                out.put((byte) c);
+            } else if (c < 0x800) {
+                out.put((byte) (0xc0 | (c >> 6)));
+                out.put((byte) (0x80 | (c & 0x3f)));
+            } else if (Character.isSurrogate(c)) {
+                if (Character.isHighSurrogate(c) && i + 1 < length && Character.isLowSurrogate(str.charAt(i + 1))) {
+                    int codePoint = Character.toCodePoint(c, str.charAt(++i));
+                    out.put((byte) (0xf0 | (codePoint >> 18)));
+                    out.put((byte) (0x80 | ((codePoint >> 12) & 0x3f)));
+                    out.put((byte) (0x80 | ((codePoint >> 6) & 0x3f)));
+                    out.put((byte) (0x80 | (codePoint & 0x3f)));
+                } else {
+                    out.put((byte) '?');
+                }
+            } else {
+                out.put((byte) (0xe0 | (c >> 12)));
+                out.put((byte) (0x80 | ((c >> 6) & 0x3f)));
+                out.put((byte) (0x80 | (c & 0x3f)));
+            }
+        }
+    }
+}
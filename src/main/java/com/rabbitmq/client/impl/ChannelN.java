@@ -32,6 +32,9 @@ import java.util.*;
 import java.util.concurrent.CompletableFuture;
 import java.util.concurrent.CopyOnWriteArrayList;
 import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.Future;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.TimeUnit;
 import java.util.concurrent.TimeoutException;
 
 /**
@@ -74,14 +77,22 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
 
     /** Dispatcher of consumer work for this channel */
     private final ConsumerDispatcher dispatcher;
+    /** Service the consumer work is dispatched to, also runs the sending of coalesced acks */
+    private final ConsumerWorkService workService;
 
     /** Future boolean for shutting down */
     private volatile CountDownLatch finishedShutdownFlag = null;
 
-    /** Set of currently unconfirmed messages (i.e. messages that have
-     *  not been ack'd or nack'd by the server yet. */
-    private final SortedSet<Long> unconfirmedSet =
-            Collections.synchronizedSortedSet(new TreeSet<Long>());
+    /** Sequence numbers of the currently unconfirmed messages (i.e. messages that have
+     *  not been ack'd or nack'd by the server yet). Guarded by its monitor. */
+    private final ConfirmTracker unconfirmed = new ConfirmTracker();
+
+    /** Number of threads in waitForConfirms. Guarded by unconfirmed. */
+    private int confirmWaiters = 0;
+
+    /** Batches published with basicPublishBatchAsync waiting for their confirms,
+     *  in publish order. Guarded by unconfirmed. */
+    private final Deque<PendingBatch> pendingBatches = new ArrayDeque<>();
 
     /** Whether the confirm select method has been successfully activated */
     private boolean confirmSelectActivated = false;
@@ -92,6 +103,15 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     protected final MetricsCollector metricsCollector;
     private final ObservationCollector observationCollector;
 
+    /** Coalescer of the single acks, null if ack coalescing is disabled. Guarded by _channelLock. */
+    private final AckCoalescer ackCoalescer;
+    private final AckCoalescer.AckSender ackSender = this::sendAck;
+    /** Task sending the pending coalesced acks once due. Guarded by _channelLock. */
+    private volatile Future<?> ackFlushTask;
+
+    /** Body being streamed to a {@link StreamingConsumer}, until its last frame arrives. */
+    private volatile ContentBodyStream streamingBody;
+
     /**
      * Construct a new channel on the given connection with the given
      * channel number. Usually not called directly - call
@@ -122,8 +142,12 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
                     MetricsCollector metricsCollector, ObservationCollector observationCollector) {
         super(connection, channelNumber);
         this.dispatcher = new ConsumerDispatcher(connection, this, workService);
+        this.workService = workService;
         this.metricsCollector = metricsCollector;
         this.observationCollector = observationCollector;
+        this.ackCoalescer = connection.getAckCoalescingMaxCount() > 0 ?
+            new AckCoalescer(connection.getAckCoalescingMaxCount(),
+                TimeUnit.MILLISECONDS.toNanos(connection.getAckCoalescingMaxDelay())) : null;
     }
 
     /**
@@ -212,25 +236,30 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         if (nextPublishSeqNo == 0L)
             throw new IllegalStateException("Confirms not selected");
         long startTime = System.currentTimeMillis();
-        synchronized (unconfirmedSet) {
+        synchronized (unconfirmed) {
             while (true) {
                 if (getCloseReason() != null) {
                     throw Utility.fixStackTrace(getCloseReason());
                 }
-                if (unconfirmedSet.isEmpty()) {
+                if (unconfirmed.isEmpty()) {
                     boolean aux = onlyAcksReceived;
                     onlyAcksReceived = true;
                     return aux;
                 }
-                if (timeout == 0L) {
-                    unconfirmedSet.wait();
-                } else {
-                    long elapsed = System.currentTimeMillis() - startTime;
-                    if (timeout > elapsed) {
-                        unconfirmedSet.wait(timeout - elapsed);
+                confirmWaiters++;
+                try {
+                    if (timeout == 0L) {
+                        unconfirmed.wait();
                     } else {
-                        throw new TimeoutException();
+                        long elapsed = System.currentTimeMillis() - startTime;
+                        if (timeout > elapsed) {
+                            unconfirmed.wait(timeout - elapsed);
+                        } else {
+                            throw new TimeoutException();
+                        }
                     }
+                } finally {
+                    confirmWaiters--;
                 }
             }
         }
@@ -303,8 +332,26 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         this.dispatcher.quiesce();
         broadcastShutdownSignal(getCloseReason());
 
-        synchronized (unconfirmedSet) {
-            unconfirmedSet.notifyAll();
+        List<PendingBatch> batches;
+        synchronized (unconfirmed) {
+            unconfirmed.notifyAll();
+            batches = new ArrayList<>(pendingBatches);
+            pendingBatches.clear();
+        }
+        for (PendingBatch batch : batches) {
+            batch.confirmed.completeExceptionally(getCloseReason());
+        }
+
+        Future<?> task = this.ackFlushTask;
+        if (task != null) {
+            // the pending acks are lost with the channel
+            task.cancel(false);
+        }
+
+        ContentBodyStream body = this.streamingBody;
+        if (body != null) {
+            // the rest of the body will not arrive
+            body.fail(getCloseReason());
         }
     }
 
@@ -437,9 +484,28 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         }
     }
 
+    /**
+     * Protected API - Dispatches a delivery to a {@link StreamingConsumer}
+     * as soon as its content header arrives.
+     */
+    @Override
+    protected void handleContentHeader(AMQCommand command) throws IOException {
+        Method method = command.getMethod();
+        if (isOpen() && method instanceof Basic.Deliver
+            && _consumers.get(((Basic.Deliver) method).getConsumerTag()) instanceof StreamingConsumer) {
+            processDelivery(command, (Basic.Deliver) method);
+        }
+    }
+
     protected void processDelivery(Command command, Basic.Deliver method) {
         Basic.Deliver m = method;
 
+        if (command instanceof AMQCommand && ((AMQCommand) command).isContentBodyStreamed()) {
+            // dispatched when the content header arrived, the body is complete now
+            setStreamingBody(null);
+            return;
+        }
+
         Consumer callback = _consumers.get(m.getConsumerTag());
         if (callback == null) {
             if (defaultConsumer == null) {
@@ -464,11 +530,24 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
             // this way, the message is inside the stats before it is handled
             // in case a manual ack in the callback, the stats will be able to record the ack
             metricsCollector.consumedMessage(this, m.getDeliveryTag(), m.getConsumerTag());
-            this.dispatcher.handleDelivery(callback,
-                                           m.getConsumerTag(),
-                                           envelope,
-                                           (BasicProperties) command.getContentHeader(),
-                                           command.getContentBody());
+            if (callback instanceof StreamingConsumer && command instanceof AMQCommand) {
+                AMQCommand streamedCommand = (AMQCommand) command;
+                ContentBodyStream body = streamedCommand.streamContentBody();
+                if (!streamedCommand.isComplete()) {
+                    setStreamingBody(body);
+                }
+                this.dispatcher.handleStreamingDelivery((StreamingConsumer) callback,
+                                                        m.getConsumerTag(),
+                                                        envelope,
+                                                        (BasicProperties) command.getContentHeader(),
+                                                        body);
+            } else {
+                this.dispatcher.handleDelivery(callback,
+                                               m.getConsumerTag(),
+                                               envelope,
+                                               (BasicProperties) command.getContentHeader(),
+                                               command.getContentBody());
+            }
         } catch (WorkPoolFullException e) {
             // couldn't enqueue in work pool, propagating
             throw e;
@@ -481,6 +560,22 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         }
     }
 
+    /**
+     * The dispatch thread of a streamed body waits for the body frames, so the
+     * connection thread must not wait for room in the dispatch queue until the
+     * last frame has arrived: the queue is unlimited meanwhile, like while an
+     * RPC is outstanding.
+     */
+    private void setStreamingBody(ContentBodyStream body) {
+        _channelLock.lock();
+        try {
+            this.streamingBody = body;
+            dispatcher.setUnlimited(body != null || isOutstandingRpc());
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
     private void callReturnListeners(Command command, Basic.Return basicReturn) {
         try {
             for (ReturnListener l : this.returnListeners) {
@@ -617,6 +712,9 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
             // connection wants to send Connection-CloseOK
             _channelLock.lock();
             try {
+                if (initiatedByApplication) {
+                    flushAcks();
+                }
                 startProcessShutdownSignal(signal, !initiatedByApplication, true);
                 quiescingRpc(reason, k);
             } finally {
@@ -707,7 +805,9 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         final long deliveryTag;
         if (nextPublishSeqNo > 0) {
             deliveryTag = getNextPublishSeqNo();
-            unconfirmedSet.add(deliveryTag);
+            synchronized (unconfirmed) {
+                unconfirmed.add(deliveryTag);
+            }
             nextPublishSeqNo++;
         } else {
             deliveryTag = 0;
@@ -715,18 +815,22 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         if (props == null) {
             props = MessageProperties.MINIMAL_BASIC;
         }
-        AMQP.Basic.Publish publish = new Basic.Publish.Builder()
-                .exchange(exchange)
-                .routingKey(routingKey)
-                .mandatory(mandatory)
-                .immediate(immediate)
-                .build();
         try {
-            ObservationCollector.PublishCall publishCall = properties -> {
-                AMQCommand command = new AMQCommand(publish, properties, body);
-                transmit(command);
-            };
-            observationCollector.publish(publishCall, publish, props, body, this.connectionInfo());
+            if (observationCollector == ObservationCollector.NO_OP && canTransmitEncoded()) {
+                transmitPublish(exchange, routingKey, mandatory, immediate, props, body);
+            } else {
+                AMQP.Basic.Publish publish = new Basic.Publish.Builder()
+                        .exchange(exchange)
+                        .routingKey(routingKey)
+                        .mandatory(mandatory)
+                        .immediate(immediate)
+                        .build();
+                ObservationCollector.PublishCall publishCall = properties -> {
+                    AMQCommand command = new AMQCommand(publish, properties, body);
+                    transmit(command);
+                };
+                observationCollector.publish(publishCall, publish, props, body, this.connectionInfo());
+            }
         } catch (IOException | AlreadyClosedException e) {
             metricsCollector.basicPublishFailure(this, e);
             throw e;
@@ -734,6 +838,84 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         metricsCollector.basicPublish(this, deliveryTag);
     }
 
+    /** Public API - {@inheritDoc} */
+    @Override
+    public long basicPublishBatch(List<OutboundMessage> messages) throws IOException {
+        return publishBatch(messages, null);
+    }
+
+    /** Public API - {@inheritDoc} */
+    @Override
+    public CompletableFuture<Boolean> basicPublishBatchAsync(List<OutboundMessage> messages) throws IOException {
+        CompletableFuture<Boolean> confirmed = new CompletableFuture<>();
+        publishBatch(messages, confirmed);
+        return confirmed;
+    }
+
+    /**
+     * Publishes the messages with a single flush and, if the future is not null,
+     * completes it when the broker has confirmed all the messages.
+     * @return the publish sequence number of the first message, 0 if confirms are not enabled
+     */
+    private long publishBatch(List<OutboundMessage> messages, CompletableFuture<Boolean> confirmed)
+        throws IOException
+    {
+        final long firstDeliveryTag;
+        _channelLock.lock();
+        try {
+            // the sequence numbers are assigned in the order the messages are written
+            // and the batch is tracked before the write, the confirms can come right after it
+            firstDeliveryTag = nextPublishSeqNo;
+            trackBatch(firstDeliveryTag, messages.size(), confirmed);
+            if (observationCollector != ObservationCollector.NO_OP || !canTransmitEncoded()) {
+                // observations and traffic listeners need the messages one by one
+                for (OutboundMessage message : messages) {
+                    basicPublish(message.getExchange(), message.getRoutingKey(), message.isMandatory(),
+                        message.getProperties(), message.getBody());
+                }
+                return firstDeliveryTag;
+            }
+            if (firstDeliveryTag > 0) {
+                synchronized (unconfirmed) {
+                    for (int i = 0; i < messages.size(); i++) {
+                        unconfirmed.add(firstDeliveryTag + i);
+                    }
+                }
+                nextPublishSeqNo += messages.size();
+            }
+            try {
+                transmitPublishBatch(messages);
+            } catch (IOException | AlreadyClosedException e) {
+                metricsCollector.basicPublishFailure(this, e);
+                throw e;
+            }
+        } catch (IOException | RuntimeException e) {
+            if (confirmed != null) {
+                confirmed.completeExceptionally(e);
+            }
+            throw e;
+        } finally {
+            _channelLock.unlock();
+        }
+        for (int i = 0; i < messages.size(); i++) {
+            metricsCollector.basicPublish(this, firstDeliveryTag == 0 ? 0 : firstDeliveryTag + i);
+        }
+        return firstDeliveryTag;
+    }
+
+    private void trackBatch(long firstDeliveryTag, int size, CompletableFuture<Boolean> confirmed) {
+        if (confirmed == null) {
+            return;
+        }
+        if (firstDeliveryTag == 0 || size == 0) {
+            confirmed.complete(true);
+            return;
+        }
+        synchronized (unconfirmed) {
+            pendingBatches.addLast(new PendingBatch(firstDeliveryTag, firstDeliveryTag + size - 1, confirmed));
+        }
+    }
+
     /** Public API - {@inheritDoc} */
     @Override
     public Exchange.DeclareOk exchangeDeclare(String exchange, String type,
@@ -1203,7 +1385,7 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     public void basicAck(long deliveryTag, boolean multiple)
         throws IOException
     {
-        transmit(new Basic.Ack(deliveryTag, multiple));
+        transmitAck(deliveryTag, multiple);
         metricsCollector.basicAck(this, deliveryTag, multiple);
     }
 
@@ -1212,7 +1394,7 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     public void basicNack(long deliveryTag, boolean multiple, boolean requeue)
         throws IOException
     {
-        transmit(new Basic.Nack(deliveryTag, multiple, requeue));
+        transmitNack(deliveryTag, multiple, requeue);
         metricsCollector.basicNack(this, deliveryTag);
     }
 
@@ -1221,10 +1403,172 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     public void basicReject(long deliveryTag, boolean requeue)
         throws IOException
     {
-        transmit(new Basic.Reject(deliveryTag, requeue));
+        transmitReject(deliveryTag, requeue);
         metricsCollector.basicReject(this, deliveryTag);
     }
 
+    /**
+     * Protected API - sends a basic.ack, or keeps it pending if ack coalescing is enabled.
+     * @see ConnectionFactory#setAckCoalescingMaxCount(int)
+     */
+    protected void transmitAck(long deliveryTag, boolean multiple)
+        throws IOException
+    {
+        if (ackCoalescer == null) {
+            sendAck(deliveryTag, multiple);
+            return;
+        }
+        _channelLock.lock();
+        try {
+            if (!isOpen()) {
+                throw new AlreadyClosedException(getCloseReason());
+            }
+            ackCoalescer.ack(deliveryTag, multiple, ackSender);
+            scheduleAckFlush();
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /**
+     * Protected API - sends a basic.nack, after the pending coalesced acks
+     * it would cover.
+     */
+    protected void transmitNack(long deliveryTag, boolean multiple, boolean requeue)
+        throws IOException
+    {
+        _channelLock.lock();
+        try {
+            if (ackCoalescer != null && multiple) {
+                ackCoalescer.flush(ackSender);
+            }
+            if (canTransmitEncoded()) {
+                Basic.Nack.encode(encodingBuffer(Basic.Nack.WIRE_SIZE), deliveryTag, multiple, requeue);
+                transmitEncodedMethod();
+            } else {
+                transmit(new Basic.Nack(deliveryTag, multiple, requeue));
+            }
+            if (ackCoalescer != null) {
+                ackCoalescer.settle(deliveryTag, multiple);
+            }
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /**
+     * Protected API - sends a basic.reject.
+     */
+    protected void transmitReject(long deliveryTag, boolean requeue)
+        throws IOException
+    {
+        _channelLock.lock();
+        try {
+            if (canTransmitEncoded()) {
+                Basic.Reject.encode(encodingBuffer(Basic.Reject.WIRE_SIZE), deliveryTag, requeue);
+                transmitEncodedMethod();
+            } else {
+                transmit(new Basic.Reject(deliveryTag, requeue));
+            }
+            if (ackCoalescer != null) {
+                ackCoalescer.settle(deliveryTag, false);
+            }
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    private void sendAck(long deliveryTag, boolean multiple)
+        throws IOException
+    {
+        if (canTransmitEncoded()) {
+            _channelLock.lock();
+            try {
+                Basic.Ack.encode(encodingBuffer(Basic.Ack.WIRE_SIZE), deliveryTag, multiple);
+                transmitEncodedMethod();
+            } finally {
+                _channelLock.unlock();
+            }
+        } else {
+            transmit(new Basic.Ack(deliveryTag, multiple));
+        }
+    }
+
+    /**
+     * Schedules the sending of the pending coalesced acks. Must be called with the channel lock held.
+     * The heartbeat executor or timer wheel only triggers the sending, which runs on the
+     * consumer work service: it takes the channel lock and writes to the socket, it must not
+     * delay the heartbeats of the connections sharing the executor.
+     */
+    private void scheduleAckFlush() {
+        if (ackFlushTask == null) {
+            long delay = ackCoalescer.nanosUntilDue(System.nanoTime());
+            if (delay >= 0) {
+                ackFlushTask = getConnection().schedule(this::dispatchAckFlush, delay);
+            }
+        }
+    }
+
+    private void dispatchAckFlush() {
+        try {
+            workService.execute(this::flushAcksIfDue);
+        } catch (RejectedExecutionException e) {
+            // the executor is shut down, the pending acks are sent with the next ack or method, if any
+            LOGGER.debug("Could not send coalesced acks on channel {}: {}", this, e.getMessage());
+            _channelLock.lock();
+            try {
+                ackFlushTask = null;
+            } finally {
+                _channelLock.unlock();
+            }
+        }
+    }
+
+    private void flushAcksIfDue() {
+        _channelLock.lock();
+        try {
+            ackFlushTask = null;
+            if (!isOpen()) {
+                return;
+            }
+            if (ackCoalescer.nanosUntilDue(System.nanoTime()) == 0) {
+                ackCoalescer.flush(ackSender);
+            }
+            scheduleAckFlush();
+        } catch (IOException | RuntimeException e) {
+            LOGGER.warn("Error while sending coalesced acks on channel {}", this, e);
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /** Sends the pending coalesced acks, if any, before a method they must precede. */
+    private void sendPendingAcks() throws IOException {
+        if (ackCoalescer == null) {
+            return;
+        }
+        _channelLock.lock();
+        try {
+            if (isOpen()) {
+                ackCoalescer.flush(ackSender);
+            }
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
+    /** Sends the pending coalesced acks, if any. Must be called with the channel lock held. */
+    private void flushAcks() {
+        if (ackCoalescer != null && isOpen()) {
+            try {
+                ackCoalescer.flush(ackSender);
+            } catch (IOException | RuntimeException e) {
+                // the channel is closing anyway
+                LOGGER.debug("Error while sending coalesced acks on channel {}", this, e);
+            }
+        }
+    }
+
     /** Public API - {@inheritDoc} */
     @Override
     public String basicConsume(String queue, Consumer callback)
@@ -1544,6 +1888,8 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     public Basic.RecoverOk basicRecover(boolean requeue)
         throws IOException
     {
+        // acked deliveries must not be redelivered
+        sendPendingAcks();
         return (Basic.RecoverOk) exnWrappingRpc(new Basic.Recover(requeue)).getMethod();
     }
 
@@ -1561,6 +1907,8 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     public Tx.CommitOk txCommit()
         throws IOException
     {
+        // the acks belong to the transaction
+        sendPendingAcks();
         return (Tx.CommitOk) exnWrappingRpc(new Tx.Commit()).getMethod();
     }
 
@@ -1569,6 +1917,7 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
     public Tx.RollbackOk txRollback()
         throws IOException
     {
+        sendPendingAcks();
         return (Tx.RollbackOk) exnWrappingRpc(new Tx.Rollback()).getMethod();
     }
 
@@ -1610,6 +1959,11 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         return exnWrappingAsyncRpc(method);
     }
 
+    @Override
+    public List<Command> batchRpc(List<? extends Method> methods) throws IOException {
+        return new ArrayList<>(exnWrappingPipelinedRpc(methods));
+    }
+
     @Override
     public void enqueueRpc(RpcContinuation k) {
         _channelLock.lock();
@@ -1621,26 +1975,73 @@ public class ChannelN extends AMQChannel implements com.rabbitmq.client.Channel
         }
     }
 
+    @Override
+    protected void enqueuePipelinedRpc(RpcWrapper rpc) {
+        _channelLock.lock();
+        try {
+            super.enqueuePipelinedRpc(rpc);
+            dispatcher.setUnlimited(true);
+        } finally {
+            _channelLock.unlock();
+        }
+    }
+
     @Override
     protected void markRpcFinished() {
         _channelLock.lock();
         try {
-            dispatcher.setUnlimited(false);
+            // still unlimited while a body is streamed
+            dispatcher.setUnlimited(this.streamingBody != null);
         } finally {
             _channelLock.unlock();
         }
     }
 
     private void handleAckNack(long seqNo, boolean multiple, boolean nack) {
-        if (multiple) {
-            unconfirmedSet.headSet(seqNo + 1).clear();
-        } else {
-            unconfirmedSet.remove(seqNo);
-        }
-        synchronized (unconfirmedSet) {
+        List<PendingBatch> completedBatches = null;
+        synchronized (unconfirmed) {
+            unconfirmed.confirm(seqNo, multiple);
             onlyAcksReceived = onlyAcksReceived && !nack;
-            if (unconfirmedSet.isEmpty())
-                unconfirmedSet.notifyAll();
+            if (confirmWaiters > 0 && unconfirmed.isEmpty())
+                unconfirmed.notifyAll();
+            Iterator<PendingBatch> iterator = pendingBatches.iterator();
+            while (iterator.hasNext()) {
+                PendingBatch batch = iterator.next();
+                if (batch.first > seqNo) {
+                    // the next batches are not concerned either
+                    break;
+                }
+                if (nack && (multiple || seqNo <= batch.last)) {
+                    batch.nacked = true;
+                }
+                if (unconfirmed.isConfirmed(batch.first, batch.last)) {
+                    iterator.remove();
+                    if (completedBatches == null) {
+                        completedBatches = new ArrayList<>();
+                    }
+                    completedBatches.add(batch);
+                }
+            }
+        }
+        if (completedBatches != null) {
+            for (PendingBatch batch : completedBatches) {
+                batch.confirmed.complete(!batch.nacked);
+            }
+        }
+    }
+
+    /** Messages published together, waiting for their confirms. */
+    private static final class PendingBatch {
+
+        private final long first;
+        private final long last;
+        private final CompletableFuture<Boolean> confirmed;
+        private boolean nacked = false;
+
+        private PendingBatch(long first, long last, CompletableFuture<Boolean> confirmed) {
+            this.first = first;
+            this.last = last;
+            this.confirmed = confirmed;
         }
     }
 
@@ -50,19 +50,47 @@ final class CommandAssembler {
     /** sum of the lengths of all fragments */
     private int bodyLength;
 
+    /** Stream the body fragments go to instead of bodyN once the body is streamed, may be null */
+    private ContentBodyStream bodyStream;
+
     /** No bytes of content body not yet accumulated */
     private long remainingBodyBytes;
 
     private final int maxBodyLength;
 
+    /** Whether the properties of the content header are decoded on first access */
+    private final boolean lazyProperties;
+
+    /** Cache for the decoded short strings, may be null */
+    private final ShortStringCache cache;
+
+    /** Per-method statistics to record the inbound frames into, may be null */
+    private final MethodWireStats wireStats;
+
+    /** Pool to assemble fragmented bodies in and give the fragments back to, may be null */
+    private final InboundBufferPool bufferPool;
+
+    /** Index of the method being assembled in the statistics */
+    private int methodIndex = -1;
+
     public CommandAssembler(Method method, AMQContentHeader contentHeader, byte[] body,
                             int maxBodyLength) {
+        this(method, contentHeader, body, maxBodyLength, false, null, null, null);
+    }
+
+    public CommandAssembler(Method method, AMQContentHeader contentHeader, byte[] body,
+                            int maxBodyLength, boolean lazyProperties, ShortStringCache cache,
+                            MethodWireStats wireStats, InboundBufferPool bufferPool) {
         this.method = method;
         this.contentHeader = contentHeader;
         this.bodyN = new ArrayList<>(2);
         this.bodyLength = 0;
         this.remainingBodyBytes = 0;
         this.maxBodyLength = maxBodyLength;
+        this.lazyProperties = lazyProperties;
+        this.cache = cache;
+        this.wireStats = wireStats;
+        this.bufferPool = bufferPool;
         appendBodyFragment(body);
         if (method == null) {
             this.state = CAState.EXPECTING_METHOD;
@@ -94,7 +122,14 @@ final class CommandAssembler {
 
     private void consumeMethodFrame(Frame f) throws IOException {
         if (f.getType() == AMQP.FRAME_METHOD) {
-            this.method = AMQImpl.readMethodFrom(f.getInputStream());
+            if (this.wireStats == null) {
+                this.method = AMQImpl.readMethodFrom(f.getPayloadBuffer(), this.cache);
+            } else {
+                long decodingStart = this.wireStats.startTime();
+                this.method = AMQImpl.readMethodFrom(f.getPayloadBuffer(), this.cache);
+                this.methodIndex = AMQImpl.methodIndex(this.method.protocolClassId(), this.method.protocolMethodId());
+                this.wireStats.recordInbound(this.methodIndex, f.size(), decodingStart);
+            }
             this.state = this.method.hasContent() ? CAState.EXPECTING_CONTENT_HEADER : CAState.COMPLETE;
         } else {
             throw new UnexpectedFrameError(f, AMQP.FRAME_METHOD);
@@ -103,7 +138,10 @@ final class CommandAssembler {
 
     private void consumeHeaderFrame(Frame f) throws IOException {
         if (f.getType() == AMQP.FRAME_HEADER) {
-            this.contentHeader = AMQImpl.readContentHeaderFrom(f.getInputStream());
+            this.contentHeader = AMQImpl.readContentHeaderFrom(f.getPayloadBuffer(), this.lazyProperties, this.cache);
+            if (this.wireStats != null) {
+                this.wireStats.recordInboundContent(this.methodIndex, f.size());
+            }
             long bodySize = this.contentHeader.getBodySize();
             if (bodySize >= this.maxBodyLength) {
                 throw new IllegalStateException(format(
@@ -123,12 +161,19 @@ final class CommandAssembler {
     private void consumeBodyFrame(Frame f) {
         if (f.getType() == AMQP.FRAME_BODY) {
             byte[] fragment = f.getPayload();
+            if (this.wireStats != null) {
+                this.wireStats.recordInboundContent(this.methodIndex, f.size());
+            }
             this.remainingBodyBytes -= fragment.length;
             updateContentBodyState();
             if (this.remainingBodyBytes < 0) {
                 throw new UnsupportedOperationException("%%%%%% FIXME unimplemented");
             }
-            appendBodyFragment(fragment);
+            if (this.bodyStream == null) {
+                appendBodyFragment(fragment);
+            } else {
+                this.bodyStream.append(fragment);
+            }
         } else {
             throw new UnexpectedFrameError(f, AMQP.FRAME_BODY);
         }
@@ -139,11 +184,24 @@ final class CommandAssembler {
         if (this.bodyLength == 0) return EMPTY_BYTE_ARRAY;
         if (this.bodyN.size() == 1) return this.bodyN.get(0);
 
-        byte[] body = new byte[bodyLength];
+        if (this.bufferPool == null) {
+            byte[] body = new byte[bodyLength];
+            int offset = 0;
+            for (byte[] fragment : this.bodyN) {
+                System.arraycopy(fragment, 0, body, offset, fragment.length);
+                offset += fragment.length;
+            }
+            this.bodyN.clear();
+            this.bodyN.add(body);
+            return body;
+        }
+        // inbound fragments belong to this command only, they can go back to the pool
+        byte[] body = this.bufferPool.acquire(bodyLength);
         int offset = 0;
         for (byte[] fragment : this.bodyN) {
             System.arraycopy(fragment, 0, body, offset, fragment.length);
             offset += fragment.length;
+            this.bufferPool.recycle(fragment);
         }
         this.bodyN.clear();
         this.bodyN.add(body);
@@ -154,6 +212,28 @@ final class CommandAssembler {
         return coalesceContentBody();
     }
 
+    /**
+     * Sends the body fragments received so far and the next ones to a stream,
+     * rather than assembling them. The content header must be received.
+     * @return the stream, null if the body is already streamed
+     */
+    public synchronized ContentBodyStream streamContentBody() {
+        if (this.bodyStream != null) {
+            return null;
+        }
+        this.bodyStream = new ContentBodyStream(this.contentHeader.getBodySize());
+        for (byte[] fragment : this.bodyN) {
+            this.bodyStream.append(fragment);
+        }
+        this.bodyN.clear();
+        this.bodyLength = 0;
+        return this.bodyStream;
+    }
+
+    public synchronized boolean isContentBodyStreamed() {
+        return this.bodyStream != null;
+    }
+
     private void appendBodyFragment(byte[] fragment) {
         if (fragment == null || fragment.length == 0) return;
         bodyN.add(fragment);
@@ -48,4 +48,8 @@ public class CompletableFutureRpcWrapper implements RpcWrapper {
     public void shutdown(ShutdownSignalException signal) {
         completableFuture.completeExceptionally(signal);
     }
+
+    boolean isFor(CompletableFuture<Command> future) {
+        return this.completableFuture == future;
+    }
 }
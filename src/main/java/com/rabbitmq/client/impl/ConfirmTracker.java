@@ -0,0 +1,164 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+/**
+ * Publish sequence numbers waiting for their confirm.
+ * <p>
+ * Sequence numbers are tracked in a ring of bits indexed by sequence
+ * number, which grows when needed: publishing and single confirms are O(1)
+ * without allocation, multiple confirms clear 64 sequence numbers at a time.
+ * <p>
+ * Not thread-safe, guarded by the instance monitor, which is also the
+ * monitor {@link com.rabbitmq.client.Channel#waitForConfirms()} waits on.
+ */
+final class ConfirmTracker {
+
+    /** Initial number of bits of the ring, must be a power of 2 and at least 64 */
+    static final int INITIAL_CAPACITY = 1024;
+
+    private long[] words = new long[INITIAL_CAPACITY >>> 6];
+    private long mask = INITIAL_CAPACITY - 1;
+    /** Every sequence number lower than the base is confirmed */
+    private long base = 1;
+    /** Every sequence number from this one is not published yet */
+    private long next = 1;
+    private int size = 0;
+
+    /** Tracks a published sequence number, sequence numbers are published in increasing order. */
+    void add(long seqNo) {
+        if (seqNo < base) {
+            return;
+        }
+        if (seqNo - base > mask) {
+            grow(seqNo - base + 1);
+        }
+        int position = (int) (seqNo & mask);
+        long bit = 1L << position;
+        if ((words[position >>> 6] & bit) == 0) {
+            words[position >>> 6] |= bit;
+            size++;
+        }
+        if (seqNo >= next) {
+            next = seqNo + 1;
+        }
+    }
+
+    /** Removes the sequence number, or all the sequence numbers up to it if {@code multiple}. */
+    void confirm(long seqNo, boolean multiple) {
+        if (seqNo < base) {
+            return;
+        }
+        if (multiple) {
+            long last = Math.min(seqNo, next - 1);
+            size -= clear(base, last);
+            base = last + 1;
+            advanceBase();
+        } else if (seqNo < next) {
+            int position = (int) (seqNo & mask);
+            long bit = 1L << position;
+            if ((words[position >>> 6] & bit) != 0) {
+                words[position >>> 6] &= ~bit;
+                size--;
+                if (seqNo == base) {
+                    advanceBase();
+                }
+            }
+        }
+    }
+
+    /** @return whether all the sequence numbers of the range are published and confirmed */
+    boolean isConfirmed(long first, long last) {
+        if (last >= next) {
+            return false;
+        }
+        for (long seqNo = Math.max(first, base); seqNo <= last; ) {
+            int position = (int) (seqNo & mask);
+            int count = (int) Math.min(64 - (position & 63), last - seqNo + 1);
+            if ((words[position >>> 6] & bits(position, count)) != 0) {
+                return false;
+            }
+            seqNo += count;
+        }
+        return true;
+    }
+
+    boolean isEmpty() {
+        return size == 0;
+    }
+
+    int size() {
+        return size;
+    }
+
+    /** @return the number of sequence numbers of the range that were not confirmed */
+    private int clear(long first, long last) {
+        int cleared = 0;
+        for (long seqNo = first; seqNo <= last; ) {
+            int position = (int) (seqNo & mask);
+            int count = (int) Math.min(64 - (position & 63), last - seqNo + 1);
+            long bits = bits(position, count);
+            cleared += Long.bitCount(words[position >>> 6] & bits);
+            words[position >>> 6] &= ~bits;
+            seqNo += count;
+        }
+        return cleared;
+    }
+
+    /** Moves the base to the lowest unconfirmed sequence number. */
+    private void advanceBase() {
+        if (size == 0) {
+            base = next;
+            return;
+        }
+        while (base < next) {
+            int position = (int) (base & mask);
+            long remaining = words[position >>> 6] >>> position;
+            if (remaining != 0) {
+                base += Long.numberOfTrailingZeros(remaining);
+                return;
+            }
+            base += 64 - (position & 63);
+        }
+        base = next;
+    }
+
+    private void grow(long span) {
+        long capacity = mask + 1;
+        while (capacity < span) {
+            capacity <<= 1;
+        }
+        if (capacity > Integer.MAX_VALUE) {
+            throw new IllegalStateException("Too many unconfirmed messages: " + span);
+        }
+        long[] grown = new long[(int) (capacity >>> 6)];
+        long grownMask = capacity - 1;
+        for (long seqNo = base; seqNo < next; seqNo++) {
+            int position = (int) (seqNo & mask);
+            if ((words[position >>> 6] & (1L << position)) != 0) {
+                int grownPosition = (int) (seqNo & grownMask);
+                grown[grownPosition >>> 6] |= 1L << grownPosition;
+            }
+        }
+        this.words = grown;
+        this.mask = grownMask;
+    }
+
+    /** @return the mask of {@code count} bits from the position in its word */
+    private static long bits(int position, int count) {
+        return (count == 64 ? -1L : (1L << count) - 1) << position;
+    }
+}
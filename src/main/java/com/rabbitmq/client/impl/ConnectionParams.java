@@ -30,6 +30,7 @@ import java.util.concurrent.ExecutorService;
 import java.util.concurrent.ScheduledExecutorService;
 import java.util.concurrent.ThreadFactory;
 import java.util.function.Predicate;
+import java.util.function.Supplier;
 
 public class ConnectionParams {
     private CredentialsProvider credentialsProvider;
@@ -65,6 +66,20 @@ public class ConnectionParams {
 
     private int maxInboundMessageBodySize;
 
+    private boolean lazyPropertiesDecoding;
+
+    private int shortStringCacheSize;
+
+    private int ackCoalescingMaxCount;
+
+    private int ackCoalescingMaxDelay;
+
+    private boolean ringBufferConsumerDispatch;
+
+    private InboundBufferPool inboundBufferPool;
+    private Supplier<TrafficRecorder> trafficRecorderFactory;
+    private HashedTimerWheel timerWheel;
+
     public ConnectionParams() {}
 
     public CredentialsProvider getCredentialsProvider() {
@@ -306,4 +321,68 @@ public class ConnectionParams {
     public void setMaxInboundMessageBodySize(int maxInboundMessageBodySize) {
         this.maxInboundMessageBodySize = maxInboundMessageBodySize;
     }
+
+    public boolean isLazyPropertiesDecoding() {
+        return lazyPropertiesDecoding;
+    }
+
+    public void setLazyPropertiesDecoding(boolean lazyPropertiesDecoding) {
+        this.lazyPropertiesDecoding = lazyPropertiesDecoding;
+    }
+
+    public int getShortStringCacheSize() {
+        return shortStringCacheSize;
+    }
+
+    public void setShortStringCacheSize(int shortStringCacheSize) {
+        this.shortStringCacheSize = shortStringCacheSize;
+    }
+
+    public int getAckCoalescingMaxCount() {
+        return ackCoalescingMaxCount;
+    }
+
+    public void setAckCoalescingMaxCount(int ackCoalescingMaxCount) {
+        this.ackCoalescingMaxCount = ackCoalescingMaxCount;
+    }
+
+    public int getAckCoalescingMaxDelay() {
+        return ackCoalescingMaxDelay;
+    }
+
+    public void setAckCoalescingMaxDelay(int ackCoalescingMaxDelay) {
+        this.ackCoalescingMaxDelay = ackCoalescingMaxDelay;
+    }
+
+    public boolean isRingBufferConsumerDispatch() {
+        return ringBufferConsumerDispatch;
+    }
+
+    public void setRingBufferConsumerDispatch(boolean ringBufferConsumerDispatch) {
+        this.ringBufferConsumerDispatch = ringBufferConsumerDispatch;
+    }
+
+    public InboundBufferPool getInboundBufferPool() {
+        return inboundBufferPool;
+    }
+
+    public void setInboundBufferPool(InboundBufferPool inboundBufferPool) {
+        this.inboundBufferPool = inboundBufferPool;
+    }
+
+    public Supplier<TrafficRecorder> getTrafficRecorderFactory() {
+        return trafficRecorderFactory;
+    }
+
+    public void setTrafficRecorderFactory(Supplier<TrafficRecorder> trafficRecorderFactory) {
+        this.trafficRecorderFactory = trafficRecorderFactory;
+    }
+
+    public HashedTimerWheel getTimerWheel() {
+        return timerWheel;
+    }
+
+    public void setTimerWheel(HashedTimerWheel timerWheel) {
+        this.timerWheel = timerWheel;
+    }
 }
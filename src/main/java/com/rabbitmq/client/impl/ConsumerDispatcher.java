@@ -20,6 +20,7 @@ import com.rabbitmq.client.Channel;
 import com.rabbitmq.client.Consumer;
 import com.rabbitmq.client.Envelope;
 import com.rabbitmq.client.ShutdownSignalException;
+import com.rabbitmq.client.StreamingConsumer;
 import com.rabbitmq.utility.Utility;
 
 import java.io.IOException;
@@ -41,6 +42,9 @@ final class ConsumerDispatcher {
 
     private final Channel channel;
 
+    /** Pool the bodies of deliveries go back to, may be null */
+    private final InboundBufferPool bufferPool;
+
     private volatile boolean shuttingDown = false;
     private volatile boolean shutdownConsumersDriven = false;
     private volatile CountDownLatch shutdownConsumersComplete;
@@ -52,6 +56,7 @@ final class ConsumerDispatcher {
                               ConsumerWorkService workService) {
         this.connection = connection;
         this.channel = channel;
+        this.bufferPool = connection.getInboundBufferPool();
         workService.registerKey(channel);
         this.workService = workService;
     }
@@ -145,6 +150,11 @@ final class ConsumerDispatcher {
         new Runnable() {
             @Override
             public void run() {
+                InboundBufferPool.Lease lease = null;
+                if (bufferPool != null) {
+                    lease = bufferPool.lend(body);
+                    InboundBufferPool.delivering(lease);
+                }
                 try {
                     delegate.handleDelivery(consumerTag,
                             envelope,
@@ -157,6 +167,39 @@ final class ConsumerDispatcher {
                             delegate,
                             consumerTag,
                             "handleDelivery");
+                } finally {
+                    if (bufferPool != null) {
+                        InboundBufferPool.delivering(null);
+                        if (lease != null) {
+                            lease.release();
+                        }
+                    }
+                }
+            }
+        });
+    }
+
+    public void handleStreamingDelivery(final StreamingConsumer delegate,
+                                        final String consumerTag,
+                                        final Envelope envelope,
+                                        final AMQP.BasicProperties properties,
+                                        final ContentBodyStream body) throws IOException {
+        executeUnlessShuttingDown(
+        new Runnable() {
+            @Override
+            public void run() {
+                try {
+                    delegate.handleStreamingDelivery(consumerTag,
+                            envelope,
+                            properties,
+                            body);
+                } catch (Throwable ex) {
+                    connection.getExceptionHandler().handleConsumerException(
+                            channel,
+                            ex,
+                            delegate,
+                            consumerTag,
+                            "handleDelivery");
                 }
             }
         });
@@ -32,9 +32,21 @@ final public class ConsumerWorkService {
     private final ExecutorService executor;
     private final boolean privateExecutor;
     private final WorkPool<Channel, Runnable> workPool;
+    /** Dispatcher used instead of the work pool, null if the work pool is used */
+    private final RingBufferDispatcher ringBufferDispatcher;
     private final int shutdownTimeout;
 
     public ConsumerWorkService(ExecutorService executor, ThreadFactory threadFactory, int queueingTimeout, int shutdownTimeout) {
+        this(executor, threadFactory, queueingTimeout, shutdownTimeout, false);
+    }
+
+    /**
+     * @param ringBufferDispatch whether to dispatch with per-channel ring buffers instead of a {@link WorkPool}
+     * @see RingBufferDispatcher
+     * @since 6.0.0
+     */
+    public ConsumerWorkService(ExecutorService executor, ThreadFactory threadFactory, int queueingTimeout,
+                               int shutdownTimeout, boolean ringBufferDispatch) {
         this.privateExecutor = (executor == null);
         if (executor == null) {
             LOGGER.debug("Creating executor service with {} thread(s) for consumer work service", DEFAULT_NUM_THREADS);
@@ -42,7 +54,13 @@ final public class ConsumerWorkService {
         } else {
             this.executor = executor;
         }
-        this.workPool = new WorkPool<>(queueingTimeout);
+        if (ringBufferDispatch) {
+            this.workPool = null;
+            this.ringBufferDispatcher = new RingBufferDispatcher(this.executor, queueingTimeout, MAX_RUNNABLE_BLOCK_SIZE);
+        } else {
+            this.workPool = new WorkPool<>(queueingTimeout);
+            this.ringBufferDispatcher = null;
+        }
         this.shutdownTimeout = shutdownTimeout;
     }
 
@@ -58,7 +76,11 @@ final public class ConsumerWorkService {
      * Stop executing all consumer work
      */
     public void shutdown() {
-        this.workPool.unregisterAllKeys();
+        if (ringBufferDispatcher != null) {
+            this.ringBufferDispatcher.unregisterAllKeys();
+        } else {
+            this.workPool.unregisterAllKeys();
+        }
         if (privateExecutor)
             this.executor.shutdown();
     }
@@ -68,15 +90,25 @@ final public class ConsumerWorkService {
      * @param channel to stop consumer work for
      */
     public void stopWork(Channel channel) {
-        this.workPool.unregisterKey(channel);
+        if (ringBufferDispatcher != null) {
+            this.ringBufferDispatcher.unregisterKey(channel);
+        } else {
+            this.workPool.unregisterKey(channel);
+        }
     }
 
     public void registerKey(Channel channel) {
-        this.workPool.registerKey(channel);
+        if (ringBufferDispatcher != null) {
+            this.ringBufferDispatcher.registerKey(channel);
+        } else {
+            this.workPool.registerKey(channel);
+        }
     }
 
     public void setUnlimited(Channel channel, boolean unlimited) {
-        if (unlimited) {
+        if (ringBufferDispatcher != null) {
+            this.ringBufferDispatcher.setUnlimited(channel, unlimited);
+        } else if (unlimited) {
             this.workPool.unlimit(channel);
         } else {
             this.workPool.limit(channel);
@@ -84,11 +116,25 @@ final public class ConsumerWorkService {
     }
 
     public void addWork(Channel channel, Runnable runnable) {
-        if (this.workPool.addWorkItem(channel, runnable)) {
+        if (ringBufferDispatcher != null) {
+            this.ringBufferDispatcher.addWork(channel, runnable);
+        } else if (this.workPool.addWorkItem(channel, runnable)) {
             this.executor.execute(new WorkPoolRunnable());
         }
     }
 
+    /**
+     * Runs a task on the executor of this work service, outside of the
+     * per-channel work queues, e.g. to send the coalesced acks of a channel.
+     * Unlike {@link #addWork(Channel, Runnable)}, this never blocks.
+     * @param task the task to run
+     * @throws java.util.concurrent.RejectedExecutionException if the executor does not accept the task
+     * @since 6.0.0
+     */
+    public void execute(Runnable task) {
+        this.executor.execute(task);
+    }
+
     /**
      * @return true if executor used by this work service is managed
      *              by it and wasn't provided by the user
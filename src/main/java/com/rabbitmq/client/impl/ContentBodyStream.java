@@ -0,0 +1,170 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.ShutdownSignalException;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InterruptedIOException;
+import java.nio.ByteBuffer;
+import java.util.ArrayDeque;
+
+/**
+ * Body of an inbound message, readable while its frames arrive.
+ * <p>
+ * The body is not copied into a single array: the stream reads the
+ * payloads of the body frames in turn, waiting for the next frame if
+ * needed, and {@link #readFragments()} exposes them as read-only buffers.
+ * Reading fails with an {@link IOException} if the channel closes before
+ * the whole body arrives.
+ *
+ * @see com.rabbitmq.client.StreamingConsumer
+ * @since 6.0.0
+ */
+public final class ContentBodyStream extends InputStream {
+
+    private final long bodySize;
+    /** Fragments not read yet, guarded by this */
+    private final ArrayDeque<byte[]> fragments = new ArrayDeque<>();
+    /** Bytes received so far, guarded by this */
+    private long received = 0;
+    /** Why the body will not be complete, guarded by this */
+    private ShutdownSignalException failure;
+    /** Fragment being read and position in it, reader only */
+    private byte[] current;
+    private int position;
+
+    ContentBodyStream(long bodySize) {
+        this.bodySize = bodySize;
+    }
+
+    /** @return the size of the whole body, from the content header */
+    public long getBodySize() {
+        return bodySize;
+    }
+
+    @Override
+    public int read() throws IOException {
+        if (!nextFragment()) {
+            return -1;
+        }
+        return current[position++] & 0xFF;
+    }
+
+    @Override
+    public int read(byte[] b, int off, int len) throws IOException {
+        if (len == 0) {
+            return 0;
+        }
+        if (!nextFragment()) {
+            return -1;
+        }
+        int count = Math.min(len, current.length - position);
+        System.arraycopy(current, position, b, off, count);
+        position += count;
+        return count;
+    }
+
+    @Override
+    public synchronized int available() {
+        long available = current == null ? 0 : current.length - position;
+        for (byte[] fragment : fragments) {
+            available += fragment.length;
+        }
+        return (int) Math.min(available, Integer.MAX_VALUE);
+    }
+
+    /**
+     * Waits for the whole body and returns the part of it not read yet, which
+     * is then considered read.
+     *
+     * @return read-only buffers over the payloads of the body frames, in order
+     * @throws IOException if the channel closes before the whole body arrives
+     */
+    public ByteBuffer[] readFragments() throws IOException {
+        synchronized (this) {
+            awaitReceived(bodySize);
+        }
+        int count = (current != null && position < current.length ? 1 : 0);
+        ByteBuffer[] buffers;
+        synchronized (this) {
+            buffers = new ByteBuffer[count + fragments.size()];
+            int i = 0;
+            if (count == 1) {
+                buffers[i++] = ByteBuffer.wrap(current, position, current.length - position).asReadOnlyBuffer();
+            }
+            byte[] fragment;
+            while ((fragment = fragments.pollFirst()) != null) {
+                buffers[i++] = ByteBuffer.wrap(fragment).asReadOnlyBuffer();
+            }
+        }
+        current = null;
+        return buffers;
+    }
+
+    /** Adds the payload of a body frame, called by the connection thread. */
+    synchronized void append(byte[] fragment) {
+        if (fragment.length > 0) {
+            fragments.addLast(fragment);
+            received += fragment.length;
+            notifyAll();
+        }
+    }
+
+    /** Fails the pending and next reads if the body is not complete. */
+    synchronized void fail(ShutdownSignalException cause) {
+        if (received < bodySize) {
+            failure = cause;
+            notifyAll();
+        }
+    }
+
+    /** @return whether there is a fragment with bytes to read, false at the end of the body */
+    private boolean nextFragment() throws IOException {
+        if (current != null && position < current.length) {
+            return true;
+        }
+        synchronized (this) {
+            while (fragments.isEmpty()) {
+                if (received >= bodySize) {
+                    current = null;
+                    return false;
+                }
+                awaitReceived(received + 1);
+            }
+            current = fragments.pollFirst();
+            position = 0;
+            return true;
+        }
+    }
+
+    /** Waits until at least this many bytes are received, must hold the monitor. */
+    private void awaitReceived(long size) throws IOException {
+        while (received < size) {
+            if (failure != null) {
+                throw new IOException("Channel closed before the whole message body was received", failure);
+            }
+            try {
+                wait();
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                throw new InterruptedIOException("Interrupted while waiting for the message body");
+            }
+        }
+    }
+}
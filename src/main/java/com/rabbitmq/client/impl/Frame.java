@@ -16,13 +16,12 @@
 package com.rabbitmq.client.impl;
 
 import com.rabbitmq.client.AMQP;
-import com.rabbitmq.client.LongString;
 import com.rabbitmq.client.MalformedFrameException;
 
 import java.io.*;
-import java.math.BigDecimal;
 import java.net.SocketTimeoutException;
-import java.util.Date;
+import java.nio.ByteBuffer;
+import java.util.Arrays;
 import java.util.List;
 import java.util.Map;
 import static java.lang.String.format;
@@ -70,10 +69,8 @@ public class Frame {
     public static Frame fromBodyFragment(int channelNumber, byte[] body, int offset, int length)
         throws IOException
     {
-        Frame frame = new Frame(AMQP.FRAME_BODY, channelNumber);
-        DataOutputStream bodyOut = frame.getOutputStream();
-        bodyOut.write(body, offset, length);
-        return frame;
+        // an exact payload array, writers can then reference it without copying it again
+        return new Frame(AMQP.FRAME_BODY, channelNumber, Arrays.copyOfRange(body, offset, offset + length));
     }
 
     /**
@@ -83,6 +80,18 @@ public class Frame {
      * @return a new Frame if we read a frame successfully, otherwise null
      */
     public static Frame readFrom(DataInputStream is, int maxPayloadSize) throws IOException {
+        return readFrom(is, maxPayloadSize, null);
+    }
+
+    /**
+     * Protected API - Factory method to instantiate a Frame by reading an
+     * AMQP-wire-protocol frame from the given input stream, the payload
+     * of body frames is taken from the pool.
+     *
+     * @param bufferPool pool of inbound bodies, may be null
+     * @return a new Frame if we read a frame successfully, otherwise null
+     */
+    static Frame readFrom(DataInputStream is, int maxPayloadSize, InboundBufferPool bufferPool) throws IOException {
         int type;
         int channel;
 
@@ -116,7 +125,9 @@ public class Frame {
                 payloadSize, maxPayloadSize
             ));
         }
-        byte[] payload = new byte[payloadSize];
+        // method and header payloads are not pooled, lazy properties keep theirs
+        byte[] payload = bufferPool != null && type == AMQP.FRAME_BODY ?
+            bufferPool.acquire(payloadSize) : new byte[payloadSize];
         is.readFully(payload);
 
         int frameEndMarker = is.readUnsignedByte();
@@ -201,6 +212,32 @@ public class Frame {
         os.write(AMQP.FRAME_END);
     }
 
+    /**
+     * Private API - records this frame, without copying the payload of an
+     * outbound frame first.
+     */
+    void recordPayload(TrafficRecorder recorder, boolean inbound) {
+        if (accumulator == null) {
+            recorder.append(inbound, type, channel, payload, 0, payload.length);
+            return;
+        }
+        try {
+            accumulator.writeTo(new OutputStream() {
+                @Override
+                public void write(int b) {
+                    throw new UnsupportedOperationException();
+                }
+
+                @Override
+                public void write(byte[] b, int off, int len) {
+                    recorder.append(inbound, type, channel, b, off, len);
+                }
+            });
+        } catch (IOException e) {
+            // not thrown by the stream
+        }
+    }
+
     public int size() {
         if(accumulator != null) {
             return accumulator.size() + NON_BODY_SIZE;
@@ -209,6 +246,16 @@ public class Frame {
         }
     }
 
+    /**
+     * Private API - whether the payload is held in an array, which
+     * {@link #getPayload()} then returns without copying it.
+     * Frames constructed with an accumulator should be written with
+     * {@link #writeTo(DataOutputStream)} instead.
+     */
+    public boolean hasPayloadArray() {
+        return payload != null;
+    }
+
     /**
      * Public API - retrieves the frame payload
      */
@@ -228,6 +275,14 @@ public class Frame {
         return new DataInputStream(new ByteArrayInputStream(getPayload()));
     }
 
+    /**
+     * Public API - retrieves a ByteBuffer wrapping the payload,
+     * suitable for {@link AMQImpl#readMethodFrom(ByteBuffer)}
+     */
+    public ByteBuffer getPayloadBuffer() {
+        return ByteBuffer.wrap(getPayload());
+    }
+
     /**
      * Public API - retrieves a fresh DataOutputStream streaming into the accumulator
      */
@@ -251,72 +306,8 @@ public class Frame {
     public static long tableSize(Map<String, Object> table)
         throws UnsupportedEncodingException
     {
-        long acc = 0;
-        for(Map.Entry<String, Object> entry: table.entrySet()) {
-            acc += shortStrSize(entry.getKey());
-            acc += fieldValueSize(entry.getValue());
-        }
-        return acc;
-    }
-
-    /** Computes the AMQP wire-protocol length of a protocol-encoded field-value. */
-    private static long fieldValueSize(Object value)
-        throws UnsupportedEncodingException
-    {
-        long acc = 1; // for the type tag
-        if(value instanceof String) {
-            acc += longStrSize((String)value);
-        }
-        else if(value instanceof LongString) {
-            acc += 4 + ((LongString)value).length();
-        }
-        else if(value instanceof Integer) {
-            acc += 4;
-        }
-        else if(value instanceof BigDecimal) {
-            acc += 5;
-        }
-        else if(value instanceof Date) {
-            acc += 8;
-        }
-        else if(value instanceof Map) {
-            @SuppressWarnings("unchecked")
-            Map<String,Object> map = (Map<String,Object>) value;
-            acc += 4 + tableSize(map);
-        }
-        else if (value instanceof Byte) {
-            acc += 1;
-        }
-        else if(value instanceof Double) {
-            acc += 8;
-        }
-        else if(value instanceof Float) {
-            acc += 4;
-        }
-        else if(value instanceof Long) {
-            acc += 8;
-        }
-        else if(value instanceof Short) {
-            acc += 2;
-        }
-        else if(value instanceof Boolean) {
-            acc += 1;
-        }
-        else if(value instanceof byte[]) {
-            acc += 4 + ((byte[])value).length;
-        }
-        else if(value instanceof List) {
-            acc += 4 + arraySize((List<?>)value);
-        }
-        else if(value instanceof Object[]) {
-            acc += 4 + arraySize((Object[])value);
-        }
-        else if(value == null) {
-        }
-        else {
-            throw new IllegalArgumentException("invalid value in table");
-        }
-        return acc;
+        // without the length prefix
+        return ByteBufferValueWriter.tableSize(table) - 4;
     }
 
     /** Computes the AMQP 0-9-1 wire-protocol length of an encoded field-array of type List */
@@ -325,7 +316,7 @@ public class Frame {
     {
         long acc = 0;
         for (Object value : values) {
-            acc += fieldValueSize(value);
+            acc += ByteBufferValueWriter.fieldValueSize(value);
         }
         return acc;
     }
@@ -334,25 +325,11 @@ public class Frame {
     public static long arraySize(Object[] values) throws UnsupportedEncodingException {
         long acc = 0;
         for (Object value : values) {
-            acc += fieldValueSize(value);
+            acc += ByteBufferValueWriter.fieldValueSize(value);
         }
         return acc;
     }
 
-    /** Computes the AMQP wire-protocol length of a protocol-encoded long string. */
-    private static int longStrSize(String str)
-        throws UnsupportedEncodingException
-    {
-        return str.getBytes("utf-8").length + 4;
-    }
-
-    /** Computes the AMQP wire-protocol length of a protocol-encoded short string. */
-    private static int shortStrSize(String str)
-        throws UnsupportedEncodingException
-    {
-        return str.getBytes("utf-8").length + 1;
-    }
-
     public int getType() {
         return type;
     }
@@ -18,6 +18,8 @@ package com.rabbitmq.client.impl;
 import java.io.IOException;
 import java.net.SocketException;
 import java.net.SocketTimeoutException;
+import java.nio.ByteBuffer;
+import java.util.Arrays;
 
 /**
  * Interface to a frame handler.
@@ -65,6 +67,48 @@ public interface FrameHandler extends NetworkConnection {
      */
     void writeFrame(Frame frame) throws IOException;
 
+    /**
+     * Write a frame to the underlying data connection, its payload
+     * being a range of a byte array. The caller can reuse the array
+     * once the method returns.
+     * <p>
+     * The default implementation copies the payload into a {@link Frame}.
+     *
+     * @param type the frame type
+     * @param channel the channel number
+     * @param payload the array holding the payload
+     * @param offset the offset of the payload in the array
+     * @param length the length of the payload
+     * @throws IOException if there is a problem accessing the connection
+     */
+    default void writeFrame(int type, int channel, byte[] payload, int offset, int length) throws IOException {
+        writeFrame(new Frame(type, channel, Arrays.copyOfRange(payload, offset, offset + length)));
+    }
+
+    /**
+     * Write complete frames, already encoded in a range of a byte array,
+     * end markers included, to the underlying data connection in one go.
+     * The caller can reuse the array once the method returns.
+     * <p>
+     * The default implementation writes the frames one by one with
+     * {@link #writeFrame(int, int, byte[], int, int)}.
+     *
+     * @param frames the array holding the encoded frames
+     * @param offset the offset of the first frame in the array
+     * @param length the length of the frames
+     * @throws IOException if there is a problem accessing the connection
+     */
+    default void writeFrames(byte[] frames, int offset, int length) throws IOException {
+        ByteBuffer buffer = ByteBuffer.wrap(frames, offset, length);
+        while (buffer.hasRemaining()) {
+            int type = buffer.get() & 0xFF;
+            int channel = buffer.getShort() & 0xFFFF;
+            int payloadSize = buffer.getInt();
+            writeFrame(type, channel, frames, buffer.position(), payloadSize);
+            buffer.position(buffer.position() + payloadSize + 1);
+        }
+    }
+
     /**
      * Flush the underlying data connection.
      * @throws IOException if there is a problem accessing the connection
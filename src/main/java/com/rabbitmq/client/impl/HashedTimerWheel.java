@@ -0,0 +1,511 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Queue;
+import java.util.concurrent.CancellationException;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.Executor;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
+import java.util.concurrent.atomic.AtomicIntegerFieldUpdater;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Hashed timing wheel to share between many connections.
+ * <p>
+ * A {@link java.util.concurrent.ScheduledThreadPoolExecutor} keeps its tasks
+ * in a binary heap: scheduling and cancelling are O(log n) under a single lock,
+ * which adds up with thousands of connections that each re-arm heartbeat and
+ * ack flush timers. The wheel trades precision for cost: time is cut in ticks
+ * of a fixed duration, a task goes in the bucket of the tick it is due in, and
+ * scheduling and cancelling are O(1). A task runs at most one tick late, which
+ * is fine for timers measured in seconds or hundreds of milliseconds.
+ * <p>
+ * A single thread advances the wheel and only triggers the due tasks: they run
+ * on a task executor, so a task blocking on I/O, e.g. a heartbeat written to a
+ * slow socket, does not delay the other timers. A periodic task does not run
+ * again while its previous run is in progress, the runs due meanwhile are
+ * skipped. Scheduling and cancelling never take a lock: the wheel thread picks
+ * up new and cancelled tasks on its next tick.
+ * <p>
+ * It's developer's responsibility to {@link #close()} the wheel when it is no
+ * longer needed.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#setTimerWheel(HashedTimerWheel)
+ * @since 6.0.0
+ */
+public final class HashedTimerWheel implements AutoCloseable {
+
+    private static final Logger LOGGER = LoggerFactory.getLogger(HashedTimerWheel.class);
+
+    /** Default duration of a tick, in milliseconds */
+    public static final long DEFAULT_TICK_DURATION_MS = 100;
+    /** Default number of buckets of the wheel */
+    public static final int DEFAULT_WHEEL_SIZE = 512;
+
+    private final long tickNanos;
+    private final Bucket[] wheel;
+    private final int mask;
+    private final long startTime;
+
+    private final Queue<Timeout> scheduled = new ConcurrentLinkedQueue<>();
+    private final Queue<Timeout> cancelled = new ConcurrentLinkedQueue<>();
+    private final AtomicLong pending = new AtomicLong();
+
+    private final Thread worker;
+    private final Executor taskExecutor;
+    /** Executor created by the wheel, shut down when the wheel is closed, null otherwise */
+    private final ExecutorService privateTaskExecutor;
+    private volatile boolean closed = false;
+
+    /**
+     * Creates a wheel with the default tick duration and size.
+     */
+    public HashedTimerWheel() {
+        this(Executors.defaultThreadFactory(), DEFAULT_TICK_DURATION_MS, TimeUnit.MILLISECONDS, DEFAULT_WHEEL_SIZE);
+    }
+
+    /**
+     * Creates a wheel.
+     *
+     * @param threadFactory factory of the thread of the wheel
+     * @param tickDuration  duration of a tick, the precision of the wheel
+     * @param unit          unit of the tick duration
+     * @param wheelSize     number of buckets, rounded up to a power of 2;
+     *                      a task due after more than a full turn stays in its
+     *                      bucket for several turns
+     */
+    public HashedTimerWheel(ThreadFactory threadFactory, long tickDuration, TimeUnit unit, int wheelSize) {
+        this(threadFactory, tickDuration, unit, wheelSize, null);
+    }
+
+    /**
+     * Creates a wheel.
+     *
+     * @param threadFactory factory of the thread of the wheel and, if no task
+     *                      executor is given, of the threads running the tasks
+     * @param tickDuration  duration of a tick, the precision of the wheel
+     * @param unit          unit of the tick duration
+     * @param wheelSize     number of buckets, rounded up to a power of 2;
+     *                      a task due after more than a full turn stays in its
+     *                      bucket for several turns
+     * @param taskExecutor  runs the due tasks, not shut down by the wheel; if null,
+     *                      the wheel runs them with a cached thread pool of its own
+     */
+    public HashedTimerWheel(ThreadFactory threadFactory, long tickDuration, TimeUnit unit, int wheelSize,
+                            Executor taskExecutor) {
+        if (tickDuration <= 0) {
+            throw new IllegalArgumentException("Tick duration must be greater than 0: " + tickDuration);
+        }
+        if (wheelSize <= 0 || wheelSize > (1 << 30)) {
+            throw new IllegalArgumentException("Wheel size must be between 1 and 2^30: " + wheelSize);
+        }
+        this.tickNanos = unit.toNanos(tickDuration);
+        int size = Integer.highestOneBit(wheelSize);
+        if (size < wheelSize) {
+            size <<= 1;
+        }
+        this.wheel = new Bucket[size];
+        for (int i = 0; i < size; i++) {
+            this.wheel[i] = new Bucket();
+        }
+        this.mask = size - 1;
+        if (taskExecutor == null) {
+            this.privateTaskExecutor = Executors.newCachedThreadPool(r -> {
+                Thread thread = threadFactory.newThread(r);
+                thread.setDaemon(true);
+                return thread;
+            });
+            this.taskExecutor = this.privateTaskExecutor;
+        } else {
+            this.privateTaskExecutor = null;
+            this.taskExecutor = taskExecutor;
+        }
+        this.startTime = System.nanoTime();
+        this.worker = threadFactory.newThread(new Worker());
+        this.worker.setDaemon(true);
+        this.worker.start();
+    }
+
+    /**
+     * Schedules a one-shot task.
+     *
+     * @param task  the task, run by the task executor
+     * @param delay the delay before running the task
+     * @param unit  the unit of the delay
+     * @return the future of the task, to cancel it
+     * @throws RejectedExecutionException if the wheel is closed
+     */
+    public Future<Void> schedule(Runnable task, long delay, TimeUnit unit) {
+        return add(new Timeout(task, deadline(unit.toNanos(delay)), 0));
+    }
+
+    /**
+     * Schedules a periodic task, until it is cancelled or it throws an exception.
+     *
+     * @param task         the task, run by the task executor
+     * @param initialDelay the delay before the first run
+     * @param period       the period between runs
+     * @param unit         the unit of the delay and of the period
+     * @return the future of the task, to cancel it
+     * @throws RejectedExecutionException if the wheel is closed
+     */
+    public Future<Void> scheduleAtFixedRate(Runnable task, long initialDelay, long period, TimeUnit unit) {
+        if (period <= 0) {
+            throw new IllegalArgumentException("Period must be greater than 0: " + period);
+        }
+        return add(new Timeout(task, deadline(unit.toNanos(initialDelay)), unit.toNanos(period)));
+    }
+
+    /**
+     * @return the number of tasks scheduled and not cancelled yet
+     */
+    public long pendingTimeouts() {
+        return this.pending.get();
+    }
+
+    /**
+     * Stops the thread of the wheel. The pending tasks never run, the tasks
+     * already running are not interrupted.
+     */
+    @Override
+    public void close() {
+        if (this.closed) {
+            return;
+        }
+        this.closed = true;
+        if (this.privateTaskExecutor != null) {
+            this.privateTaskExecutor.shutdown();
+        }
+        this.worker.interrupt();
+        if (Thread.currentThread() != this.worker) {
+            try {
+                this.worker.join(TimeUnit.NANOSECONDS.toMillis(this.tickNanos) + 1000);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        }
+    }
+
+    private Timeout add(Timeout timeout) {
+        if (this.closed) {
+            throw new RejectedExecutionException("Timer wheel is closed");
+        }
+        this.pending.incrementAndGet();
+        this.scheduled.add(timeout);
+        return timeout;
+    }
+
+    private long deadline(long delayNanos) {
+        long deadline = System.nanoTime() - this.startTime + Math.max(delayNanos, 0);
+        // guard against overflow
+        return deadline < 0 ? Long.MAX_VALUE : deadline;
+    }
+
+    private final class Worker implements Runnable {
+
+        private long tick = 0;
+        private final List<Timeout> periodic = new ArrayList<>();
+
+        @Override
+        public void run() {
+            while (!closed) {
+                long now = waitForNextTick();
+                if (now < 0) {
+                    break;
+                }
+                removeCancelled();
+                transferScheduled();
+                wheel[(int) (tick & mask)].expire(now, periodic);
+                for (Timeout timeout : periodic) {
+                    timeout.deadline += timeout.period;
+                    // the bucket of the current tick is done
+                    place(timeout, tick + 1);
+                }
+                periodic.clear();
+                tick++;
+            }
+        }
+
+        /** Sleeps until the end of the current tick, returns the time since the start of the wheel or -1 if closed */
+        private long waitForNextTick() {
+            long tickEnd = tickNanos * (tick + 1);
+            while (true) {
+                long now = System.nanoTime() - startTime;
+                long sleepMs = (tickEnd - now + 999_999) / 1_000_000;
+                if (sleepMs <= 0) {
+                    return now;
+                }
+                try {
+                    Thread.sleep(sleepMs);
+                } catch (InterruptedException e) {
+                    if (closed) {
+                        return -1;
+                    }
+                }
+            }
+        }
+
+        private void removeCancelled() {
+            Timeout timeout;
+            while ((timeout = cancelled.poll()) != null) {
+                if (timeout.bucket != null) {
+                    timeout.bucket.remove(timeout);
+                }
+            }
+        }
+
+        private void transferScheduled() {
+            // not bounded: tasks cancelled before their transfer, e.g. re-armed
+            // timeouts, are only dropped here and must not pile up
+            Timeout timeout;
+            while ((timeout = scheduled.poll()) != null) {
+                if (timeout.state == Timeout.PENDING) {
+                    place(timeout, tick);
+                }
+            }
+        }
+
+        /** Puts a task in its bucket, the bucket of fromTick being the next to expire */
+        private void place(Timeout timeout, long fromTick) {
+            long dueTick = timeout.deadline / tickNanos;
+            timeout.remainingRounds = (dueTick - fromTick) / wheel.length;
+            // a task already due goes in the next bucket to expire
+            long bucketTick = Math.max(dueTick, fromTick);
+            wheel[(int) (bucketTick & mask)].add(timeout);
+        }
+    }
+
+    /** Doubly-linked list of the tasks of a bucket, only accessed by the thread of the wheel */
+    private final class Bucket {
+
+        private Timeout head;
+        private Timeout tail;
+
+        private void add(Timeout timeout) {
+            timeout.bucket = this;
+            if (head == null) {
+                head = tail = timeout;
+            } else {
+                tail.next = timeout;
+                timeout.prev = tail;
+                tail = timeout;
+            }
+        }
+
+        private void expire(long now, List<Timeout> periodic) {
+            Timeout timeout = head;
+            while (timeout != null) {
+                Timeout next = timeout.next;
+                if (timeout.state != Timeout.PENDING) {
+                    remove(timeout);
+                } else if (timeout.remainingRounds <= 0 && timeout.deadline <= now) {
+                    remove(timeout);
+                    if (timeout.fire()) {
+                        periodic.add(timeout);
+                    }
+                } else {
+                    timeout.remainingRounds--;
+                }
+                timeout = next;
+            }
+        }
+
+        private void remove(Timeout timeout) {
+            if (timeout.bucket != this) {
+                return;
+            }
+            if (timeout.prev == null) {
+                head = timeout.next;
+            } else {
+                timeout.prev.next = timeout.next;
+            }
+            if (timeout.next == null) {
+                tail = timeout.prev;
+            } else {
+                timeout.next.prev = timeout.prev;
+            }
+            timeout.prev = timeout.next = null;
+            timeout.bucket = null;
+        }
+    }
+
+    private final class Timeout implements Future<Void> {
+
+        private static final int PENDING = 0;
+        private static final int RUNNING = 1;
+        private static final int CANCELLED = 2;
+        private static final int DONE = 3;
+
+        private final Runnable task;
+        private final long period;
+        // accessed by the thread of the wheel only
+        private long deadline;
+        private long remainingRounds;
+        private Bucket bucket;
+        private Timeout prev, next;
+
+        // not private, for the field updater
+        volatile int state = PENDING;
+        private volatile Throwable failure;
+        /** Whether a run of the periodic task is in progress */
+        private volatile boolean running;
+
+        private Timeout(Runnable task, long deadline, long period) {
+            this.task = task;
+            this.deadline = deadline;
+            this.period = period;
+        }
+
+        /**
+         * Hands the task to the task executor, on the thread of the wheel.
+         * Returns true if the task is periodic and must be scheduled again.
+         */
+        private boolean fire() {
+            if (period == 0) {
+                if (!STATE.compareAndSet(this, PENDING, RUNNING)) {
+                    return false;
+                }
+                pending.decrementAndGet();
+            } else if (this.running) {
+                // the previous run has not returned yet, e.g. blocked on a socket write
+                return this.state == PENDING;
+            } else {
+                this.running = true;
+            }
+            try {
+                taskExecutor.execute(this::run);
+            } catch (RejectedExecutionException e) {
+                this.running = false;
+                complete(e);
+                return false;
+            }
+            return period > 0 && this.state == PENDING;
+        }
+
+        private void run() {
+            try {
+                task.run();
+            } catch (Throwable e) {
+                LOGGER.warn("Error while running timer task {}", task, e);
+                complete(e);
+                return;
+            } finally {
+                this.running = false;
+            }
+            if (period == 0) {
+                complete(null);
+            } else if (this.state != PENDING) {
+                // cancelled while running
+                signal();
+            }
+        }
+
+        /** Completes a one-shot task, or a periodic task with a failure */
+        private void complete(Throwable failure) {
+            this.failure = failure;
+            if (period == 0) {
+                this.state = DONE;
+            } else if (STATE.compareAndSet(this, PENDING, DONE)) {
+                pending.decrementAndGet();
+            }
+            signal();
+        }
+
+        /**
+         * Cancels the task, unless it is running or done. The cancelled task
+         * leaves its bucket on the next tick. The thread of the wheel is never
+         * interrupted.
+         */
+        @Override
+        public boolean cancel(boolean mayInterruptIfRunning) {
+            if (!STATE.compareAndSet(this, PENDING, CANCELLED)) {
+                return false;
+            }
+            pending.decrementAndGet();
+            cancelled.add(this);
+            signal();
+            return true;
+        }
+
+        @Override
+        public boolean isCancelled() {
+            return this.state == CANCELLED;
+        }
+
+        @Override
+        public boolean isDone() {
+            return this.state >= CANCELLED;
+        }
+
+        @Override
+        public Void get() throws InterruptedException, ExecutionException {
+            synchronized (this) {
+                while (this.state < CANCELLED) {
+                    wait();
+                }
+            }
+            return result();
+        }
+
+        @Override
+        public Void get(long timeout, TimeUnit unit) throws InterruptedException, ExecutionException, TimeoutException {
+            long end = System.nanoTime() + unit.toNanos(timeout);
+            synchronized (this) {
+                while (this.state < CANCELLED) {
+                    long remaining = end - System.nanoTime();
+                    if (remaining <= 0) {
+                        throw new TimeoutException();
+                    }
+                    TimeUnit.NANOSECONDS.timedWait(this, remaining);
+                }
+            }
+            return result();
+        }
+
+        private Void result() throws ExecutionException {
+            if (this.state == CANCELLED) {
+                throw new CancellationException();
+            }
+            if (this.failure != null) {
+                throw new ExecutionException(this.failure);
+            }
+            return null;
+        }
+
+        private void signal() {
+            synchronized (this) {
+                notifyAll();
+            }
+        }
+    }
+
+    private static final AtomicIntegerFieldUpdater<Timeout> STATE =
+        AtomicIntegerFieldUpdater.newUpdater(Timeout.class, "state");
+}
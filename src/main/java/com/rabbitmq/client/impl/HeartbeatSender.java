@@ -19,11 +19,11 @@ package com.rabbitmq.client.impl;
 import com.rabbitmq.client.AMQP;
 
 import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Future;
 import java.util.concurrent.ScheduledExecutorService;
 import java.util.concurrent.Executors;
 import java.util.concurrent.ThreadFactory;
 import java.util.concurrent.TimeUnit;
-import java.util.concurrent.ScheduledFuture;
 import java.io.IOException;
 
 import static java.util.concurrent.TimeUnit.SECONDS;
@@ -32,7 +32,9 @@ import static java.util.concurrent.TimeUnit.SECONDS;
  * Manages heartbeat sending for a {@link AMQConnection}.
  * <p/>
  * Heartbeats are sent in a dedicated thread that is separate
- * from the main loop thread used for the connection.
+ * from the main loop thread used for the connection, or by
+ * the task executor of a {@link HashedTimerWheel} shared by connections,
+ * whose thread only triggers the heartbeats.
  */
 final class HeartbeatSender {
 
@@ -43,17 +45,20 @@ final class HeartbeatSender {
 
     private ScheduledExecutorService executor;
     private final boolean privateExecutor;
+    private final HashedTimerWheel timerWheel;
 
-    private ScheduledFuture<?> future;
+    private Future<?> future;
 
     private boolean shutdown = false;
 
     private volatile long lastActivityTime;
 
-    HeartbeatSender(FrameHandler frameHandler, ScheduledExecutorService heartbeatExecutor, ThreadFactory threadFactory) {
+    HeartbeatSender(FrameHandler frameHandler, ScheduledExecutorService heartbeatExecutor,
+                    HashedTimerWheel timerWheel, ThreadFactory threadFactory) {
         this.frameHandler = frameHandler;
         this.privateExecutor = (heartbeatExecutor == null);
         this.executor = heartbeatExecutor;
+        this.timerWheel = timerWheel;
         this.threadFactory = threadFactory;
     }
 
@@ -80,11 +85,34 @@ final class HeartbeatSender {
                 // wake every heartbeatSeconds / 2 to avoid the worst case
                 // where the last activity comes just after the last heartbeat
                 long interval = SECONDS.toNanos(heartbeatSeconds) / 2;
-                ScheduledExecutorService executor = createExecutorIfNecessary();
                 Runnable task = new HeartbeatRunnable(interval);
-                this.future = executor.scheduleAtFixedRate(
-                    task, interval, interval, TimeUnit.NANOSECONDS);
+                if (this.timerWheel != null) {
+                    this.future = this.timerWheel.scheduleAtFixedRate(
+                        task, interval, interval, TimeUnit.NANOSECONDS);
+                } else {
+                    ScheduledExecutorService executor = createExecutorIfNecessary();
+                    this.future = executor.scheduleAtFixedRate(
+                        task, interval, interval, TimeUnit.NANOSECONDS);
+                }
+            }
+        }
+    }
+
+    /**
+     * Schedules a one-shot task on the heartbeat executor or timer wheel,
+     * e.g. to trigger the sending of the pending coalesced acks of a channel.
+     * The task must not block, it would delay the heartbeats.
+     * @return the future of the task, null if the sender is shut down
+     */
+    Future<?> schedule(Runnable task, long delayNanos) {
+        synchronized (this.monitor) {
+            if (this.shutdown) {
+                return null;
+            }
+            if (this.timerWheel != null) {
+                return this.timerWheel.schedule(task, delayNanos, TimeUnit.NANOSECONDS);
             }
+            return createExecutorIfNecessary().schedule(task, delayNanos, TimeUnit.NANOSECONDS);
         }
     }
 
@@ -0,0 +1,219 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import java.util.ArrayDeque;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentMap;
+import java.util.concurrent.atomic.AtomicInteger;
+
+/**
+ * Pool of the arrays of inbound message bodies.
+ * <p>
+ * The payloads of inbound body frames and the bodies assembled from several
+ * frames are taken from the pool, and bodies go back to the pool once the
+ * consumer they are delivered to is done with them: when
+ * {@link com.rabbitmq.client.Consumer#handleDelivery} returns, unless the
+ * body has been retained with its {@linkplain #lease(byte[]) lease}, e.g. with
+ * {@link com.rabbitmq.client.Delivery#retain()}. A consumer must then not
+ * use a body it has not retained after {@code handleDelivery} returns.
+ * The reference count of a body is held by its lease, deliveries do not
+ * share any state.
+ * <p>
+ * Arrays are pooled by exact length, since a body is exposed as a whole
+ * array. This suits large messages well: all the body frames of a message
+ * but the last have the same length, set by the negotiated maximum frame
+ * size. Short arrays are not pooled, nor are lengths beyond the maximum
+ * number of pooled lengths.
+ * <p>
+ * A pool can be shared by connections and is thread-safe.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#setInboundBufferPool(InboundBufferPool)
+ * @since 6.0.0
+ */
+public final class InboundBufferPool {
+
+    /** Default length under which arrays are not pooled */
+    public static final int DEFAULT_MIN_LENGTH = 4096;
+    /** Default maximum number of pooled arrays of a given length */
+    public static final int DEFAULT_MAX_ARRAYS_PER_LENGTH = 32;
+    /** Default maximum number of distinct pooled lengths */
+    public static final int DEFAULT_MAX_LENGTHS = 64;
+
+    /** Lease of the delivery being handled by the current thread, if its body is pooled */
+    private static final ThreadLocal<Lease> DELIVERING = new ThreadLocal<>();
+
+    private final int minLength;
+    private final int maxArraysPerLength;
+    private final int maxLengths;
+    private final ConcurrentMap<Integer, ArrayDeque<byte[]>> arrays = new ConcurrentHashMap<>();
+
+    public InboundBufferPool() {
+        this(DEFAULT_MIN_LENGTH, DEFAULT_MAX_ARRAYS_PER_LENGTH, DEFAULT_MAX_LENGTHS);
+    }
+
+    /**
+     * @param minLength          length under which arrays are not pooled
+     * @param maxArraysPerLength maximum number of pooled arrays of a given length
+     * @param maxLengths         maximum number of distinct pooled lengths
+     */
+    public InboundBufferPool(int minLength, int maxArraysPerLength, int maxLengths) {
+        if (minLength <= 0 || maxArraysPerLength <= 0 || maxLengths <= 0) {
+            throw new IllegalArgumentException("Pool settings must be greater than 0");
+        }
+        this.minLength = minLength;
+        this.maxArraysPerLength = maxArraysPerLength;
+        this.maxLengths = maxLengths;
+    }
+
+    /** @return an array of this length, from the pool if one is available */
+    byte[] acquire(int length) {
+        if (length >= minLength) {
+            ArrayDeque<byte[]> pooled = arrays.get(length);
+            if (pooled != null) {
+                byte[] array;
+                synchronized (pooled) {
+                    array = pooled.pollLast();
+                }
+                if (array != null) {
+                    return array;
+                }
+            }
+        }
+        return new byte[length];
+    }
+
+    /** Puts back an array nothing refers to anymore. */
+    void recycle(byte[] array) {
+        int length = array.length;
+        if (length < minLength) {
+            return;
+        }
+        ArrayDeque<byte[]> pooled = arrays.get(length);
+        if (pooled == null) {
+            if (arrays.size() >= maxLengths) {
+                return;
+            }
+            pooled = arrays.computeIfAbsent(length, l -> new ArrayDeque<>());
+        }
+        synchronized (pooled) {
+            if (pooled.size() < maxArraysPerLength) {
+                pooled.addLast(array);
+            }
+        }
+    }
+
+    /**
+     * Hands a body to a consumer, the body goes back to the pool
+     * when the last reference to it is {@linkplain Lease#release() released}.
+     *
+     * @return the lease of the body, null if the body is not pooled
+     */
+    Lease lend(byte[] body) {
+        return body.length >= minLength ? new Lease(this, body) : null;
+    }
+
+    /**
+     * Makes a lease the one of the delivery being handled on the current thread,
+     * null once the delivery has been handled.
+     */
+    static void delivering(Lease lease) {
+        DELIVERING.set(lease);
+    }
+
+    /**
+     * Returns the lease of a body being delivered on the current thread,
+     * that is from {@link com.rabbitmq.client.Consumer#handleDelivery}.
+     *
+     * @param body the message body
+     * @return the lease of the body, null if the body does not come from a
+     * pool or is not being delivered on the current thread
+     */
+    public static Lease lease(byte[] body) {
+        if (body == null) {
+            return null;
+        }
+        Lease lease = DELIVERING.get();
+        return lease != null && lease.body == body ? lease : null;
+    }
+
+    /** @return the number of pooled arrays, for tests */
+    int size() {
+        int size = 0;
+        for (ArrayDeque<byte[]> pooled : arrays.values()) {
+            synchronized (pooled) {
+                size += pooled.size();
+            }
+        }
+        return size;
+    }
+
+    /**
+     * Reference count of a body handed to a consumer.
+     * The consumer holds the first reference until {@code handleDelivery} returns.
+     */
+    public static final class Lease {
+
+        private final InboundBufferPool pool;
+        private final byte[] body;
+        /** 0 once the body has been recycled or detached */
+        private final AtomicInteger references = new AtomicInteger(1);
+
+        private Lease(InboundBufferPool pool, byte[] body) {
+            this.pool = pool;
+            this.body = body;
+        }
+
+        /**
+         * Keeps the body out of the pool until a matching {@link #release()}.
+         * Does nothing once the body has been recycled or detached.
+         */
+        public void retain() {
+            int current;
+            do {
+                current = references.get();
+                if (current <= 0) {
+                    return;
+                }
+            } while (!references.compareAndSet(current, current + 1));
+        }
+
+        /**
+         * Releases a reference to the body, the body goes back to its pool
+         * with the last reference.
+         */
+        public void release() {
+            int current;
+            do {
+                current = references.get();
+                if (current <= 0) {
+                    return;
+                }
+            } while (!references.compareAndSet(current, current - 1));
+            if (current == 1) {
+                pool.recycle(body);
+            }
+        }
+
+        /**
+         * Keeps the body out of the pool for good, whatever its references.
+         */
+        public void detach() {
+            references.set(0);
+        }
+    }
+}
@@ -11,9 +11,11 @@ import org.slf4j.LoggerFactory;
  * This implementation checks whether the <code>TRACE</code> log level
  * is enabled before logging anything. This {@link TrafficListener}
  * should only be activated for debugging purposes, not in a production
- * environment.
+ * environment. {@link TrafficRecorder} records the traffic in binary form,
+ * at a low cost, and can stay enabled in production.
  *
  * @see TrafficListener
+ * @see TrafficRecorder
  * @see com.rabbitmq.client.ConnectionFactory#setTrafficListener(TrafficListener)
  * @since 5.5.0
  */
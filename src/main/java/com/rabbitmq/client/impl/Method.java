@@ -16,8 +16,8 @@
 
 package com.rabbitmq.client.impl;
 
-import java.io.DataOutputStream;
 import java.io.IOException;
+import java.nio.ByteBuffer;
 
 import com.rabbitmq.client.AMQP;
 import com.rabbitmq.client.impl.AMQImpl.MethodVisitor;
@@ -61,6 +61,29 @@ public abstract class Method implements com.rabbitmq.client.Method {
      */
     public abstract void writeArgumentsTo(MethodArgumentWriter writer) throws IOException;
 
+    /**
+     * Private API - Autogenerated exact wire size of this method.
+     * @return the size in bytes of the method frame payload, class and method ids included
+     */
+    public abstract int wireSize();
+
+    /**
+     * Private API - Autogenerated encoder for this method.
+     * @param out the buffer to encode the method arguments into, with at least
+     * {@link #wireSize()} - 4 bytes remaining
+     */
+    public abstract void encodeArgumentsTo(ByteBuffer out);
+
+    /**
+     * Private API - Encodes the whole method frame payload.
+     * @param out the buffer to encode into, with at least {@link #wireSize()} bytes remaining
+     */
+    public void encodeTo(ByteBuffer out) {
+        out.putShort((short) protocolClassId());
+        out.putShort((short) protocolMethodId());
+        encodeArgumentsTo(out);
+    }
+
     /**
      * Public API - debugging utility
      * @param buffer the buffer to append debug data to
@@ -77,13 +100,8 @@ public abstract class Method implements com.rabbitmq.client.Method {
     }
 
     public Frame toFrame(int channelNumber) throws IOException {
-        Frame frame = new Frame(AMQP.FRAME_METHOD, channelNumber);
-        DataOutputStream bodyOut = frame.getOutputStream();
-        bodyOut.writeShort(protocolClassId());
-        bodyOut.writeShort(protocolMethodId());
-        MethodArgumentWriter argWriter = new MethodArgumentWriter(new ValueWriter(bodyOut));
-        writeArgumentsTo(argWriter);
-        argWriter.flush();
-        return frame;
+        byte[] payload = new byte[wireSize()];
+        encodeTo(ByteBuffer.wrap(payload));
+        return new Frame(AMQP.FRAME_METHOD, channelNumber, payload);
     }
 }
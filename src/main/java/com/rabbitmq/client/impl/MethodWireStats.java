@@ -0,0 +1,150 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import java.util.concurrent.atomic.LongAdder;
+
+/**
+ * Per-method wire statistics: number of commands, number of bytes
+ * (frame overhead, content header and body included) and optionally
+ * the time spent decoding and encoding, inbound and outbound.
+ * <p>
+ * Statistics are kept in flat arrays indexed by {@link AMQImpl#methodIndex(int, int)},
+ * so recording does not look anything up. Instances are thread-safe and
+ * usually shared by all the connections of a {@link com.rabbitmq.client.MetricsCollector}.
+ *
+ * @see com.rabbitmq.client.MetricsCollector#methodWireStats()
+ * @see AbstractMetricsCollector#enableMethodWireStats(boolean)
+ * @since 6.0.0
+ */
+public final class MethodWireStats {
+
+    private final boolean timing;
+
+    private final LongAdder[] inboundCommands = adders();
+    private final LongAdder[] inboundBytes = adders();
+    private final LongAdder[] inboundNanos = adders();
+    private final LongAdder[] outboundCommands = adders();
+    private final LongAdder[] outboundBytes = adders();
+    private final LongAdder[] outboundNanos = adders();
+
+    /**
+     * @param timing whether to measure the time spent decoding and encoding methods,
+     *               which costs 2 calls to {@link System#nanoTime()} per command
+     */
+    public MethodWireStats(boolean timing) {
+        this.timing = timing;
+    }
+
+    private static LongAdder[] adders() {
+        LongAdder[] adders = new LongAdder[AMQImpl.METHOD_COUNT];
+        for (int i = 0; i < adders.length; i++) {
+            adders[i] = new LongAdder();
+        }
+        return adders;
+    }
+
+    /** @return whether decoding and encoding are timed */
+    public boolean isTimingEnabled() {
+        return timing;
+    }
+
+    /**
+     * Private API - starts timing a decoding or an encoding.
+     * @return the start time to pass in when recording, 0 if timing is disabled
+     */
+    long startTime() {
+        return timing ? System.nanoTime() : 0L;
+    }
+
+    /**
+     * Private API - records an inbound method frame, to call right after decoding it.
+     * @param methodIndex the index of the method, ignored if negative
+     * @param bytes the size of the method frame
+     * @param startTime the value of {@link #startTime()} before decoding
+     */
+    void recordInbound(int methodIndex, long bytes, long startTime) {
+        if (methodIndex >= 0) {
+            inboundCommands[methodIndex].increment();
+            inboundBytes[methodIndex].add(bytes);
+            if (timing) {
+                inboundNanos[methodIndex].add(System.nanoTime() - startTime);
+            }
+        }
+    }
+
+    /**
+     * Private API - records the content header and body frames of an inbound command.
+     * @param methodIndex the index of the method, ignored if negative
+     * @param bytes the size of the frame
+     */
+    void recordInboundContent(int methodIndex, long bytes) {
+        if (methodIndex >= 0) {
+            inboundBytes[methodIndex].add(bytes);
+        }
+    }
+
+    /**
+     * Private API - records an outbound command, to call right after encoding it.
+     * @param methodIndex the index of the method, ignored if negative
+     * @param bytes the size of the frames of the command
+     * @param startTime the value of {@link #startTime()} before encoding
+     */
+    void recordOutbound(int methodIndex, long bytes, long startTime) {
+        if (methodIndex >= 0) {
+            outboundCommands[methodIndex].increment();
+            outboundBytes[methodIndex].add(bytes);
+            if (timing) {
+                outboundNanos[methodIndex].add(System.nanoTime() - startTime);
+            }
+        }
+    }
+
+    /** @return the number of received commands of the method at the given index */
+    public long getInboundCommands(int methodIndex) {
+        return inboundCommands[methodIndex].sum();
+    }
+
+    /** @return the number of bytes received for the method at the given index */
+    public long getInboundBytes(int methodIndex) {
+        return inboundBytes[methodIndex].sum();
+    }
+
+    /** @return the time spent decoding the method at the given index, 0 if timing is disabled */
+    public long getDecodingNanos(int methodIndex) {
+        return inboundNanos[methodIndex].sum();
+    }
+
+    /** @return the number of sent commands of the method at the given index */
+    public long getOutboundCommands(int methodIndex) {
+        return outboundCommands[methodIndex].sum();
+    }
+
+    /** @return the number of bytes sent for the method at the given index */
+    public long getOutboundBytes(int methodIndex) {
+        return outboundBytes[methodIndex].sum();
+    }
+
+    /** @return the time spent encoding the method at the given index, 0 if timing is disabled */
+    public long getEncodingNanos(int methodIndex) {
+        return outboundNanos[methodIndex].sum();
+    }
+
+    /** @return the number of methods in the statistics, see {@link AMQImpl#methodName(int)} */
+    public int size() {
+        return AMQImpl.METHOD_COUNT;
+    }
+}
@@ -19,12 +19,16 @@ import com.rabbitmq.client.Channel;
 import com.rabbitmq.client.Connection;
 import com.rabbitmq.client.MetricsCollector;
 import io.micrometer.core.instrument.Counter;
+import io.micrometer.core.instrument.FunctionCounter;
+import io.micrometer.core.instrument.FunctionTimer;
 import io.micrometer.core.instrument.MeterRegistry;
 import io.micrometer.core.instrument.Tag;
 import io.micrometer.core.instrument.Tags;
 
 import java.util.Collections;
+import java.util.concurrent.TimeUnit;
 import java.util.concurrent.atomic.AtomicLong;
+import java.util.function.Consumer;
 import java.util.function.Function;
 
 import static com.rabbitmq.client.impl.MicrometerMetricsCollector.Metrics.*;
@@ -63,6 +67,8 @@ public class MicrometerMetricsCollector extends AbstractMetricsCollector {
 
     private final Counter rejectedMessages;
 
+    private Consumer<MethodWireStats> methodWireStatsRegistration = stats -> { };
+
     public MicrometerMetricsCollector(MeterRegistry registry) {
         this(registry, "rabbitmq");
     }
@@ -77,6 +83,7 @@ public class MicrometerMetricsCollector extends AbstractMetricsCollector {
 
     public MicrometerMetricsCollector(final MeterRegistry registry, final String prefix, final Iterable<Tag> tags) {
         this(metric -> metric.create(registry, prefix, tags));
+        this.methodWireStatsRegistration = stats -> registerMethodWireStats(stats, registry, prefix, tags);
     }
 
     public MicrometerMetricsCollector(Function<Metrics, Object> metricsCreator) {
@@ -152,6 +159,37 @@ public class MicrometerMetricsCollector extends AbstractMetricsCollector {
         unroutedPublishedMessages.increment();
     }
 
+    @Override
+    protected void registerMethodWireStats(MethodWireStats stats) {
+        methodWireStatsRegistration.accept(stats);
+    }
+
+    private static void registerMethodWireStats(MethodWireStats stats, MeterRegistry registry,
+                                                 String prefix, Iterable<Tag> tags) {
+        for (int i = 0; i < stats.size(); i++) {
+            final int index = i;
+            Tags methodTags = Tags.of(tags).and("method", AMQImpl.methodName(index));
+            Tags inboundTags = methodTags.and("direction", "inbound");
+            Tags outboundTags = methodTags.and("direction", "outbound");
+            FunctionCounter.builder(prefix + ".method.commands", stats, s -> s.getInboundCommands(index))
+                .tags(inboundTags).register(registry);
+            FunctionCounter.builder(prefix + ".method.commands", stats, s -> s.getOutboundCommands(index))
+                .tags(outboundTags).register(registry);
+            FunctionCounter.builder(prefix + ".method.bytes", stats, s -> s.getInboundBytes(index))
+                .baseUnit("bytes").tags(inboundTags).register(registry);
+            FunctionCounter.builder(prefix + ".method.bytes", stats, s -> s.getOutboundBytes(index))
+                .baseUnit("bytes").tags(outboundTags).register(registry);
+            if (stats.isTimingEnabled()) {
+                FunctionTimer.builder(prefix + ".method.decoding", stats,
+                        s -> s.getInboundCommands(index), s -> s.getDecodingNanos(index), TimeUnit.NANOSECONDS)
+                    .tags(methodTags).register(registry);
+                FunctionTimer.builder(prefix + ".method.encoding", stats,
+                        s -> s.getOutboundCommands(index), s -> s.getEncodingNanos(index), TimeUnit.NANOSECONDS)
+                    .tags(methodTags).register(registry);
+            }
+        }
+    }
+
     public AtomicLong getConnections() {
         return connections;
     }
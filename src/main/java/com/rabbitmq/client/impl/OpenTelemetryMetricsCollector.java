@@ -22,8 +22,10 @@ import io.opentelemetry.api.OpenTelemetry;
 import io.opentelemetry.api.common.Attributes;
 import io.opentelemetry.api.metrics.LongCounter;
 import io.opentelemetry.api.metrics.Meter;
+import io.opentelemetry.api.metrics.ObservableLongMeasurement;
 
 import java.util.concurrent.atomic.AtomicLong;
+import java.util.function.IntToLongFunction;
 
 /**
  * <a href="https://opentelemetry.io/">OpenTelemetry</a> implementation of {@link MetricsCollector}.
@@ -33,6 +35,8 @@ import java.util.concurrent.atomic.AtomicLong;
  */
 public class OpenTelemetryMetricsCollector extends AbstractMetricsCollector {
 
+    private final Meter meter;
+    private final String prefix;
     private final Attributes attributes;
 
     private final AtomicLong connections = new AtomicLong(0L);
@@ -58,6 +62,8 @@ public class OpenTelemetryMetricsCollector extends AbstractMetricsCollector {
     public OpenTelemetryMetricsCollector(final OpenTelemetry openTelemetry, final String prefix, final Attributes attributes) {
         // initialize meter
         Meter meter = openTelemetry.getMeter("amqp-client");
+        this.meter = meter;
+        this.prefix = prefix;
 
         // attributes
         this.attributes = attributes;
@@ -185,6 +191,60 @@ public class OpenTelemetryMetricsCollector extends AbstractMetricsCollector {
         unroutedPublishedMessagesCounter.add(1L, attributes);
     }
 
+    @Override
+    protected void registerMethodWireStats(MethodWireStats stats) {
+        int size = stats.size();
+        Attributes[] methodAttributes = new Attributes[size];
+        Attributes[] inboundAttributes = new Attributes[size];
+        Attributes[] outboundAttributes = new Attributes[size];
+        for (int i = 0; i < size; i++) {
+            methodAttributes[i] = attributes.toBuilder().put("method", AMQImpl.methodName(i)).build();
+            inboundAttributes[i] = methodAttributes[i].toBuilder().put("direction", "inbound").build();
+            outboundAttributes[i] = methodAttributes[i].toBuilder().put("direction", "outbound").build();
+        }
+
+        // commands per method
+        meter.counterBuilder(prefix + ".method.commands")
+            .setUnit("{commands}")
+            .setDescription("The number of commands exchanged with the RabbitMQ server, per AMQP method")
+            .buildWithCallback(measurement -> {
+                record(measurement, size, stats::getInboundCommands, inboundAttributes);
+                record(measurement, size, stats::getOutboundCommands, outboundAttributes);
+            });
+
+        // bytes per method
+        meter.counterBuilder(prefix + ".method.bytes")
+            .setUnit("By")
+            .setDescription("The number of bytes exchanged with the RabbitMQ server, per AMQP method")
+            .buildWithCallback(measurement -> {
+                record(measurement, size, stats::getInboundBytes, inboundAttributes);
+                record(measurement, size, stats::getOutboundBytes, outboundAttributes);
+            });
+
+        if (stats.isTimingEnabled()) {
+            // decoding and encoding time per method
+            meter.counterBuilder(prefix + ".method.decoding.time")
+                .setUnit("ns")
+                .setDescription("The time spent decoding methods received from the RabbitMQ server")
+                .buildWithCallback(measurement -> record(measurement, size, stats::getDecodingNanos, methodAttributes));
+            meter.counterBuilder(prefix + ".method.encoding.time")
+                .setUnit("ns")
+                .setDescription("The time spent encoding methods sent to the RabbitMQ server")
+                .buildWithCallback(measurement -> record(measurement, size, stats::getEncodingNanos, methodAttributes));
+        }
+    }
+
+    private static void record(ObservableLongMeasurement measurement, int size,
+                               IntToLongFunction values, Attributes[] attributes) {
+        for (int i = 0; i < size; i++) {
+            long value = values.applyAsLong(i);
+            // methods that never went through the connections are not reported
+            if (value > 0) {
+                measurement.record(value, attributes[i]);
+            }
+        }
+    }
+
     public AtomicLong getConnections() {
         return connections;
     }
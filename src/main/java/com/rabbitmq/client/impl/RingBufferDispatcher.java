@@ -0,0 +1,287 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.Channel;
+
+import java.util.ArrayDeque;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicBoolean;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Alternative to {@link WorkPool} for {@link ConsumerWorkService}: each channel
+ * has its own ring buffer of work items, filled by the connection thread and
+ * drained by at most one executor thread at a time, which keeps the order of
+ * the items of a channel. There is no lock shared by the channels, adding and
+ * running items does not take any monitor unless the ring is full or has
+ * overflowed.
+ * <p>
+ * A channel is scheduled on the executor when items are added to its empty
+ * ring, the executor thread then runs up to a batch of items and reschedules
+ * the channel if there are more, so busy channels do not starve the others.
+ * <p>
+ * Like with {@link WorkPool}, adding to a full ring blocks, unless a channel
+ * waits for an RPC response: items then go to an unbounded overflow queue.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#setRingBufferConsumerDispatch(boolean)
+ */
+final class RingBufferDispatcher {
+
+    /** Number of items of a ring, must be a power of 2 */
+    static final int RING_SIZE = 1024;
+    private static final int MASK = RING_SIZE - 1;
+
+    private final ExecutorService executor;
+    private final int queueingTimeout;
+    private final int batchSize;
+    private final Map<Channel, Ring> rings = new ConcurrentHashMap<>();
+    /** Channels waiting for an RPC response. Rings are not bounded if this is non-empty. */
+    private final Set<Channel> unlimited = ConcurrentHashMap.newKeySet();
+
+    /**
+     * @param executor        runs the items
+     * @param queueingTimeout time in ms to wait to add an item to a full ring,
+     *                        {@link WorkPoolFullException} is thrown after it, no timeout if not positive
+     * @param batchSize       maximum number of items of a channel to run in a row
+     */
+    RingBufferDispatcher(ExecutorService executor, int queueingTimeout, int batchSize) {
+        this.executor = executor;
+        this.queueingTimeout = queueingTimeout;
+        this.batchSize = batchSize;
+    }
+
+    void registerKey(Channel channel) {
+        rings.computeIfAbsent(channel, c -> new Ring());
+    }
+
+    void unregisterKey(Channel channel) {
+        unlimited.remove(channel);
+        Ring ring = rings.remove(channel);
+        if (ring != null) {
+            ring.close();
+        }
+    }
+
+    void unregisterAllKeys() {
+        unlimited.clear();
+        for (Ring ring : rings.values()) {
+            ring.close();
+        }
+        rings.clear();
+    }
+
+    void setUnlimited(Channel channel, boolean unlimited) {
+        if (unlimited) {
+            this.unlimited.add(channel);
+            // producers blocked on full rings can use the overflow queues
+            for (Ring ring : rings.values()) {
+                ring.wakeUpProducers();
+            }
+        } else {
+            this.unlimited.remove(channel);
+        }
+    }
+
+    /** Adds an item to the ring of the channel, ignored if the channel is not registered. */
+    void addWork(Channel channel, Runnable item) {
+        Ring ring = rings.get(channel);
+        if (ring != null && ring.offer(item)) {
+            ring.schedule();
+        }
+    }
+
+    /**
+     * Single-producer, single-consumer ring of the items of a channel.
+     * The producer is the connection thread, except in rare cases (e.g. the
+     * shutdown of a channel from an application thread), so producers claim
+     * the ring with a compare-and-set, which is not contended in practice,
+     * and only take the ring monitor when the ring is full or has overflowed.
+     * The consumer is the executor thread that runs the ring.
+     */
+    private final class Ring implements Runnable {
+
+        private final Runnable[] items = new Runnable[RING_SIZE];
+        /** Sequence of the next item to run, written by the consumer */
+        private final AtomicLong head = new AtomicLong();
+        /** Sequence of the next item to add, written by the producer */
+        private final AtomicLong tail = new AtomicLong();
+        private final AtomicBoolean scheduled = new AtomicBoolean(false);
+        /** Claimed by the producer adding an item */
+        private final AtomicBoolean producing = new AtomicBoolean(false);
+        /** Items added while the ring was full and unlimited. Guarded by this. */
+        private final ArrayDeque<Runnable> overflow = new ArrayDeque<>();
+        private volatile boolean overflowing = false;
+        private volatile boolean producerWaiting = false;
+        private volatile boolean closed = false;
+
+        /** @return whether the item was added */
+        private boolean offer(Runnable item) {
+            // the ring has room and has not overflowed, no monitor needed
+            if (producing.compareAndSet(false, true)) {
+                try {
+                    if (!closed && !overflowing) {
+                        long sequence = tail.get();
+                        if (sequence - head.get() < RING_SIZE) {
+                            items[(int) sequence & MASK] = item;
+                            tail.lazySet(sequence + 1);
+                            return true;
+                        }
+                    }
+                } finally {
+                    producing.set(false);
+                }
+            }
+            return offerSlowly(item);
+        }
+
+        /** Adds an item to a full or overflowing ring, or competes with another producer */
+        private synchronized boolean offerSlowly(Runnable item) {
+            long deadline = queueingTimeout > 0 ?
+                System.nanoTime() + TimeUnit.MILLISECONDS.toNanos(queueingTimeout) : 0L;
+            while (!closed) {
+                claim();
+                try {
+                    if (overflowing) {
+                        // the next items follow the overflow items, to keep the order
+                        overflow.addLast(item);
+                        return true;
+                    }
+                    long sequence = tail.get();
+                    if (sequence - head.get() < RING_SIZE) {
+                        items[(int) sequence & MASK] = item;
+                        tail.lazySet(sequence + 1);
+                        return true;
+                    }
+                    if (!unlimited.isEmpty()) {
+                        overflow.addLast(item);
+                        overflowing = true;
+                        return true;
+                    }
+                    // the flag is set before checking again, the consumer checks it after moving the head
+                    producerWaiting = true;
+                    if (sequence - head.get() < RING_SIZE) {
+                        producerWaiting = false;
+                        continue;
+                    }
+                } finally {
+                    producing.set(false);
+                }
+                try {
+                    if (queueingTimeout > 0) {
+                        long remaining = deadline - System.nanoTime();
+                        if (remaining <= 0) {
+                            throw new WorkPoolFullException("Could not enqueue in work pool after " + queueingTimeout + " ms.");
+                        }
+                        TimeUnit.NANOSECONDS.timedWait(this, remaining);
+                    } else {
+                        wait();
+                    }
+                } catch (InterruptedException e) {
+                    Thread.currentThread().interrupt();
+                    return false;
+                } finally {
+                    producerWaiting = false;
+                }
+            }
+            return false;
+        }
+
+        /** Waits for a producer on the fast path, which never blocks */
+        private void claim() {
+            while (!producing.compareAndSet(false, true)) {
+                Thread.yield();
+            }
+        }
+
+        private void schedule() {
+            if (!closed && scheduled.compareAndSet(false, true)) {
+                executor.execute(this);
+            }
+        }
+
+        @Override
+        public void run() {
+            try {
+                runBatch();
+            } catch (RuntimeException e) {
+                Thread.currentThread().interrupt();
+            } finally {
+                scheduled.set(false);
+                if (hasWork()) {
+                    schedule();
+                }
+            }
+        }
+
+        private void runBatch() {
+            long sequence = head.get();
+            try {
+                for (int count = 0; count < batchSize && !closed; count++) {
+                    Runnable item;
+                    // read before the tail: every item in the ring is older than the overflow items
+                    boolean overflow = overflowing;
+                    if (sequence < tail.get()) {
+                        int index = (int) sequence & MASK;
+                        item = items[index];
+                        items[index] = null;
+                        sequence++;
+                    } else if (overflow) {
+                        item = pollOverflow();
+                        if (item == null) {
+                            break;
+                        }
+                    } else {
+                        break;
+                    }
+                    item.run();
+                }
+            } finally {
+                head.set(sequence);
+                if (producerWaiting) {
+                    wakeUpProducers();
+                }
+            }
+        }
+
+        /** Only called once the ring has overflowed, which is rare */
+        private synchronized Runnable pollOverflow() {
+            Runnable item = overflow.pollFirst();
+            if (overflow.isEmpty()) {
+                overflowing = false;
+            }
+            return item;
+        }
+
+        private boolean hasWork() {
+            return !closed && (head.get() < tail.get() || overflowing);
+        }
+
+        private synchronized void wakeUpProducers() {
+            notifyAll();
+        }
+
+        private synchronized void close() {
+            closed = true;
+            overflow.clear();
+            notifyAll();
+        }
+    }
+}
@@ -0,0 +1,208 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.concurrent.locks.Lock;
+import java.util.concurrent.locks.ReentrantLock;
+
+/**
+ * Bounded, least-recently-used cache of the strings decoded from
+ * short strings: consumer tags, exchange names, routing keys, table keys.
+ * Entries are looked up by their raw UTF-8 bytes, so a hit returns the
+ * shared {@link String} instance without allocating anything.
+ * <p>
+ * A connection with the cache enabled uses one instance for all the frames it decodes, see
+ * {@link ByteBufferValueReader#readShortstr(java.nio.ByteBuffer, ShortStringCache)}.
+ * This class is thread-safe.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#setShortStringCacheSize(int)
+ * @since 6.0.0
+ */
+public final class ShortStringCache {
+
+    /** Strings longer than this (in bytes) are decoded without going through the cache */
+    public static final int DEFAULT_MAX_LENGTH = 128;
+
+    private final int maxSize;
+    private final int maxLength;
+    private final Entry[] buckets;
+    /** Sentinel of the recency list: {@code lru.after} is the eldest entry, {@code lru.before} the youngest */
+    private final Entry lru = new Entry(0, null, null);
+    private final Lock lock = new ReentrantLock();
+    private int size;
+    private long hits;
+    private long misses;
+
+    /**
+     * @param maxSize the maximum number of strings in the cache
+     */
+    public ShortStringCache(int maxSize) {
+        this(maxSize, DEFAULT_MAX_LENGTH);
+    }
+
+    /**
+     * @param maxSize   the maximum number of strings in the cache
+     * @param maxLength the maximum length in bytes of the strings in the cache
+     */
+    public ShortStringCache(int maxSize, int maxLength) {
+        if (maxSize <= 0) {
+            throw new IllegalArgumentException("Cache size must be greater than 0: " + maxSize);
+        }
+        this.maxSize = maxSize;
+        this.maxLength = maxLength;
+        int capacity = Integer.highestOneBit(Math.min(maxSize, 1 << 20) * 2 - 1) << 1;
+        this.buckets = new Entry[capacity];
+        lru.before = lru;
+        lru.after = lru;
+    }
+
+    /**
+     * Returns the string for the given UTF-8 bytes, from the cache if it
+     * is there, decoding and caching it otherwise.
+     * @param bytes  the array holding the encoded string
+     * @param offset the offset of the encoded string in the array
+     * @param length the length of the encoded string
+     * @return the decoded string
+     */
+    public String intern(byte[] bytes, int offset, int length) {
+        if (length > maxLength) {
+            return new String(bytes, offset, length, StandardCharsets.UTF_8);
+        }
+        int hash = hash(bytes, offset, length);
+        lock.lock();
+        try {
+            int index = hash & (buckets.length - 1);
+            for (Entry e = buckets[index]; e != null; e = e.next) {
+                if (e.hash == hash && e.matches(bytes, offset, length)) {
+                    hits++;
+                    unlink(e);
+                    linkYoungest(e);
+                    return e.value;
+                }
+            }
+            misses++;
+            Entry e = new Entry(hash,
+                Arrays.copyOfRange(bytes, offset, offset + length),
+                new String(bytes, offset, length, StandardCharsets.UTF_8));
+            e.next = buckets[index];
+            buckets[index] = e;
+            linkYoungest(e);
+            if (++size > maxSize) {
+                evict(lru.after);
+            }
+            return e.value;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    /** @return the number of strings in the cache */
+    public int size() {
+        lock.lock();
+        try {
+            return size;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    /** @return the number of lookups that found their string in the cache */
+    public long getHits() {
+        lock.lock();
+        try {
+            return hits;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    /** @return the number of lookups that had to decode their string */
+    public long getMisses() {
+        lock.lock();
+        try {
+            return misses;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    private void evict(Entry eldest) {
+        unlink(eldest);
+        int index = eldest.hash & (buckets.length - 1);
+        Entry previous = null;
+        for (Entry e = buckets[index]; e != null; previous = e, e = e.next) {
+            if (e == eldest) {
+                if (previous == null) {
+                    buckets[index] = e.next;
+                } else {
+                    previous.next = e.next;
+                }
+                break;
+            }
+        }
+        size--;
+    }
+
+    private void linkYoungest(Entry e) {
+        e.before = lru.before;
+        e.after = lru;
+        lru.before.after = e;
+        lru.before = e;
+    }
+
+    private static void unlink(Entry e) {
+        e.before.after = e.after;
+        e.after.before = e.before;
+    }
+
+    private static int hash(byte[] bytes, int offset, int length) {
+        int h = 1;
+        for (int i = offset; i < offset + length; i++) {
+            h = 31 * h + bytes[i];
+        }
+        return h ^ (h >>> 16);
+    }
+
+    private static final class Entry {
+        private final int hash;
+        private final byte[] bytes;
+        private final String value;
+        /** Next entry in the same bucket */
+        private Entry next;
+        /** Neighbours in the recency list */
+        private Entry before, after;
+
+        private Entry(int hash, byte[] bytes, String value) {
+            this.hash = hash;
+            this.bytes = bytes;
+            this.value = value;
+        }
+
+        private boolean matches(byte[] other, int offset, int length) {
+            if (bytes.length != length) {
+                return false;
+            }
+            for (int i = 0; i < length; i++) {
+                if (bytes[i] != other[offset + i]) {
+                    return false;
+                }
+            }
+            return true;
+        }
+    }
+}
@@ -58,6 +58,9 @@ public class SocketFrameHandler implements FrameHandler {
 
     private final int maxInboundMessageBodySize;
 
+    /** Pool of the payloads of inbound body frames, may be null */
+    private final InboundBufferPool inboundBufferPool;
+
     /** Time to linger before closing the socket forcefully. */
     public static final int SOCKET_CLOSING_TIMEOUT = 1;
 
@@ -73,9 +76,19 @@ public class SocketFrameHandler implements FrameHandler {
      */
     public SocketFrameHandler(Socket socket, ExecutorService shutdownExecutor,
                               int maxInboundMessageBodySize) throws IOException {
+        this(socket, shutdownExecutor, maxInboundMessageBodySize, null);
+    }
+
+    /**
+     * @param socket the socket to use
+     * @param inboundBufferPool pool of the payloads of inbound body frames, may be null
+     */
+    public SocketFrameHandler(Socket socket, ExecutorService shutdownExecutor,
+                              int maxInboundMessageBodySize, InboundBufferPool inboundBufferPool) throws IOException {
         _socket = socket;
         _shutdownExecutor = shutdownExecutor;
         this.maxInboundMessageBodySize = maxInboundMessageBodySize;
+        this.inboundBufferPool = inboundBufferPool;
 
         _inputStream = new DataInputStream(new BufferedInputStream(socket.getInputStream()));
         _outputStream = new DataOutputStream(new BufferedOutputStream(socket.getOutputStream()));
@@ -196,7 +209,7 @@ public class SocketFrameHandler implements FrameHandler {
     public Frame readFrame() throws IOException {
         _inputStreamLock.lock();
         try {
-            return Frame.readFrom(_inputStream, this.maxInboundMessageBodySize);
+            return Frame.readFrom(_inputStream, this.maxInboundMessageBodySize, this.inboundBufferPool);
         } finally {
             _inputStreamLock.unlock();
         }
@@ -212,6 +225,31 @@ public class SocketFrameHandler implements FrameHandler {
         }
     }
 
+    @Override
+    public void writeFrame(int type, int channel, byte[] payload, int offset, int length) throws IOException {
+        _outputStreamLock.lock();
+        try {
+            // copied to the buffered stream before returning, the array can be reused
+            _outputStream.writeByte(type);
+            _outputStream.writeShort(channel);
+            _outputStream.writeInt(length);
+            _outputStream.write(payload, offset, length);
+            _outputStream.write(AMQP.FRAME_END);
+        } finally {
+            _outputStreamLock.unlock();
+        }
+    }
+
+    @Override
+    public void writeFrames(byte[] frames, int offset, int length) throws IOException {
+        _outputStreamLock.lock();
+        try {
+            _outputStream.write(frames, offset, length);
+        } finally {
+            _outputStreamLock.unlock();
+        }
+    }
+
     @Override
     public void flush() throws IOException {
         _outputStream.flush();
@@ -30,6 +30,7 @@ public class SocketFrameHandlerFactory extends AbstractFrameHandlerFactory {
     private final SocketFactory socketFactory;
     private final ExecutorService shutdownExecutor;
     private final SslContextFactory sslContextFactory;
+    private final InboundBufferPool inboundBufferPool;
 
     public SocketFrameHandlerFactory(int connectionTimeout, SocketFactory socketFactory, SocketConfigurator configurator,
                                      boolean ssl) {
@@ -45,10 +46,18 @@ public class SocketFrameHandlerFactory extends AbstractFrameHandlerFactory {
     public SocketFrameHandlerFactory(int connectionTimeout, SocketFactory socketFactory, SocketConfigurator configurator,
                                      boolean ssl, ExecutorService shutdownExecutor, SslContextFactory sslContextFactory,
                                      int maxInboundMessageBodySize) {
+        this(connectionTimeout, socketFactory, configurator, ssl, shutdownExecutor, sslContextFactory,
+             maxInboundMessageBodySize, null);
+    }
+
+    public SocketFrameHandlerFactory(int connectionTimeout, SocketFactory socketFactory, SocketConfigurator configurator,
+                                     boolean ssl, ExecutorService shutdownExecutor, SslContextFactory sslContextFactory,
+                                     int maxInboundMessageBodySize, InboundBufferPool inboundBufferPool) {
         super(connectionTimeout, configurator, ssl, maxInboundMessageBodySize);
         this.socketFactory = socketFactory;
         this.shutdownExecutor = shutdownExecutor;
         this.sslContextFactory = sslContextFactory;
+        this.inboundBufferPool = inboundBufferPool;
     }
 
     public FrameHandler create(Address addr, String connectionName) throws IOException {
@@ -81,7 +90,8 @@ public class SocketFrameHandlerFactory extends AbstractFrameHandlerFactory {
 
     public FrameHandler create(Socket sock) throws IOException
     {
-        return new SocketFrameHandler(sock, this.shutdownExecutor, this.maxInboundMessageBodySize);
+        return new SocketFrameHandler(sock, this.shutdownExecutor, this.maxInboundMessageBodySize,
+            this.inboundBufferPool);
     }
 
     private static void quietTrySocketClose(Socket socket) {
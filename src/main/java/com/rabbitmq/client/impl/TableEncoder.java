@@ -0,0 +1,178 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import java.nio.BufferOverflowException;
+import java.nio.ByteBuffer;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * Encodes tables and arrays in a single pass, for {@link ValueWriter}.
+ * <p>
+ * Length prefixes are reserved and back-patched once the entries are
+ * written, instead of being computed beforehand by walking the values,
+ * nested tables included. The UTF-8 encodings of the keys are cached for
+ * the duration of a write: the tables of an array often share their keys,
+ * e.g. in the <code>x-death</code> header.
+ * <p>
+ * Each thread has its own encoder, see {@link #forCurrentThread()}, so the
+ * buffer is reused by all the value writers of the thread, which are usually
+ * short-lived. When it is too small, the buffer grows in place: the bytes
+ * already written are copied and the encoding goes on.
+ * <p>
+ * Not thread-safe, the returned buffer is valid until the next call.
+ */
+final class TableEncoder {
+
+    private static final int INITIAL_CAPACITY = 1024;
+    /** Capacity above which the buffer is dropped after use, not to retain the memory of a large table */
+    private static final int MAX_RETAINED_CAPACITY = 64 * 1024;
+
+    private static final ThreadLocal<TableEncoder> ENCODERS = ThreadLocal.withInitial(TableEncoder::new);
+
+    private ByteBuffer buffer;
+    private final Map<String, byte[]> keys = new HashMap<>();
+
+    TableEncoder() {
+        this(INITIAL_CAPACITY);
+    }
+
+    TableEncoder(int initialCapacity) {
+        this.buffer = ByteBuffer.allocate(initialCapacity);
+    }
+
+    /** @return the encoder of the current thread, to {@link #release()} once the encoded value is consumed */
+    static TableEncoder forCurrentThread() {
+        return ENCODERS.get();
+    }
+
+    /** @return the encoded table, length prefix included, from position 0 to the buffer position */
+    ByteBuffer encodeTable(Map<String, Object> table) {
+        buffer.clear();
+        try {
+            writeTable(table);
+            return buffer;
+        } finally {
+            keys.clear();
+        }
+    }
+
+    /** @return the encoded array, length prefix included, from position 0 to the buffer position */
+    ByteBuffer encodeArray(Iterable<?> array) {
+        buffer.clear();
+        try {
+            writeArray(array);
+            return buffer;
+        } finally {
+            keys.clear();
+        }
+    }
+
+    /** Drops the buffer if a large value made it grow beyond {@link #MAX_RETAINED_CAPACITY}. */
+    void release() {
+        if (buffer.capacity() > MAX_RETAINED_CAPACITY) {
+            buffer = ByteBuffer.allocate(INITIAL_CAPACITY);
+        }
+    }
+
+    private void writeTable(Map<String, Object> table) {
+        ensureRemaining(4);
+        int lengthPosition = buffer.position();
+        buffer.putInt(0);
+        for (Map.Entry<String, Object> entry : table.entrySet()) {
+            writeKey(entry.getKey());
+            writeFieldValue(entry.getValue());
+        }
+        buffer.putInt(lengthPosition, buffer.position() - lengthPosition - 4);
+    }
+
+    private void writeArray(Iterable<?> array) {
+        ensureRemaining(4);
+        int lengthPosition = buffer.position();
+        buffer.putInt(0);
+        for (Object item : array) {
+            writeFieldValue(item);
+        }
+        buffer.putInt(lengthPosition, buffer.position() - lengthPosition - 4);
+    }
+
+    private void writeKey(String key) {
+        byte[] bytes = keys.get(key);
+        if (bytes == null) {
+            bytes = key.getBytes(StandardCharsets.UTF_8);
+            if (bytes.length > 255) {
+                throw new IllegalArgumentException(
+                        "Short string too long; utf-8 encoded length = " + bytes.length +
+                        ", max = 255.");
+            }
+            keys.put(key, bytes);
+        }
+        ensureRemaining(1 + bytes.length);
+        buffer.put((byte) bytes.length);
+        buffer.put(bytes);
+    }
+
+    private void writeFieldValue(Object value) {
+        if (value instanceof Map) {
+            ensureRemaining(1);
+            buffer.put((byte) 'F');
+            @SuppressWarnings("unchecked")
+            Map<String, Object> map = (Map<String, Object>) value;
+            writeTable(map);
+        } else if (value instanceof List) {
+            ensureRemaining(1);
+            buffer.put((byte) 'A');
+            writeArray((List<?>) value);
+        } else if (value instanceof Object[]) {
+            ensureRemaining(1);
+            buffer.put((byte) 'A');
+            writeArray(Arrays.asList((Object[]) value));
+        } else {
+            int start = buffer.position();
+            try {
+                ByteBufferValueWriter.writeFieldValue(buffer, value);
+            } catch (BufferOverflowException e) {
+                // measured only in this case, to write the value again after it
+                buffer.position(start);
+                ensureRemaining(ByteBufferValueWriter.fieldValueSize(value));
+                ByteBufferValueWriter.writeFieldValue(buffer, value);
+            }
+        }
+    }
+
+    private void ensureRemaining(int size) {
+        if (buffer.remaining() < size) {
+            grow(size);
+        }
+    }
+
+    /** Replaces the buffer with a larger one, with the bytes written so far. */
+    private void grow(int size) {
+        long capacity = Math.max(2L * buffer.capacity(), (long) buffer.position() + size);
+        if (capacity > Integer.MAX_VALUE) {
+            throw new IllegalArgumentException("Table too large to be encoded");
+        }
+        ByteBuffer grown = ByteBuffer.allocate((int) capacity);
+        buffer.flip();
+        grown.put(buffer);
+        buffer = grown;
+    }
+}
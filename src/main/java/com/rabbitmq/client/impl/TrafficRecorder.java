@@ -0,0 +1,467 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.nio.ByteBuffer;
+import java.nio.MappedByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.file.Path;
+import java.nio.file.StandardOpenOption;
+import java.util.ArrayList;
+import java.util.BitSet;
+import java.util.Collections;
+import java.util.List;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.locks.Lock;
+import java.util.concurrent.locks.ReentrantLock;
+import java.util.function.IntPredicate;
+
+/**
+ * Binary recorder of the frames of a connection, a "flight recorder" which
+ * keeps the most recent traffic.
+ * <p>
+ * Frames are appended with a timestamp, their direction and their channel
+ * to a ring buffer of fixed capacity, on the heap or in a memory-mapped file,
+ * the oldest frames are overwritten. Recording a frame copies its payload
+ * once, without any decoding, and the payloads of body frames are truncated
+ * to {@link #setMaxBodyPayload(int) a maximum size}, which bounds the cost
+ * per frame. Method and content header frames are recorded whole, so the
+ * generated decoders can replay them, see {@link Record#getMethod()}.
+ * <p>
+ * Commands can be {@linkplain #setSampling(int) sampled} and channels
+ * {@linkplain #setChannelFilter(IntPredicate) filtered}. The content frames
+ * of a command are recorded only if its method frame is.
+ * <p>
+ * A connection records its frames when the connection factory has a
+ * {@linkplain com.rabbitmq.client.ConnectionFactory#setTrafficRecorderFactory
+ * recorder factory}, each connection needs its own recorder.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#setTrafficRecorderFactory(java.util.function.Supplier)
+ * @since 6.0.0
+ */
+public final class TrafficRecorder {
+
+    /** Default maximum size of the recorded payload of body frames */
+    public static final int DEFAULT_MAX_BODY_PAYLOAD = 256;
+
+    // length, timestamp, direction, type, channel, payload size
+    private static final int RECORD_HEADER_SIZE = 4 + 8 + 1 + 1 + 2 + 4;
+    // magic, capacity, head, tail
+    private static final int FILE_HEADER_SIZE = 4 + 4 + 8 + 8;
+    private static final int MAGIC = 0x414d5152; // "AMQR"
+
+    private final ByteBuffer ring;
+    private final int capacity;
+    /** Header of the file of a mapped recorder, where the positions are persisted, null otherwise */
+    private final ByteBuffer fileHeader;
+    private final Lock lock = new ReentrantLock();
+    private final ByteBuffer recordHeader = ByteBuffer.allocate(RECORD_HEADER_SIZE);
+    private final long epochNanos = TimeUnit.MILLISECONDS.toNanos(System.currentTimeMillis());
+    private final long startNanos = System.nanoTime();
+    // logical positions, the physical position is modulo the capacity
+    private long head;
+    private long tail;
+
+    private volatile int sampling = 1;
+    private volatile IntPredicate channelFilter;
+    private volatile int maxBodyPayload = DEFAULT_MAX_BODY_PAYLOAD;
+    private long sampledCommands;
+    // channels whose last method frame has been recorded, by direction
+    private final BitSet inboundSampledChannels = new BitSet();
+    private final BitSet outboundSampledChannels = new BitSet();
+
+    /**
+     * Creates a recorder with a ring buffer on the heap.
+     * @param capacity the size of the ring buffer, in bytes
+     */
+    public TrafficRecorder(int capacity) {
+        this(ByteBuffer.allocate(checkCapacity(capacity)), null);
+    }
+
+    private TrafficRecorder(ByteBuffer ring, ByteBuffer fileHeader) {
+        this.ring = ring;
+        this.capacity = ring.capacity();
+        this.fileHeader = fileHeader;
+        if (fileHeader != null) {
+            fileHeader.putInt(0, MAGIC);
+            fileHeader.putInt(4, capacity);
+            persistPositions();
+        }
+    }
+
+    /**
+     * Creates a recorder with a ring buffer in a memory-mapped file, which
+     * keeps the traffic if the process dies, see {@link #read(Path)}.
+     * The file is created or overwritten.
+     * @param file the file to map
+     * @param capacity the size of the ring buffer, in bytes
+     * @return the recorder
+     * @throws IOException if the file cannot be mapped
+     */
+    public static TrafficRecorder mapped(Path file, int capacity) throws IOException {
+        checkCapacity(capacity);
+        try (FileChannel channel = FileChannel.open(file, StandardOpenOption.CREATE, StandardOpenOption.READ,
+            StandardOpenOption.WRITE, StandardOpenOption.TRUNCATE_EXISTING)) {
+            MappedByteBuffer buffer = channel.map(FileChannel.MapMode.READ_WRITE, 0, FILE_HEADER_SIZE + (long) capacity);
+            buffer.limit(FILE_HEADER_SIZE);
+            ByteBuffer fileHeader = buffer.slice();
+            buffer.limit(buffer.capacity()).position(FILE_HEADER_SIZE);
+            return new TrafficRecorder(buffer.slice(), fileHeader);
+        }
+    }
+
+    /**
+     * Reads the records of the file of a {@link #mapped(Path, int) mapped recorder},
+     * e.g. after the process that recorded them died.
+     * @param file the file of the recorder
+     * @return the records, from the oldest to the most recent
+     * @throws IOException if the file is not the file of a recorder
+     */
+    public static List<Record> read(Path file) throws IOException {
+        try (FileChannel channel = FileChannel.open(file, StandardOpenOption.READ)) {
+            ByteBuffer buffer = channel.map(FileChannel.MapMode.READ_ONLY, 0, channel.size());
+            if (buffer.capacity() < FILE_HEADER_SIZE || buffer.getInt(0) != MAGIC
+                || buffer.getInt(4) != buffer.capacity() - FILE_HEADER_SIZE) {
+                throw new IOException("Not a traffic recorder file: " + file);
+            }
+            buffer.position(FILE_HEADER_SIZE);
+            TrafficRecorder recorder = new TrafficRecorder(buffer.slice(), null);
+            recorder.head = buffer.getLong(8);
+            recorder.tail = buffer.getLong(16);
+            return recorder.records();
+        }
+    }
+
+    private static int checkCapacity(int capacity) {
+        if (capacity < 1024) {
+            throw new IllegalArgumentException("Capacity must be at least 1024 bytes: " + capacity);
+        }
+        return capacity;
+    }
+
+    /**
+     * Records one command out of {@code sampling}, default is 1, every command.
+     * A heartbeat counts as a command.
+     * @param sampling the sampling rate, 1 to record every command
+     * @return this recorder
+     */
+    public TrafficRecorder setSampling(int sampling) {
+        if (sampling < 1) {
+            throw new IllegalArgumentException("Sampling must be positive: " + sampling);
+        }
+        this.sampling = sampling;
+        return this;
+    }
+
+    /**
+     * Records only the frames of the channels the filter accepts, default
+     * is null, every channel.
+     * @param channelFilter the filter of channel numbers, 0 is the connection
+     * @return this recorder
+     */
+    public TrafficRecorder setChannelFilter(IntPredicate channelFilter) {
+        this.channelFilter = channelFilter;
+        return this;
+    }
+
+    /**
+     * Maximum size of the recorded payload of body frames, default is
+     * {@link #DEFAULT_MAX_BODY_PAYLOAD}. Records keep the actual size.
+     * @param maxBodyPayload the maximum size, in bytes, 0 not to record bodies
+     * @return this recorder
+     */
+    public TrafficRecorder setMaxBodyPayload(int maxBodyPayload) {
+        if (maxBodyPayload < 0) {
+            throw new IllegalArgumentException("Maximum body payload cannot be negative: " + maxBodyPayload);
+        }
+        this.maxBodyPayload = maxBodyPayload;
+        return this;
+    }
+
+    void inbound(Frame frame) {
+        record(true, frame);
+    }
+
+    void outbound(Frame frame) {
+        record(false, frame);
+    }
+
+    void outbound(int type, int channel, byte[] payload, int offset, int length) {
+        if (shouldRecord(false, type, channel)) {
+            append(false, type, channel, payload, offset, length);
+        }
+    }
+
+    /**
+     * Records frames already encoded in an array.
+     */
+    void outbound(byte[] frames, int offset, int length) {
+        ByteBuffer buffer = ByteBuffer.wrap(frames, offset, length);
+        while (buffer.remaining() > 7) {
+            int start = buffer.position();
+            int type = buffer.get() & 0xFF;
+            int channel = buffer.getShort() & 0xFFFF;
+            int size = buffer.getInt();
+            outbound(type, channel, frames, start + 7, size);
+            buffer.position(start + 7 + size + 1);
+        }
+    }
+
+    private void record(boolean inbound, Frame frame) {
+        if (shouldRecord(inbound, frame.getType(), frame.getChannel())) {
+            frame.recordPayload(this, inbound);
+        }
+    }
+
+    /** Called back by {@link Frame#recordPayload(TrafficRecorder, boolean)} */
+    void append(boolean inbound, int type, int channel, byte[] payload, int offset, int length) {
+        int recorded = type == AMQP.FRAME_BODY ? Math.min(length, maxBodyPayload) : length;
+        int recordLength = RECORD_HEADER_SIZE + recorded;
+        if (recordLength > capacity) {
+            return;
+        }
+        long timestamp = epochNanos + System.nanoTime() - startNanos;
+        lock.lock();
+        try {
+            while (tail + recordLength - head > capacity) {
+                head += readInt(head);
+            }
+            recordHeader.clear();
+            recordHeader.putInt(recordLength).putLong(timestamp).put((byte) (inbound ? 0 : 1))
+                .put((byte) type).putShort((short) channel).putInt(length);
+            write(tail, recordHeader.array(), 0, RECORD_HEADER_SIZE);
+            write(tail + RECORD_HEADER_SIZE, payload, offset, recorded);
+            tail += recordLength;
+            persistPositions();
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    private boolean shouldRecord(boolean inbound, int type, int channel) {
+        IntPredicate filter = this.channelFilter;
+        if (filter != null && !filter.test(channel)) {
+            return false;
+        }
+        int rate = this.sampling;
+        if (rate == 1) {
+            return true;
+        }
+        BitSet sampledChannels = inbound ? inboundSampledChannels : outboundSampledChannels;
+        lock.lock();
+        try {
+            if (type == AMQP.FRAME_HEADER || type == AMQP.FRAME_BODY) {
+                return sampledChannels.get(channel);
+            }
+            boolean sampled = sampledCommands++ % rate == 0;
+            if (type == AMQP.FRAME_METHOD) {
+                sampledChannels.set(channel, sampled);
+            }
+            return sampled;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    private void persistPositions() {
+        if (fileHeader != null) {
+            fileHeader.putLong(8, head);
+            fileHeader.putLong(16, tail);
+        }
+    }
+
+    private void write(long position, byte[] source, int offset, int length) {
+        int start = (int) (position % capacity);
+        int first = Math.min(length, capacity - start);
+        ByteBuffer destination = ring.duplicate();
+        destination.position(start);
+        destination.put(source, offset, first);
+        if (first < length) {
+            destination.position(0);
+            destination.put(source, offset + first, length - first);
+        }
+    }
+
+    private void read(long position, byte[] destination, int offset, int length) {
+        int start = (int) (position % capacity);
+        int first = Math.min(length, capacity - start);
+        ByteBuffer source = ring.duplicate();
+        source.position(start);
+        source.get(destination, offset, first);
+        if (first < length) {
+            source.position(0);
+            source.get(destination, offset + first, length - first);
+        }
+    }
+
+    private int readInt(long position) {
+        byte[] bytes = new byte[4];
+        read(position, bytes, 0, 4);
+        return ByteBuffer.wrap(bytes).getInt();
+    }
+
+    /**
+     * @return a copy of the records, from the oldest to the most recent
+     */
+    public List<Record> records() {
+        lock.lock();
+        try {
+            List<Record> records = new ArrayList<>();
+            byte[] header = new byte[RECORD_HEADER_SIZE];
+            for (long position = head; position < tail; ) {
+                read(position, header, 0, RECORD_HEADER_SIZE);
+                ByteBuffer fields = ByteBuffer.wrap(header);
+                int recordLength = fields.getInt();
+                long timestamp = fields.getLong();
+                boolean inbound = fields.get() == 0;
+                int type = fields.get() & 0xFF;
+                int channel = fields.getShort() & 0xFFFF;
+                int payloadSize = fields.getInt();
+                byte[] payload = new byte[recordLength - RECORD_HEADER_SIZE];
+                read(position + RECORD_HEADER_SIZE, payload, 0, payload.length);
+                records.add(new Record(timestamp, inbound, type, channel, payloadSize, payload));
+                position += recordLength;
+            }
+            return Collections.unmodifiableList(records);
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    /**
+     * Writes the recorded frames of a direction as AMQP frames, e.g. to
+     * decode them offline with the codec codegen.py generates.
+     * Truncated body frames are written with their recorded payload.
+     * @param out the stream to write to
+     * @param inbound true for the inbound frames, false for the outbound frames
+     * @throws IOException if writing fails
+     */
+    public void writeFrames(OutputStream out, boolean inbound) throws IOException {
+        DataOutputStream os = new DataOutputStream(out);
+        for (Record record : records()) {
+            if (record.isInbound() == inbound) {
+                record.toFrame().writeTo(os);
+            }
+        }
+        os.flush();
+    }
+
+    /**
+     * A recorded frame.
+     */
+    public static final class Record {
+
+        private final long timestamp;
+        private final boolean inbound;
+        private final int type;
+        private final int channel;
+        private final int payloadSize;
+        private final byte[] payload;
+
+        Record(long timestamp, boolean inbound, int type, int channel, int payloadSize, byte[] payload) {
+            this.timestamp = timestamp;
+            this.inbound = inbound;
+            this.type = type;
+            this.channel = channel;
+            this.payloadSize = payloadSize;
+            this.payload = payload;
+        }
+
+        /**
+         * @return when the frame was recorded, in nanoseconds since the epoch
+         */
+        public long getTimestamp() {
+            return timestamp;
+        }
+
+        public boolean isInbound() {
+            return inbound;
+        }
+
+        /**
+         * @return the frame type, e.g. {@link AMQP#FRAME_METHOD}
+         */
+        public int getType() {
+            return type;
+        }
+
+        public int getChannel() {
+            return channel;
+        }
+
+        /**
+         * @return the size of the payload of the frame, which can be larger
+         * than the recorded payload for body frames
+         */
+        public int getPayloadSize() {
+            return payloadSize;
+        }
+
+        /**
+         * @return the recorded payload
+         */
+        public byte[] getPayload() {
+            return payload;
+        }
+
+        public boolean isTruncated() {
+            return payload.length < payloadSize;
+        }
+
+        /**
+         * Decodes a method frame with the generated decoders.
+         * @return the method, null if the frame is not a method frame
+         * @throws IOException if the payload is not a valid method
+         */
+        public Method getMethod() throws IOException {
+            return type == AMQP.FRAME_METHOD ? AMQImpl.readMethodFrom(ByteBuffer.wrap(payload)) : null;
+        }
+
+        /**
+         * Decodes a content header frame with the generated decoders.
+         * @return the content header, null if the frame is not a content header frame
+         * @throws IOException if the payload is not a valid content header
+         */
+        public AMQContentHeader getContentHeader() throws IOException {
+            return type == AMQP.FRAME_HEADER ? AMQImpl.readContentHeaderFrom(ByteBuffer.wrap(payload)) : null;
+        }
+
+        /**
+         * @return the frame, with the recorded payload
+         */
+        public Frame toFrame() {
+            return new Frame(type, channel, payload);
+        }
+
+        @Override
+        public String toString() {
+            return "Record{" +
+                "timestamp=" + timestamp +
+                ", inbound=" + inbound +
+                ", type=" + type +
+                ", channel=" + channel +
+                ", payloadSize=" + payloadSize +
+                '}';
+        }
+    }
+
+}
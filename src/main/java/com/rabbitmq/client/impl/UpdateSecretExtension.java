@@ -18,6 +18,7 @@ package com.rabbitmq.client.impl;
 import com.rabbitmq.client.LongString;
 
 import java.io.IOException;
+import java.nio.ByteBuffer;
 import java.util.Objects;
 
 /**
@@ -103,6 +104,17 @@ abstract class UpdateSecretExtension {
             writer.writeLongstr(this.newSecret);
             writer.writeShortstr(this.reason);
         }
+
+        public int wireSize() {
+            return 4
+                + ByteBufferValueWriter.longstrSize(this.newSecret)
+                + ByteBufferValueWriter.shortstrSize(this.reason);
+        }
+
+        public void encodeArgumentsTo(ByteBuffer out) {
+            ByteBufferValueWriter.writeLongstr(out, this.newSecret);
+            ByteBufferValueWriter.writeShortstr(out, this.reason);
+        }
     }
 }
 
@@ -22,6 +22,8 @@ import java.io.InputStream;
 import java.io.OutputStream;
 import java.math.BigDecimal;
 import java.math.BigInteger;
+import java.nio.ByteBuffer;
+import java.util.Arrays;
 import java.util.Date;
 import java.util.Map;
 import java.util.List;
@@ -116,11 +118,11 @@ public class ValueWriter
             // Convenience.
             out.writeInt(0);
         } else {
-            out.writeInt((int)Frame.tableSize(table));
-            for(Map.Entry<String,Object> entry: table.entrySet()) {
-                writeShortstr(entry.getKey());
-                Object value = entry.getValue();
-                writeFieldValue(value);
+            TableEncoder encoder = TableEncoder.forCurrentThread();
+            try {
+                writeEncoded(encoder.encodeTable(table));
+            } finally {
+                encoder.release();
             }
         }
     }
@@ -224,10 +226,7 @@ public class ValueWriter
             out.write(0);
         }
         else {
-            out.writeInt((int)Frame.arraySize(value));
-            for (Object item : value) {
-                writeFieldValue(item);
-            }
+            writeEncodedArray(value);
         }
     }
 
@@ -238,13 +237,27 @@ public class ValueWriter
             out.write(0);
         }
         else {
-            out.writeInt((int)Frame.arraySize(value));
-            for (Object item : value) {
-                writeFieldValue(item);
-            }
+            writeEncodedArray(Arrays.asList(value));
         }
     }
 
+    private void writeEncodedArray(Iterable<?> array)
+        throws IOException
+    {
+        TableEncoder encoder = TableEncoder.forCurrentThread();
+        try {
+            writeEncoded(encoder.encodeArray(array));
+        } finally {
+            encoder.release();
+        }
+    }
+
+    private void writeEncoded(ByteBuffer encoded)
+        throws IOException
+    {
+        out.write(encoded.array(), encoded.arrayOffset(), encoded.position());
+    }
+
     /** Public API - encodes an octet from an int. */
     public final void writeOctet(int octet)
         throws IOException
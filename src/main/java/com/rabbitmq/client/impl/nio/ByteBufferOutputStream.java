@@ -42,6 +42,19 @@ public class ByteBufferOutputStream extends OutputStream {
         buffer.put((byte) b);
     }
 
+    @Override
+    public void write(byte[] b, int off, int len) throws IOException {
+        while (len > 0) {
+            if (!buffer.hasRemaining()) {
+                drain(channel, buffer);
+            }
+            int chunk = Math.min(len, buffer.remaining());
+            buffer.put(b, off, chunk);
+            off += chunk;
+            len -= chunk;
+        }
+    }
+
     @Override
     public void flush() throws IOException {
         drain(channel, buffer);
@@ -0,0 +1,43 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl.nio;
+
+import java.io.DataOutputStream;
+import java.io.IOException;
+
+/**
+ * Write request for frames already encoded, e.g. a batch of published messages.
+ *
+ * @see com.rabbitmq.client.impl.FrameHandler#writeFrames(byte[], int, int)
+ */
+public class BytesWriteRequest implements WriteRequest {
+
+    final byte[] frames;
+
+    public BytesWriteRequest(byte[] frames) {
+        this.frames = frames;
+    }
+
+    @Override
+    public void handle(DataOutputStream outputStream) throws IOException {
+        outputStream.write(frames);
+    }
+
+    @Override
+    public void gather(GatheringWrite write) throws IOException {
+        write.reference(frames, 0, frames.length);
+    }
+}
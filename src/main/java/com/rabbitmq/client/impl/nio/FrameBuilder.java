@@ -106,7 +106,12 @@ public class FrameBuilder {
                 }
                 framePayload = new byte[framePayloadSize];
             } else if (bytesRead >= PAYLOAD_OFFSET && bytesRead < framePayload.length + PAYLOAD_OFFSET) {
-                framePayload[bytesRead - PAYLOAD_OFFSET] = (byte) readFromBuffer();
+                // payload, copied in bulk from what the application buffer holds
+                int payloadOffset = bytesRead - PAYLOAD_OFFSET;
+                int length = Math.min(framePayload.length - payloadOffset, applicationBuffer.remaining());
+                applicationBuffer.get(framePayload, payloadOffset, length);
+                bytesRead += length;
+                continue;
             } else if (bytesRead == framePayload.length + PAYLOAD_OFFSET) {
                 int frameEndMarker = readFromBuffer();
                 if (frameEndMarker != AMQP.FRAME_END) {
@@ -15,6 +15,7 @@
 
 package com.rabbitmq.client.impl.nio;
 
+import com.rabbitmq.client.AMQP;
 import com.rabbitmq.client.impl.Frame;
 
 import java.io.DataOutputStream;
@@ -35,4 +36,19 @@ public class FrameWriteRequest implements WriteRequest {
     public void handle(DataOutputStream outputStream) throws IOException {
         frame.writeTo(outputStream);
     }
+
+    @Override
+    public void gather(GatheringWrite write) throws IOException {
+        if (!frame.hasPayloadArray()) {
+            // method, header and heartbeat frames: copy the accumulator, no intermediate array
+            frame.writeTo(write.outputStream());
+            return;
+        }
+        byte[] payload = frame.getPayload();
+        write.writeByte(frame.getType());
+        write.writeShort(frame.getChannel());
+        write.writeInt(payload.length);
+        write.reference(payload, 0, payload.length);
+        write.writeByte(AMQP.FRAME_END);
+    }
 }
@@ -0,0 +1,171 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl.nio;
+
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.nio.ByteBuffer;
+import java.nio.channels.GatheringByteChannel;
+import java.util.Arrays;
+
+/**
+ * Gathers the write requests of a connection to write them with as few
+ * {@link GatheringByteChannel#write(ByteBuffer[], int, int)} calls as possible.
+ * <p>
+ * Small pieces (frame headers, end markers, small payloads) are copied into
+ * the write buffer of the NIO loop, large payloads are referenced, not copied.
+ * Referenced arrays must not change until {@link #flush()} returns, which is
+ * the case for the payloads of write requests: they are not shared with the
+ * application.
+ * <p>
+ * Used by the NIO loop thread only, for plain (non-TLS) connections.
+ *
+ * @see WriteRequest#gather(GatheringWrite)
+ * @since 6.0.0
+ */
+public final class GatheringWrite {
+
+    /** Arrays shorter than this are copied rather than referenced */
+    static final int COPY_THRESHOLD = 256;
+
+    /** Maximum number of buffers of a single write */
+    static final int MAX_BUFFERS = 64;
+
+    private final GatheringByteChannel channel;
+    /** The write buffer of the loop, the copied bytes not written yet start at segmentStart */
+    private final ByteBuffer scratch;
+    /** One more slot for the pending segment of the scratch buffer */
+    private final ByteBuffer[] buffers = new ByteBuffer[MAX_BUFFERS + 1];
+    private int count = 0;
+    private int segmentStart = 0;
+    private long bytesWritten = 0;
+    private final DataOutputStream outputStream = new DataOutputStream(new OutputStream() {
+
+        @Override
+        public void write(int b) throws IOException {
+            writeByte(b);
+        }
+
+        @Override
+        public void write(byte[] b, int off, int len) throws IOException {
+            copy(b, off, len);
+        }
+    });
+
+    GatheringWrite(GatheringByteChannel channel, ByteBuffer scratch) {
+        this.channel = channel;
+        this.scratch = scratch;
+    }
+
+    /** @return a stream copying into the write buffer, for requests that need one */
+    public DataOutputStream outputStream() {
+        return outputStream;
+    }
+
+    public void writeByte(int value) throws IOException {
+        ensureRemaining(1);
+        scratch.put((byte) value);
+    }
+
+    public void writeShort(int value) throws IOException {
+        ensureRemaining(2);
+        scratch.putShort((short) value);
+    }
+
+    public void writeInt(int value) throws IOException {
+        ensureRemaining(4);
+        scratch.putInt(value);
+    }
+
+    /** Copies the bytes into the write buffer. */
+    public void copy(byte[] array, int offset, int length) throws IOException {
+        while (length > 0) {
+            ensureRemaining(1);
+            int chunk = Math.min(length, scratch.remaining());
+            scratch.put(array, offset, chunk);
+            offset += chunk;
+            length -= chunk;
+        }
+    }
+
+    /** Adds the bytes to the write without copying them, unless they are few. */
+    public void reference(byte[] array, int offset, int length) throws IOException {
+        if (length < COPY_THRESHOLD) {
+            copy(array, offset, length);
+            return;
+        }
+        if (count >= MAX_BUFFERS - 1) {
+            // no room for the pending segment and the array
+            flush();
+        }
+        addSegment();
+        buffers[count++] = ByteBuffer.wrap(array, offset, length);
+    }
+
+    /** Writes everything gathered so far. */
+    public void flush() throws IOException {
+        addSegment();
+        if (count > 0) {
+            long remaining = 0;
+            for (int i = 0; i < count; i++) {
+                remaining += buffers[i].remaining();
+            }
+            int first = 0;
+            while (remaining > 0) {
+                long written = channel.write(buffers, first, count - first);
+                remaining -= written;
+                bytesWritten += written;
+                while (first < count && !buffers[first].hasRemaining()) {
+                    first++;
+                }
+            }
+        }
+        reset();
+    }
+
+    /** Discards everything gathered so far, e.g. after an error. */
+    void reset() {
+        Arrays.fill(buffers, 0, count, null);
+        count = 0;
+        scratch.clear();
+        segmentStart = 0;
+    }
+
+    /** @return the number of bytes written since the last call */
+    long takeBytesWritten() {
+        long written = bytesWritten;
+        bytesWritten = 0;
+        return written;
+    }
+
+    private void ensureRemaining(int size) throws IOException {
+        if (scratch.remaining() < size) {
+            flush();
+        }
+    }
+
+    /** Adds the copied bytes not in a buffer yet as a buffer, there must be a free slot. */
+    private void addSegment() {
+        if (scratch.position() > segmentStart) {
+            ByteBuffer segment = scratch.duplicate();
+            segment.limit(scratch.position());
+            segment.position(segmentStart);
+            buffers[count++] = segment;
+            segmentStart = scratch.position();
+        }
+    }
+}
@@ -57,6 +57,8 @@ public class NioLoop implements Runnable {
 
         final ByteBuffer buffer = context.readBuffer;
 
+        final NioLoopStatistics statistics = context.statistics;
+
         final SelectorHolder writeSelectorState = context.writeSelectorState;
         final Selector writeSelector = writeSelectorState.selector;
         final Set<SocketChannelRegistration> writeRegistrations = writeSelectorState.registrations;
@@ -88,9 +90,11 @@ public class NioLoop implements Runnable {
                 }
 
                 int select;
+                long selectStart = System.nanoTime();
                 if (!writeRegistered && registrations.isEmpty() && writeRegistrations.isEmpty()) {
                     // we can block, registrations will call Selector.wakeup()
                     select = selector.select(1000);
+                    statistics.recordSelect(System.nanoTime() - selectStart);
                     if (selector.keys().size() == 0) {
                         // we haven't been doing anything for a while, shutdown state
                         boolean clean = context.cleanUp();
@@ -103,6 +107,7 @@ public class NioLoop implements Runnable {
                 } else {
                     // we don't have to block, we need to select and clean cancelled keys before registration
                     select = selector.selectNow();
+                    statistics.recordSelect(System.nanoTime() - selectStart);
                 }
 
                 writeRegistered = false;
@@ -189,7 +194,9 @@ public class NioLoop implements Runnable {
 
                 // write loop
 
+                selectStart = System.nanoTime();
                 select = writeSelector.selectNow();
+                statistics.recordSelect(System.nanoTime() - selectStart);
 
                 // registrations should be done after select,
                 // once the cancelled keys have been actually removed
@@ -234,15 +241,27 @@ public class NioLoop implements Runnable {
 
                                 int toBeWritten = state.getWriteQueue().size();
                                 int written = 0;
-
-                                DataOutputStream outputStream = state.outputStream;
+                                long bytesWritten = 0;
 
                                 WriteRequest request;
-                                while (written <= toBeWritten && (request = state.getWriteQueue().poll()) != null) {
-                                    request.handle(outputStream);
-                                    written++;
+                                GatheringWrite gatheringWrite = state.gatheringWrite;
+                                if (gatheringWrite != null) {
+                                    // all the queued requests in as few gathering writes as possible
+                                    while (written <= toBeWritten && (request = state.getWriteQueue().poll()) != null) {
+                                        request.gather(gatheringWrite);
+                                        written++;
+                                    }
+                                    gatheringWrite.flush();
+                                    bytesWritten = gatheringWrite.takeBytesWritten();
+                                } else {
+                                    DataOutputStream outputStream = state.outputStream;
+                                    while (written <= toBeWritten && (request = state.getWriteQueue().poll()) != null) {
+                                        request.handle(outputStream);
+                                        written++;
+                                    }
+                                    outputStream.flush();
                                 }
-                                outputStream.flush();
+                                statistics.recordWrite(written, bytesWritten);
                                 if (!state.getWriteQueue().isEmpty()) {
                                     cancelKey = true;
                                 }
@@ -40,12 +40,20 @@ public class NioLoopContext {
 
     final ByteBuffer readBuffer, writeBuffer;
 
+    final NioLoopStatistics statistics;
+
     SelectorHolder readSelectorState;
     SelectorHolder writeSelectorState;
 
     public NioLoopContext(SocketChannelFrameHandlerFactory socketChannelFrameHandlerFactory,
         NioParams nioParams) {
+        this(socketChannelFrameHandlerFactory, nioParams, 0);
+    }
+
+    NioLoopContext(SocketChannelFrameHandlerFactory socketChannelFrameHandlerFactory,
+        NioParams nioParams, int index) {
         this.socketChannelFrameHandlerFactory = socketChannelFrameHandlerFactory;
+        this.statistics = new NioLoopStatistics(index);
         this.executorService = nioParams.getNioExecutor();
         this.threadFactory = nioParams.getThreadFactory();
         NioContext nioContext = new NioContext(nioParams, null);
@@ -0,0 +1,57 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl.nio;
+
+import java.util.List;
+
+/**
+ * Chooses the NIO loop of a new connection.
+ * <p>
+ * The default assigns connections to loops in turn, regardless of
+ * connections that have been closed since.
+ *
+ * @see NioParams#setNioLoopSelector(NioLoopSelector)
+ * @see NioParams#setNbIoThreads(int)
+ * @since 6.0.0
+ */
+@FunctionalInterface
+public interface NioLoopSelector {
+
+    /**
+     * Chooses the loop of a new connection.
+     *
+     * @param loops the statistics of the loops, in index order
+     * @return the index of the loop to use
+     */
+    int select(List<NioLoopStatistics> loops);
+
+    /**
+     * Selector of the loop with the fewest open connections, the first one on ties.
+     *
+     * @return the selector
+     */
+    static NioLoopSelector leastConnections() {
+        return loops -> {
+            int selected = 0;
+            for (int i = 1; i < loops.size(); i++) {
+                if (loops.get(i).getConnectionCount() < loops.get(selected).getConnectionCount()) {
+                    selected = i;
+                }
+            }
+            return selected;
+        };
+    }
+}
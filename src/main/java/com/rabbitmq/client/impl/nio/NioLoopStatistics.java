@@ -0,0 +1,136 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl.nio;
+
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.LongAdder;
+
+/**
+ * Statistics of a NIO loop: connections, write queue depth, bytes written
+ * per write wake-up and time spent in selectors.
+ * <p>
+ * Counters updated by the loop thread only are plain volatile fields,
+ * the others are thread-safe.
+ *
+ * @see com.rabbitmq.client.ConnectionFactory#getNioLoopStatistics()
+ * @see NioLoopSelector
+ * @since 6.0.0
+ */
+public final class NioLoopStatistics {
+
+    private final int index;
+    private final AtomicInteger connections = new AtomicInteger();
+    private final LongAdder writeRequestsQueued = new LongAdder();
+    private final LongAdder writeRequestsDiscarded = new LongAdder();
+    private volatile long writeRequestsWritten;
+    private volatile long writeWakeUps;
+    private volatile long bytesWritten;
+    private volatile long selects;
+    private volatile long selectNanos;
+
+    NioLoopStatistics(int index) {
+        this.index = index;
+    }
+
+    void connectionOpened() {
+        connections.incrementAndGet();
+    }
+
+    void connectionClosed() {
+        connections.decrementAndGet();
+    }
+
+    void writeRequestQueued() {
+        writeRequestsQueued.increment();
+    }
+
+    /** Write requests still queued when their connection closes. */
+    void writeRequestsDiscarded(int requests) {
+        writeRequestsDiscarded.add(requests);
+    }
+
+    /** Loop thread only. */
+    void recordWrite(int requests, long bytes) {
+        writeRequestsWritten += requests;
+        writeWakeUps++;
+        bytesWritten += bytes;
+    }
+
+    /** Loop thread only. */
+    void recordSelect(long nanos) {
+        selects++;
+        selectNanos += nanos;
+    }
+
+    /** @return the index of the loop, between 0 and {@link NioParams#getNbIoThreads()} - 1 */
+    public int getIndex() {
+        return index;
+    }
+
+    /** @return the number of open connections handled by the loop */
+    public int getConnectionCount() {
+        return connections.get();
+    }
+
+    /** @return the number of write requests queued and not written yet, for all the connections of the loop */
+    public long getWriteQueueDepth() {
+        return Math.max(0, writeRequestsQueued.sum() - writeRequestsDiscarded.sum() - writeRequestsWritten);
+    }
+
+    /** @return the number of write requests written */
+    public long getWriteRequestsWritten() {
+        return writeRequestsWritten;
+    }
+
+    /** @return the number of times the loop wrote the queued requests of a connection */
+    public long getWriteWakeUps() {
+        return writeWakeUps;
+    }
+
+    /** @return the number of bytes written, for plain (non-TLS) connections */
+    public long getBytesWritten() {
+        return bytesWritten;
+    }
+
+    /** @return the average number of bytes written per write wake-up, for plain (non-TLS) connections */
+    public double getBytesPerWriteWakeUp() {
+        long wakeUps = writeWakeUps;
+        return wakeUps == 0 ? 0 : (double) bytesWritten / wakeUps;
+    }
+
+    /** @return the number of selector calls */
+    public long getSelects() {
+        return selects;
+    }
+
+    /** @return the time spent in selector calls, blocking included, in nanoseconds */
+    public long getSelectNanos() {
+        return selectNanos;
+    }
+
+    @Override
+    public String toString() {
+        return "NioLoopStatistics{" +
+            "index=" + index +
+            ", connections=" + getConnectionCount() +
+            ", writeQueueDepth=" + getWriteQueueDepth() +
+            ", writeWakeUps=" + writeWakeUps +
+            ", bytesWritten=" + bytesWritten +
+            ", selects=" + selects +
+            ", selectNanos=" + selectNanos +
+            '}';
+    }
+}
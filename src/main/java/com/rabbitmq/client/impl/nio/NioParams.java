@@ -109,6 +109,13 @@ public class NioParams {
     private Function<NioContext, NioQueue> writeQueueFactory =
         DEFAULT_WRITE_QUEUE_FACTORY;
 
+    /**
+     * Chooses the NIO loop of new connections.
+     *
+     * @since 6.0.0
+     */
+    private NioLoopSelector nioLoopSelector;
+
     public NioParams() {
     }
 
@@ -125,6 +132,7 @@ public class NioParams {
         setConnectionShutdownExecutor(nioParams.getConnectionShutdownExecutor());
         setByteBufferFactory(nioParams.getByteBufferFactory());
         setWriteQueueFactory(nioParams.getWriteQueueFactory());
+        setNioLoopSelector(nioParams.getNioLoopSelector());
     }
 
     /**
@@ -425,4 +433,27 @@ public class NioParams {
     public Function<NioContext, NioQueue> getWriteQueueFactory() {
         return writeQueueFactory;
     }
+
+    /**
+     * Set the selector of the NIO loop of new connections, when
+     * there are {@link #setNbIoThreads(int) several loops}.
+     * <p>
+     * The default assigns connections to loops in turn.
+     * {@link NioLoopSelector#leastConnections()} balances the loops
+     * better when connections are closed and re-created.
+     *
+     * @param nioLoopSelector the selector to use
+     * @return this {@link NioParams} instance
+     * @see NioLoopSelector
+     * @see NioLoopStatistics
+     * @since 6.0.0
+     */
+    public NioParams setNioLoopSelector(NioLoopSelector nioLoopSelector) {
+        this.nioLoopSelector = nioLoopSelector;
+        return this;
+    }
+
+    public NioLoopSelector getNioLoopSelector() {
+        return nioLoopSelector;
+    }
 }
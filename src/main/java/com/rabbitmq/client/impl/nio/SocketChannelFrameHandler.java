@@ -15,6 +15,7 @@
 
 package com.rabbitmq.client.impl.nio;
 
+import com.rabbitmq.client.AMQP;
 import com.rabbitmq.client.impl.AMQConnection;
 import com.rabbitmq.client.impl.Frame;
 import com.rabbitmq.client.impl.FrameHandler;
@@ -24,6 +25,8 @@ import org.slf4j.LoggerFactory;
 import java.io.IOException;
 import java.net.InetAddress;
 import java.net.SocketException;
+import java.nio.ByteBuffer;
+import java.util.Arrays;
 
 /**
  *
@@ -88,6 +91,21 @@ public class SocketChannelFrameHandler implements FrameHandler {
         state.write(frame);
     }
 
+    @Override
+    public void writeFrame(int type, int channel, byte[] payload, int offset, int length) throws IOException {
+        // one exact array for the whole frame, the write is asynchronous and the caller can reuse the payload
+        byte[] frame = new byte[length + 8];
+        ByteBuffer buffer = ByteBuffer.wrap(frame);
+        buffer.put((byte) type).putShort((short) channel).putInt(length).put(payload, offset, length).put((byte) AMQP.FRAME_END);
+        state.write(frame);
+    }
+
+    @Override
+    public void writeFrames(byte[] frames, int offset, int length) throws IOException {
+        // the write is asynchronous and the caller can reuse the array
+        state.write(Arrays.copyOfRange(frames, offset, offset + length));
+    }
+
     @Override
     public void flush() throws IOException {
 
@@ -36,6 +36,7 @@ import java.net.InetSocketAddress;
 import java.net.SocketAddress;
 import java.nio.channels.SocketChannel;
 import java.util.ArrayList;
+import java.util.Collections;
 import java.util.List;
 import java.util.concurrent.atomic.AtomicLong;
 import java.util.concurrent.locks.Lock;
@@ -58,6 +59,8 @@ public class SocketChannelFrameHandlerFactory extends AbstractFrameHandlerFactor
 
     private final List<NioLoopContext> nioLoopContexts;
 
+    private final List<NioLoopStatistics> nioLoopStatistics;
+
     public SocketChannelFrameHandlerFactory(int connectionTimeout, NioParams nioParams, boolean ssl,
                                             SslContextFactory sslContextFactory,
                                             int maxInboundMessageBodySize) {
@@ -66,8 +69,13 @@ public class SocketChannelFrameHandlerFactory extends AbstractFrameHandlerFactor
         this.sslContextFactory = sslContextFactory;
         this.nioLoopContexts = new ArrayList<>(this.nioParams.getNbIoThreads());
         for (int i = 0; i < this.nioParams.getNbIoThreads(); i++) {
-            this.nioLoopContexts.add(new NioLoopContext(this, this.nioParams));
+            this.nioLoopContexts.add(new NioLoopContext(this, this.nioParams, i));
+        }
+        List<NioLoopStatistics> statistics = new ArrayList<>(this.nioLoopContexts.size());
+        for (NioLoopContext nioLoopContext : this.nioLoopContexts) {
+            statistics.add(nioLoopContext.statistics);
         }
+        this.nioLoopStatistics = Collections.unmodifiableList(statistics);
     }
 
     @Override
@@ -129,8 +137,17 @@ public class SocketChannelFrameHandlerFactory extends AbstractFrameHandlerFactor
             stateLock.lock();
             NioLoopContext nioLoopContext = null;
             try {
-                long modulo = globalConnectionCount.getAndIncrement() % nioParams.getNbIoThreads();
-                nioLoopContext = nioLoopContexts.get((int) modulo);
+                int index;
+                if (nioParams.getNioLoopSelector() == null) {
+                    index = (int) (globalConnectionCount.getAndIncrement() % nioParams.getNbIoThreads());
+                } else {
+                    index = nioParams.getNioLoopSelector().select(nioLoopStatistics);
+                    if (index < 0 || index >= nioLoopContexts.size()) {
+                        throw new IllegalStateException("NIO loop selector returned index " + index
+                            + ", there are " + nioLoopContexts.size() + " loops");
+                    }
+                }
+                nioLoopContext = nioLoopContexts.get(index);
                 nioLoopContext.initStateIfNecessary();
                 SocketChannelFrameHandlerState state = new SocketChannelFrameHandlerState(
                     channel,
@@ -163,6 +180,15 @@ public class SocketChannelFrameHandlerFactory extends AbstractFrameHandlerFactor
 
     }
 
+    /**
+     * Statistics of the NIO loops, in index order.
+     * @return the statistics
+     * @since 6.0.0
+     */
+    public List<NioLoopStatistics> getLoopStatistics() {
+        return nioLoopStatistics;
+    }
+
     void lock() {
         stateLock.lock();
     }
@@ -26,6 +26,7 @@ import java.io.IOException;
 import java.nio.ByteBuffer;
 import java.nio.channels.SelectionKey;
 import java.nio.channels.SocketChannel;
+import java.util.concurrent.atomic.AtomicBoolean;
 
 
 /**
@@ -69,14 +70,22 @@ public class SocketChannelFrameHandlerState {
 
     final DataOutputStream outputStream;
 
+    /** gathers the write requests of plain connections, null if TLS is on */
+    final GatheringWrite gatheringWrite;
+
     final FrameBuilder frameBuilder;
 
+    final NioLoopStatistics statistics;
+
+    private final AtomicBoolean closed = new AtomicBoolean(false);
+
     public SocketChannelFrameHandlerState(SocketChannel channel, NioLoopContext nioLoopsState,
                                           NioParams nioParams, SSLEngine sslEngine,
                                           int maxFramePayloadSize) {
         this.channel = channel;
         this.readSelectorState = nioLoopsState.readSelectorState;
         this.writeSelectorState = nioLoopsState.writeSelectorState;
+        this.statistics = nioLoopsState.statistics;
 
         NioContext nioContext = new NioContext(nioParams, sslEngine);
 
@@ -92,9 +101,8 @@ public class SocketChannelFrameHandlerState {
             this.plainIn = nioLoopsState.readBuffer;
             this.cipherIn = null;
 
-            this.outputStream = new DataOutputStream(
-                new ByteBufferOutputStream(channel, plainOut)
-            );
+            this.gatheringWrite = new GatheringWrite(channel, plainOut);
+            this.outputStream = this.gatheringWrite.outputStream();
 
             this.frameBuilder = new FrameBuilder(channel, plainIn, maxFramePayloadSize);
 
@@ -108,9 +116,11 @@ public class SocketChannelFrameHandlerState {
             this.outputStream = new DataOutputStream(
                 new SslEngineByteBufferOutputStream(sslEngine, plainOut, cipherOut, channel)
             );
+            this.gatheringWrite = null;
             this.frameBuilder = new SslEngineFrameBuilder(sslEngine, plainIn,
                 cipherIn, channel, maxFramePayloadSize);
         }
+        this.statistics.connectionOpened();
 
     }
 
@@ -130,10 +140,15 @@ public class SocketChannelFrameHandlerState {
         sendWriteRequest(new FrameWriteRequest(frame));
     }
 
+    public void write(byte[] frames) throws IOException {
+        sendWriteRequest(new BytesWriteRequest(frames));
+    }
+
     private void sendWriteRequest(WriteRequest writeRequest) throws IOException {
         try {
             boolean offered = this.writeQueue.offer(writeRequest);
             if(offered) {
+                this.statistics.writeRequestQueued();
                 this.writeSelectorState.registerFrameHandlerState(this, SelectionKey.OP_WRITE);
                 this.readSelectorState.selector.wakeup();
             } else {
@@ -174,7 +189,7 @@ public class SocketChannelFrameHandlerState {
 
     void endWriteSequence() {
         if(!ssl) {
-            plainOut.clear();
+            gatheringWrite.reset();
         }
     }
 
@@ -229,6 +244,10 @@ public class SocketChannelFrameHandlerState {
     }
 
     void close() throws IOException {
+        if (closed.compareAndSet(false, true)) {
+            statistics.connectionClosed();
+            statistics.writeRequestsDiscarded(writeQueue.size());
+        }
         if(ssl) {
             SslEngineHelper.close(channel, sslEngine);
         }
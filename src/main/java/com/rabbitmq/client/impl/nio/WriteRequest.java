@@ -25,4 +25,16 @@ public interface WriteRequest {
 
     void handle(DataOutputStream dataOutputStream) throws IOException;
 
+    /**
+     * Adds the bytes of the request to a gathering write, for plain connections.
+     * The default implementation copies them with {@link #handle(DataOutputStream)}.
+     *
+     * @param write the gathering write of the connection
+     * @throws IOException if writing fails
+     * @since 6.0.0
+     */
+    default void gather(GatheringWrite write) throws IOException {
+        handle(write.outputStream());
+    }
+
 }
@@ -221,6 +221,16 @@ public class AutorecoveringChannel implements RecoverableChannel {
         delegate.basicPublish(exchange, routingKey, mandatory, immediate, props, body);
     }
 
+    @Override
+    public long basicPublishBatch(List<OutboundMessage> messages) throws IOException {
+        return delegate.basicPublishBatch(messages);
+    }
+
+    @Override
+    public CompletableFuture<Boolean> basicPublishBatchAsync(List<OutboundMessage> messages) throws IOException {
+        return delegate.basicPublishBatchAsync(messages);
+    }
+
     @Override
     public AMQP.Exchange.DeclareOk exchangeDeclare(String exchange, String type) throws IOException {
         return exchangeDeclare(exchange, type, false, false, null);
@@ -941,6 +951,29 @@ public class AutorecoveringChannel implements RecoverableChannel {
         return future;
     }
 
+    @Override
+    public List<Command> batchRpc(List<? extends Method> methods) throws IOException {
+        for (Method method : methods) {
+            recordOnRpcRequest(method);
+        }
+        List<Command> responses;
+        try {
+            responses = delegate.batchRpc(methods);
+        } catch (BatchRpcException e) {
+            // the methods before the failing one have been executed
+            recordOnRpcResponses(e.getReplies(), methods);
+            throw e;
+        }
+        recordOnRpcResponses(responses, methods);
+        return responses;
+    }
+
+    private void recordOnRpcResponses(List<Command> responses, List<? extends Method> methods) {
+        for (int i = 0; i < responses.size(); i++) {
+            recordOnRpcResponse(responses.get(i).getMethod(), methods.get(i));
+        }
+    }
+
     private void recordOnRpcRequest(Method method) {
         if (method instanceof AMQP.Queue.Delete) {
             deleteRecordedQueue(((AMQP.Queue.Delete) method).getQueue());
@@ -38,6 +38,8 @@ import java.util.concurrent.TimeUnit;
 import java.util.concurrent.TimeoutException;
 import java.util.concurrent.locks.Lock;
 import java.util.concurrent.locks.ReentrantLock;
+import java.util.function.BiConsumer;
+import java.util.function.Function;
 import java.util.function.Predicate;
 
 /**
@@ -717,16 +719,24 @@ public class AutorecoveringConnection implements RecoverableConnection, NetworkC
         // 3. Recover bindings
         // 4. Recover consumers
         if (executor == null) {
-            // recover entities in serial on the main connection thread
-            for (final RecordedExchange exchange : Utility.copy(recordedExchanges).values()) {
-                recoverExchange(exchange, true);
-            }
-            for (final Map.Entry<String, RecordedQueue> entry : Utility.copy(recordedQueues).entrySet()) {
-                recoverQueue(entry.getKey(), entry.getValue(), true);
-            }
-            for (final RecordedBinding b : Utility.copy(recordedBindings)) {
-                recoverBinding(b, true);
-            }
+            // recover entities in serial on the main connection thread,
+            // with pipelined declarations on each channel
+            recoverEntitiesPipelined(Utility.copy(recordedExchanges).values(),
+                topologyRecoveryFilter::filterExchange, RecordedExchange::recoveryMethod,
+                (x, reply) -> LOGGER.debug("{} has recovered", x),
+                x -> recoverExchange(x, true));
+            recoverEntitiesPipelined(Utility.copy(recordedQueues).values(),
+                topologyRecoveryFilter::filterQueue, RecordedQueue::recoveryMethod,
+                (q, reply) -> {
+                    String oldName = q.getName();
+                    q.recovered((AMQP.Queue.DeclareOk) reply.getMethod());
+                    queueRecovered(oldName, q);
+                },
+                q -> recoverQueue(q.getName(), q, true));
+            recoverEntitiesPipelined(Utility.copy(recordedBindings),
+                topologyRecoveryFilter::filterBinding, AutorecoveringConnection::bindingRecoveryMethod,
+                (b, reply) -> LOGGER.debug("{} has recovered", b),
+                b -> recoverBinding(b, true));
             for (final Map.Entry<String, RecordedConsumer> entry : Utility.copy(consumers).entrySet()) {
                 recoverConsumer(entry.getKey(), entry.getValue(), true);
             }
@@ -748,6 +758,60 @@ public class AutorecoveringConnection implements RecoverableConnection, NetworkC
         }
     }
 
+    /**
+     * Recovers entities with a pipelined batch of declarations per channel, see {@link Channel#batchRpc(List)}.
+     * If a batch fails, the entities without a reply are recovered one by one, with retries and
+     * errors delivered to the connection's {@link ExceptionHandler}.
+     * Entities alone on their channel are recovered one by one directly.
+     */
+    private <E extends RecordedEntity> void recoverEntitiesPipelined(Collection<E> entities, Predicate<E> filter,
+                                                                     Function<E, Method> recoveryMethod,
+                                                                     BiConsumer<E, Command> onRecovered,
+                                                                     java.util.function.Consumer<E> recoverOneByOne) {
+        Map<AutorecoveringChannel, List<E>> entitiesByChannel = new LinkedHashMap<>();
+        for (E entity : entities) {
+            if (filter.test(entity)) {
+                entitiesByChannel.computeIfAbsent(entity.getChannel(), c -> new ArrayList<>()).add(entity);
+            }
+        }
+        for (List<E> batch : entitiesByChannel.values()) {
+            if (batch.size() == 1) {
+                recoverOneByOne.accept(batch.get(0));
+                continue;
+            }
+            List<Method> methods = new ArrayList<>(batch.size());
+            for (E entity : batch) {
+                methods.add(recoveryMethod.apply(entity));
+            }
+            List<Command> replies;
+            try {
+                replies = batch.get(0).getDelegateChannel().batchRpc(methods);
+            } catch (BatchRpcException e) {
+                // the entities before the failing one are recovered
+                replies = e.getReplies();
+                LOGGER.debug("Pipelined recovery of {} entities failed after {} replies, recovering the others one by one: {}",
+                    batch.size(), replies.size(), e.getCause() == null ? e.getMessage() : e.getCause().getMessage());
+            } catch (Exception e) {
+                LOGGER.debug("Pipelined recovery of {} entities failed, recovering them one by one: {}",
+                    batch.size(), e.getMessage());
+                replies = Collections.emptyList();
+            }
+            for (int i = 0; i < replies.size(); i++) {
+                onRecovered.accept(batch.get(i), replies.get(i));
+            }
+            for (int i = replies.size(); i < batch.size(); i++) {
+                recoverOneByOne.accept(batch.get(i));
+            }
+        }
+    }
+
+    private static Method bindingRecoveryMethod(RecordedBinding b) {
+        if (b instanceof RecordedQueueBinding) {
+            return ((RecordedQueueBinding) b).recoveryMethod();
+        }
+        return ((RecordedExchangeBinding) b).recoveryMethod();
+    }
+
     public void recoverExchange(RecordedExchange x, boolean retry) {
         // recorded exchanges are guaranteed to be non-predefined (we filter out predefined ones in exchangeDeclare). MK.
         try {
@@ -810,24 +874,28 @@ public class AutorecoveringConnection implements RecoverableConnection, NetworkC
             } else {
                 q.recover();
             }
-            String newName = q.getName();
-            if (!oldName.equals(newName)) {
-                // make sure queues are re-added with
-                // their new names, if applicable. MK.
-                propagateQueueNameChangeToBindings(oldName, newName);
-                propagateQueueNameChangeToConsumers(oldName, newName);
-                synchronized (this.recordedQueues) {
-                    // bug26552:
-                    // remove old name after we've updated the bindings and consumers,
-                    deleteRecordedQueue(oldName);
-                    this.recordedQueues.put(newName, q);
-                }
-            }
-            for (QueueRecoveryListener qrl : Utility.copy(this.queueRecoveryListeners)) {
-                qrl.queueRecovered(oldName, newName);
+            queueRecovered(oldName, q);
+        }
+    }
+
+    private void queueRecovered(final String oldName, RecordedQueue q) {
+        String newName = q.getName();
+        if (!oldName.equals(newName)) {
+            // make sure queues are re-added with
+            // their new names, if applicable. MK.
+            propagateQueueNameChangeToBindings(oldName, newName);
+            propagateQueueNameChangeToConsumers(oldName, newName);
+            synchronized (this.recordedQueues) {
+                // bug26552:
+                // remove old name after we've updated the bindings and consumers,
+                deleteRecordedQueue(oldName);
+                this.recordedQueues.put(newName, q);
             }
-            LOGGER.debug("{} has recovered", q);
         }
+        for (QueueRecoveryListener qrl : Utility.copy(this.queueRecoveryListeners)) {
+            qrl.queueRecovered(oldName, newName);
+        }
+        LOGGER.debug("{} has recovered", q);
     }
 
     public void recoverBinding(RecordedBinding b, boolean retry) {
@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client.impl.recovery;
 
+import com.rabbitmq.client.AMQP;
+
 import java.io.IOException;
 import java.util.Map;
 
@@ -36,6 +38,15 @@ public class RecordedExchange extends RecordedNamedEntity {
         this.channel.getDelegate().exchangeDeclare(this.name, this.type, this.durable, this.autoDelete, this.arguments);
     }
 
+    /** @return the method {@link #recover()} sends, for pipelined recovery */
+    AMQP.Exchange.Declare recoveryMethod() {
+        return new AMQP.Exchange.Declare.Builder()
+            .exchange(this.name).type(this.type)
+            .durable(this.durable).autoDelete(this.autoDelete)
+            .arguments(this.arguments)
+            .build();
+    }
+
     public RecordedExchange durable(boolean value) {
         this.durable = value;
         return this;
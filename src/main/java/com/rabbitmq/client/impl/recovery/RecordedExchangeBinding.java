@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client.impl.recovery;
 
+import com.rabbitmq.client.AMQP;
+
 import java.io.IOException;
 
 /**
@@ -30,6 +32,14 @@ public class RecordedExchangeBinding extends RecordedBinding {
         this.channel.getDelegate().exchangeBind(this.destination, this.source, this.routingKey, this.arguments);
     }
     
+    /** @return the method {@link #recover()} sends, for pipelined recovery */
+    AMQP.Exchange.Bind recoveryMethod() {
+        return new AMQP.Exchange.Bind.Builder()
+            .destination(this.destination).source(this.source)
+            .routingKey(this.routingKey).arguments(this.arguments)
+            .build();
+    }
+
     @Override
     public String toString() {
         return "RecordedExchangeBinding[source=" + source + ", destination=" + destination + ", routingKey=" + routingKey + ", arguments=" + arguments + ", channel=" + channel + "]";
@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client.impl.recovery;
 
+import com.rabbitmq.client.AMQP;
+
 import java.io.IOException;
 import java.util.Map;
 
@@ -64,6 +66,20 @@ public class RecordedQueue extends RecordedNamedEntity {
                                                      this.arguments).getQueue();
     }
 
+    /** @return the method {@link #recover()} sends, for pipelined recovery */
+    AMQP.Queue.Declare recoveryMethod() {
+        return new AMQP.Queue.Declare.Builder()
+            .queue(this.getNameToUseForRecovery())
+            .durable(this.durable).exclusive(this.exclusive).autoDelete(this.autoDelete)
+            .arguments(this.arguments)
+            .build();
+    }
+
+    /** Completes a pipelined recovery with the reply to {@link #recoveryMethod()} */
+    void recovered(AMQP.Queue.DeclareOk ok) {
+        this.name = ok.getQueue();
+    }
+
     public String getNameToUseForRecovery() {
         return recoveredQueueNameSupplier.getNameToUseForRecovery(this);
     }
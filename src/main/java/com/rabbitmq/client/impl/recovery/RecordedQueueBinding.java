@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client.impl.recovery;
 
+import com.rabbitmq.client.AMQP;
+
 import java.io.IOException;
 
 /**
@@ -30,6 +32,14 @@ public class RecordedQueueBinding extends RecordedBinding {
         this.channel.getDelegate().queueBind(this.destination, this.source, this.routingKey, this.arguments);
     }
     
+    /** @return the method {@link #recover()} sends, for pipelined recovery */
+    AMQP.Queue.Bind recoveryMethod() {
+        return new AMQP.Queue.Bind.Builder()
+            .queue(this.destination).exchange(this.source)
+            .routingKey(this.routingKey).arguments(this.arguments)
+            .build();
+    }
+
     @Override
     public String toString() {
         return "RecordedQueueBinding[source=" + source + ", destination=" + destination + ", routingKey=" + routingKey + ", arguments=" + arguments + ", channel=" + channel + "]";
@@ -22,7 +22,6 @@ import com.rabbitmq.client.impl.AMQConnection;
 import com.rabbitmq.client.impl.AMQImpl;
 import com.rabbitmq.client.impl.ChannelN;
 import com.rabbitmq.client.impl.ConsumerWorkService;
-import com.rabbitmq.client.impl.AMQImpl.Basic;
 import com.rabbitmq.client.observation.ObservationCollector;
 
 import java.io.IOException;
@@ -109,7 +108,7 @@ public class RecoveryAwareChannelN extends ChannelN {
             // therefore we should do nothing
             return;
         }
-        transmit(new Basic.Ack(realTag, multiple));
+        transmitAck(realTag, multiple);
         metricsCollector.basicAck(this, deliveryTag, multiple);
     }
 
@@ -125,7 +124,7 @@ public class RecoveryAwareChannelN extends ChannelN {
             // therefore we should do nothing
             return;
         }
-        transmit(new Basic.Nack(realTag, multiple, requeue));
+        transmitNack(realTag, multiple, requeue);
         metricsCollector.basicNack(this, deliveryTag);
     }
 
@@ -136,7 +135,7 @@ public class RecoveryAwareChannelN extends ChannelN {
         // multiple deliveries at once
         long realTag = deliveryTag - activeDeliveryTagOffset;
         if (realTag > 0) {
-            transmit(new Basic.Reject(realTag, requeue));
+            transmitReject(realTag, requeue);
             metricsCollector.basicReject(this, deliveryTag);
         }
     }
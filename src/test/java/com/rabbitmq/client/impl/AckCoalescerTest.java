@@ -0,0 +1,214 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.Channel;
+import com.rabbitmq.client.Command;
+import com.rabbitmq.client.Connection;
+import com.rabbitmq.client.ConnectionFactory;
+import com.rabbitmq.client.TrafficListener;
+import com.rabbitmq.client.test.StubBroker;
+import org.junit.jupiter.api.Test;
+
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.TimeUnit;
+
+import static org.assertj.core.api.Assertions.assertThat;
+
+public class AckCoalescerTest {
+
+    private static final long NEVER = TimeUnit.HOURS.toNanos(1);
+
+    // sent acks, "n" for a single ack, "n+" for a multiple ack
+    private final List<String> sent = new ArrayList<>();
+    private final AckCoalescer.AckSender sender = (tag, multiple) -> sent.add(tag + (multiple ? "+" : ""));
+
+    @Test
+    public void contiguousAcksAreSentAsOneMultipleAck() throws IOException {
+        AckCoalescer coalescer = new AckCoalescer(3, NEVER);
+        coalescer.ack(1, false, sender);
+        coalescer.ack(2, false, sender);
+        assertThat(sent).isEmpty();
+        coalescer.ack(3, false, sender);
+        assertThat(sent).containsExactly("3+");
+        assertThat(coalescer.nanosUntilDue(System.nanoTime())).isEqualTo(-1);
+    }
+
+    @Test
+    public void acksAfterGapAreSentOneByOne() throws IOException {
+        AckCoalescer coalescer = new AckCoalescer(10, NEVER);
+        coalescer.ack(1, false, sender);
+        coalescer.ack(3, false, sender);
+        coalescer.flush(sender);
+        assertThat(sent).containsExactly("1", "3");
+
+        sent.clear();
+        coalescer.ack(2, false, sender);
+        coalescer.ack(4, false, sender);
+        coalescer.flush(sender);
+        // 3 is already acked, a multiple ack does not cover it twice
+        assertThat(sent).containsExactly("4+");
+    }
+
+    @Test
+    public void rejectedDeliveriesDoNotBreakContiguity() throws IOException {
+        AckCoalescer coalescer = new AckCoalescer(10, NEVER);
+        coalescer.ack(1, false, sender);
+        coalescer.settle(2, false);
+        coalescer.ack(3, false, sender);
+        coalescer.flush(sender);
+        assertThat(sent).containsExactly("3+");
+    }
+
+    @Test
+    public void multipleNackAndAckSettleUpToTheirTag() throws IOException {
+        AckCoalescer coalescer = new AckCoalescer(10, NEVER);
+        coalescer.ack(1, false, sender);
+        coalescer.flush(sender);
+        coalescer.settle(3, true);
+        coalescer.ack(4, false, sender);
+        coalescer.ack(5, false, sender);
+        coalescer.flush(sender);
+        coalescer.ack(7, true, sender);
+        coalescer.ack(8, false, sender);
+        coalescer.flush(sender);
+        assertThat(sent).containsExactly("1", "5+", "7+", "8");
+    }
+
+    @Test
+    public void acksAreSentOnceDue() throws IOException {
+        AckCoalescer coalescer = new AckCoalescer(10, 0);
+        coalescer.ack(1, false, sender);
+        assertThat(sent).containsExactly("1");
+
+        sent.clear();
+        coalescer = new AckCoalescer(10, NEVER);
+        coalescer.ack(1, false, sender);
+        long now = System.nanoTime();
+        assertThat(coalescer.nanosUntilDue(now)).isPositive().isLessThanOrEqualTo(NEVER);
+        assertThat(coalescer.nanosUntilDue(now + NEVER)).isZero();
+    }
+
+    @Test
+    public void coalescingIsGivenUpAfterLongGap() throws IOException {
+        AckCoalescer coalescer = new AckCoalescer(10, NEVER);
+        coalescer.ack(2, false, sender);
+        coalescer.ack(AckCoalescer.MAX_SPAN + 2, false, sender);
+        assertThat(sent).containsExactly("2", String.valueOf(AckCoalescer.MAX_SPAN + 2));
+
+        sent.clear();
+        coalescer.ack(1, false, sender);
+        coalescer.ack(3, false, sender);
+        assertThat(sent).containsExactly("1", "3");
+    }
+
+    @Test
+    public void pendingAcksAreSentBeforeTxCommitAndRollback() throws Exception {
+        List<String> methods = coalescedAcksAround(channel -> {
+            channel.txSelect();
+            ackOne(channel);
+            channel.txCommit();
+            ackOne(channel);
+            channel.txRollback();
+        });
+        assertThat(methods).containsExactly("basic.ack", "tx.commit", "basic.ack", "tx.rollback");
+    }
+
+    @Test
+    public void pendingAcksAreSentBeforeRecover() throws Exception {
+        List<String> methods = coalescedAcksAround(channel -> {
+            ackOne(channel);
+            channel.basicRecover(true);
+        });
+        assertThat(methods).containsExactly("basic.ack", "basic.recover");
+    }
+
+    @Test
+    public void dueAcksAreSentOnTheConsumerWorkService() throws Exception {
+        ExecutorService executor = Executors.newSingleThreadExecutor(r -> new Thread(r, "consumer-work"));
+        CompletableFuture<String> ackThread = new CompletableFuture<>();
+        try (StubBroker broker = new StubBroker()) {
+            ConnectionFactory cf = broker.connectionFactory();
+            cf.setAckCoalescingMaxCount(100);
+            cf.setAckCoalescingMaxDelay(10);
+            cf.setSharedExecutor(executor);
+            cf.setTrafficListener(new TrafficListener() {
+
+                @Override
+                public void write(Command outboundCommand) {
+                    if (outboundCommand.getMethod() instanceof AMQP.Basic.Ack) {
+                        ackThread.complete(Thread.currentThread().getName());
+                    }
+                }
+
+                @Override
+                public void read(Command inboundCommand) {
+                }
+            });
+            try (Connection connection = cf.newConnection()) {
+                ackOne(connection.createChannel());
+                // not on the heartbeat executor, the flush takes the channel lock and writes to the socket
+                assertThat(ackThread.get(10, TimeUnit.SECONDS)).isEqualTo("consumer-work");
+            }
+        } finally {
+            executor.shutdownNow();
+        }
+    }
+
+    interface ChannelCallback {
+
+        void run(Channel channel) throws IOException;
+    }
+
+    private static void ackOne(Channel channel) throws IOException {
+        String queue = channel.queueDeclare().getQueue();
+        channel.basicPublish("", queue, null, new byte[1]);
+        channel.basicAck(channel.basicGet(queue, false).getEnvelope().getDeliveryTag(), false);
+    }
+
+    /** @return the outbound acks, transaction and recover methods, in order, the channel still open */
+    private static List<String> coalescedAcksAround(ChannelCallback callback) throws Exception {
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024);
+        List<String> methods = new ArrayList<>();
+        try (StubBroker broker = new StubBroker()) {
+            ConnectionFactory cf = broker.connectionFactory();
+            // acks are only sent before the methods or when they are due
+            cf.setAckCoalescingMaxCount(100);
+            cf.setAckCoalescingMaxDelay((int) TimeUnit.HOURS.toMillis(1));
+            cf.setTrafficRecorderFactory(() -> recorder);
+            try (Connection connection = cf.newConnection()) {
+                Channel channel = connection.createChannel();
+                callback.run(channel);
+                for (TrafficRecorder.Record record : recorder.records()) {
+                    if (!record.isInbound() && record.getType() == AMQP.FRAME_METHOD) {
+                        String name = record.getMethod().protocolMethodName();
+                        if (name.startsWith("tx.") && !name.equals("tx.select") || name.equals("basic.ack")
+                            || name.equals("basic.recover")) {
+                            methods.add(name);
+                        }
+                    }
+                }
+            }
+        }
+        return methods;
+    }
+}
@@ -0,0 +1,258 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.MalformedFrameException;
+import org.junit.jupiter.api.Test;
+
+import java.io.IOException;
+import java.math.BigDecimal;
+import java.math.BigInteger;
+import java.nio.ByteBuffer;
+import java.util.Arrays;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.Iterator;
+import java.util.Map;
+
+import static java.util.Collections.singletonMap;
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
+
+public class ByteBufferValueReaderTest {
+
+    @Test
+    public void methodsDecodedFromBufferMatchStreamDecoding() throws IOException {
+        Map<String, Object> arguments = new HashMap<>();
+        arguments.put("x-max-length", 10);
+        arguments.put("x-dead-letter-exchange", "dlx");
+        arguments.put("x-nested", singletonMap("key", Arrays.asList(1L, "two", 3.0d)));
+        Method[] methods = new Method[] {
+            new AMQImpl.Basic.Deliver("ctag", 42L, true, "amq.direct", "rk"),
+            new AMQImpl.Basic.Ack(7L, true),
+            new AMQImpl.Basic.Nack(8L, false, true),
+            new AMQImpl.Queue.Declare(0, "q", false, true, false, true, false, arguments),
+            new AMQImpl.Exchange.Declare(0, "e", "topic", false, true, true, false, true, null),
+            new AMQImpl.Connection.Close(320, "forced", 0, 0),
+            new AMQImpl.Channel.CloseOk()
+        };
+        for (Method method : methods) {
+            Frame frame = method.toFrame(1);
+            Method fromStream = AMQImpl.readMethodFrom(frame.getInputStream());
+            Method fromBuffer = AMQImpl.readMethodFrom(frame.getPayloadBuffer());
+            assertThat(fromBuffer).isEqualTo(fromStream);
+        }
+    }
+
+    @Test
+    public void propertiesDecodedFromBufferMatchStreamDecoding() throws IOException {
+        Map<String, Object> headers = new HashMap<>();
+        headers.put("x-death", Arrays.asList(singletonMap("count", 1L)));
+        headers.put("amount", new BigDecimal(BigInteger.valueOf(1234), 2));
+        AMQP.BasicProperties[] properties = new AMQP.BasicProperties[] {
+            new AMQP.BasicProperties(),
+            new AMQP.BasicProperties.Builder().messageId("m1").build(),
+            new AMQP.BasicProperties.Builder()
+                .contentType("text/plain").contentEncoding("UTF-8")
+                .headers(headers).deliveryMode(2).priority(5)
+                .correlationId("c").replyTo("r").expiration("1000").messageId("m")
+                .timestamp(new Date(1_600_000_000_000L)).type("t").userId("u")
+                .appId("a").clusterId("cl")
+                .build()
+        };
+        for (AMQP.BasicProperties props : properties) {
+            Frame frame = props.toFrame(1, 123L);
+            AMQContentHeader fromStream = AMQImpl.readContentHeaderFrom(frame.getInputStream());
+            AMQContentHeader fromBuffer = AMQImpl.readContentHeaderFrom(frame.getPayloadBuffer());
+            assertThat(fromBuffer).isEqualTo(fromStream);
+            assertThat(fromBuffer.getBodySize()).isEqualTo(123L);
+        }
+    }
+
+    @Test
+    public void lazyPropertiesMatchEagerDecoding() throws IOException {
+        Map<String, Object> headers = new HashMap<>();
+        headers.put("x-death", Arrays.asList(singletonMap("count", 1L)));
+        headers.put("traceparent", "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01");
+        AMQP.BasicProperties props = new AMQP.BasicProperties.Builder()
+            .contentType("text/plain").headers(headers).deliveryMode(2)
+            .correlationId("c").timestamp(new Date(1_600_000_000_000L)).appId("a")
+            .build();
+        Frame frame = props.toFrame(1, 123L);
+        AMQP.BasicProperties eager = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(frame.getPayloadBuffer());
+
+        AMQP.BasicProperties lazy = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(frame.getPayloadBuffer(), true);
+        assertThat(lazy.getBodySize()).isEqualTo(123L);
+        assertThat(lazy.getCorrelationId()).isEqualTo("c");
+        assertThat(lazy.getDeliveryMode()).isEqualTo(2);
+        assertThat(lazy.getPriority()).isNull();
+        assertThat(lazy.getHeaders()).isEqualTo(eager.getHeaders());
+        assertThat(lazy).isEqualTo(eager);
+        assertThat(lazy.hashCode()).isEqualTo(eager.hashCode());
+
+        lazy = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(frame.getPayloadBuffer(), true);
+        assertThat(lazy.builder().build()).isEqualTo(eager);
+        assertThat(lazy.wireSize()).isEqualTo(frame.getPayload().length);
+        assertThat(lazy.toFrame(1, 123L).getPayload()).isEqualTo(frame.getPayload());
+    }
+
+    @Test
+    public void lazyPropertiesAreReEncodedAsReceived() throws IOException {
+        AMQP.BasicProperties[] properties = new AMQP.BasicProperties[] {
+            new AMQP.BasicProperties(),
+            new AMQP.BasicProperties.Builder().messageId("m1").build(),
+            new AMQP.BasicProperties.Builder()
+                .headers(singletonMap("key", "value")).priority(5).clusterId("cl")
+                .build()
+        };
+        for (AMQP.BasicProperties props : properties) {
+            byte[] payload = props.toFrame(1, 42L).getPayload();
+            AMQContentHeader lazy = AMQImpl.readContentHeaderFrom(ByteBuffer.wrap(payload), true);
+            assertThat(lazy.toFrame(1, 42L).getPayload()).isEqualTo(payload);
+            StringBuilder debug = new StringBuilder();
+            lazy.appendPropertyDebugStringTo(debug);
+            StringBuilder expected = new StringBuilder();
+            props.appendPropertyDebugStringTo(expected);
+            assertThat(debug.toString()).isEqualTo(expected.toString());
+        }
+    }
+
+    @Test
+    public void unboxedPropertiesKeepTheirPresence() throws IOException {
+        AMQP.BasicProperties zeroes = new AMQP.BasicProperties.Builder()
+            .deliveryMode(0).priority(0).timestamp(new Date(0L)).build();
+        AMQP.BasicProperties absent = new AMQP.BasicProperties();
+        assertThat(zeroes).isNotEqualTo(absent);
+        assertThat(zeroes.getPriority()).isZero();
+        assertThat(absent.getPriority()).isNull();
+        assertThat(absent.getTimestamp()).isNull();
+
+        AMQP.BasicProperties props = new AMQP.BasicProperties.Builder()
+            .deliveryMode(2).priority(255).timestamp(new Date(1_600_000_000_000L)).build();
+        for (boolean lazy : new boolean[] { false, true }) {
+            AMQP.BasicProperties decoded = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(
+                props.toFrame(1, 0L).getPayloadBuffer(), lazy);
+            assertThat(decoded.getDeliveryMode()).isEqualTo(2);
+            assertThat(decoded.getPriority()).isEqualTo(255);
+            assertThat(decoded.getTimestamp()).isEqualTo(new Date(1_600_000_000_000L));
+            assertThat(decoded.getContentType()).isNull();
+            assertThat(decoded).isEqualTo(props);
+            assertThat(decoded.hashCode()).isEqualTo(props.hashCode());
+        }
+    }
+
+    @Test
+    public void decodedTablesAreMutable() throws IOException {
+        for (int size : new int[] { 0, 1, ArrayTable.MAX_SIZE, ArrayTable.MAX_SIZE + 1 }) {
+            Map<String, Object> arguments = new HashMap<>();
+            for (int i = 0; i < size; i++) {
+                arguments.put("x-key-" + i, i);
+            }
+            arguments.put("x-nested", new HashMap<>(singletonMap("key", "value")));
+            Method method = new AMQImpl.Queue.Declare(0, "q", false, true, false, false, false, arguments);
+            AMQImpl.Queue.Declare decoded = (AMQImpl.Queue.Declare) AMQImpl.readMethodFrom(
+                method.toFrame(1).getPayloadBuffer());
+            // method arguments are unmodifiable, as they always were, nested tables are not
+            assertThat(decoded.getArguments()).isEqualTo(arguments).hasSameHashCodeAs(arguments);
+            assertThatThrownBy(() -> decoded.getArguments().put("x-other", 1))
+                .isInstanceOf(UnsupportedOperationException.class);
+            @SuppressWarnings("unchecked")
+            Map<String, Object> nested = (Map<String, Object>) decoded.getArguments().get("x-nested");
+            nested.put("other", 1);
+            assertThat(nested).containsEntry("key", "value").containsEntry("other", 1);
+
+            ByteBuffer buffer = ByteBuffer.allocate(ByteBufferValueWriter.tableSize(arguments));
+            ByteBufferValueWriter.writeTable(buffer, arguments);
+            buffer.flip();
+            Map<String, Object> table = ByteBufferValueReader.readTable(buffer);
+            assertThat(table).isEqualTo(arguments);
+            assertThat(table.get("x-unknown")).isNull();
+            table.put("x-other", 1);
+            assertThat(table.remove("x-nested")).isNotNull();
+            assertThat(table).containsEntry("x-other", 1).doesNotContainKey("x-nested").hasSize(size + 1);
+            Iterator<Map.Entry<String, Object>> iterator = table.entrySet().iterator();
+            Map.Entry<String, Object> first = iterator.next();
+            first.setValue("changed");
+            assertThat(table.get(first.getKey())).isEqualTo("changed");
+            iterator.remove();
+            assertThat(table).hasSize(size).doesNotContainKey(first.getKey());
+        }
+    }
+
+    @Test
+    public void changedHeadersOfDecodedPropertiesAreEncoded() throws IOException {
+        AMQP.BasicProperties props = new AMQP.BasicProperties.Builder()
+            .headers(singletonMap("x-retry", 1)).contentType("text/plain").build();
+        for (boolean lazy : new boolean[] { false, true }) {
+            AMQP.BasicProperties decoded = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(
+                props.toFrame(1, 0L).getPayloadBuffer(), lazy);
+            for (int retry = 2; retry < 5; retry++) {
+                decoded.getHeaders().put("x-retry", retry);
+                AMQP.BasicProperties republished = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(
+                    decoded.toFrame(1, 0L).getPayloadBuffer(), lazy);
+                assertThat(republished.getHeaders()).containsEntry("x-retry", retry);
+                assertThat(republished.getContentType()).isEqualTo("text/plain");
+            }
+        }
+    }
+
+    @Test
+    public void firstOccurrenceOfDuplicateTableKeyWins() throws IOException {
+        ByteBuffer buffer = ByteBuffer.allocate(64);
+        buffer.putInt(0);
+        for (int value : new int[] { 1, 2 }) {
+            buffer.put((byte) 1).put((byte) 'k').put((byte) 'I').putInt(value);
+        }
+        buffer.putInt(0, buffer.position() - 4).flip();
+        Map<String, Object> table = ByteBufferValueReader.readTable(buffer);
+        assertThat(table).hasSize(1).containsEntry("k", 1);
+    }
+
+    @Test
+    public void octetPropertiesOutOfRangeAreRejected() {
+        assertThatThrownBy(() -> new AMQP.BasicProperties.Builder().priority(300).build())
+            .isInstanceOf(IllegalArgumentException.class).hasMessageContaining("priority");
+        assertThatThrownBy(() -> new AMQP.BasicProperties.Builder().deliveryMode(-1).build())
+            .isInstanceOf(IllegalArgumentException.class).hasMessageContaining("delivery-mode");
+    }
+
+    @Test
+    public void truncatedMethodFrameIsMalformed() throws IOException {
+        byte[] payload = new AMQImpl.Basic.Deliver("ctag", 42L, true, "amq.direct", "rk")
+            .toFrame(1).getPayload();
+        ByteBuffer truncated = ByteBuffer.wrap(Arrays.copyOf(payload, payload.length - 3));
+        assertThatThrownBy(() -> AMQImpl.readMethodFrom(truncated))
+            .isInstanceOf(MalformedFrameException.class);
+    }
+
+    @Test
+    public void tableLengthBeyondFrameIsMalformed() {
+        ByteBuffer buffer = ByteBuffer.allocate(8);
+        buffer.putInt(1000).putInt(0).flip();
+        assertThatThrownBy(() -> ByteBufferValueReader.readTable(buffer))
+            .isInstanceOf(MalformedFrameException.class);
+    }
+
+    @Test
+    public void shortstrReadFromSlice() {
+        ByteBuffer buffer = ByteBuffer.wrap(new byte[] { 'x', 'x', 3, 'a', 'b', 'c', 'y' });
+        buffer.position(2);
+        ByteBuffer slice = buffer.slice();
+        assertThat(ByteBufferValueReader.readShortstr(slice)).isEqualTo("abc");
+        assertThat(slice.position()).isEqualTo(4);
+    }
+}
@@ -0,0 +1,193 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayOutputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.math.BigDecimal;
+import java.math.BigInteger;
+import java.nio.ByteBuffer;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+import static java.util.Collections.singletonMap;
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
+
+public class ByteBufferValueWriterTest {
+
+    @Test
+    public void utf8LengthMatchesStringEncoding() {
+        String[] values = new String[] {
+            "", "ascii", "café", "€100", "🐇 rabbit",
+            "unpaired \ud83d high", "unpaired \udc07 low", "trailing \ud83d"
+        };
+        for (String value : values) {
+            assertThat(ByteBufferValueWriter.utf8Length(value))
+                .isEqualTo(value.getBytes(StandardCharsets.UTF_8).length);
+        }
+    }
+
+    @Test
+    public void methodEncodingMatchesStreamEncoding() throws IOException {
+        Map<String, Object> arguments = new HashMap<>();
+        arguments.put("x-max-length", 10);
+        arguments.put("x-dead-letter-exchange", "dlx €");
+        arguments.put("x-nested", singletonMap("key", Arrays.asList(1L, "two", 3.0d, null)));
+        arguments.put("x-array", new Object[] { (byte) 1, (short) 2, true, new byte[] { 1, 2 } });
+        arguments.put("x-decimal", new BigDecimal(BigInteger.valueOf(1234), 2));
+        arguments.put("x-date", new Date(1_600_000_000_000L));
+        arguments.put("x-long-string", LongStringHelper.asLongString("long"));
+        Method[] methods = new Method[] {
+            new AMQImpl.Basic.Publish(0, "amq.direct", "rk 🐇", true, false),
+            new AMQImpl.Basic.Ack(7L, true),
+            new AMQImpl.Basic.Nack(8L, false, true),
+            new AMQImpl.Queue.Declare(0, "q", false, true, false, true, false, arguments),
+            new AMQImpl.Exchange.Declare(0, "e", "topic", false, true, true, false, true, null),
+            new AMQImpl.Channel.CloseOk(),
+            new UpdateSecretExtension.UpdateSecret(LongStringHelper.asLongString("secret"), "refresh")
+        };
+        for (Method method : methods) {
+            byte[] expected = streamEncoded(method);
+            assertThat(method.wireSize()).isEqualTo(expected.length);
+            assertThat(method.toFrame(1).getPayload()).isEqualTo(expected);
+        }
+    }
+
+    @Test
+    public void propertiesEncodingMatchesStreamEncoding() throws IOException {
+        Map<String, Object> headers = new HashMap<>();
+        headers.put("x-death", Arrays.asList(singletonMap("count", 1L)));
+        headers.put("traceparent", "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01");
+        AMQP.BasicProperties[] properties = new AMQP.BasicProperties[] {
+            new AMQP.BasicProperties(),
+            new AMQP.BasicProperties.Builder().messageId("m1").build(),
+            new AMQP.BasicProperties.Builder()
+                .contentType("text/plain").contentEncoding("UTF-8")
+                .headers(headers).deliveryMode(2).priority(5)
+                .correlationId("c").replyTo("r").expiration("1000").messageId("m")
+                .timestamp(new Date(1_600_000_000_000L)).type("t").userId("u")
+                .appId("a").clusterId("cl")
+                .build()
+        };
+        for (AMQP.BasicProperties props : properties) {
+            byte[] expected = streamEncoded(props, 1024L);
+            assertThat(props.wireSize()).isEqualTo(expected.length);
+            assertThat(props.toFrame(1, 1024L).getPayload()).isEqualTo(expected);
+        }
+    }
+
+    @Test
+    public void reusedPropertiesEncodeTheSame() throws IOException {
+        AMQP.BasicProperties props = new AMQP.BasicProperties.Builder()
+            .contentType("text/plain").deliveryMode(2)
+            .headers(singletonMap("x-service", "billing"))
+            .build();
+        for (long bodySize : new long[] { 0L, 10L, 1L << 40, 10L }) {
+            byte[] expected = streamEncoded(props, bodySize);
+            assertThat(props.wireSize()).isEqualTo(expected.length);
+            assertThat(props.toFrame(1, bodySize).getPayload()).isEqualTo(expected);
+        }
+    }
+
+    @Test
+    public void flyweightEncodingMatchesMethodEncoding() {
+        ByteBuffer buffer = ByteBuffer.allocate(AMQImpl.Basic.Publish.MAX_WIRE_SIZE);
+        AMQImpl.Basic.Ack.encode(buffer, 7L, true);
+        assertThat(buffer.position()).isEqualTo(AMQImpl.Basic.Ack.WIRE_SIZE);
+        assertThat(Arrays.copyOf(buffer.array(), buffer.position()))
+            .isEqualTo(new AMQImpl.Basic.Ack(7L, true).toFrame(1).getPayload());
+
+        buffer.clear();
+        AMQImpl.Basic.Nack.encode(buffer, 8L, false, true);
+        assertThat(buffer.position()).isEqualTo(AMQImpl.Basic.Nack.WIRE_SIZE);
+        assertThat(Arrays.copyOf(buffer.array(), buffer.position()))
+            .isEqualTo(new AMQImpl.Basic.Nack(8L, false, true).toFrame(1).getPayload());
+
+        buffer.clear();
+        AMQImpl.Basic.Reject.encode(buffer, 9L, true);
+        assertThat(Arrays.copyOf(buffer.array(), buffer.position()))
+            .isEqualTo(new AMQImpl.Basic.Reject(9L, true).toFrame(1).getPayload());
+
+        buffer.clear();
+        AMQImpl.Basic.Publish.encode(buffer, 0, "amq.direct", "rk 🐇", true, false);
+        assertThat(Arrays.copyOf(buffer.array(), buffer.position()))
+            .isEqualTo(new AMQImpl.Basic.Publish(0, "amq.direct", "rk 🐇", true, false).toFrame(1).getPayload());
+
+        buffer.clear();
+        AMQImpl.Basic.Qos.encode(buffer, 0, 250, false);
+        assertThat(Arrays.copyOf(buffer.array(), buffer.position()))
+            .isEqualTo(new AMQImpl.Basic.Qos(0, 250, false).toFrame(1).getPayload());
+    }
+
+    @Test
+    public void reusedPropertiesWithNestedValuesEncodeTheirCurrentValues() throws IOException {
+        Map<String, Object> nested = new HashMap<>();
+        List<Object> list = new ArrayList<>();
+        byte[] bytes = new byte[] { 1 };
+        Map<String, Object> headers = new HashMap<>();
+        headers.put("x-nested", nested);
+        headers.put("x-list", list);
+        headers.put("x-bytes", bytes);
+        AMQP.BasicProperties props = new AMQP.BasicProperties.Builder().headers(headers).build();
+        for (int i = 0; i < 4; i++) {
+            nested.put("key-" + i, i);
+            list.add(i);
+            bytes[0] = (byte) i;
+            byte[] expected = streamEncoded(props, 0L);
+            assertThat(props.wireSize()).isEqualTo(expected.length);
+            assertThat(props.toFrame(1, 0L).getPayload()).isEqualTo(expected);
+        }
+    }
+
+    @Test
+    public void tooLongShortstrIsRejected() {
+        char[] chars = new char[256];
+        Arrays.fill(chars, 'a');
+        Method method = new AMQImpl.Basic.Publish(0, "", new String(chars), false, false);
+        assertThatThrownBy(() -> method.toFrame(1)).isInstanceOf(IllegalArgumentException.class);
+    }
+
+    private static byte[] streamEncoded(Method method) throws IOException {
+        ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+        DataOutputStream out = new DataOutputStream(bytes);
+        out.writeShort(method.protocolClassId());
+        out.writeShort(method.protocolMethodId());
+        MethodArgumentWriter writer = new MethodArgumentWriter(new ValueWriter(out));
+        method.writeArgumentsTo(writer);
+        writer.flush();
+        return bytes.toByteArray();
+    }
+
+    private static byte[] streamEncoded(AMQContentHeader header, long bodySize) throws IOException {
+        ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+        DataOutputStream out = new DataOutputStream(bytes);
+        out.writeShort(header.getClassId());
+        out.writeShort(0);
+        out.writeLong(bodySize);
+        header.writePropertiesTo(new ContentHeaderPropertyWriter(out));
+        return bytes.toByteArray();
+    }
+}
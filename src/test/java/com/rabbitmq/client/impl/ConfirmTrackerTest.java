@@ -0,0 +1,109 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import org.junit.jupiter.api.Test;
+
+import java.util.Random;
+import java.util.SortedSet;
+import java.util.TreeSet;
+
+import static org.assertj.core.api.Assertions.assertThat;
+
+public class ConfirmTrackerTest {
+
+    @Test
+    public void singleAndMultipleConfirms() {
+        ConfirmTracker tracker = new ConfirmTracker();
+        for (long seqNo = 1; seqNo <= 10; seqNo++) {
+            tracker.add(seqNo);
+        }
+        assertThat(tracker.size()).isEqualTo(10);
+        tracker.confirm(3, false);
+        tracker.confirm(3, false);
+        assertThat(tracker.size()).isEqualTo(9);
+        assertThat(tracker.isConfirmed(3, 3)).isTrue();
+        assertThat(tracker.isConfirmed(2, 3)).isFalse();
+
+        tracker.confirm(5, true);
+        assertThat(tracker.size()).isEqualTo(5);
+        assertThat(tracker.isConfirmed(1, 5)).isTrue();
+        tracker.confirm(10, true);
+        assertThat(tracker.isEmpty()).isTrue();
+        assertThat(tracker.isConfirmed(1, 10)).isTrue();
+    }
+
+    @Test
+    public void unpublishedRangeIsNotConfirmed() {
+        ConfirmTracker tracker = new ConfirmTracker();
+        tracker.add(1);
+        tracker.confirm(1, false);
+        assertThat(tracker.isConfirmed(1, 2)).isFalse();
+        tracker.add(2);
+        tracker.confirm(2, true);
+        assertThat(tracker.isConfirmed(1, 2)).isTrue();
+    }
+
+    @Test
+    public void growsBeyondInitialCapacity() {
+        ConfirmTracker tracker = new ConfirmTracker();
+        int count = ConfirmTracker.INITIAL_CAPACITY * 5 + 17;
+        for (long seqNo = 1; seqNo <= count; seqNo++) {
+            tracker.add(seqNo);
+            if (seqNo % 3 == 0) {
+                tracker.confirm(seqNo, false);
+            }
+        }
+        assertThat(tracker.size()).isEqualTo(count - count / 3);
+        tracker.confirm(count - 1, true);
+        assertThat(tracker.size()).isEqualTo(1);
+        assertThat(tracker.isConfirmed(count, count)).isFalse();
+        tracker.confirm(count, false);
+        assertThat(tracker.isEmpty()).isTrue();
+    }
+
+    @Test
+    public void matchesSortedSet() {
+        Random random = new Random(42);
+        ConfirmTracker tracker = new ConfirmTracker();
+        SortedSet<Long> expected = new TreeSet<>();
+        long nextSeqNo = 1;
+        for (int i = 0; i < 100_000; i++) {
+            int action = random.nextInt(10);
+            if (action < 6 || expected.isEmpty()) {
+                tracker.add(nextSeqNo);
+                expected.add(nextSeqNo);
+                nextSeqNo++;
+            } else {
+                long seqNo = expected.first() + random.nextInt((int) Math.min(200, nextSeqNo - expected.first()));
+                boolean multiple = action == 9;
+                tracker.confirm(seqNo, multiple);
+                if (multiple) {
+                    expected.headSet(seqNo + 1).clear();
+                } else {
+                    expected.remove(seqNo);
+                }
+            }
+            assertThat(tracker.size()).isEqualTo(expected.size());
+            if (i % 100 == 0 && nextSeqNo > 1) {
+                long first = 1 + random.nextInt((int) (nextSeqNo - 1));
+                long last = Math.min(nextSeqNo - 1, first + random.nextInt(300));
+                assertThat(tracker.isConfirmed(first, last))
+                    .isEqualTo(expected.subSet(first, last + 1).isEmpty());
+            }
+        }
+    }
+}
@@ -0,0 +1,200 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.Channel;
+import com.rabbitmq.client.Consumer;
+import com.rabbitmq.client.DefaultConsumer;
+import com.rabbitmq.client.Envelope;
+import com.rabbitmq.client.ShutdownSignalException;
+import com.rabbitmq.client.StreamingConsumer;
+import com.rabbitmq.client.TrafficListener;
+import org.junit.jupiter.api.Test;
+import org.mockito.Mockito;
+
+import java.io.ByteArrayOutputStream;
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.util.Arrays;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.TimeUnit;
+
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
+
+public class ContentBodyStreamTest {
+
+    @Test
+    public void readWhileFragmentsArrive() throws Exception {
+        byte[] body = new byte[10000];
+        for (int i = 0; i < body.length; i++) {
+            body[i] = (byte) i;
+        }
+        ContentBodyStream stream = new ContentBodyStream(body.length);
+        CompletableFuture<byte[]> read = CompletableFuture.supplyAsync(() -> {
+            try {
+                ByteArrayOutputStream out = new ByteArrayOutputStream();
+                byte[] buffer = new byte[333];
+                int count;
+                while ((count = stream.read(buffer, 0, buffer.length)) != -1) {
+                    out.write(buffer, 0, count);
+                }
+                return out.toByteArray();
+            } catch (IOException e) {
+                throw new RuntimeException(e);
+            }
+        });
+        for (int offset = 0; offset < body.length; offset += 4096) {
+            stream.append(Arrays.copyOfRange(body, offset, Math.min(offset + 4096, body.length)));
+            Thread.sleep(10);
+        }
+        assertThat(read.get(10, TimeUnit.SECONDS)).isEqualTo(body);
+    }
+
+    @Test
+    public void fragmentsAreExposedWithoutCopy() throws IOException {
+        ContentBodyStream stream = new ContentBodyStream(6);
+        byte[] first = new byte[] { 1, 2, 3, 4 };
+        stream.append(first);
+        stream.append(new byte[] { 5, 6 });
+        assertThat(stream.read()).isEqualTo(1);
+        assertThat(stream.available()).isEqualTo(5);
+        ByteBuffer[] fragments = stream.readFragments();
+        assertThat(fragments).hasSize(2);
+        assertThat(fragments[0].isReadOnly()).isTrue();
+        assertThat(fragments[0].remaining()).isEqualTo(3);
+        assertThat(fragments[0].get()).isEqualTo((byte) 2);
+        assertThat(fragments[1].remaining()).isEqualTo(2);
+        assertThat(stream.read()).isEqualTo(-1);
+    }
+
+    @Test
+    public void readFailsIfTheChannelClosesBeforeTheEnd() throws IOException {
+        ContentBodyStream stream = new ContentBodyStream(4);
+        stream.append(new byte[] { 1, 2 });
+        stream.fail(new ShutdownSignalException(false, false, null, null));
+        assertThat(stream.read()).isEqualTo(1);
+        assertThat(stream.read()).isEqualTo(2);
+        assertThatThrownBy(stream::read).isInstanceOf(IOException.class);
+    }
+
+    @Test
+    public void assemblerStreamsBodyFromTheContentHeader() throws IOException {
+        CommandAssembler assembler = new CommandAssembler(null, null, null, Integer.MAX_VALUE);
+        assembler.handleFrame(new AMQImpl.Basic.Deliver("ctag", 1L, false, "amq.direct", "rk").toFrame(1));
+        assembler.handleFrame(new AMQP.BasicProperties().toFrame(1, 5));
+        ContentBodyStream stream = assembler.streamContentBody();
+        assertThat(assembler.streamContentBody()).isNull();
+        assertThat(assembler.handleFrame(new Frame(AMQP.FRAME_BODY, 1, new byte[] { 1, 2, 3 }))).isFalse();
+        assertThat(assembler.handleFrame(new Frame(AMQP.FRAME_BODY, 1, new byte[] { 4, 5 }))).isTrue();
+        assertThat(assembler.getContentBody()).isEmpty();
+        byte[] body = new byte[5];
+        assertThat(stream.read(body, 0, 5)).isEqualTo(3);
+        assertThat(stream.read(body, 3, 2)).isEqualTo(2);
+        assertThat(body).containsExactly(1, 2, 3, 4, 5);
+        assertThat(stream.read()).isEqualTo(-1);
+    }
+
+    @Test
+    public void streamingConsumerDoesNotBlockTheConnectionThread() throws Exception {
+        // one dispatch thread, busy with the streamed body until its last frame arrives
+        ExecutorService executor = Executors.newSingleThreadExecutor();
+        ConsumerWorkService workService = new ConsumerWorkService(executor, null, 1000);
+        AMQConnection connection = Mockito.mock(AMQConnection.class);
+        Mockito.when(connection.getTrafficListener()).thenReturn(TrafficListener.NO_OP);
+        Mockito.when(connection.getMaxInboundMessageBodySize()).thenReturn(Integer.MAX_VALUE);
+        try {
+            ChannelN streamingChannel = new ChannelN(connection, 1, workService);
+            ChannelN channel = new ChannelN(connection, 2, workService);
+            CompletableFuture<byte[]> streamed = new CompletableFuture<>();
+            class BodyReader extends DefaultConsumer implements StreamingConsumer {
+
+                BodyReader(Channel ch) {
+                    super(ch);
+                }
+
+                @Override
+                public void handleStreamingDelivery(String consumerTag, Envelope envelope,
+                                                    AMQP.BasicProperties properties, ContentBodyStream body) {
+                    try {
+                        ByteArrayOutputStream out = new ByteArrayOutputStream();
+                        int b;
+                        while ((b = body.read()) != -1) {
+                            out.write(b);
+                        }
+                        streamed.complete(out.toByteArray());
+                    } catch (IOException e) {
+                        streamed.completeExceptionally(e);
+                    }
+                }
+            }
+            consume(streamingChannel, "streaming", new BodyReader(streamingChannel));
+            // more than the dispatch queue of a channel holds
+            int deliveries = 2000;
+            CountDownLatch delivered = new CountDownLatch(deliveries);
+            consume(channel, "plain", new DefaultConsumer(channel) {
+                @Override
+                public void handleDelivery(String consumerTag, Envelope envelope,
+                                           AMQP.BasicProperties properties, byte[] body) {
+                    delivered.countDown();
+                }
+            });
+
+            // frames of the channels interleave, like from a broker
+            CompletableFuture<Void> read = CompletableFuture.runAsync(() -> {
+                try {
+                    streamingChannel.handleFrame(new AMQImpl.Basic.Deliver("streaming", 1L, false, "", "q").toFrame(1));
+                    streamingChannel.handleFrame(new AMQP.BasicProperties().toFrame(1, 4));
+                    streamingChannel.handleFrame(new Frame(AMQP.FRAME_BODY, 1, new byte[] { 1, 2 }));
+                    for (int i = 0; i < deliveries; i++) {
+                        channel.handleFrame(new AMQImpl.Basic.Deliver("plain", i + 1, false, "", "q").toFrame(2));
+                        channel.handleFrame(new AMQP.BasicProperties().toFrame(2, 1));
+                        channel.handleFrame(new Frame(AMQP.FRAME_BODY, 2, new byte[] { 0 }));
+                    }
+                    streamingChannel.handleFrame(new Frame(AMQP.FRAME_BODY, 1, new byte[] { 3, 4 }));
+                } catch (IOException e) {
+                    throw new RuntimeException(e);
+                }
+            });
+            read.get(10, TimeUnit.SECONDS);
+            assertThat(streamed.get(10, TimeUnit.SECONDS)).containsExactly(1, 2, 3, 4);
+            assertThat(delivered.await(10, TimeUnit.SECONDS)).isTrue();
+        } finally {
+            workService.shutdown();
+            executor.shutdownNow();
+        }
+    }
+
+    private static void consume(ChannelN channel, String consumerTag, Consumer consumer) throws Exception {
+        CompletableFuture<String> consumed = CompletableFuture.supplyAsync(() -> {
+            try {
+                return channel.basicConsume("q", true, consumerTag, consumer);
+            } catch (IOException e) {
+                throw new RuntimeException(e);
+            }
+        });
+        while (!channel.isOutstandingRpc()) {
+            Thread.sleep(1);
+        }
+        channel.handleCompleteInboundCommand(new AMQCommand(new AMQImpl.Basic.ConsumeOk(consumerTag)));
+        assertThat(consumed.get(10, TimeUnit.SECONDS)).isEqualTo(consumerTag);
+    }
+}
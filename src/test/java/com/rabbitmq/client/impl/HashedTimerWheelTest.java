@@ -0,0 +1,209 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.Connection;
+import com.rabbitmq.client.ConnectionFactory;
+import com.rabbitmq.client.test.StubBroker;
+import org.junit.jupiter.api.AfterEach;
+import org.junit.jupiter.api.BeforeEach;
+import org.junit.jupiter.api.Test;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.CancellationException;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicReference;
+
+import static com.rabbitmq.client.test.TestUtils.waitAtMost;
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
+
+public class HashedTimerWheelTest {
+
+    HashedTimerWheel wheel;
+
+    @BeforeEach
+    public void init() {
+        // 4 buckets of 10 ms, a turn of the wheel is 40 ms
+        wheel = new HashedTimerWheel(Executors.defaultThreadFactory(), 10, TimeUnit.MILLISECONDS, 4);
+    }
+
+    @AfterEach
+    public void tearDown() {
+        wheel.close();
+    }
+
+    @Test
+    public void tasksRunAfterTheirDelay() throws Exception {
+        long start = System.nanoTime();
+        AtomicInteger runs = new AtomicInteger();
+        Future<?> future = wheel.schedule(runs::incrementAndGet, 100, TimeUnit.MILLISECONDS);
+        assertThat(future.get(5, TimeUnit.SECONDS)).isNull();
+        assertThat(System.nanoTime() - start).isGreaterThanOrEqualTo(TimeUnit.MILLISECONDS.toNanos(100));
+        assertThat(runs).hasValue(1);
+        assertThat(future.isDone()).isTrue();
+        assertThat(future.isCancelled()).isFalse();
+        assertThat(wheel.pendingTimeouts()).isZero();
+    }
+
+    @Test
+    public void cancelledTasksDoNotRun() throws Exception {
+        AtomicInteger runs = new AtomicInteger();
+        List<Future<?>> futures = new ArrayList<>();
+        for (int i = 0; i < 100; i++) {
+            futures.add(wheel.schedule(runs::incrementAndGet, 50, TimeUnit.MILLISECONDS));
+        }
+        for (int i = 0; i < futures.size(); i += 2) {
+            assertThat(futures.get(i).cancel(false)).isTrue();
+        }
+        assertThat(wheel.pendingTimeouts()).isEqualTo(50);
+        for (int i = 1; i < futures.size(); i += 2) {
+            futures.get(i).get(5, TimeUnit.SECONDS);
+        }
+        assertThat(runs).hasValue(50);
+        assertThat(futures.get(0).isCancelled()).isTrue();
+        assertThat(futures.get(0).cancel(false)).isFalse();
+        assertThatThrownBy(() -> futures.get(0).get()).isInstanceOf(CancellationException.class);
+        assertThat(wheel.pendingTimeouts()).isZero();
+    }
+
+    @Test
+    public void periodicTasksRunUntilCancelled() throws Exception {
+        AtomicInteger runs = new AtomicInteger();
+        CountDownLatch latch = new CountDownLatch(5);
+        Future<?> future = wheel.scheduleAtFixedRate(() -> {
+            runs.incrementAndGet();
+            latch.countDown();
+        }, 0, 20, TimeUnit.MILLISECONDS);
+        assertThat(latch.await(5, TimeUnit.SECONDS)).isTrue();
+        assertThat(wheel.pendingTimeouts()).isEqualTo(1);
+        assertThat(future.cancel(false)).isTrue();
+        assertThat(wheel.pendingTimeouts()).isZero();
+        Thread.sleep(50);
+        int runsAfterCancel = runs.get();
+        Thread.sleep(100);
+        assertThat(runs).hasValue(runsAfterCancel);
+        assertThatThrownBy(future::get).isInstanceOf(CancellationException.class);
+    }
+
+    @Test
+    public void failingTasksCompleteTheirFuture() {
+        Future<?> oneShot = wheel.schedule(() -> {
+            throw new IllegalStateException();
+        }, 10, TimeUnit.MILLISECONDS);
+        AtomicInteger runs = new AtomicInteger();
+        Future<?> periodic = wheel.scheduleAtFixedRate(() -> {
+            runs.incrementAndGet();
+            throw new IllegalStateException();
+        }, 10, 10, TimeUnit.MILLISECONDS);
+        assertThatThrownBy(() -> oneShot.get(5, TimeUnit.SECONDS))
+            .isInstanceOf(ExecutionException.class).hasCauseInstanceOf(IllegalStateException.class);
+        assertThatThrownBy(() -> periodic.get(5, TimeUnit.SECONDS))
+            .isInstanceOf(ExecutionException.class).hasCauseInstanceOf(IllegalStateException.class);
+        assertThat(runs).hasValue(1);
+        assertThat(wheel.pendingTimeouts()).isZero();
+    }
+
+    @Test
+    public void blockedTasksDoNotDelayOtherTasks() throws Exception {
+        CountDownLatch blocked = new CountDownLatch(1);
+        CountDownLatch release = new CountDownLatch(1);
+        Future<?> blocking = wheel.schedule(() -> {
+            blocked.countDown();
+            try {
+                release.await();
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        }, 10, TimeUnit.MILLISECONDS);
+        assertThat(blocked.await(5, TimeUnit.SECONDS)).isTrue();
+        AtomicInteger runs = new AtomicInteger();
+        wheel.schedule(runs::incrementAndGet, 20, TimeUnit.MILLISECONDS).get(5, TimeUnit.SECONDS);
+        assertThat(runs).hasValue(1);
+        assertThat(blocking.isDone()).isFalse();
+        release.countDown();
+        blocking.get(5, TimeUnit.SECONDS);
+    }
+
+    @Test
+    public void periodicTaskRunsDoNotOverlap() throws Exception {
+        AtomicInteger running = new AtomicInteger();
+        AtomicInteger maxRunning = new AtomicInteger();
+        CountDownLatch runs = new CountDownLatch(3);
+        Future<?> future = wheel.scheduleAtFixedRate(() -> {
+            maxRunning.accumulateAndGet(running.incrementAndGet(), Math::max);
+            try {
+                // longer than the period
+                Thread.sleep(50);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+            running.decrementAndGet();
+            runs.countDown();
+        }, 0, 10, TimeUnit.MILLISECONDS);
+        assertThat(runs.await(5, TimeUnit.SECONDS)).isTrue();
+        future.cancel(false);
+        assertThat(maxRunning).hasValue(1);
+    }
+
+    @Test
+    public void tasksRunOnTheTaskExecutor() throws Exception {
+        ExecutorService executor = Executors.newSingleThreadExecutor(r -> new Thread(r, "timer-task"));
+        try (HashedTimerWheel wheelWithExecutor = new HashedTimerWheel(Executors.defaultThreadFactory(),
+            10, TimeUnit.MILLISECONDS, 4, executor)) {
+            AtomicReference<String> thread = new AtomicReference<>();
+            wheelWithExecutor.schedule(() -> thread.set(Thread.currentThread().getName()), 10, TimeUnit.MILLISECONDS)
+                .get(5, TimeUnit.SECONDS);
+            assertThat(thread).hasValue("timer-task");
+        } finally {
+            executor.shutdownNow();
+        }
+    }
+
+    @Test
+    public void closedWheelRejectsTasks() {
+        wheel.close();
+        assertThatThrownBy(() -> wheel.schedule(() -> { }, 10, TimeUnit.MILLISECONDS))
+            .isInstanceOf(RejectedExecutionException.class);
+    }
+
+    @Test
+    public void connectionsShareTheWheelForTheirHeartbeats() throws Exception {
+        try (StubBroker broker = new StubBroker()) {
+            ConnectionFactory cf = broker.connectionFactory();
+            cf.setTimerWheel(wheel);
+            cf.setRequestedHeartbeat(1);
+            List<Connection> connections = new ArrayList<>();
+            for (int i = 0; i < 3; i++) {
+                connections.add(cf.newConnection());
+            }
+            assertThat(wheel.pendingTimeouts()).isEqualTo(3);
+            for (Connection connection : connections) {
+                connection.close();
+            }
+            waitAtMost(() -> wheel.pendingTimeouts() == 0);
+        }
+    }
+}
@@ -0,0 +1,151 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.Delivery;
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.util.Arrays;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.TimeUnit;
+
+import static org.assertj.core.api.Assertions.assertThat;
+
+public class InboundBufferPoolTest {
+
+    @Test
+    public void arraysArePooledByLength() {
+        InboundBufferPool pool = new InboundBufferPool(16, 2, 2);
+        byte[] small = new byte[8];
+        pool.recycle(small);
+        assertThat(pool.size()).isZero();
+
+        byte[] array = pool.acquire(32);
+        pool.recycle(array);
+        assertThat(pool.acquire(32)).isSameAs(array);
+        assertThat(pool.acquire(32)).isNotSameAs(array);
+
+        pool.recycle(new byte[32]);
+        pool.recycle(new byte[32]);
+        pool.recycle(new byte[32]);
+        assertThat(pool.size()).isEqualTo(2);
+        pool.recycle(new byte[64]);
+        pool.recycle(new byte[128]);
+        assertThat(pool.size()).isEqualTo(3);
+        assertThat(pool.acquire(128)).hasSize(128);
+    }
+
+    @Test
+    public void bodyGoesBackToThePoolWithTheLastReference() {
+        InboundBufferPool pool = new InboundBufferPool(16, 2, 2);
+        byte[] body = pool.acquire(32);
+        InboundBufferPool.Lease lease = pool.lend(body);
+        InboundBufferPool.delivering(lease);
+        Delivery delivery = new Delivery(null, null, body).retain();
+        InboundBufferPool.delivering(null);
+        assertThat(InboundBufferPool.lease(body)).isNull();
+        lease.release();
+        assertThat(pool.size()).isZero();
+        delivery.release();
+        assertThat(pool.size()).isEqualTo(1);
+        // released already
+        delivery.release();
+        lease.release();
+        delivery.retain();
+        assertThat(pool.size()).isEqualTo(1);
+
+        body = pool.acquire(32);
+        lease = pool.lend(body);
+        InboundBufferPool.delivering(lease);
+        assertThat(InboundBufferPool.lease(body)).isSameAs(lease);
+        assertThat(InboundBufferPool.lease(new byte[32])).isNull();
+        InboundBufferPool.lease(body).detach();
+        InboundBufferPool.delivering(null);
+        lease.release();
+        assertThat(pool.size()).isZero();
+
+        assertThat(pool.lend(new byte[8])).isNull();
+    }
+
+    @Test
+    public void concurrentRetainsAndReleasesRecycleOnce() throws InterruptedException {
+        InboundBufferPool pool = new InboundBufferPool(16, 4, 2);
+        byte[] body = pool.acquire(32);
+        InboundBufferPool.Lease lease = pool.lend(body);
+        int threads = 4;
+        int iterations = 10000;
+        CountDownLatch done = new CountDownLatch(threads);
+        for (int i = 0; i < threads; i++) {
+            new Thread(() -> {
+                for (int j = 0; j < iterations; j++) {
+                    lease.retain();
+                    lease.release();
+                }
+                done.countDown();
+            }).start();
+        }
+        assertThat(done.await(10, TimeUnit.SECONDS)).isTrue();
+        assertThat(pool.size()).isZero();
+        lease.release();
+        assertThat(pool.size()).isEqualTo(1);
+    }
+
+    @Test
+    public void onlyBodyFramePayloadsComeFromThePool() throws IOException {
+        InboundBufferPool pool = new InboundBufferPool(16, 2, 2);
+        byte[] pooled = new byte[32];
+        pool.recycle(pooled);
+
+        byte[] payload = new byte[32];
+        Arrays.fill(payload, (byte) 7);
+        Frame header = readFrom(new Frame(AMQP.FRAME_HEADER, 1, payload), pool);
+        assertThat(header.getPayload()).isNotSameAs(pooled).isEqualTo(payload);
+        Frame body = readFrom(new Frame(AMQP.FRAME_BODY, 1, payload), pool);
+        assertThat(body.getPayload()).isSameAs(pooled).isEqualTo(payload);
+    }
+
+    @Test
+    public void fragmentsGoBackToThePoolOnceAssembled() throws IOException {
+        InboundBufferPool pool = new InboundBufferPool(16, 4, 4);
+        byte[] body = new byte[100];
+        for (int i = 0; i < body.length; i++) {
+            body[i] = (byte) i;
+        }
+        CommandAssembler assembler = new CommandAssembler(null, null, null, Integer.MAX_VALUE,
+            false, null, null, pool);
+        assembler.handleFrame(new AMQImpl.Basic.Deliver("ctag", 1L, false, "amq.direct", "rk").toFrame(1));
+        assembler.handleFrame(new AMQP.BasicProperties().toFrame(1, body.length));
+        assembler.handleFrame(new Frame(AMQP.FRAME_BODY, 1, Arrays.copyOfRange(body, 0, 40)));
+        assembler.handleFrame(new Frame(AMQP.FRAME_BODY, 1, Arrays.copyOfRange(body, 40, 80)));
+        assertThat(assembler.handleFrame(new Frame(AMQP.FRAME_BODY, 1, Arrays.copyOfRange(body, 80, 100)))).isTrue();
+        assertThat(assembler.getContentBody()).isEqualTo(body);
+        assertThat(pool.size()).isEqualTo(3);
+    }
+
+    private static Frame readFrom(Frame frame, InboundBufferPool pool) throws IOException {
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        frame.writeTo(new DataOutputStream(out));
+        return Frame.readFrom(new DataInputStream(new ByteArrayInputStream(out.toByteArray())),
+            Integer.MAX_VALUE, pool);
+    }
+}
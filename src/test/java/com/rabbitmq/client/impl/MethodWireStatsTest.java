@@ -0,0 +1,60 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import org.junit.jupiter.api.Test;
+
+import java.io.IOException;
+
+import static org.assertj.core.api.Assertions.assertThat;
+
+public class MethodWireStatsTest {
+
+    @Test
+    public void methodIndexIsDenseAndNamed() {
+        assertThat(AMQImpl.methodIndex(AMQImpl.Connection.INDEX, AMQImpl.Connection.Start.INDEX)).isZero();
+        int publish = AMQImpl.methodIndex(AMQImpl.Basic.INDEX, AMQImpl.Basic.Publish.INDEX);
+        assertThat(publish).isBetween(0, AMQImpl.METHOD_COUNT - 1);
+        assertThat(AMQImpl.methodName(publish)).isEqualTo("basic.publish");
+        assertThat(AMQImpl.methodIndex(AMQImpl.Basic.INDEX, 999)).isEqualTo(-1);
+        assertThat(AMQImpl.methodIndex(999, AMQImpl.Basic.Publish.INDEX)).isEqualTo(-1);
+    }
+
+    @Test
+    public void inboundCommandsAreRecorded() throws IOException {
+        MethodWireStats stats = new MethodWireStats(true);
+        byte[] body = new byte[] { 1, 2, 3 };
+        Frame methodFrame = new AMQImpl.Basic.Deliver("ctag", 1L, false, "amq.direct", "rk").toFrame(1);
+        Frame headerFrame = new AMQP.BasicProperties().toFrame(1, body.length);
+        Frame bodyFrame = Frame.fromBodyFragment(1, body, 0, body.length);
+
+        for (int i = 0; i < 2; i++) {
+            CommandAssembler assembler = new CommandAssembler(null, null, null, Integer.MAX_VALUE,
+                false, null, stats, null);
+            assembler.handleFrame(methodFrame);
+            assembler.handleFrame(headerFrame);
+            assertThat(assembler.handleFrame(bodyFrame)).isTrue();
+        }
+
+        int deliver = AMQImpl.methodIndex(AMQImpl.Basic.INDEX, AMQImpl.Basic.Deliver.INDEX);
+        assertThat(stats.getInboundCommands(deliver)).isEqualTo(2);
+        assertThat(stats.getInboundBytes(deliver))
+            .isEqualTo(2L * (methodFrame.size() + headerFrame.size() + bodyFrame.size()));
+        assertThat(stats.getDecodingNanos(deliver)).isNotNegative();
+        assertThat(stats.getOutboundCommands(deliver)).isZero();
+    }
+}
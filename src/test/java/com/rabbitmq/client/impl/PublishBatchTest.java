@@ -0,0 +1,150 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.MessageProperties;
+import com.rabbitmq.client.OutboundMessage;
+import com.rabbitmq.client.TrafficListener;
+import org.junit.jupiter.api.AfterEach;
+import org.junit.jupiter.api.BeforeEach;
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayOutputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.util.Arrays;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.TimeUnit;
+
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.mockito.ArgumentMatchers.any;
+import static org.mockito.ArgumentMatchers.anyInt;
+import static org.mockito.Mockito.doAnswer;
+import static org.mockito.Mockito.mock;
+import static org.mockito.Mockito.times;
+import static org.mockito.Mockito.verify;
+import static org.mockito.Mockito.when;
+
+public class PublishBatchTest {
+
+    ExecutorService executorService;
+    ConsumerWorkService consumerWorkService;
+    AMQConnection connection;
+    ByteArrayOutputStream written;
+
+    @BeforeEach
+    public void init() throws IOException {
+        executorService = Executors.newSingleThreadExecutor();
+        consumerWorkService = new ConsumerWorkService(executorService, null, 1000, 1000);
+        connection = mock(AMQConnection.class);
+        when(connection.getTrafficListener()).thenReturn(TrafficListener.NO_OP);
+        when(connection.getFrameMax()).thenReturn(4096);
+        written = new ByteArrayOutputStream();
+        doAnswer(invocation -> {
+            byte[] frames = invocation.getArgument(0);
+            int offset = invocation.getArgument(1);
+            int length = invocation.getArgument(2);
+            written.write(frames, offset, length);
+            return null;
+        }).when(connection).writeFrames(any(byte[].class), anyInt(), anyInt());
+        doAnswer(invocation -> {
+            int type = invocation.getArgument(0);
+            int channel = invocation.getArgument(1);
+            byte[] payload = invocation.getArgument(2);
+            int offset = invocation.getArgument(3);
+            int length = invocation.getArgument(4);
+            new Frame(type, channel, Arrays.copyOfRange(payload, offset, offset + length))
+                .writeTo(new DataOutputStream(written));
+            return null;
+        }).when(connection).writeFrame(anyInt(), anyInt(), any(byte[].class), anyInt(), anyInt());
+    }
+
+    @AfterEach
+    public void tearDown() {
+        consumerWorkService.shutdown();
+        executorService.shutdownNow();
+    }
+
+    @Test
+    public void batchIsWrittenAsConsecutiveFramesAndFlushedOnce() throws IOException {
+        ChannelN channel = new ChannelN(connection, 1, consumerWorkService);
+        // larger than the scratch buffer, written as is
+        byte[] largeBody = new byte[AMQChannel.PUBLISH_BATCH_BUFFER_SIZE + 1];
+        Arrays.fill(largeBody, (byte) 'x');
+        List<OutboundMessage> messages = Arrays.asList(
+            new OutboundMessage("amq.direct", "rk 🐇", MessageProperties.PERSISTENT_TEXT_PLAIN, "hello".getBytes()),
+            new OutboundMessage("", "q", true, null, new byte[0]),
+            new OutboundMessage("", "q", null, new byte[10000]),
+            new OutboundMessage("", "q", MessageProperties.BASIC, largeBody)
+        );
+
+        assertThat(channel.basicPublishBatch(messages)).isZero();
+
+        ByteArrayOutputStream expected = new ByteArrayOutputStream();
+        DataOutputStream out = new DataOutputStream(expected);
+        for (OutboundMessage message : messages) {
+            new AMQImpl.Basic.Publish(0, message.getExchange(), message.getRoutingKey(), message.isMandatory(), false)
+                .toFrame(1).writeTo(out);
+            AMQP.BasicProperties props = message.getProperties() == null ?
+                MessageProperties.MINIMAL_BASIC : message.getProperties();
+            props.toFrame(1, message.getBody().length).writeTo(out);
+            for (int offset = 0; offset < message.getBody().length; offset += 4096 - 8) {
+                int length = Math.min(message.getBody().length - offset, 4096 - 8);
+                new Frame(AMQP.FRAME_BODY, 1, Arrays.copyOfRange(message.getBody(), offset, offset + length))
+                    .writeTo(out);
+            }
+        }
+        assertThat(written.toByteArray()).isEqualTo(expected.toByteArray());
+        verify(connection, times(1)).flush();
+    }
+
+    @Test
+    public void batchFutureCompletesWhenAllMessagesAreConfirmed() throws Exception {
+        ChannelN channel = new ChannelN(connection, 1, consumerWorkService);
+        ScheduledExecutorService scheduler = Executors.newSingleThreadScheduledExecutor();
+        try {
+            scheduler.schedule(() -> {
+                channel.handleCompleteInboundCommand(new AMQCommand(new AMQImpl.Confirm.SelectOk()));
+                return null;
+            }, 50, TimeUnit.MILLISECONDS);
+            channel.confirmSelect();
+        } finally {
+            scheduler.shutdownNow();
+        }
+        List<OutboundMessage> messages = Arrays.asList(
+            new OutboundMessage("", "q", null, new byte[1]),
+            new OutboundMessage("", "q", null, new byte[2]),
+            new OutboundMessage("", "q", null, new byte[3])
+        );
+
+        CompletableFuture<Boolean> first = channel.basicPublishBatchAsync(messages);
+        CompletableFuture<Boolean> second = channel.basicPublishBatchAsync(messages);
+        assertThat(channel.getNextPublishSeqNo()).isEqualTo(7);
+
+        channel.processAsync(new AMQCommand(new AMQImpl.Basic.Ack(2, true)));
+        assertThat(first).isNotDone();
+        channel.processAsync(new AMQCommand(new AMQImpl.Basic.Nack(3, false, false)));
+        assertThat(first).isCompletedWithValue(false);
+        assertThat(second).isNotDone();
+        channel.processAsync(new AMQCommand(new AMQImpl.Basic.Ack(6, true)));
+        assertThat(second).isCompletedWithValue(true);
+    }
+}
@@ -0,0 +1,164 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.Channel;
+import org.junit.jupiter.api.Test;
+
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Deque;
+import java.util.List;
+import java.util.Queue;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.TimeUnit;
+
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
+import static org.mockito.ArgumentMatchers.any;
+import static org.mockito.Mockito.doAnswer;
+import static org.mockito.Mockito.mock;
+
+public class RingBufferDispatcherTest {
+
+    @Test
+    public void itemsOfChannelRunInOrder() throws InterruptedException {
+        ExecutorService executor = Executors.newFixedThreadPool(4);
+        try {
+            RingBufferDispatcher dispatcher = new RingBufferDispatcher(executor, -1, 16);
+            int channelCount = 8, itemCount = 10_000;
+            List<Channel> channels = new ArrayList<>();
+            List<Queue<Integer>> runs = new ArrayList<>();
+            CountDownLatch latch = new CountDownLatch(channelCount * itemCount);
+            for (int i = 0; i < channelCount; i++) {
+                Channel channel = mock(Channel.class);
+                channels.add(channel);
+                runs.add(new ConcurrentLinkedQueue<>());
+                dispatcher.registerKey(channel);
+            }
+            for (int item = 0; item < itemCount; item++) {
+                for (int i = 0; i < channelCount; i++) {
+                    Queue<Integer> run = runs.get(i);
+                    int value = item;
+                    dispatcher.addWork(channels.get(i), () -> {
+                        run.add(value);
+                        latch.countDown();
+                    });
+                }
+            }
+            assertThat(latch.await(10, TimeUnit.SECONDS)).isTrue();
+            for (Queue<Integer> run : runs) {
+                int expected = 0;
+                for (Integer value : run) {
+                    assertThat(value).isEqualTo(expected++);
+                }
+                assertThat(expected).isEqualTo(itemCount);
+            }
+        } finally {
+            executor.shutdownNow();
+        }
+    }
+
+    @Test
+    public void concurrentProducersDoNotLoseItems() throws Exception {
+        ExecutorService executor = Executors.newFixedThreadPool(2);
+        ExecutorService producers = Executors.newFixedThreadPool(3);
+        try {
+            RingBufferDispatcher dispatcher = new RingBufferDispatcher(executor, -1, 16);
+            Channel channel = mock(Channel.class);
+            dispatcher.registerKey(channel);
+            int producerCount = 3, itemCount = 20_000;
+            CountDownLatch latch = new CountDownLatch(producerCount * itemCount);
+            for (int i = 0; i < producerCount; i++) {
+                producers.submit(() -> {
+                    for (int item = 0; item < itemCount; item++) {
+                        dispatcher.addWork(channel, latch::countDown);
+                    }
+                });
+            }
+            assertThat(latch.await(10, TimeUnit.SECONDS)).isTrue();
+        } finally {
+            producers.shutdownNow();
+            executor.shutdownNow();
+        }
+    }
+
+    @Test
+    public void fullRingBlocksUnlessUnlimited() {
+        Deque<Runnable> scheduled = new ArrayDeque<>();
+        ExecutorService executor = mock(ExecutorService.class);
+        doAnswer(invocation -> scheduled.add(invocation.getArgument(0)))
+            .when(executor).execute(any(Runnable.class));
+        RingBufferDispatcher dispatcher = new RingBufferDispatcher(executor, 50, 256);
+        Channel channel = mock(Channel.class);
+        dispatcher.registerKey(channel);
+
+        List<Integer> run = new ArrayList<>();
+        int item = 0;
+        for (; item < RingBufferDispatcher.RING_SIZE; item++) {
+            int value = item;
+            dispatcher.addWork(channel, () -> run.add(value));
+        }
+        assertThat(scheduled).hasSize(1);
+        int value = item;
+        assertThatThrownBy(() -> dispatcher.addWork(channel, () -> run.add(value)))
+            .isInstanceOf(WorkPoolFullException.class);
+
+        dispatcher.setUnlimited(channel, true);
+        for (; item < RingBufferDispatcher.RING_SIZE + 100; item++) {
+            int overflowValue = item;
+            dispatcher.addWork(channel, () -> run.add(overflowValue));
+        }
+        dispatcher.setUnlimited(channel, false);
+
+        // each run is a batch, the ring reschedules itself while it has work
+        int batches = 0;
+        while (!scheduled.isEmpty()) {
+            scheduled.poll().run();
+            batches++;
+        }
+        assertThat(batches).isEqualTo((RingBufferDispatcher.RING_SIZE + 100 + 255) / 256);
+        assertThat(run).hasSize(RingBufferDispatcher.RING_SIZE + 100);
+        for (int i = 0; i < run.size(); i++) {
+            assertThat(run.get(i)).isEqualTo(i);
+        }
+    }
+
+    @Test
+    public void unregisteredChannelStopsRunning() {
+        Deque<Runnable> scheduled = new ArrayDeque<>();
+        ExecutorService executor = mock(ExecutorService.class);
+        doAnswer(invocation -> scheduled.add(invocation.getArgument(0)))
+            .when(executor).execute(any(Runnable.class));
+        RingBufferDispatcher dispatcher = new RingBufferDispatcher(executor, -1, 256);
+        Channel channel = mock(Channel.class);
+        dispatcher.registerKey(channel);
+
+        List<Integer> run = new ArrayList<>();
+        dispatcher.addWork(channel, () -> run.add(1));
+        dispatcher.addWork(channel, () -> dispatcher.unregisterKey(channel));
+        dispatcher.addWork(channel, () -> run.add(3));
+        scheduled.poll().run();
+        assertThat(run).containsExactly(1);
+        assertThat(scheduled).isEmpty();
+
+        dispatcher.addWork(channel, () -> run.add(4));
+        assertThat(scheduled).isEmpty();
+    }
+}
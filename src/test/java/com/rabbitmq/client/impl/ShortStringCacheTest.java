@@ -0,0 +1,93 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import org.junit.jupiter.api.Test;
+
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.util.Map;
+
+import static java.util.Collections.singletonMap;
+import static org.assertj.core.api.Assertions.assertThat;
+
+public class ShortStringCacheTest {
+
+    @Test
+    public void hitReturnsSameInstance() {
+        ShortStringCache cache = new ShortStringCache(16);
+        byte[] bytes = "xamq.directx".getBytes(StandardCharsets.UTF_8);
+        String first = cache.intern(bytes, 1, 10);
+        String second = cache.intern("amq.direct".getBytes(StandardCharsets.UTF_8), 0, 10);
+        assertThat(first).isEqualTo("amq.direct");
+        assertThat(second).isSameAs(first);
+        assertThat(cache.getHits()).isEqualTo(1);
+        assertThat(cache.getMisses()).isEqualTo(1);
+        assertThat(cache.size()).isEqualTo(1);
+    }
+
+    @Test
+    public void leastRecentlyUsedEntryIsEvicted() {
+        ShortStringCache cache = new ShortStringCache(2);
+        String a = intern(cache, "a");
+        String b = intern(cache, "b");
+        assertThat(intern(cache, "a")).isSameAs(a);
+        intern(cache, "c");
+        assertThat(cache.size()).isEqualTo(2);
+        assertThat(intern(cache, "a")).isSameAs(a);
+        assertThat(intern(cache, "b")).isNotSameAs(b).isEqualTo("b");
+    }
+
+    @Test
+    public void longStringsAreNotCached() {
+        ShortStringCache cache = new ShortStringCache(16, 4);
+        assertThat(intern(cache, "too long")).isNotSameAs(intern(cache, "too long"));
+        assertThat(cache.size()).isZero();
+    }
+
+    @Test
+    public void deliveriesShareDecodedStrings() throws IOException {
+        ShortStringCache cache = new ShortStringCache(16);
+        Method method = new AMQImpl.Basic.Deliver("ctag", 1L, false, "amq.direct", "rk");
+        AMQImpl.Basic.Deliver first = (AMQImpl.Basic.Deliver) AMQImpl.readMethodFrom(
+            method.toFrame(1).getPayloadBuffer(), cache);
+        AMQImpl.Basic.Deliver second = (AMQImpl.Basic.Deliver) AMQImpl.readMethodFrom(
+            method.toFrame(1).getPayloadBuffer(), cache);
+        assertThat(second).isEqualTo(first);
+        assertThat(second.getConsumerTag()).isSameAs(first.getConsumerTag());
+        assertThat(second.getExchange()).isSameAs(first.getExchange());
+        assertThat(second.getRoutingKey()).isSameAs(first.getRoutingKey());
+
+        AMQP.BasicProperties props = new AMQP.BasicProperties.Builder()
+            .contentType("text/plain").headers(singletonMap("x-first-death-queue", "q")).build();
+        for (boolean lazy : new boolean[] { false, true }) {
+            AMQP.BasicProperties decoded1 = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(
+                props.toFrame(1, 0L).getPayloadBuffer(), lazy, cache);
+            AMQP.BasicProperties decoded2 = (AMQP.BasicProperties) AMQImpl.readContentHeaderFrom(
+                props.toFrame(1, 0L).getPayloadBuffer(), lazy, cache);
+            assertThat(decoded2.getContentType()).isSameAs(decoded1.getContentType());
+            Map<String, Object> headers1 = decoded1.getHeaders();
+            Map<String, Object> headers2 = decoded2.getHeaders();
+            assertThat(headers2.keySet().iterator().next()).isSameAs(headers1.keySet().iterator().next());
+        }
+    }
+
+    private static String intern(ShortStringCache cache, String value) {
+        byte[] bytes = value.getBytes(StandardCharsets.UTF_8);
+        return cache.intern(bytes, 0, bytes.length);
+    }
+}
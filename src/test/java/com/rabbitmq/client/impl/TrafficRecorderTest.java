@@ -0,0 +1,240 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.Channel;
+import com.rabbitmq.client.Connection;
+import com.rabbitmq.client.ConnectionFactory;
+import com.rabbitmq.client.test.StubBroker;
+import org.junit.jupiter.api.Test;
+import org.junit.jupiter.api.io.TempDir;
+
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.concurrent.TimeUnit;
+import java.util.stream.Collectors;
+
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.junit.jupiter.api.Assumptions.assumeTrue;
+
+public class TrafficRecorderTest {
+
+    @TempDir
+    Path directory;
+
+    static Frame publish(int channel, String routingKey) throws IOException {
+        return new AMQImpl.Basic.Publish(0, "", routingKey, false, false).toFrame(channel);
+    }
+
+    static byte[] body(int size) {
+        byte[] body = new byte[size];
+        for (int i = 0; i < size; i++) {
+            body[i] = (byte) i;
+        }
+        return body;
+    }
+
+    @Test
+    public void oldestFramesAreOverwritten() throws IOException {
+        TrafficRecorder recorder = new TrafficRecorder(1024);
+        for (int i = 0; i < 100; i++) {
+            recorder.outbound(publish(1, "key-" + i));
+        }
+        List<TrafficRecorder.Record> records = recorder.records();
+        assertThat(records).hasSizeBetween(10, 99);
+        List<String> routingKeys = new ArrayList<>();
+        for (TrafficRecorder.Record record : records) {
+            assertThat(record.isInbound()).isFalse();
+            assertThat(record.getChannel()).isEqualTo(1);
+            routingKeys.add(((AMQP.Basic.Publish) record.getMethod()).getRoutingKey());
+        }
+        assertThat(routingKeys).endsWith("key-98", "key-99");
+        assertThat(records).isSortedAccordingTo((r1, r2) -> Long.compare(r1.getTimestamp(), r2.getTimestamp()));
+    }
+
+    @Test
+    public void bodyPayloadsAreTruncated() throws IOException {
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024).setMaxBodyPayload(100);
+        AMQP.BasicProperties properties = new AMQP.BasicProperties.Builder().contentType("text/plain").build();
+        byte[] body = body(1000);
+        recorder.outbound(publish(1, "orders"));
+        recorder.outbound(properties.toFrame(1, body.length));
+        recorder.inbound(Frame.fromBodyFragment(1, body, 0, body.length));
+
+        List<TrafficRecorder.Record> records = recorder.records();
+        assertThat(records).hasSize(3);
+        assertThat(records.get(0).getMethod()).isInstanceOf(AMQP.Basic.Publish.class);
+        assertThat(records.get(1).getContentHeader().getBodySize()).isEqualTo(1000);
+        assertThat(((AMQP.BasicProperties) records.get(1).getContentHeader()).getContentType()).isEqualTo("text/plain");
+        TrafficRecorder.Record bodyRecord = records.get(2);
+        assertThat(bodyRecord.isInbound()).isTrue();
+        assertThat(bodyRecord.isTruncated()).isTrue();
+        assertThat(bodyRecord.getPayloadSize()).isEqualTo(1000);
+        assertThat(bodyRecord.getPayload()).hasSize(100).startsWith(body[0], body[1], body[2]);
+    }
+
+    @Test
+    public void contentFramesFollowTheSamplingOfTheirMethod() throws IOException {
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024).setSampling(2);
+        for (int i = 0; i < 4; i++) {
+            recorder.outbound(publish(1, "key-" + i));
+            recorder.outbound(AMQP.FRAME_HEADER, 1, new byte[14], 0, 14);
+            recorder.outbound(AMQP.FRAME_BODY, 1, new byte[10], 0, 10);
+        }
+        List<Integer> types = recorder.records().stream().map(TrafficRecorder.Record::getType).collect(Collectors.toList());
+        assertThat(types).containsExactly(AMQP.FRAME_METHOD, AMQP.FRAME_HEADER, AMQP.FRAME_BODY,
+            AMQP.FRAME_METHOD, AMQP.FRAME_HEADER, AMQP.FRAME_BODY);
+    }
+
+    @Test
+    public void framesOfFilteredOutChannelsAreNotRecorded() throws IOException {
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024).setChannelFilter(channel -> channel != 2);
+        recorder.outbound(publish(1, "one"));
+        recorder.outbound(publish(2, "two"));
+        recorder.inbound(publish(3, "three"));
+        assertThat(recorder.records()).extracting(TrafficRecorder.Record::getChannel).containsExactly(1, 3);
+    }
+
+    @Test
+    public void encodedFramesAreRecordedOneByOne() throws IOException {
+        ByteArrayOutputStream encoded = new ByteArrayOutputStream();
+        DataOutputStream out = new DataOutputStream(encoded);
+        out.write(new byte[3]);
+        publish(1, "first").writeTo(out);
+        publish(2, "second").writeTo(out);
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024);
+        recorder.outbound(encoded.toByteArray(), 3, encoded.size() - 3);
+        List<TrafficRecorder.Record> records = recorder.records();
+        assertThat(records).extracting(TrafficRecorder.Record::getChannel).containsExactly(1, 2);
+        assertThat(((AMQP.Basic.Publish) records.get(1).getMethod()).getRoutingKey()).isEqualTo("second");
+    }
+
+    @Test
+    public void framesCanBeWrittenForOfflineDecoding() throws IOException {
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024);
+        recorder.outbound(publish(1, "out"));
+        recorder.inbound(publish(1, "in"));
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        recorder.writeFrames(out, true);
+        DataInputStream in = new DataInputStream(new ByteArrayInputStream(out.toByteArray()));
+        Frame frame = Frame.readFrom(in, Integer.MAX_VALUE);
+        assertThat(((AMQP.Basic.Publish) AMQImpl.readMethodFrom(frame.getPayloadBuffer())).getRoutingKey()).isEqualTo("in");
+        assertThat(in.available()).isZero();
+    }
+
+    @Test
+    public void writtenFramesCanBeDecodedWithTheGeneratedCodec() throws Exception {
+        Path codec = Paths.get("target", "generated-sources", "python", "amqp_codec.py");
+        assumeTrue(Files.exists(codec), "the Python codec is generated by the build");
+        TrafficRecorder recorder = new TrafficRecorder(64 * 1024);
+        AMQP.BasicProperties properties = new AMQP.BasicProperties.Builder().contentType("text/plain").build();
+        byte[] body = body(1000);
+        recorder.outbound(publish(1, "orders"));
+        recorder.outbound(properties.toFrame(1, body.length));
+        recorder.outbound(Frame.fromBodyFragment(1, body, 0, body.length));
+        ByteArrayOutputStream frames = new ByteArrayOutputStream();
+        recorder.writeFrames(frames, false);
+
+        Path capture = directory.resolve("capture.bin");
+        Files.write(capture, frames.toByteArray());
+        String[] decoded = decode(codec, capture, 0);
+        assertThat(decoded).hasSize(3);
+        assertThat(decoded[0]).contains("basic.publish", "'routing_key': 'orders'");
+        assertThat(decoded[1]).contains("body_size=1000", "'content_type': 'text/plain'");
+        assertThat(decoded[2]).contains("1000 bytes");
+
+        // the last frame is truncated, the records before it are decoded
+        Path truncated = directory.resolve("truncated.bin");
+        Files.write(truncated, Arrays.copyOf(frames.toByteArray(), frames.size() - 10));
+        assertThat(decode(codec, truncated, 1)).hasSize(2);
+    }
+
+    private static String[] decode(Path codec, Path capture, int expectedStatus) throws Exception {
+        Process process;
+        try {
+            process = new ProcessBuilder("python3", codec.toString(), capture.toString())
+                .redirectError(ProcessBuilder.Redirect.INHERIT)
+                .start();
+        } catch (IOException e) {
+            assumeTrue(false, "python3 is not available");
+            return null;
+        }
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        byte[] buffer = new byte[4096];
+        int read;
+        while ((read = process.getInputStream().read(buffer)) != -1) {
+            out.write(buffer, 0, read);
+        }
+        assertThat(process.waitFor(30, TimeUnit.SECONDS)).isTrue();
+        assertThat(process.exitValue()).isEqualTo(expectedStatus);
+        return new String(out.toByteArray(), StandardCharsets.UTF_8).trim().split("\\R");
+    }
+
+    @Test
+    public void mappedRecorderCanBeReadAfterwards() throws IOException {
+        Path file = directory.resolve("traffic.bin");
+        TrafficRecorder recorder = TrafficRecorder.mapped(file, 2048);
+        for (int i = 0; i < 50; i++) {
+            recorder.outbound(publish(1, "key-" + i));
+        }
+        List<TrafficRecorder.Record> recorded = recorder.records();
+        List<TrafficRecorder.Record> read = TrafficRecorder.read(file);
+        assertThat(read).hasSameSizeAs(recorded);
+        assertThat(read.get(read.size() - 1).getPayload()).isEqualTo(recorded.get(recorded.size() - 1).getPayload());
+    }
+
+    @Test
+    public void connectionsRecordTheirFrames() throws Exception {
+        List<TrafficRecorder> recorders = new CopyOnWriteArrayList<>();
+        try (StubBroker broker = new StubBroker()) {
+            ConnectionFactory cf = broker.connectionFactory();
+            cf.setTrafficRecorderFactory(() -> {
+                TrafficRecorder recorder = new TrafficRecorder(64 * 1024);
+                recorders.add(recorder);
+                return recorder;
+            });
+            try (Connection connection = cf.newConnection()) {
+                Channel channel = connection.createChannel();
+                String queue = channel.queueDeclare().getQueue();
+                channel.basicPublish("", queue, null, body(10));
+                assertThat(channel.basicGet(queue, true)).isNotNull();
+            }
+        }
+        assertThat(recorders).hasSize(1);
+        List<String> methods = new ArrayList<>();
+        for (TrafficRecorder.Record record : recorders.get(0).records()) {
+            if (record.getType() == AMQP.FRAME_METHOD) {
+                methods.add((record.isInbound() ? "< " : "> ") + record.getMethod().protocolMethodName());
+            }
+        }
+        assertThat(methods).startsWith("< connection.start", "> connection.start-ok")
+            .contains("> basic.publish", "< basic.get-ok");
+    }
+
+}
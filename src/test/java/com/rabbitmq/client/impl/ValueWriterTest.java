@@ -20,6 +20,14 @@ import org.junit.jupiter.api.Test;
 import java.io.*;
 import java.math.BigDecimal;
 import java.math.BigInteger;
+import java.nio.ByteBuffer;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
 
 import static org.assertj.core.api.Assertions.assertThat;
 import static org.assertj.core.api.Assertions.assertThatThrownBy;
@@ -65,4 +73,71 @@ public class ValueWriterTest {
         BigDecimal read = (BigDecimal) ValueReader.readFieldValue(new DataInputStream(new ByteArrayInputStream(outputStream.toByteArray())));
         assertThat(read).isEqualTo(value);
     }
+
+    @Test
+    public void nestedTablesAreWrittenInOnePass() throws IOException {
+        List<Object> deaths = new ArrayList<>();
+        for (int i = 0; i < 50; i++) {
+            Map<String, Object> death = new LinkedHashMap<>();
+            death.put("count", (long) i);
+            death.put("reason", "expired");
+            death.put("queue", "queue-" + i);
+            death.put("time", new Date(1000L * i));
+            death.put("exchange", "");
+            death.put("routing-keys", Arrays.asList("rk-" + i, "\u00e9t\u00e9"));
+            deaths.add(death);
+        }
+        Map<String, Object> table = new LinkedHashMap<>();
+        table.put("x-death", deaths);
+        table.put("nested", new Object[] { new HashMap<>(), Arrays.asList(1, 2) });
+        table.put("bytes", new byte[3000]);
+
+        ByteArrayOutputStream outputStream = new ByteArrayOutputStream();
+        ValueWriter valueWriter = new ValueWriter(new DataOutputStream(outputStream));
+        valueWriter.writeTable(table);
+        // writing again reuses the encoder
+        valueWriter.writeTable(table);
+
+        ByteBuffer expected = ByteBuffer.allocate(ByteBufferValueWriter.tableSize(table));
+        ByteBufferValueWriter.writeTable(expected, table);
+        byte[] written = outputStream.toByteArray();
+        assertThat(written).hasSize(2 * expected.capacity());
+        assertThat(Arrays.copyOfRange(written, 0, expected.capacity())).isEqualTo(expected.array());
+        assertThat(Arrays.copyOfRange(written, expected.capacity(), written.length)).isEqualTo(expected.array());
+
+        Map<String, Object> read = new ValueReader(new DataInputStream(new ByteArrayInputStream(written))).readTable();
+        assertThat((List<?>) read.get("x-death")).hasSize(50);
+    }
+
+    @Test
+    public void tableEncoderGrowsItsBuffer() {
+        Map<String, Object> table = new HashMap<>();
+        table.put("key", "a value longer than the initial capacity");
+        TableEncoder encoder = new TableEncoder(8);
+        ByteBuffer encoded = encoder.encodeTable(table);
+        assertThat(encoded.position()).isEqualTo(ByteBufferValueWriter.tableSize(table));
+        assertThat(encoded.getInt(0)).isEqualTo(encoded.position() - 4);
+    }
+
+    @Test
+    public void tableEncoderKeepsWrittenBytesWhenGrowing() {
+        Map<String, Object> nested = new LinkedHashMap<>();
+        nested.put("name", "a value longer than the initial capacity");
+        nested.put("items", Arrays.asList(1, "two", new byte[100]));
+        Map<String, Object> table = new LinkedHashMap<>();
+        table.put("first", 1);
+        table.put("nested", nested);
+        table.put("large", new byte[100 * 1024]);
+        table.put("last", "end");
+
+        TableEncoder encoder = new TableEncoder(8);
+        ByteBuffer expected = ByteBuffer.allocate(ByteBufferValueWriter.tableSize(table));
+        ByteBufferValueWriter.writeTable(expected, table);
+        for (int i = 0; i < 2; i++) {
+            // the second write starts from a small buffer again, the first one grew beyond the retained capacity
+            ByteBuffer encoded = encoder.encodeTable(table);
+            assertThat(Arrays.copyOf(encoded.array(), encoded.position())).isEqualTo(expected.array());
+            encoder.release();
+        }
+    }
 }
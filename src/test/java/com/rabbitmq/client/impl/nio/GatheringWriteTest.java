@@ -0,0 +1,185 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl.nio;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.impl.Frame;
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayOutputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.channels.GatheringByteChannel;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.Random;
+
+import static org.assertj.core.api.Assertions.assertThat;
+
+public class GatheringWriteTest {
+
+    @Test
+    public void gatheredBytesAreTheFrameBytes() throws IOException {
+        Random random = new Random();
+        List<WriteRequest> requests = new ArrayList<>();
+        requests.add(HeaderWriteRequest.SINGLETON);
+        for (int i = 0; i < 200; i++) {
+            byte[] payload = new byte[random.nextInt(3) == 0 ? random.nextInt(10000) : random.nextInt(100)];
+            random.nextBytes(payload);
+            requests.add(new FrameWriteRequest(new Frame(AMQP.FRAME_BODY, i, payload)));
+            if (i % 10 == 0) {
+                // outbound frames: accumulators and body fragments
+                Frame method = new Frame(AMQP.FRAME_METHOD, i);
+                method.getOutputStream().write(payload, 0, payload.length / 2);
+                requests.add(new FrameWriteRequest(method));
+                requests.add(new FrameWriteRequest(new Frame(AMQP.FRAME_HEARTBEAT, 0)));
+                requests.add(new FrameWriteRequest(Frame.fromBodyFragment(i, payload, payload.length / 4, payload.length / 2)));
+            }
+            if (i % 50 == 0) {
+                byte[] frames = new byte[1000];
+                random.nextBytes(frames);
+                requests.add(new BytesWriteRequest(frames));
+            }
+        }
+
+        ByteArrayOutputStream expected = new ByteArrayOutputStream();
+        DataOutputStream expectedStream = new DataOutputStream(expected);
+        for (WriteRequest request : requests) {
+            request.handle(expectedStream);
+        }
+        expectedStream.flush();
+
+        // accepts a few bytes at a time, like a busy socket
+        SlowChannel channel = new SlowChannel(333);
+        GatheringWrite write = new GatheringWrite(channel, ByteBuffer.allocate(1024));
+        for (WriteRequest request : requests) {
+            request.gather(write);
+        }
+        write.flush();
+
+        assertThat(channel.written.toByteArray()).isEqualTo(expected.toByteArray());
+        assertThat(write.takeBytesWritten()).isEqualTo(expected.size());
+        assertThat(write.takeBytesWritten()).isZero();
+        assertThat(channel.maxBuffers).isLessThanOrEqualTo(GatheringWrite.MAX_BUFFERS + 1);
+    }
+
+    @Test
+    public void largePayloadsAreReferenced() throws IOException {
+        byte[] payload = new byte[GatheringWrite.COPY_THRESHOLD * 4];
+        Arrays.fill(payload, (byte) 1);
+        SlowChannel channel = new SlowChannel(Integer.MAX_VALUE);
+        GatheringWrite write = new GatheringWrite(channel, ByteBuffer.allocate(64));
+        new FrameWriteRequest(new Frame(AMQP.FRAME_BODY, 1, payload)).gather(write);
+        write.flush();
+        // header, payload, frame end
+        assertThat(channel.writes).isEqualTo(1);
+        assertThat(channel.maxBuffers).isEqualTo(3);
+        assertThat(channel.written.size()).isEqualTo(payload.length + 8);
+    }
+
+    @Test
+    public void bodyFragmentsAreReferenced() throws IOException {
+        byte[] body = new byte[GatheringWrite.COPY_THRESHOLD * 4];
+        Arrays.fill(body, (byte) 1);
+        Frame fragment = Frame.fromBodyFragment(1, body, 10, body.length - 20);
+        assertThat(fragment.hasPayloadArray()).isTrue();
+        assertThat(fragment.getPayload()).hasSize(body.length - 20);
+        SlowChannel channel = new SlowChannel(Integer.MAX_VALUE);
+        GatheringWrite write = new GatheringWrite(channel, ByteBuffer.allocate(64));
+        new FrameWriteRequest(fragment).gather(write);
+        write.flush();
+        assertThat(channel.maxBuffers).isEqualTo(3);
+        assertThat(channel.written.size()).isEqualTo(body.length - 20 + 8);
+    }
+
+    @Test
+    public void leastConnectionsSelector() {
+        List<NioLoopStatistics> loops = Arrays.asList(
+            new NioLoopStatistics(0), new NioLoopStatistics(1), new NioLoopStatistics(2)
+        );
+        NioLoopSelector selector = NioLoopSelector.leastConnections();
+        assertThat(selector.select(loops)).isZero();
+        loops.get(0).connectionOpened();
+        assertThat(selector.select(loops)).isEqualTo(1);
+        loops.get(1).connectionOpened();
+        loops.get(2).connectionOpened();
+        loops.get(1).connectionClosed();
+        assertThat(selector.select(loops)).isEqualTo(1);
+    }
+
+    @Test
+    public void writeQueueDepth() {
+        NioLoopStatistics statistics = new NioLoopStatistics(0);
+        for (int i = 0; i < 10; i++) {
+            statistics.writeRequestQueued();
+        }
+        statistics.recordWrite(6, 600);
+        assertThat(statistics.getWriteQueueDepth()).isEqualTo(4);
+        statistics.writeRequestsDiscarded(4);
+        assertThat(statistics.getWriteQueueDepth()).isZero();
+        assertThat(statistics.getBytesPerWriteWakeUp()).isEqualTo(600);
+    }
+
+    private static class SlowChannel implements GatheringByteChannel {
+
+        private final int maxBytesPerWrite;
+        private final ByteArrayOutputStream written = new ByteArrayOutputStream();
+        private int writes = 0;
+        private int maxBuffers = 0;
+
+        private SlowChannel(int maxBytesPerWrite) {
+            this.maxBytesPerWrite = maxBytesPerWrite;
+        }
+
+        @Override
+        public long write(ByteBuffer[] srcs, int offset, int length) {
+            writes++;
+            maxBuffers = Math.max(maxBuffers, length);
+            long total = 0;
+            for (int i = offset; i < offset + length && total < maxBytesPerWrite; i++) {
+                ByteBuffer src = srcs[i];
+                int chunk = (int) Math.min(src.remaining(), maxBytesPerWrite - total);
+                byte[] bytes = new byte[chunk];
+                src.get(bytes);
+                written.write(bytes, 0, chunk);
+                total += chunk;
+            }
+            return total;
+        }
+
+        @Override
+        public long write(ByteBuffer[] srcs) {
+            return write(srcs, 0, srcs.length);
+        }
+
+        @Override
+        public int write(ByteBuffer src) {
+            return (int) write(new ByteBuffer[]{src}, 0, 1);
+        }
+
+        @Override
+        public boolean isOpen() {
+            return true;
+        }
+
+        @Override
+        public void close() {
+        }
+    }
+}
@@ -28,12 +28,15 @@ import org.junit.jupiter.api.BeforeEach;
 import org.junit.jupiter.api.Test;
 
 import java.io.IOException;
+import java.util.Arrays;
+import java.util.List;
 import java.util.concurrent.Callable;
 import java.util.concurrent.Executors;
 import java.util.concurrent.ScheduledExecutorService;
 import java.util.concurrent.TimeUnit;
 
 import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
 import static org.assertj.core.api.Assertions.fail;
 import static org.mockito.Mockito.*;
 
@@ -162,6 +165,96 @@ public class AMQChannelTest {
         assertThat(rpcResponse.getMethod()).isEqualTo(response2);
     }
 
+    @Test public void pipelinedRpcMatchesRepliesInOrder() throws IOException {
+        int rpcTimeout = 1000;
+        AMQConnection connection = mock(AMQConnection.class);
+        when(connection.getChannelRpcTimeout()).thenReturn(rpcTimeout);
+        when(connection.getTrafficListener()).thenReturn(TrafficListener.NO_OP);
+
+        final DummyAmqChannel channel = new DummyAmqChannel(connection, 1);
+        List<Method> methods = Arrays.asList(
+            new AMQImpl.Exchange.Declare.Builder().exchange("e").type("topic").build(),
+            new AMQImpl.Queue.Declare.Builder().queue("q").build(),
+            new AMQImpl.Queue.Bind.Builder().queue("q").exchange("e").routingKey("#").build(),
+            new AMQImpl.Basic.Get.Builder().queue("q").build()
+        );
+        final List<Method> responses = Arrays.asList(
+            new AMQImpl.Exchange.DeclareOk(),
+            new AMQImpl.Queue.DeclareOk.Builder().queue("q").build(),
+            new AMQImpl.Queue.BindOk(),
+            new AMQImpl.Basic.GetEmpty.Builder().build()
+        );
+
+        scheduler.schedule((Callable<Void>) () -> {
+            // a stale reply, e.g. of a timed out request, is thrown away
+            channel.handleCompleteInboundCommand(new AMQCommand(new AMQImpl.Queue.PurgeOk(0)));
+            for (Method response : responses) {
+                channel.handleCompleteInboundCommand(new AMQCommand(response));
+            }
+            return null;
+        }, (long) (rpcTimeout / 10.0), TimeUnit.MILLISECONDS);
+
+        List<AMQCommand> replies = channel.pipelinedRpc(methods);
+        assertThat(replies).extracting(AMQCommand::getMethod).containsExactlyElementsOf(responses);
+        assertThat(channel.nextOutstandingRpc()).isNull();
+    }
+
+    @Test public void pipelinedRpcTimesOutWhenResponsesDoNotCome() throws IOException {
+        int rpcTimeout = 100;
+        AMQConnection connection = mock(AMQConnection.class);
+        when(connection.getChannelRpcTimeout()).thenReturn(rpcTimeout);
+        when(connection.getTrafficListener()).thenReturn(TrafficListener.NO_OP);
+
+        final DummyAmqChannel channel = new DummyAmqChannel(connection, 1);
+        Method first = new AMQImpl.Queue.Declare.Builder().queue("q1").build();
+        Method second = new AMQImpl.Queue.Declare.Builder().queue("q2").build();
+
+        scheduler.schedule((Callable<Void>) () -> {
+            channel.handleCompleteInboundCommand(new AMQCommand(
+                new AMQImpl.Queue.DeclareOk.Builder().queue("q1").build()));
+            return null;
+        }, (long) (rpcTimeout / 2.0), TimeUnit.MILLISECONDS);
+
+        try {
+            channel.pipelinedRpc(Arrays.asList(first, second));
+            fail("Should time out and throw an exception");
+        } catch (ChannelContinuationTimeoutException e) {
+            assertThat(e.getMethod()).isEqualTo(second);
+        }
+
+        // the pipeline has been cleaned, a regular RPC goes through
+        final Method response = new AMQImpl.Queue.DeclareOk.Builder().queue("q3").build();
+        scheduler.schedule((Callable<Void>) () -> {
+            channel.handleCompleteInboundCommand(new AMQCommand(response));
+            return null;
+        }, (long) (rpcTimeout / 2.0), TimeUnit.MILLISECONDS);
+        assertThat(channel.rpc(new AMQImpl.Queue.Declare.Builder().queue("q3").build()).getMethod())
+            .isEqualTo(response);
+    }
+
+    @Test public void asynchronousMethodsCannotBePipelined() {
+        AMQConnection connection = mock(AMQConnection.class);
+        when(connection.getTrafficListener()).thenReturn(TrafficListener.NO_OP);
+        DummyAmqChannel channel = new DummyAmqChannel(connection, 1);
+        assertThatThrownBy(() -> channel.pipelinedRpc(Arrays.asList(new AMQImpl.Basic.Ack(1L, false))))
+            .isInstanceOf(IllegalArgumentException.class);
+    }
+
+    @Test public void specificationReplyMapping() {
+        Method queueDeclare = new AMQImpl.Queue.Declare.Builder().queue("q").build();
+        assertThat(AMQImpl.isReply(queueDeclare, new AMQImpl.Queue.DeclareOk.Builder().queue("q").build())).isTrue();
+        assertThat(AMQImpl.isReply(queueDeclare, new AMQImpl.Queue.BindOk())).isFalse();
+        Method get = new AMQImpl.Basic.Get.Builder().queue("q").build();
+        assertThat(AMQImpl.isReply(get, new AMQImpl.Basic.GetEmpty.Builder().build())).isTrue();
+        assertThat(AMQImpl.isReply(get, new AMQImpl.Basic.GetOk(1L, false, "", "q", 0))).isTrue();
+        assertThat(AMQImpl.isReply(new AMQImpl.Basic.Ack(1L, false), new AMQImpl.Basic.Ack(1L, false))).isFalse();
+        assertThat(AMQImpl.isSynchronous(AMQImpl.methodIndex(50, 10))).isTrue();
+        assertThat(AMQImpl.isSynchronous(AMQImpl.methodIndex(60, 80))).isFalse();
+        assertThat(AMQImpl.isNoWait(queueDeclare)).isFalse();
+        assertThat(AMQImpl.isNoWait(new AMQImpl.Queue.Declare.Builder().queue("q").nowait(true).build())).isTrue();
+        assertThat(AMQImpl.isNoWait(get)).isFalse();
+    }
+
     static class DummyAmqChannel extends AMQChannel {
 
         public DummyAmqChannel(AMQConnection connection, int channelNumber) {
@@ -15,6 +15,8 @@
 
 package com.rabbitmq.client.test;
 
+import com.rabbitmq.client.BatchRpcException;
+import com.rabbitmq.client.ChannelContinuationTimeoutException;
 import com.rabbitmq.client.Command;
 import com.rabbitmq.client.Method;
 import com.rabbitmq.client.TrafficListener;
@@ -24,10 +26,14 @@ import org.junit.jupiter.api.BeforeEach;
 import org.junit.jupiter.api.Test;
 import org.mockito.Mockito;
 
+import java.util.Arrays;
+import java.util.List;
 import java.util.concurrent.ExecutorService;
 import java.util.concurrent.Executors;
 import java.util.stream.Stream;
+import static org.assertj.core.api.Assertions.assertThat;
 import static org.assertj.core.api.Assertions.assertThatThrownBy;
+import static org.assertj.core.api.Assertions.catchThrowableOfType;
 import static org.junit.jupiter.api.Assertions.assertNotNull;
 
 public class ChannelNTest {
@@ -107,6 +113,50 @@ public class ChannelNTest {
         Mockito.verify(trafficListener, Mockito.times(1)).write(Mockito.any(Command.class));
     }
 
+    @Test
+    public void batchRpcExposesRepliesReceivedBeforeFailure() throws Exception {
+        AMQConnection connection = Mockito.mock(AMQConnection.class);
+        Mockito.when(connection.getTrafficListener()).thenReturn(TrafficListener.NO_OP);
+        Mockito.when(connection.getChannelRpcTimeout()).thenReturn(100);
+
+        ChannelN channel = new ChannelN(connection, 1, consumerWorkService);
+        Method reply = new AMQImpl.Queue.DeclareOk.Builder().queue("amq.gen-1").build();
+
+        new Thread(() -> {
+            try {
+                Thread.sleep(15);
+                channel.handleCompleteInboundCommand(new AMQCommand(reply));
+            } catch (Exception e) {
+                throw new RuntimeException(e);
+            }
+        }).start();
+
+        List<Method> methods = Arrays.asList(
+            new AMQImpl.Queue.Declare.Builder().queue("").build(),
+            new AMQImpl.Queue.Declare.Builder().queue("q2").build(),
+            new AMQImpl.Queue.Declare.Builder().queue("q3").build()
+        );
+        BatchRpcException e = catchThrowableOfType(() -> channel.batchRpc(methods), BatchRpcException.class);
+        assertThat(e).hasCauseInstanceOf(ChannelContinuationTimeoutException.class);
+        assertThat(e.getReplies()).extracting(Command::getMethod).containsExactly(reply);
+    }
+
+    @Test
+    public void nowaitMethodsCannotBeBatched() {
+        AMQConnection connection = Mockito.mock(AMQConnection.class);
+        TrafficListener trafficListener = Mockito.mock(TrafficListener.class);
+        Mockito.when(connection.getTrafficListener()).thenReturn(trafficListener);
+
+        ChannelN channel = new ChannelN(connection, 1, consumerWorkService);
+        List<Method> methods = Arrays.asList(
+            new AMQImpl.Queue.Declare.Builder().queue("q1").build(),
+            new AMQImpl.Queue.Declare.Builder().queue("q2").nowait(true).build()
+        );
+        assertThatThrownBy(() -> channel.batchRpc(methods))
+            .isInstanceOf(IllegalArgumentException.class);
+        Mockito.verify(trafficListener, Mockito.never()).write(Mockito.any(Command.class));
+    }
+
     interface Consumer {
 
         void apply(int value) throws Exception;
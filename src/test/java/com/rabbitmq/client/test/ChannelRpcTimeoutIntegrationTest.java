@@ -23,11 +23,15 @@ import org.junit.jupiter.api.Test;
 
 import javax.net.SocketFactory;
 import java.io.IOException;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutionException;
 import java.util.concurrent.Executors;
 import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.TimeUnit;
 import java.util.concurrent.TimeoutException;
 
 import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
 import static org.assertj.core.api.Assertions.fail;
 
 public class ChannelRpcTimeoutIntegrationTest {
@@ -82,6 +86,28 @@ public class ChannelRpcTimeoutIntegrationTest {
         }
     }
 
+    @Test public void asyncRpcCompletesExceptionallyWhenTimeoutIsSetWithTimerWheel() throws IOException, TimeoutException {
+        FrameHandler frameHandler = createFrameHandler();
+        ConnectionParams params = factory.params(Executors.newFixedThreadPool(1));
+        params.setChannelRpcTimeout((int) (waitTimeOnSomeResponses / 5.0));
+        try (HashedTimerWheel timerWheel = new HashedTimerWheel(
+            Executors.defaultThreadFactory(), 10, TimeUnit.MILLISECONDS, 64)) {
+            params.setTimerWheel(timerWheel);
+            WaitingAmqConnection connection = new WaitingAmqConnection(params, frameHandler);
+            try {
+                connection.start();
+                Channel channel = connection.createChannel();
+                CompletableFuture<Command> declareOk = channel.asyncCompletableRpc(
+                    new AMQP.Queue.Declare.Builder().exclusive(true).autoDelete(true).build());
+                assertThatThrownBy(() -> declareOk.get(waitTimeOnSomeResponses / 2, TimeUnit.MILLISECONDS))
+                    .isInstanceOf(ExecutionException.class)
+                    .hasCauseInstanceOf(ChannelContinuationTimeoutException.class);
+            } finally {
+                connection.close();
+            }
+        }
+    }
+
     private FrameHandler createFrameHandler() throws IOException {
         SocketFrameHandlerFactory socketFrameHandlerFactory = new SocketFrameHandlerFactory(ConnectionFactory.DEFAULT_CONNECTION_TIMEOUT,
             SocketFactory.getDefault(), SocketConfigurators.defaultConfigurator(), false, null);
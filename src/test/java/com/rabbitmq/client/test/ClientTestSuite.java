@@ -17,6 +17,7 @@ package com.rabbitmq.client.test;
 
 import com.rabbitmq.client.JacksonJsonRpcTest;
 import com.rabbitmq.client.impl.*;
+import com.rabbitmq.client.impl.nio.GatheringWriteTest;
 import com.rabbitmq.utility.IntAllocatorTests;
 import org.junit.platform.suite.api.SelectClasses;
 import org.junit.platform.suite.api.Suite;
@@ -74,6 +75,20 @@ import org.junit.platform.suite.api.Suite;
     RefreshCredentialsTest.class,
     AMQConnectionRefreshCredentialsTest.class,
     ValueWriterTest.class,
+    ByteBufferValueReaderTest.class,
+    ByteBufferValueWriterTest.class,
+    ShortStringCacheTest.class,
+    MethodWireStatsTest.class,
+    PublishBatchTest.class,
+    AckCoalescerTest.class,
+    ConfirmTrackerTest.class,
+    RingBufferDispatcherTest.class,
+    GatheringWriteTest.class,
+    InboundBufferPoolTest.class,
+    ContentBodyStreamTest.class,
+    StubBrokerTest.class,
+    TrafficRecorderTest.class,
+    HashedTimerWheelTest.class,
     BlockedConnectionTest.class
 })
 public class ClientTestSuite {
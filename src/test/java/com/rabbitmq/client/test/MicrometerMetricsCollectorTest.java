@@ -17,6 +17,7 @@ package com.rabbitmq.client.test;
 
 import static org.assertj.core.api.Assertions.assertThatThrownBy;
 
+import com.rabbitmq.client.impl.MethodWireStats;
 import com.rabbitmq.client.impl.MicrometerMetricsCollector;
 import io.micrometer.core.instrument.Meter;
 import io.micrometer.core.instrument.simple.SimpleMeterRegistry;
@@ -54,6 +55,26 @@ public class MicrometerMetricsCollectorTest {
         }
     }
 
+    @Test
+    public void methodWireStatsAreRegisteredOnceEnabled() {
+        collector = new MicrometerMetricsCollector(registry, "rabbitmq", "uri", "/api/users");
+        Assertions.assertThat(collector.methodWireStats()).isNull();
+        Assertions.assertThat(registry.find("rabbitmq.method.commands").meters()).isEmpty();
+
+        MethodWireStats stats = collector.enableMethodWireStats(true);
+        Assertions.assertThat(collector.methodWireStats()).isSameAs(stats);
+        Assertions.assertThat(collector.enableMethodWireStats(false)).isSameAs(stats);
+        Assertions.assertThat(registry.find("rabbitmq.method.commands")
+            .tags("method", "basic.publish", "direction", "outbound", "uri", "/api/users").functionCounter())
+            .isNotNull();
+        Assertions.assertThat(registry.find("rabbitmq.method.bytes")
+            .tags("method", "basic.deliver", "direction", "inbound").functionCounter())
+            .isNotNull();
+        Assertions.assertThat(registry.find("rabbitmq.method.decoding")
+            .tags("method", "basic.deliver").functionTimer())
+            .isNotNull();
+    }
+
     @Test
     public void tagsMustBeKeyValuePairs() {
         assertThatThrownBy(() -> new MicrometerMetricsCollector(registry, "rabbitmq", "uri"))
@@ -0,0 +1,555 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.test;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.ConnectionFactory;
+import com.rabbitmq.client.impl.AMQCommand;
+import com.rabbitmq.client.impl.AMQContentHeader;
+import com.rabbitmq.client.impl.AMQImpl;
+import com.rabbitmq.client.impl.Frame;
+import com.rabbitmq.client.impl.LongStringHelper;
+import com.rabbitmq.client.impl.Method;
+
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.EOFException;
+import java.io.IOException;
+import java.net.InetAddress;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.net.SocketException;
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.Deque;
+import java.util.HashMap;
+import java.util.LinkedHashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * In-process broker, to run the client without RabbitMQ in tests and
+ * benchmarks.
+ * <p>
+ * The broker listens on the loopback interface and speaks AMQP 0-9-1 with
+ * the generated {@link AMQImpl} codecs. It supports the connection handshake,
+ * channels, exchange and queue declarations, bindings, publishing, consumers,
+ * {@code basic.get}, publisher confirms and acknowledgments, and accepts
+ * transactions and {@code basic.recover} without acting on them. Other methods
+ * close the connection with a {@code NOT_IMPLEMENTED} error.
+ * <p>
+ * All exchanges route like direct exchanges. A published message goes
+ * straight to a consumer of each matching queue, in turn, and waits in the
+ * queue when it has no consumers. Nothing is persisted and acknowledgments
+ * are accepted but ignored: there are no redeliveries.
+ */
+public class StubBroker implements AutoCloseable {
+
+    private static final int FRAME_MAX = 131072;
+    private static final int CHANNEL_MAX = 2047;
+    private static final byte[] PROTOCOL_HEADER = {'A', 'M', 'Q', 'P', 0, 0, 9, 1};
+
+    private final ServerSocket serverSocket;
+    private final Set<StubConnection> connections = ConcurrentHashMap.newKeySet();
+    private final AtomicLong names = new AtomicLong();
+
+    // routing state, guarded by this
+    private final Map<String, StubQueue> queues = new HashMap<>();
+    // exchange -> routing key -> queues
+    private final Map<String, Map<String, Set<String>>> bindings = new HashMap<>();
+
+    public StubBroker() throws IOException {
+        this.serverSocket = new ServerSocket(0, 50, InetAddress.getLoopbackAddress());
+        Thread acceptor = new Thread(this::accept, "stub-broker-acceptor-" + getPort());
+        acceptor.setDaemon(true);
+        acceptor.start();
+    }
+
+    public int getPort() {
+        return serverSocket.getLocalPort();
+    }
+
+    /**
+     * @return a connection factory for this broker, which uses blocking IO
+     */
+    public ConnectionFactory connectionFactory() {
+        ConnectionFactory connectionFactory = new ConnectionFactory();
+        connectionFactory.setHost(serverSocket.getInetAddress().getHostAddress());
+        connectionFactory.setPort(getPort());
+        return connectionFactory;
+    }
+
+    /**
+     * @return the number of messages waiting in a queue, -1 if it does not exist
+     */
+    public synchronized int messageCount(String queue) {
+        StubQueue q = queues.get(queue);
+        return q == null ? -1 : q.messages.size();
+    }
+
+    @Override
+    public void close() throws IOException {
+        serverSocket.close();
+        for (StubConnection connection : connections) {
+            connection.close();
+        }
+    }
+
+    private void accept() {
+        while (!serverSocket.isClosed()) {
+            try {
+                Socket socket = serverSocket.accept();
+                socket.setTcpNoDelay(true);
+                StubConnection connection = new StubConnection(socket);
+                connections.add(connection);
+                Thread reader = new Thread(connection::run, "stub-broker-connection-" + socket.getPort());
+                reader.setDaemon(true);
+                reader.start();
+            } catch (IOException e) {
+                // closed
+            }
+        }
+    }
+
+    private static Map<String, Object> serverProperties() {
+        Map<String, Object> capabilities = new HashMap<>();
+        capabilities.put("publisher_confirms", true);
+        capabilities.put("basic.nack", true);
+        capabilities.put("consumer_cancel_notify", true);
+        Map<String, Object> properties = new HashMap<>();
+        properties.put("product", "StubBroker");
+        properties.put("capabilities", capabilities);
+        return properties;
+    }
+
+    private synchronized StubQueue declareQueue(String name) {
+        String queue = name.isEmpty() ? "amq.gen-" + names.incrementAndGet() : name;
+        return queues.computeIfAbsent(queue, StubQueue::new);
+    }
+
+    private synchronized void bind(String queue, String exchange, String routingKey) {
+        bindings.computeIfAbsent(exchange, e -> new HashMap<>())
+            .computeIfAbsent(routingKey, k -> new LinkedHashSet<>())
+            .add(queue);
+    }
+
+    private synchronized void unbind(String queue, String exchange, String routingKey) {
+        Set<String> bound = bindings.getOrDefault(exchange, Collections.emptyMap()).get(routingKey);
+        if (bound != null) {
+            bound.remove(queue);
+        }
+    }
+
+    private synchronized int deleteQueue(String name) {
+        StubQueue queue = queues.remove(name);
+        for (Map<String, Set<String>> exchangeBindings : bindings.values()) {
+            for (Set<String> bound : exchangeBindings.values()) {
+                bound.remove(name);
+            }
+        }
+        return queue == null ? 0 : queue.messages.size();
+    }
+
+    private synchronized int purgeQueue(String name) {
+        StubQueue queue = queues.get(name);
+        if (queue == null) {
+            return 0;
+        }
+        int count = queue.messages.size();
+        queue.messages.clear();
+        return count;
+    }
+
+    private synchronized List<Delivery> addConsumer(String queue, StubConsumer consumer) {
+        StubQueue q = queues.get(queue);
+        if (q == null) {
+            return null;
+        }
+        q.consumers.add(consumer);
+        List<Delivery> deliveries = new ArrayList<>(q.messages.size());
+        for (Message message : q.messages) {
+            deliveries.add(new Delivery(consumer, message));
+        }
+        q.messages.clear();
+        return deliveries;
+    }
+
+    private synchronized void removeConsumers(StubChannel channel, String consumerTag) {
+        for (StubQueue queue : queues.values()) {
+            queue.consumers.removeIf(c -> c.channel == channel && (consumerTag == null || c.tag.equals(consumerTag)));
+        }
+    }
+
+    private synchronized Message get(String queue) {
+        StubQueue q = queues.get(queue);
+        return q == null ? null : q.messages.poll();
+    }
+
+    /**
+     * @return the deliveries to consumers, null if the message is unroutable
+     */
+    private synchronized List<Delivery> route(Message message) {
+        Set<String> destinations;
+        if (message.exchange.isEmpty()) {
+            destinations = Collections.singleton(message.routingKey);
+        } else {
+            destinations = bindings.getOrDefault(message.exchange, Collections.emptyMap())
+                .getOrDefault(message.routingKey, Collections.emptySet());
+        }
+        List<Delivery> deliveries = null;
+        for (String destination : destinations) {
+            StubQueue queue = queues.get(destination);
+            if (queue == null) {
+                continue;
+            }
+            if (deliveries == null) {
+                deliveries = new ArrayList<>(1);
+            }
+            if (queue.consumers.isEmpty()) {
+                queue.messages.add(message);
+            } else {
+                queue.next = (queue.next + 1) % queue.consumers.size();
+                deliveries.add(new Delivery(queue.consumers.get(queue.next), message));
+            }
+        }
+        return deliveries;
+    }
+
+    private static final class Message {
+
+        private final String exchange;
+        private final String routingKey;
+        private final AMQContentHeader header;
+        private final byte[] body;
+
+        private Message(String exchange, String routingKey, AMQContentHeader header, byte[] body) {
+            this.exchange = exchange;
+            this.routingKey = routingKey;
+            this.header = header;
+            this.body = body;
+        }
+    }
+
+    private static final class StubQueue {
+
+        private final String name;
+        private final List<StubConsumer> consumers = new ArrayList<>();
+        private final Deque<Message> messages = new ArrayDeque<>();
+        private int next;
+
+        private StubQueue(String name) {
+            this.name = name;
+        }
+    }
+
+    private static final class StubConsumer {
+
+        private final StubChannel channel;
+        private final String tag;
+
+        private StubConsumer(StubChannel channel, String tag) {
+            this.channel = channel;
+            this.tag = tag;
+        }
+    }
+
+    private static final class Delivery {
+
+        private final StubConsumer consumer;
+        private final Message message;
+
+        private Delivery(StubConsumer consumer, Message message) {
+            this.consumer = consumer;
+            this.message = message;
+        }
+
+        /**
+         * Sends the message to the consumer, closes the connection of the
+         * consumer if it fails, the connection of the publisher is unaffected.
+         */
+        private void send() {
+            StubChannel channel = consumer.channel;
+            try {
+                // delivery tags must be written in order
+                synchronized (channel.connection.out) {
+                    channel.connection.write(channel.number,
+                        new AMQImpl.Basic.Deliver(consumer.tag, channel.deliveryTags.incrementAndGet(), false,
+                            message.exchange, message.routingKey),
+                        message);
+                }
+            } catch (IOException e) {
+                channel.connection.close();
+            }
+        }
+    }
+
+    private static final class StubChannel {
+
+        private final StubConnection connection;
+        private final int number;
+        private final AtomicLong deliveryTags = new AtomicLong();
+        private boolean confirms;
+        private long publishSequence;
+
+        private StubChannel(StubConnection connection, int number) {
+            this.connection = connection;
+            this.number = number;
+        }
+    }
+
+    private final class StubConnection {
+
+        private final Socket socket;
+        private final DataOutputStream out;
+        private final Map<Integer, StubChannel> channels = new ConcurrentHashMap<>();
+        private volatile int frameMax = FRAME_MAX;
+
+        private StubConnection(Socket socket) throws IOException {
+            this.socket = socket;
+            this.out = new DataOutputStream(new BufferedOutputStream(socket.getOutputStream()));
+        }
+
+        private void run() {
+            try {
+                DataInputStream in = new DataInputStream(new BufferedInputStream(socket.getInputStream()));
+                byte[] header = new byte[PROTOCOL_HEADER.length];
+                in.readFully(header);
+                if (!Arrays.equals(header, PROTOCOL_HEADER)) {
+                    synchronized (out) {
+                        out.write(PROTOCOL_HEADER);
+                        out.flush();
+                    }
+                    return;
+                }
+                write(0, new AMQImpl.Connection.Start(0, 9, serverProperties(),
+                    LongStringHelper.asLongString("PLAIN AMQPLAIN"), LongStringHelper.asLongString("en_US")));
+                Map<Integer, AMQCommand> commands = new HashMap<>();
+                while (!socket.isClosed()) {
+                    Frame frame = Frame.readFrom(in, Integer.MAX_VALUE);
+                    if (frame == null || frame.getType() == AMQP.FRAME_HEARTBEAT) {
+                        continue;
+                    }
+                    AMQCommand command = commands.computeIfAbsent(frame.getChannel(), c -> new AMQCommand());
+                    if (command.handleFrame(frame)) {
+                        commands.remove(frame.getChannel());
+                        handle(frame.getChannel(), command);
+                    }
+                }
+            } catch (EOFException | SocketException e) {
+                // connection closed by the client or by the broker
+            } catch (IOException e) {
+                throw new IllegalStateException("Error in stub broker connection", e);
+            } finally {
+                close();
+            }
+        }
+
+        private void handle(int channelNumber, AMQCommand command) throws IOException {
+            Method method = command.getMethod();
+            if (channelNumber == 0) {
+                handleConnectionMethod(method);
+                return;
+            }
+            if (method instanceof AMQP.Channel.Open) {
+                channels.put(channelNumber, new StubChannel(this, channelNumber));
+                write(channelNumber, new AMQImpl.Channel.OpenOk(LongStringHelper.asLongString("")));
+                return;
+            }
+            StubChannel channel = channels.get(channelNumber);
+            if (channel == null) {
+                if (!(method instanceof AMQP.Channel.CloseOk)) {
+                    notImplemented(method);
+                }
+                return;
+            }
+            if (method instanceof AMQP.Basic.Publish) {
+                publish(channel, (AMQP.Basic.Publish) method, command);
+            } else if (method instanceof AMQP.Basic.Ack || method instanceof AMQP.Basic.Nack
+                || method instanceof AMQP.Basic.Reject) {
+                // no redeliveries, acknowledgments are ignored
+            } else if (method instanceof AMQP.Basic.Consume) {
+                consume(channel, (AMQP.Basic.Consume) method);
+            } else if (method instanceof AMQP.Basic.Cancel) {
+                AMQP.Basic.Cancel cancel = (AMQP.Basic.Cancel) method;
+                removeConsumers(channel, cancel.getConsumerTag());
+                reply(channel, cancel.getNowait(), new AMQImpl.Basic.CancelOk(cancel.getConsumerTag()));
+            } else if (method instanceof AMQP.Basic.Get) {
+                Message message = get(((AMQP.Basic.Get) method).getQueue());
+                if (message == null) {
+                    write(channelNumber, new AMQImpl.Basic.GetEmpty(""));
+                } else {
+                    synchronized (out) {
+                        write(channelNumber, new AMQImpl.Basic.GetOk(channel.deliveryTags.incrementAndGet(), false,
+                            message.exchange, message.routingKey, 0), message);
+                    }
+                }
+            } else if (method instanceof AMQP.Basic.Recover) {
+                // no redeliveries
+                write(channelNumber, new AMQImpl.Basic.RecoverOk());
+            } else if (method instanceof AMQP.Tx.Select) {
+                write(channelNumber, new AMQImpl.Tx.SelectOk());
+            } else if (method instanceof AMQP.Tx.Commit) {
+                write(channelNumber, new AMQImpl.Tx.CommitOk());
+            } else if (method instanceof AMQP.Tx.Rollback) {
+                write(channelNumber, new AMQImpl.Tx.RollbackOk());
+            } else if (method instanceof AMQP.Basic.Qos) {
+                write(channelNumber, new AMQImpl.Basic.QosOk());
+            } else if (method instanceof AMQP.Confirm.Select) {
+                channel.confirms = true;
+                reply(channel, ((AMQP.Confirm.Select) method).getNowait(), new AMQImpl.Confirm.SelectOk());
+            } else if (method instanceof AMQP.Exchange.Declare) {
+                reply(channel, ((AMQP.Exchange.Declare) method).getNowait(), new AMQImpl.Exchange.DeclareOk());
+            } else if (method instanceof AMQP.Exchange.Delete) {
+                reply(channel, ((AMQP.Exchange.Delete) method).getNowait(), new AMQImpl.Exchange.DeleteOk());
+            } else if (method instanceof AMQP.Queue.Declare) {
+                AMQP.Queue.Declare declare = (AMQP.Queue.Declare) method;
+                StubQueue queue = declareQueue(declare.getQueue());
+                int messageCount;
+                int consumerCount;
+                synchronized (StubBroker.this) {
+                    messageCount = queue.messages.size();
+                    consumerCount = queue.consumers.size();
+                }
+                reply(channel, declare.getNowait(), new AMQImpl.Queue.DeclareOk(queue.name, messageCount, consumerCount));
+            } else if (method instanceof AMQP.Queue.Bind) {
+                AMQP.Queue.Bind bind = (AMQP.Queue.Bind) method;
+                bind(bind.getQueue(), bind.getExchange(), bind.getRoutingKey());
+                reply(channel, bind.getNowait(), new AMQImpl.Queue.BindOk());
+            } else if (method instanceof AMQP.Queue.Unbind) {
+                AMQP.Queue.Unbind unbind = (AMQP.Queue.Unbind) method;
+                unbind(unbind.getQueue(), unbind.getExchange(), unbind.getRoutingKey());
+                write(channelNumber, new AMQImpl.Queue.UnbindOk());
+            } else if (method instanceof AMQP.Queue.Purge) {
+                AMQP.Queue.Purge purge = (AMQP.Queue.Purge) method;
+                reply(channel, purge.getNowait(), new AMQImpl.Queue.PurgeOk(purgeQueue(purge.getQueue())));
+            } else if (method instanceof AMQP.Queue.Delete) {
+                AMQP.Queue.Delete delete = (AMQP.Queue.Delete) method;
+                reply(channel, delete.getNowait(), new AMQImpl.Queue.DeleteOk(deleteQueue(delete.getQueue())));
+            } else if (method instanceof AMQP.Channel.Close) {
+                removeConsumers(channel, null);
+                channels.remove(channelNumber);
+                write(channelNumber, new AMQImpl.Channel.CloseOk());
+            } else {
+                notImplemented(method);
+            }
+        }
+
+        private void handleConnectionMethod(Method method) throws IOException {
+            if (method instanceof AMQP.Connection.StartOk) {
+                write(0, new AMQImpl.Connection.Tune(CHANNEL_MAX, FRAME_MAX, 0));
+            } else if (method instanceof AMQP.Connection.TuneOk) {
+                int negotiated = ((AMQP.Connection.TuneOk) method).getFrameMax();
+                frameMax = negotiated == 0 ? FRAME_MAX : Math.min(negotiated, FRAME_MAX);
+            } else if (method instanceof AMQP.Connection.Open) {
+                write(0, new AMQImpl.Connection.OpenOk(""));
+            } else if (method instanceof AMQP.Connection.Close) {
+                write(0, new AMQImpl.Connection.CloseOk());
+                close();
+            } else if (method instanceof AMQP.Connection.CloseOk) {
+                close();
+            } else {
+                notImplemented(method);
+            }
+        }
+
+        private void publish(StubChannel channel, AMQP.Basic.Publish publish, AMQCommand command) throws IOException {
+            Message message = new Message(publish.getExchange(), publish.getRoutingKey(),
+                command.getContentHeader(), command.getContentBody());
+            List<Delivery> deliveries = route(message);
+            // deliveries are written outside of the routing lock
+            if (deliveries != null) {
+                for (Delivery delivery : deliveries) {
+                    delivery.send();
+                }
+            } else if (publish.getMandatory()) {
+                write(channel.number, new AMQImpl.Basic.Return(AMQP.NO_ROUTE, "NO_ROUTE",
+                    message.exchange, message.routingKey), message);
+            }
+            if (channel.confirms) {
+                write(channel.number, new AMQImpl.Basic.Ack(++channel.publishSequence, false));
+            }
+        }
+
+        private void consume(StubChannel channel, AMQP.Basic.Consume consume) throws IOException {
+            String tag = consume.getConsumerTag().isEmpty() ?
+                "amq.ctag-" + names.incrementAndGet() : consume.getConsumerTag();
+            List<Delivery> pending = addConsumer(consume.getQueue(), new StubConsumer(channel, tag));
+            if (pending == null) {
+                channels.remove(channel.number);
+                write(channel.number, new AMQImpl.Channel.Close(AMQP.NOT_FOUND,
+                    "NOT_FOUND - no queue '" + consume.getQueue() + "'", consume.protocolClassId(), consume.protocolMethodId()));
+                return;
+            }
+            reply(channel, consume.getNowait(), new AMQImpl.Basic.ConsumeOk(tag));
+            for (Delivery delivery : pending) {
+                delivery.send();
+            }
+        }
+
+        private void notImplemented(Method method) throws IOException {
+            write(0, new AMQImpl.Connection.Close(AMQP.NOT_IMPLEMENTED,
+                "NOT_IMPLEMENTED - " + method.protocolMethodName(), method.protocolClassId(), method.protocolMethodId()));
+        }
+
+        private void reply(StubChannel channel, boolean nowait, Method reply) throws IOException {
+            if (!nowait) {
+                write(channel.number, reply);
+            }
+        }
+
+        private void write(int channelNumber, Method method) throws IOException {
+            synchronized (out) {
+                method.toFrame(channelNumber).writeTo(out);
+                out.flush();
+            }
+        }
+
+        private void write(int channelNumber, Method method, Message message) throws IOException {
+            byte[] body = message.body;
+            int bodyFrameMax = frameMax - AMQCommand.EMPTY_FRAME_SIZE;
+            synchronized (out) {
+                method.toFrame(channelNumber).writeTo(out);
+                message.header.toFrame(channelNumber, body.length).writeTo(out);
+                for (int offset = 0; offset < body.length; offset += bodyFrameMax) {
+                    int length = Math.min(bodyFrameMax, body.length - offset);
+                    Frame.fromBodyFragment(channelNumber, body, offset, length).writeTo(out);
+                }
+                out.flush();
+            }
+        }
+
+        private void close() {
+            connections.remove(this);
+            for (StubChannel channel : channels.values()) {
+                removeConsumers(channel, null);
+            }
+            try {
+                socket.close();
+            } catch (IOException e) {
+                // ignored
+            }
+        }
+    }
+
+}
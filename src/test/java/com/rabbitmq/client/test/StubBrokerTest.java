@@ -0,0 +1,161 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.test;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.Channel;
+import com.rabbitmq.client.Connection;
+import com.rabbitmq.client.ConnectionFactory;
+import com.rabbitmq.client.DefaultConsumer;
+import com.rabbitmq.client.Envelope;
+import com.rabbitmq.client.GetResponse;
+import org.junit.jupiter.api.AfterEach;
+import org.junit.jupiter.api.BeforeEach;
+import org.junit.jupiter.params.ParameterizedTest;
+import org.junit.jupiter.params.provider.ValueSource;
+
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.util.List;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.concurrent.CountDownLatch;
+
+import static com.rabbitmq.client.test.TestUtils.LatchConditions.completed;
+import static org.assertj.core.api.Assertions.assertThat;
+import static org.assertj.core.api.Assertions.assertThatThrownBy;
+
+public class StubBrokerTest {
+
+    StubBroker broker;
+
+    @BeforeEach
+    public void init() throws IOException {
+        broker = new StubBroker();
+    }
+
+    @AfterEach
+    public void tearDown() throws IOException {
+        broker.close();
+    }
+
+    ConnectionFactory connectionFactory(boolean nio) {
+        ConnectionFactory cf = broker.connectionFactory();
+        if (nio) {
+            cf.useNio();
+        } else {
+            cf.useBlockingIo();
+        }
+        return cf;
+    }
+
+    @ParameterizedTest
+    @ValueSource(booleans = {true, false})
+    public void publishedMessagesAreDeliveredToConsumers(boolean nio) throws Exception {
+        int messageCount = 100;
+        try (Connection connection = connectionFactory(nio).newConnection()) {
+            Channel channel = connection.createChannel();
+            String queue = channel.queueDeclare().getQueue();
+            CountDownLatch latch = new CountDownLatch(messageCount);
+            List<String> bodies = new CopyOnWriteArrayList<>();
+            List<Long> deliveryTags = new CopyOnWriteArrayList<>();
+            channel.basicConsume(queue, false, new DefaultConsumer(channel) {
+                @Override
+                public void handleDelivery(String consumerTag, Envelope envelope, AMQP.BasicProperties properties, byte[] body) throws IOException {
+                    assertThat(properties.getContentType()).isEqualTo("text/plain");
+                    bodies.add(new String(body, StandardCharsets.UTF_8));
+                    deliveryTags.add(envelope.getDeliveryTag());
+                    getChannel().basicAck(envelope.getDeliveryTag(), false);
+                    latch.countDown();
+                }
+            });
+            AMQP.BasicProperties properties = new AMQP.BasicProperties.Builder().contentType("text/plain").build();
+            for (int i = 0; i < messageCount; i++) {
+                channel.basicPublish("", queue, properties, ("message " + i).getBytes(StandardCharsets.UTF_8));
+            }
+            assertThat(latch).is(completed());
+            assertThat(bodies).hasSize(messageCount).startsWith("message 0").endsWith("message 99");
+            assertThat(deliveryTags).startsWith(1L).endsWith((long) messageCount);
+        }
+    }
+
+    @ParameterizedTest
+    @ValueSource(booleans = {true, false})
+    public void bodiesLargerThanFrameMaxAreSplitAndReassembled(boolean nio) throws Exception {
+        try (Connection connection = connectionFactory(nio).newConnection()) {
+            Channel channel = connection.createChannel();
+            String queue = channel.queueDeclare().getQueue();
+            byte[] body = new byte[connection.getFrameMax() * 3 + 1];
+            for (int i = 0; i < body.length; i++) {
+                body[i] = (byte) i;
+            }
+            channel.basicPublish("", queue, null, body);
+            GetResponse response = channel.basicGet(queue, true);
+            assertThat(response).isNotNull();
+            assertThat(response.getBody()).isEqualTo(body);
+            assertThat(channel.basicGet(queue, true)).isNull();
+        }
+    }
+
+    @ParameterizedTest
+    @ValueSource(booleans = {true, false})
+    public void publisherConfirmsAreSent(boolean nio) throws Exception {
+        try (Connection connection = connectionFactory(nio).newConnection()) {
+            Channel channel = connection.createChannel();
+            channel.confirmSelect();
+            String queue = channel.queueDeclare().getQueue();
+            for (int i = 0; i < 10; i++) {
+                channel.basicPublish("", queue, null, new byte[10]);
+            }
+            channel.waitForConfirmsOrDie(10_000);
+            assertThat(broker.messageCount(queue)).isEqualTo(10);
+        }
+    }
+
+    @ParameterizedTest
+    @ValueSource(booleans = {true, false})
+    public void messagesAreRoutedThroughBindingsOrReturned(boolean nio) throws Exception {
+        try (Connection connection = connectionFactory(nio).newConnection()) {
+            Channel channel = connection.createChannel();
+            channel.exchangeDeclare("orders", "direct");
+            String queue = channel.queueDeclare().getQueue();
+            channel.queueBind(queue, "orders", "orders.created");
+            CountDownLatch returned = new CountDownLatch(1);
+            channel.addReturnListener(r -> {
+                assertThat(r.getRoutingKey()).isEqualTo("orders.deleted");
+                returned.countDown();
+            });
+            channel.basicPublish("orders", "orders.created", null, "created".getBytes(StandardCharsets.UTF_8));
+            channel.basicPublish("orders", "orders.deleted", true, null, "deleted".getBytes(StandardCharsets.UTF_8));
+            assertThat(returned).is(completed());
+            assertThat(channel.basicGet(queue, true).getBody()).isEqualTo("created".getBytes(StandardCharsets.UTF_8));
+            assertThat(channel.queuePurge(queue).getMessageCount()).isZero();
+        }
+    }
+
+    @ParameterizedTest
+    @ValueSource(booleans = {true, false})
+    public void unsupportedMethodsCloseTheConnection(boolean nio) throws Exception {
+        Connection connection = connectionFactory(nio).newConnection();
+        Channel channel = connection.createChannel();
+        assertThatThrownBy(channel::txSelect).isInstanceOf(IOException.class);
+        TestUtils.waitAtMost(() -> !connection.isOpen());
+        assertThat(connection.getCloseReason().getReason()).isInstanceOf(AMQP.Connection.Close.class);
+        AMQP.Connection.Close close = (AMQP.Connection.Close) connection.getCloseReason().getReason();
+        assertThat(close.getReplyCode()).isEqualTo(AMQP.NOT_IMPLEMENTED);
+    }
+
+}
@@ -0,0 +1,64 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import org.openjdk.jmh.annotations.Benchmark;
+import org.openjdk.jmh.annotations.BenchmarkMode;
+import org.openjdk.jmh.annotations.Fork;
+import org.openjdk.jmh.annotations.Measurement;
+import org.openjdk.jmh.annotations.Mode;
+import org.openjdk.jmh.annotations.OutputTimeUnit;
+import org.openjdk.jmh.annotations.Scope;
+import org.openjdk.jmh.annotations.Setup;
+import org.openjdk.jmh.annotations.State;
+import org.openjdk.jmh.annotations.Warmup;
+
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * Cold start of the generated protocol classes: each fork measures a single
+ * decoding of a connection.tune method, which loads and links AMQImpl.
+ * The result depends on the codegen profile of the build, compare runs of
+ * a full and of a trimmed build (-Dcodegen.profile=publish).
+ */
+@State(Scope.Benchmark)
+@BenchmarkMode(Mode.SingleShotTime)
+@OutputTimeUnit(TimeUnit.MICROSECONDS)
+@Warmup(iterations = 0)
+@Measurement(iterations = 1)
+@Fork(20)
+public class AMQImplStartupBenchmark {
+
+    private ByteBuffer tune;
+
+    @Setup
+    public void setUp() {
+        // encoded by hand, AMQImpl must not be loaded before the measurement
+        tune = ByteBuffer.allocate(12);
+        tune.putShort((short) 10).putShort((short) 30) // connection.tune
+            .putShort((short) 2047).putInt(131072).putShort((short) 60);
+        tune.flip();
+    }
+
+    @Benchmark
+    public Method firstDecode() throws IOException {
+        return AMQImpl.readMethodFrom(tune);
+    }
+
+}
@@ -0,0 +1,109 @@
+// Copyright (c) 2007-2023 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.Channel;
+import org.openjdk.jmh.annotations.Benchmark;
+import org.openjdk.jmh.annotations.BenchmarkMode;
+import org.openjdk.jmh.annotations.Fork;
+import org.openjdk.jmh.annotations.Level;
+import org.openjdk.jmh.annotations.Measurement;
+import org.openjdk.jmh.annotations.Mode;
+import org.openjdk.jmh.annotations.OperationsPerInvocation;
+import org.openjdk.jmh.annotations.OutputTimeUnit;
+import org.openjdk.jmh.annotations.Param;
+import org.openjdk.jmh.annotations.Scope;
+import org.openjdk.jmh.annotations.Setup;
+import org.openjdk.jmh.annotations.State;
+import org.openjdk.jmh.annotations.TearDown;
+import org.openjdk.jmh.annotations.Warmup;
+
+import java.lang.reflect.Proxy;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Dispatch of consumer work, like the connection thread does for deliveries,
+ * with the work pool and with the ring buffers of {@link RingBufferDispatcher}.
+ * Each operation is a work item, items are spread over the channels.
+ */
+@State(Scope.Benchmark)
+@BenchmarkMode(Mode.Throughput)
+@OutputTimeUnit(TimeUnit.MILLISECONDS)
+@Warmup(iterations = 3, time = 2)
+@Measurement(iterations = 5, time = 2)
+@Fork(1)
+public class ConsumerWorkServiceBenchmark {
+
+    private static final int ITEMS = 10_000;
+
+    @Param({"workPool", "ringBuffer"})
+    public String dispatch;
+
+    @Param({"1", "16", "256"})
+    public int channelCount;
+
+    @Param({"4"})
+    public int threads;
+
+    private ExecutorService executor;
+    private ConsumerWorkService workService;
+    private Channel[] channels;
+    private final AtomicLong done = new AtomicLong();
+    private Runnable item;
+
+    @Setup(Level.Trial)
+    public void setUp() {
+        executor = Executors.newFixedThreadPool(threads);
+        workService = new ConsumerWorkService(executor, null, -1, 1000, "ringBuffer".equals(dispatch));
+        channels = new Channel[channelCount];
+        for (int i = 0; i < channelCount; i++) {
+            // only the identity of channels matters
+            channels[i] = (Channel) Proxy.newProxyInstance(getClass().getClassLoader(),
+                new Class<?>[] { Channel.class }, (proxy, method, args) -> {
+                    if (method.getName().equals("hashCode")) {
+                        return System.identityHashCode(proxy);
+                    } else if (method.getName().equals("equals")) {
+                        return proxy == args[0];
+                    }
+                    return null;
+                });
+            workService.registerKey(channels[i]);
+        }
+        item = done::incrementAndGet;
+    }
+
+    @TearDown(Level.Trial)
+    public void tearDown() {
+        workService.shutdown();
+        executor.shutdownNow();
+    }
+
+    @Benchmark
+    @OperationsPerInvocation(ITEMS)
+    public long dispatch() {
+        long target = done.get() + ITEMS;
+        for (int i = 0; i < ITEMS; i++) {
+            workService.addWork(channels[i % channelCount], item);
+        }
+        while (done.get() < target) {
+            Thread.yield();
+        }
+        return target;
+    }
+}
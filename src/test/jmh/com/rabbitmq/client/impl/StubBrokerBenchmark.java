@@ -0,0 +1,150 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import com.rabbitmq.client.AMQP;
+import com.rabbitmq.client.Channel;
+import com.rabbitmq.client.Connection;
+import com.rabbitmq.client.ConnectionFactory;
+import com.rabbitmq.client.DefaultConsumer;
+import com.rabbitmq.client.Envelope;
+import com.rabbitmq.client.test.StubBroker;
+import org.openjdk.jmh.annotations.Benchmark;
+import org.openjdk.jmh.annotations.BenchmarkMode;
+import org.openjdk.jmh.annotations.Fork;
+import org.openjdk.jmh.annotations.Level;
+import org.openjdk.jmh.annotations.Measurement;
+import org.openjdk.jmh.annotations.Mode;
+import org.openjdk.jmh.annotations.OperationsPerInvocation;
+import org.openjdk.jmh.annotations.OutputTimeUnit;
+import org.openjdk.jmh.annotations.Param;
+import org.openjdk.jmh.annotations.Scope;
+import org.openjdk.jmh.annotations.Setup;
+import org.openjdk.jmh.annotations.State;
+import org.openjdk.jmh.annotations.TearDown;
+import org.openjdk.jmh.annotations.Warmup;
+
+import java.io.IOException;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Publishing and consuming through the whole client, channels, command
+ * assembly and frame handlers, against the in-process {@link StubBroker},
+ * with the blocking socket and with the NIO frame handlers.
+ * Throughput is in messages per millisecond, latency is the time between
+ * publishing a message and its delivery to the consumer.
+ */
+@State(Scope.Benchmark)
+@Warmup(iterations = 3, time = 2)
+@Measurement(iterations = 5, time = 2)
+@Fork(1)
+public class StubBrokerBenchmark {
+
+    private static final int MESSAGES = 1000;
+
+    @Param({"blocking", "nio"})
+    public String io;
+
+    @Param({"16", "4096"})
+    public int messageSize;
+
+    private StubBroker broker;
+    private Connection publisherConnection;
+    private Connection consumerConnection;
+    private Channel publisher;
+    private Channel confirmingPublisher;
+    private String queue;
+    private byte[] body;
+    private final AtomicLong received = new AtomicLong();
+
+    @Setup(Level.Trial)
+    public void setUp() throws Exception {
+        broker = new StubBroker();
+        ConnectionFactory cf = broker.connectionFactory();
+        if ("nio".equals(io)) {
+            cf.useNio();
+        } else {
+            cf.useBlockingIo();
+        }
+        publisherConnection = cf.newConnection();
+        consumerConnection = cf.newConnection();
+        publisher = publisherConnection.createChannel();
+        confirmingPublisher = publisherConnection.createChannel();
+        confirmingPublisher.confirmSelect();
+        Channel consumer = consumerConnection.createChannel();
+        queue = consumer.queueDeclare().getQueue();
+        consumer.basicConsume(queue, true, new DefaultConsumer(consumer) {
+            @Override
+            public void handleDelivery(String consumerTag, Envelope envelope, AMQP.BasicProperties properties, byte[] body) {
+                received.incrementAndGet();
+            }
+        });
+        body = new byte[messageSize];
+    }
+
+    @TearDown(Level.Trial)
+    public void tearDown() throws IOException {
+        publisherConnection.close();
+        consumerConnection.close();
+        broker.close();
+    }
+
+    private void awaitDeliveries(long target) {
+        while (received.get() < target) {
+            Thread.yield();
+        }
+    }
+
+    @Benchmark
+    @BenchmarkMode(Mode.Throughput)
+    @OutputTimeUnit(TimeUnit.MILLISECONDS)
+    @OperationsPerInvocation(MESSAGES)
+    public long publishConsume() throws IOException {
+        long target = received.get() + MESSAGES;
+        for (int i = 0; i < MESSAGES; i++) {
+            publisher.basicPublish("", queue, null, body);
+        }
+        awaitDeliveries(target);
+        return target;
+    }
+
+    @Benchmark
+    @BenchmarkMode(Mode.Throughput)
+    @OutputTimeUnit(TimeUnit.MILLISECONDS)
+    @OperationsPerInvocation(MESSAGES)
+    public long publishConfirmConsume() throws Exception {
+        long target = received.get() + MESSAGES;
+        for (int i = 0; i < MESSAGES; i++) {
+            confirmingPublisher.basicPublish("", queue, null, body);
+        }
+        confirmingPublisher.waitForConfirmsOrDie(10_000);
+        awaitDeliveries(target);
+        return target;
+    }
+
+    @Benchmark
+    @BenchmarkMode(Mode.SampleTime)
+    @OutputTimeUnit(TimeUnit.MICROSECONDS)
+    public long deliveryLatency() throws IOException {
+        long target = received.get() + 1;
+        publisher.basicPublish("", queue, null, body);
+        awaitDeliveries(target);
+        return target;
+    }
+
+}
@@ -0,0 +1,136 @@
+// Copyright (c) 2007-2020 VMware, Inc. or its affiliates.  All rights reserved.
+//
+// This software, the RabbitMQ Java client library, is triple-licensed under the
+// Mozilla Public License 2.0 ("MPL"), the GNU General Public License version 2
+// ("GPL") and the Apache License version 2 ("ASL"). For the MPL, please see
+// LICENSE-MPL-RabbitMQ. For the GPL, please see LICENSE-GPL2.  For the ASL,
+// please see LICENSE-APACHE2.
+//
+// This software is distributed on an "AS IS" basis, WITHOUT WARRANTY OF ANY KIND,
+// either express or implied. See the LICENSE file for specific language governing
+// rights and limitations of this software.
+//
+// If you have any questions regarding licensing, please contact us at
+// info@rabbitmq.com.
+
+
+package com.rabbitmq.client.impl;
+
+import org.openjdk.jmh.annotations.Benchmark;
+import org.openjdk.jmh.annotations.BenchmarkMode;
+import org.openjdk.jmh.annotations.Fork;
+import org.openjdk.jmh.annotations.Measurement;
+import org.openjdk.jmh.annotations.Mode;
+import org.openjdk.jmh.annotations.OutputTimeUnit;
+import org.openjdk.jmh.annotations.Param;
+import org.openjdk.jmh.annotations.Scope;
+import org.openjdk.jmh.annotations.Setup;
+import org.openjdk.jmh.annotations.State;
+import org.openjdk.jmh.annotations.TearDown;
+import org.openjdk.jmh.annotations.Threads;
+import org.openjdk.jmh.annotations.Warmup;
+import org.openjdk.jmh.infra.ThreadParams;
+
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.ScheduledThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * Timers of many connections sharing a scheduler: each connection has a
+ * periodic heartbeat task, and re-arms a one-shot task, the way channels
+ * schedule ack flushes and continuation timeouts. The benchmark cancels
+ * and schedules again the one-shot task of a connection, with a
+ * {@link HashedTimerWheel} and with a {@link ScheduledThreadPoolExecutor},
+ * the heartbeat executor of connections, from several threads.
+ */
+@State(Scope.Benchmark)
+@BenchmarkMode(Mode.Throughput)
+@OutputTimeUnit(TimeUnit.MILLISECONDS)
+@Warmup(iterations = 3, time = 2)
+@Measurement(iterations = 5, time = 2)
+@Fork(1)
+@Threads(4)
+public class TimerWheelBenchmark {
+
+    @Param({"1000", "10000", "100000"})
+    public int connections;
+
+    @Param({"wheel", "executor"})
+    public String timer;
+
+    private HashedTimerWheel wheel;
+    private ScheduledThreadPoolExecutor executor;
+
+    private Future<?>[] heartbeats;
+    private Future<?>[] timeouts;
+
+    private static final Runnable TASK = () -> { };
+
+    @Setup
+    public void setUp() {
+        if ("wheel".equals(timer)) {
+            wheel = new HashedTimerWheel();
+        } else {
+            executor = new ScheduledThreadPoolExecutor(1, Executors.defaultThreadFactory());
+            // cancelled tasks would stay in the queue until they are due otherwise
+            executor.setRemoveOnCancelPolicy(true);
+        }
+        heartbeats = new Future<?>[connections];
+        timeouts = new Future<?>[connections];
+        for (int i = 0; i < connections; i++) {
+            heartbeats[i] = wheel != null ?
+                wheel.scheduleAtFixedRate(TASK, 30, 30, TimeUnit.SECONDS) :
+                executor.scheduleAtFixedRate(TASK, 30, 30, TimeUnit.SECONDS);
+            timeouts[i] = schedule();
+        }
+    }
+
+    @TearDown
+    public void tearDown() {
+        if (wheel != null) {
+            wheel.close();
+        } else {
+            executor.shutdownNow();
+        }
+    }
+
+    private Future<?> schedule() {
+        return wheel != null ?
+            wheel.schedule(TASK, 10, TimeUnit.SECONDS) :
+            executor.schedule(TASK, 10, TimeUnit.SECONDS);
+    }
+
+    /** Each thread re-arms the timers of its own share of the connections */
+    @State(Scope.Thread)
+    public static class Cursor {
+
+        private int next;
+        private int stride;
+
+        @Setup
+        public void setUp(ThreadParams threadParams) {
+            next = threadParams.getThreadIndex();
+            stride = threadParams.getThreadCount();
+        }
+
+        private int next(int connections) {
+            int connection = next;
+            next += stride;
+            if (next >= connections) {
+                next = connection % stride;
+            }
+            return connection;
+        }
+    }
+
+    @Benchmark
+    public Future<?> rearm(Cursor cursor) {
+        int connection = cursor.next(connections);
+        timeouts[connection].cancel(false);
+        Future<?> timeout = schedule();
+        timeouts[connection] = timeout;
+        return timeout;
+    }
+
+}